@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized backtester against a day-by-day loop per strategy.
+
+Simulates many static-weight strategies (e.g. the parameter sets of a sweep)
+over one returns panel with transaction costs, so the timings measure the
+simulation itself rather than optimizer solves.
+
+Usage:
+    python benchmarks/bench_backtest.py [--strategies 10 100] [--assets 100] [--days 2520]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import make_returns, timed
+
+from app.algorithms.backtest import Backtester, BacktestStrategy
+
+
+def loop_backtest(returns: np.ndarray, weights: np.ndarray, positions: set, cost: float) -> np.ndarray:
+    """Reference backtest: update every holding day by day."""
+    holdings = np.zeros(returns.shape[1])
+    cash = 1.0
+    equity = np.empty(len(returns))
+    for t in range(len(returns)):
+        if t > 0:
+            holdings = holdings * (1.0 + returns[t])
+        value = holdings.sum() + cash
+        equity[t] = value
+        if t in positions:
+            value *= 1.0 - cost * np.abs(weights - holdings / value).sum()
+            holdings = weights * value
+            cash = value * (1.0 - weights.sum())
+            if t == 0:
+                equity[t] = value
+    return equity
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategies", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--schedule", default="M", help="Rebalancing frequency")
+    parser.add_argument("--cost", type=float, default=0.001)
+    args = parser.parse_args()
+
+    panel = make_returns(args.days, args.assets)
+    panel.index = pd.bdate_range("2015-01-01", periods=args.days)
+    rng = np.random.default_rng(1)
+
+    header = f"{'strategies':>10}{'loop (s)':>10}{'vectorized (s)':>16}{'speedup':>9}{'max diff':>10}"
+    print(header)
+    print("-" * len(header))
+    for n_strategies in args.strategies:
+        weights = rng.dirichlet(np.ones(args.assets), size=n_strategies)
+        strategies = [
+            BacktestStrategy(f"s{i}", weights=dict(zip(panel.columns, w))) for i, w in enumerate(weights)
+        ]
+        backtester = Backtester(panel, schedule=args.schedule, transaction_cost=args.cost)
+        positions = set(backtester.rebalance_positions(args.schedule).tolist()) | {0}
+        positions.discard(args.days - 1)
+
+        results, vectorized = timed(lambda: backtester.run(strategies), repeats=3)
+        reference, loop = timed(
+            lambda: [loop_backtest(panel.values, w, positions, args.cost) for w in weights]
+        )
+        diff = max(
+            np.abs(results[f"s{i}"].equity.values - equity)[[t not in positions or t == 0 for t in range(args.days)]].max()
+            for i, equity in enumerate(reference)
+        )
+        print(f"{n_strategies:>10}{loop:>10.3f}{vectorized:>16.3f}{loop / vectorized:>8.1f}x{diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
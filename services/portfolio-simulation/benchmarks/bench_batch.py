@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch optimization: one MeanVarianceOptimizer per user vs BatchOptimizer.
+
+Every user shares the universe but has their own weight cap and target return.
+
+Usage:
+    python benchmarks/bench_batch.py [--assets 50 250] [--users 200] [--workers 1 4]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.batch import BatchOptimizationRequest, BatchOptimizer
+from app.algorithms.mean_variance import MeanVarianceOptimizer
+
+
+def make_requests(returns, n_users: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    mu = returns.mean().values
+    requests = []
+    for i in range(n_users):
+        cap = rng.uniform(0.05, 0.3)
+        target = None if i % 2 else float(np.quantile(mu, rng.uniform(0.4, 0.7)))
+        requests.append(BatchOptimizationRequest(f"user_{i}", target_return=target, weight_bounds=(0, cap)))
+    return requests
+
+
+def per_user(returns, requests, covariance: str) -> int:
+    solved = 0
+    for request in requests:
+        try:
+            MeanVarianceOptimizer(
+                returns,
+                target_return=request.target_return,
+                weight_bounds=request.weight_bounds,
+                covariance=covariance
+            ).optimize()
+            solved += 1
+        except (ValueError, RuntimeError):
+            pass
+    return solved
+
+
+def batched(returns, requests, covariance: str, workers: int) -> int:
+    batch = BatchOptimizer(returns, covariance=covariance, max_workers=workers)
+    return sum(result.success for result in batch.optimize(requests))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[50, 250])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--covariance", default="ledoit_wolf")
+    args = parser.parse_args()
+
+    header = f"{'mode':<14}{'assets':>7}{'users':>7}{'solved':>8}{'time (s)':>10}{'ms/user':>9}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        requests = make_requests(returns, args.users)
+        runs = [("per-user", lambda: per_user(returns, requests, args.covariance))]
+        for workers in args.workers:
+            runs.append((f"batch x{workers}", lambda w=workers: batched(returns, requests, args.covariance, w)))
+        for mode, run in runs:
+            solved, seconds = timed(run)
+            print(
+                f"{mode:<14}{n_assets:>7}{args.users:>7}{solved:>8}"
+                f"{seconds:>10.3f}{seconds / args.users * 1e3:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Black-Litterman posterior: explicit inverses vs the Woodbury form,
+and a cold vs cached prior when re-running with new views.
+
+Usage:
+    python benchmarks/bench_black_litterman.py [--assets 250 1000 2000] [--views 10]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.black_litterman import BlackLittermanOptimizer, View, clear_prior_cache
+
+
+def inverse_posterior(optimizer, views, tau):
+    """The previous posterior: (τΣ)^-1 and Ω^-1 formed explicitly, then an N x N solve."""
+    P, Q, Omega = optimizer._create_view_matrices(views)
+    tau_sigma_inv = np.linalg.inv(tau * optimizer.cov_matrix)
+    omega_inv = np.linalg.inv(Omega)
+    return np.linalg.solve(
+        tau_sigma_inv + P.T @ omega_inv @ P,
+        tau_sigma_inv @ optimizer.equilibrium_returns + P.T @ omega_inv @ Q
+    )
+
+
+def make_views(assets, n_views, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        View(list(rng.choice(assets, size=3, replace=False)), [1.0, 1.0, 1.0], 0.0003, 0.5)
+        for _ in range(n_views)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[250, 1000, 2000])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--views", type=int, default=10)
+    args = parser.parse_args()
+
+    header = (
+        f"{'assets':>7}{'inverse (s)':>13}{'woodbury (s)':>14}{'speedup':>9}"
+        f"{'cold run (s)':>14}{'cached run (s)':>16}{'max diff':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        assets = list(returns.columns)
+        clear_prior_cache()
+
+        def run(seed):
+            optimizer = BlackLittermanOptimizer(returns)
+            return optimizer, optimizer.combine_views(make_views(assets, args.views, seed))
+
+        (optimizer, posterior), cold_seconds = timed(lambda: run(0))
+        _, cached_seconds = timed(lambda: run(1), repeats=3)
+        views = make_views(assets, args.views, 0)
+        reference, inverse_seconds = timed(lambda: inverse_posterior(optimizer, views, optimizer.tau))
+        _, woodbury_seconds = timed(lambda: optimizer.combine_views(views), repeats=3)
+        # With fewer days than assets Σ is singular and the inverse form breaks down
+        difference = np.max(np.abs(posterior - reference)) / np.max(np.abs(posterior))
+        print(
+            f"{n_assets:>7}{inverse_seconds:>13.3f}{woodbury_seconds:>14.4f}"
+            f"{inverse_seconds / woodbury_seconds:>8.0f}x{cold_seconds:>14.3f}{cached_seconds:>16.4f}"
+            f"{difference:>12.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
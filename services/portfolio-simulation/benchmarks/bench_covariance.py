@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark the covariance estimators: estimation time, storage, and the cost of w'Σw.
+
+Usage:
+    python benchmarks/bench_covariance.py [--assets 250 1000 3000] [--days 756]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.covariance import (
+    EWMACovariance,
+    FactorCovariance,
+    FactorModelCovariance,
+    LedoitWolfCovariance,
+    SampleCovariance,
+)
+
+ESTIMATORS = {
+    "sample": SampleCovariance,
+    "ledoit_wolf": LedoitWolfCovariance,
+    "ewma": EWMACovariance,
+    "factor": lambda: FactorModelCovariance(num_factors=5),
+}
+
+
+def storage_bytes(model) -> int:
+    if isinstance(model, FactorCovariance):
+        return model.loadings.nbytes + model.factor_cov.nbytes + model.specific_variance.nbytes
+    return model.to_dense().nbytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[250, 1000, 3000])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--evaluations", type=int, default=1000)
+    args = parser.parse_args()
+
+    header = f"{'estimator':<13}{'assets':>7}{'estimate (s)':>14}{'storage (MB)':>14}{'w.Sw (us)':>11}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        weights = np.full(n_assets, 1.0 / n_assets)
+        for name, estimator in ESTIMATORS.items():
+            model, estimate_seconds = timed(lambda: estimator().estimate(returns))
+            _, seconds = timed(
+                lambda: [model.quadratic_form(weights) for _ in range(args.evaluations)]
+            )
+            print(
+                f"{name:<13}{n_assets:>7}{estimate_seconds:>14.3f}"
+                f"{storage_bytes(model) / 1e6:>14.2f}{seconds / args.evaluations * 1e6:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark efficient frontier construction.
+
+Compares the legacy approach (a fresh MeanVarianceOptimizer and a cold SLSQP
+solve from equal weights for every frontier point) with the warm-started
+walk and the Critical Line Algorithm in EfficientFrontier.
+
+Usage:
+    python benchmarks/bench_efficient_frontier.py [--assets 20 50 100] [--points 20]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.efficient_frontier import EfficientFrontier
+from app.algorithms.mean_variance import MeanVarianceOptimizer
+
+
+def legacy_frontier(returns, targets):
+    """One independent optimizer and cold solve per target return."""
+    solves = iterations = 0
+    vols = []
+    for target in targets:
+        optimizer = MeanVarianceOptimizer(returns, target_return=float(target))
+        try:
+            portfolio = optimizer.optimize()
+            vols.append(portfolio.volatility)
+        except RuntimeError:
+            vols.append(np.nan)
+        solves += 1
+        iterations += optimizer.optimization_result.nit
+    return np.array(vols), solves, iterations
+
+
+def engine_frontier(returns, targets, method):
+    engine = EfficientFrontier(returns, method=method)
+    weights = engine.frontier_weights(targets)
+    vols = np.array([
+        np.nan if w is None else engine.optimizer.calculate_portfolio_metrics(w)[1]
+        for w in weights
+    ])
+    return vols, engine.solves, engine.iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+
+    header = (
+        f"{'assets':>7}{'method':>12}{'solves':>8}{'nit':>7}{'time (s)':>10}"
+        f"{'speedup':>9}{'max vol gap':>13}"
+    )
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        # Per-period targets between the minimum-variance and maximum-return portfolios
+        reference = EfficientFrontier(returns, method="cla")
+        targets = np.linspace(
+            reference.expected_returns @ reference.min_volatility_weights(),
+            reference.expected_returns @ reference.max_return_weights(),
+            args.points,
+        )
+        exact, _, _ = engine_frontier(returns, targets, "cla")
+
+        runs = {
+            "legacy": lambda: legacy_frontier(returns, targets),
+            "warm_start": lambda: engine_frontier(returns, targets, "warm_start"),
+            "cla": lambda: engine_frontier(returns, targets, "cla"),
+        }
+        baseline_seconds = None
+        for name, run in runs.items():
+            (vols, solves, iterations), seconds = timed(run, repeats=args.repeats)
+            baseline_seconds = baseline_seconds or seconds
+            gap = np.nanmax(vols - exact)
+            print(
+                f"{n_assets:>7}{name:>12}{solves:>8}{iterations:>7}{seconds:>10.3f}"
+                f"{baseline_seconds / seconds:>8.1f}x{gap:>13.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
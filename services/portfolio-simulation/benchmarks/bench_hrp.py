@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark HierarchicalRiskParityOptimizer with a cold and a warm linkage cache.
+
+Usage:
+    python benchmarks/bench_hrp.py [--assets 100 500 2000] [--days 756]
+"""
+import argparse
+
+from common import make_returns, timed
+
+from app.algorithms.hierarchical_risk_parity import (
+    HierarchicalRiskParityOptimizer,
+    clear_linkage_cache,
+)
+
+LINKAGE_METHODS = ("single", "average", "ward")
+
+
+def run(returns, linkage_method: str):
+    optimizer = HierarchicalRiskParityOptimizer(returns, linkage_method=linkage_method)
+    optimizer.optimize()
+    return optimizer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--days", type=int, default=756)
+    args = parser.parse_args()
+
+    header = f"{'linkage':<9}{'assets':>7}{'cold (s)':>10}{'cached (s)':>12}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for linkage_method in LINKAGE_METHODS:
+        for n_assets in args.assets:
+            returns = make_returns(args.days, n_assets)
+            clear_linkage_cache()
+            cold, cold_seconds = timed(lambda: run(returns, linkage_method))
+            warm, warm_seconds = timed(lambda: run(returns, linkage_method), repeats=3)
+            assert not cold.linkage_cache_hit and warm.linkage_cache_hit
+            print(
+                f"{linkage_method:<9}{n_assets:>7}{cold_seconds:>10.3f}{warm_seconds:>12.3f}"
+                f"{cold_seconds / warm_seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark MeanVarianceOptimizer's QP backends as the universe grows.
+
+SLSQP is skipped above --slsqp-max-assets, where it becomes impractically slow.
+
+Usage:
+    python benchmarks/bench_qp_scaling.py [--assets 100 250 500 1000 2000] [--slsqp-max-assets 500]
+"""
+import argparse
+
+from common import make_returns, timed
+
+from app.algorithms.base import LinearConstraint
+from app.algorithms.mean_variance import MeanVarianceOptimizer
+
+OBJECTIVES = ("max_sharpe", "min_volatility")
+
+
+def solve(returns, objective: str, solver: str):
+    n_assets = returns.shape[1]
+    # Cap single names at 5x the equal weight and the first decile of names at 20%
+    kwargs = {
+        "weight_bounds": (0, min(1.0, 5.0 / n_assets)),
+        "linear_constraints": [
+            LinearConstraint({asset: 1.0 for asset in returns.columns[: n_assets // 10]}, upper=0.2)
+        ],
+    }
+    if objective == "min_volatility":
+        kwargs["target_return"] = float(returns.mean().quantile(0.6))
+    optimizer = MeanVarianceOptimizer(returns, risk_free_rate=0.02, solver=solver, **kwargs)
+    return optimizer.optimize(), optimizer.optimization_result
+
+
+def iterations(result) -> int:
+    # scipy's OptimizeResult has nit, QPResult has iterations
+    return getattr(result, "nit", None) or getattr(result, "iterations", 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--slsqp-max-assets", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+
+    header = (
+        f"{'objective':<15}{'assets':>7}{'solver':>8}{'nit':>7}{'time (s)':>10}"
+        f"{'speedup':>9}{'volatility':>12}{'sharpe':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for objective in OBJECTIVES:
+        for n_assets in args.assets:
+            returns = make_returns(args.days, n_assets)
+            solvers = ["slsqp", "admm"] if n_assets <= args.slsqp_max_assets else ["admm"]
+            baseline_seconds = None
+            for solver in solvers:
+                (portfolio, result), seconds = timed(
+                    lambda: solve(returns, objective, solver), repeats=args.repeats
+                )
+                baseline_seconds = baseline_seconds or seconds
+                speedup = f"{baseline_seconds / seconds:>8.1f}x" if len(solvers) > 1 else f"{'-':>9}"
+                print(
+                    f"{objective:<15}{n_assets:>7}{solver:>8}{iterations(result):>7}{seconds:>10.3f}"
+                    f"{speedup}{portfolio.volatility:>12.6f}{portfolio.sharpe_ratio:>9.4f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
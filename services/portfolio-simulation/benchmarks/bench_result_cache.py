@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the optimization result cache on a batch where many users share parameters.
+
+Runs the same batch cold (empty cache), warm (every request cached) and after
+the return window rolls forward by one day (the cache must miss again).
+
+Usage:
+    python benchmarks/bench_result_cache.py [--assets 100] [--users 1000] [--profiles 20]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.batch import BatchOptimizationRequest, BatchOptimizer
+from app.algorithms.result_cache import ResultCache
+
+
+def make_requests(n_users: int, n_profiles: int, seed: int = 0):
+    """Users drawn from a small set of risk profiles (weight caps), as in a robo-advice flow."""
+    rng = np.random.default_rng(seed)
+    caps = np.linspace(0.1, 0.5, n_profiles)
+    return [
+        BatchOptimizationRequest(f"user_{i}", weight_bounds=(0, float(rng.choice(caps))))
+        for i in range(n_users)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--profiles", type=int, default=20)
+    parser.add_argument("--redis-url", default=None, help="Back the cache with Redis (default: in-process only)")
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(args.redis_url)
+    cache = ResultCache(redis_client)
+    panel = make_returns(args.days + 1, args.assets)
+    requests = make_requests(args.users, args.profiles)
+
+    def run(returns, with_cache: bool = True) -> int:
+        batch = BatchOptimizer(returns, max_workers=1, cache=cache if with_cache else None)
+        return sum(result.success for result in batch.optimize(requests))
+
+    header = f"{'run':<16}{'solved':>8}{'time (s)':>10}{'hits':>7}{'misses':>8}"
+    print(header)
+    print("-" * len(header))
+    window, rolled = panel.iloc[:-1], panel.iloc[1:]
+    runs = [
+        ("uncached", lambda: run(window, with_cache=False)),
+        ("cold", lambda: run(window)),
+        ("warm", lambda: run(window)),
+        ("rolled window", lambda: run(rolled)),
+    ]
+    for name, func in runs:
+        hits, misses = cache.hits, cache.misses
+        solved, seconds = timed(func)
+        print(f"{name:<16}{solved:>8}{seconds:>10.3f}{cache.hits - hits:>7}{cache.misses - misses:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading simulation results from one JSON column vs the result store.
+
+Backtests many strategies (each with daily dates, equity and drawdown
+curves), then compares the JSON row a client had to parse to get one page
+of one curve against the summary row plus a paginated or downsampled read
+of that curve from the compressed series blob.
+
+Usage:
+    python benchmarks/bench_result_store.py [--strategies 10 100] [--assets 50] [--days 2520]
+"""
+import argparse
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import make_returns, timed
+
+from app.algorithms.backtest import Backtester, BacktestStrategy
+from app.storage.blobs import LocalBlobStore
+from app.storage.results import ResultStore, find_series
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategies", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--page", type=int, default=500, help="Rows per page")
+    args = parser.parse_args()
+
+    panel = make_returns(args.days, args.assets)
+    panel.index = pd.bdate_range("2015-01-01", periods=args.days)
+    rng = np.random.default_rng(1)
+    store = ResultStore(LocalBlobStore(tempfile.mkdtemp()))
+
+    header = (
+        f"{'strategies':>10}{'JSON KB':>9}{'summary KB':>12}{'blob KB':>9}"
+        f"{'JSON page (ms)':>16}{'store page (ms)':>17}{'downsampled (ms)':>18}"
+    )
+    print(header)
+    print("-" * len(header))
+    for n_strategies in args.strategies:
+        strategies = [
+            BacktestStrategy(f"s{i}", weights=dict(zip(panel.columns, w)))
+            for i, w in enumerate(rng.dirichlet(np.ones(args.assets), size=n_strategies))
+        ]
+        results = {"strategies": [r.to_dict() for r in Backtester(panel).run(strategies).values()]}
+        row = json.dumps(results)
+        summary = store.save(n_strategies, results)
+        summary_row = json.dumps(summary)
+        with store.blobs.open(store.blob_key(n_strategies)) as blob:
+            blob_size = len(blob.read())
+
+        # Last strategy's equity, rows 1000 to 1000 + page
+        _, json_page = timed(
+            lambda: json.loads(row)["strategies"][-1]["equity"][1000:1000 + args.page], repeats=5
+        )
+
+        def store_page():
+            reference = find_series(json.loads(summary_row), f"strategies/{n_strategies - 1}/equity")
+            return store.read(n_strategies, reference, 1000, args.page)
+
+        def downsampled():
+            reference = find_series(json.loads(summary_row), f"strategies/{n_strategies - 1}/equity")
+            return store.read_downsampled(n_strategies, reference, args.page)
+
+        _, page = timed(store_page, repeats=5)
+        _, sampled = timed(downsampled, repeats=5)
+        print(
+            f"{n_strategies:>10}{len(row) / 1e3:>9.0f}{len(summary_row) / 1e3:>12.0f}{blob_size / 1e3:>9.0f}"
+            f"{json_page * 1e3:>16.2f}{page * 1e3:>17.2f}{sampled * 1e3:>18.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark RiskParityOptimizer: Newton risk budgeting vs the penalized SLSQP formulation.
+
+Usage:
+    python benchmarks/bench_risk_parity.py [--assets 20 100 250 1000] [--days 756]
+"""
+import argparse
+
+from common import make_returns, timed
+
+from app.algorithms.risk_parity import RiskParityOptimizer
+
+
+def solve(returns, method: str, covariance: str = "sample"):
+    return RiskParityOptimizer(returns, method=method, covariance=covariance).optimize()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[20, 100, 250, 1000])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument(
+        "--slsqp-max-assets", type=int, default=100,
+        help="Skip the SLSQP method above this many assets (it takes minutes)"
+    )
+    args = parser.parse_args()
+
+    header = f"{'method':<8}{'covariance':>11}{'assets':>7}{'iterations':>11}{'time (s)':>10}{'residual':>11}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        runs = [("newton", "sample"), ("newton", "factor")]
+        if n_assets <= args.slsqp_max_assets:
+            runs.append(("slsqp", "sample"))
+        for method, covariance in runs:
+            portfolio, seconds = timed(lambda: solve(returns, method, covariance), repeats=args.repeats)
+            info = portfolio.solver_info
+            print(
+                f"{info['method']:<8}{covariance:>11}{n_assets:>7}{info['iterations']:>11}"
+                f"{seconds:>10.3f}{info['residual']:>11.1e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
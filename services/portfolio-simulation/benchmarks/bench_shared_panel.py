@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark handing a returns panel to pool workers by pickle vs by shared memory.
+
+Each run starts a process pool whose workers receive the panel in their
+initializer and read all of it, and waits until every worker is ready.
+Pickling sends every worker a full copy, which it then holds privately;
+shared memory sends a handle and the workers map the one published copy.
+Reported are the start-up time and each worker's private memory (Linux only).
+
+Only spawned (and forkserver) workers pickle their initializer arguments;
+forked workers inherit them, which is why BatchOptimizer and ParameterSweep
+publish panels only for those start methods.
+
+Usage:
+    python benchmarks/bench_shared_panel.py [--days 2520 10080] [--assets 500 2000] [--workers 4]
+        [--start-method spawn]
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from common import make_returns, timed
+
+from app.algorithms.shared_panel import PanelHandle, SharedPanelPool, attach, get_panel_registry
+
+_panel = None
+
+
+def _init_worker(panel, barrier) -> None:
+    global _panel
+    _panel = attach(panel) if isinstance(panel, PanelHandle) else panel
+    _panel.values.sum()
+    # Hold every worker until all are ready, so each one gets a task
+    barrier.wait()
+
+
+def _private_megabytes(_) -> float:
+    """Memory of this worker that no other process shares."""
+    with open("/proc/self/smaps_rollup") as smaps:
+        fields = dict(line.split(":", 1) for line in smaps if line.startswith("Private"))
+    return sum(int(value.split()[0]) for value in fields.values()) / 1024
+
+
+def run_pool(make_pool, workers: int) -> float:
+    with make_pool() as pool:
+        return max(pool.map(_private_megabytes, range(workers)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, nargs="+", default=[2520, 10080])
+    parser.add_argument("--assets", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--start-method", default="spawn", choices=["spawn", "forkserver", "fork"])
+    args = parser.parse_args()
+    context = multiprocessing.get_context(args.start_method)
+
+    registry = get_panel_registry()
+    header = (
+        f"{'days':>7}{'assets':>8}{'panel MB':>10}{'pickled (s)':>13}{'shared (s)':>12}"
+        f"{'pickled worker MB':>19}{'shared worker MB':>18}"
+    )
+    print(header)
+    print("-" * len(header))
+    for days in args.days:
+        for assets in args.assets:
+            panel = make_returns(days, assets)
+
+            def pickled_pool():
+                return ProcessPoolExecutor(
+                    max_workers=args.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(panel, context.Barrier(args.workers))
+                )
+
+            def shared_pool():
+                # Publishing is part of the cost: the pool unlinks the panel on shutdown
+                handle = registry.publish(panel)
+                return SharedPanelPool(
+                    [handle],
+                    max_workers=args.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(handle, context.Barrier(args.workers))
+                )
+
+            pickled_mb, pickled = timed(lambda: run_pool(pickled_pool, args.workers))
+            shared_mb, shared = timed(lambda: run_pool(shared_pool, args.workers))
+            print(
+                f"{days:>7}{assets:>8}{panel.values.nbytes / 1e6:>10.0f}{pickled:>13.3f}{shared:>12.3f}"
+                f"{pickled_mb:>19.0f}{shared_mb:>18.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
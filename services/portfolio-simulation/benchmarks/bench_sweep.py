@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark parameter sweeps: independent solves vs a warm-started sweep.
+
+Sweeps max-Sharpe mean-variance over a grid of weight caps and risk-free
+rates. The cold run solves each point from scratch; the warm run walks the
+grid in snake order, starting each point from its neighbour's solution.
+
+Usage:
+    python benchmarks/bench_sweep.py [--assets 100 250] [--caps 10] [--workers 1]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.mean_variance import MeanVarianceOptimizer
+from app.algorithms.sweep import ParameterSweep
+
+SOLVES = [0]
+
+
+class CountingOptimizer(MeanVarianceOptimizer):
+    """MeanVarianceOptimizer counting its QP solves (in-process sweeps only)."""
+
+    def solve_qp(self, problem, x0=None, y0=None):
+        SOLVES[0] += 1
+        return super().solve_qp(problem, x0=x0, y0=y0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 250])
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--caps", type=int, default=10, help="Number of weight caps in the grid")
+    parser.add_argument("--solver", default="admm")
+    args = parser.parse_args()
+
+    grid = {
+        "weight_bounds": [(0.0, float(cap)) for cap in np.linspace(0.05, 0.5, args.caps)],
+        "risk_free_rate": [0.0, 0.02, 0.04]
+    }
+    header = f"{'run':<6}{'assets':>7}{'points':>8}{'QP solves':>11}{'time (s)':>10}{'max |dSharpe|':>15}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        panel = make_returns(args.days, n_assets)
+        runs = {}
+        for run in ("cold", "warm"):
+            # In process, so the solve counter sees every solve
+            sweep = ParameterSweep(
+                CountingOptimizer,
+                panel,
+                grid,
+                options={"solver": args.solver},
+                max_workers=1,
+                warm_start=run == "warm"
+            )
+            SOLVES[0] = 0
+            results, seconds = timed(lambda: sorted(sweep.run(), key=lambda result: result.index))
+            runs[run] = (results, SOLVES[0], seconds)
+        cold = runs["cold"][0]
+        for run, (results, solves, seconds) in runs.items():
+            diff = max(
+                abs(result.portfolio.sharpe_ratio - reference.portfolio.sharpe_ratio)
+                for result, reference in zip(results, cold) if result.success and reference.success
+            )
+            print(f"{run:<6}{n_assets:>7}{len(results):>8}{solves:>11}{seconds:>10.3f}{diff:>15.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark optimizers sharing one ReturnsUniverse vs each estimating its own moments.
+
+A request comparing allocations builds several optimizers on the same
+returns. Given the DataFrame, each optimizer wraps its own universe and
+estimates the mean and covariance again; given one ReturnsUniverse they
+share its memoized moments, so each is computed once per request. Timed is
+building the optimizers (where the moments are estimated), with the
+Black-Litterman prior and HRP linkage caches cleared before every run.
+
+Usage:
+    python benchmarks/bench_universe.py [--assets 100 500 1000] [--days 2520] [--covariance sample]
+"""
+import argparse
+
+import numpy as np
+
+from common import make_returns, timed
+
+from app.algorithms.black_litterman import BlackLittermanOptimizer, clear_prior_cache
+from app.algorithms.hierarchical_risk_parity import HierarchicalRiskParityOptimizer, clear_linkage_cache
+from app.algorithms.mean_variance import MeanVarianceOptimizer
+from app.algorithms.risk_parity import RiskParityOptimizer
+from app.algorithms.universe import ReturnsUniverse
+
+OPTIMIZERS = [MeanVarianceOptimizer, RiskParityOptimizer, HierarchicalRiskParityOptimizer, BlackLittermanOptimizer]
+
+
+def build(returns, covariance: str):
+    clear_prior_cache()
+    clear_linkage_cache()
+    return [optimizer(returns, covariance=covariance) for optimizer in OPTIMIZERS]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--covariance", default="sample", help="Covariance estimator name")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    header = f"{'assets':>7}{'optimizers':>12}{'per optimizer (s)':>19}{'shared (s)':>12}{'speedup':>9}{'max diff':>10}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        returns = make_returns(args.days, n_assets)
+        separate, slow = timed(lambda: build(returns, args.covariance), repeats=args.repeats)
+        # A fresh universe per run, so every run estimates the moments once
+        shared, fast = timed(lambda: build(ReturnsUniverse(returns), args.covariance), repeats=args.repeats)
+        diff = max(
+            max(np.abs(a.expected_returns - b.expected_returns).max(), np.abs(a.cov_matrix - b.cov_matrix).max())
+            for a, b in zip(separate, shared)
+        )
+        print(f"{n_assets:>7}{len(OPTIMIZERS):>12}{slow:>19.3f}{fast:>12.3f}{slow / fast:>8.1f}x{diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
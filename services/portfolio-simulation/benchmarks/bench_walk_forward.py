@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark walk-forward re-optimization with incremental vs per-window moments.
+
+First times the moments alone: re-estimating ``window.mean()`` and
+``window.cov()`` at every rebalance against carrying them forward with
+RollingMoments. Then backtests optimizer strategies both ways: the
+previous behaviour (a policy building the optimizer cold from each window)
+against the walk-forward mode (incremental moments and warm starts).
+
+Usage:
+    python benchmarks/bench_walk_forward.py [--assets 100 400] [--days 2520] [--lookback 252] [--schedule W]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import make_returns, timed
+
+from app.algorithms.backtest import Backtester, BacktestStrategy
+from app.algorithms.covariance import RollingMoments
+from app.algorithms.hierarchical_risk_parity import HierarchicalRiskParityOptimizer
+from app.algorithms.risk_parity import RiskParityOptimizer
+
+OPTIMIZERS = {
+    "hrp": HierarchicalRiskParityOptimizer,
+    "risk_parity": RiskParityOptimizer,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--lookback", type=int, default=252)
+    parser.add_argument("--schedule", default="W", help="Rebalancing frequency")
+    args = parser.parse_args()
+
+    header = f"{'assets':>7}{'what':>22}{'per window (s)':>16}{'walk-forward (s)':>18}{'speedup':>9}{'max diff':>10}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        panel = make_returns(args.days, n_assets)
+        panel.index = pd.bdate_range("2015-01-01", periods=args.days)
+        backtester = Backtester(panel, schedule=args.schedule, lookback=args.lookback)
+        positions = backtester.rebalance_positions(args.schedule)
+        positions = positions[positions >= args.lookback - 1]
+        values = panel.values
+
+        def per_window():
+            return [
+                (window.mean().values, window.cov().values)
+                for window in (panel.iloc[p - args.lookback + 1:p + 1] for p in positions)
+            ]
+
+        def incremental():
+            moments, result = None, []
+            for previous, p in zip(np.r_[-1, positions[:-1]], positions):
+                if moments is None:
+                    moments = RollingMoments(values[p - args.lookback + 1:p + 1])
+                else:
+                    moments.slide(values[previous + 1:p + 1], values[previous - args.lookback + 1:p - args.lookback + 1])
+                result.append((moments.mean.copy(), moments.covariance))
+            return result
+
+        reference, slow = timed(per_window)
+        rolled, fast = timed(incremental)
+        diff = max(np.abs(a[1] - b[1]).max() for a, b in zip(reference, rolled))
+        print(f"{n_assets:>7}{'moments':>22}{slow:>16.3f}{fast:>18.3f}{slow / fast:>8.1f}x{diff:>10.1e}")
+
+        for name, optimizer in OPTIMIZERS.items():
+            cold = BacktestStrategy(
+                name, policy=lambda window, optimizer=optimizer: optimizer(window).optimize().weights
+            )
+            walk = BacktestStrategy(name, optimizer=optimizer)
+            cold_result, slow = timed(lambda: backtester.run([cold]))
+            walk_result, fast = timed(lambda: backtester.run([walk]))
+            diff = np.abs(cold_result[name].weights.values - walk_result[name].weights.values).max()
+            print(f"{n_assets:>7}{name + ' backtest':>22}{slow:>16.3f}{fast:>18.3f}{slow / fast:>8.1f}x{diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
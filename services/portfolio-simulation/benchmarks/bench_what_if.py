@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark evaluating candidate trades incrementally vs a full risk calculation per trade.
+
+The full calculation rebuilds the post-trade weights and computes Σw',
+w'Σw', the risk contributions, VaR and diversification ratio from scratch
+(O(N²) per trade). WhatIfAnalyzer computes Σw once and updates it with the
+covariance columns of the traded assets (O(N) per traded asset), all
+trades in one pass. Timed is the evaluation of the trades; the covariance
+estimate is shared by both.
+
+Usage:
+    python benchmarks/bench_what_if.py [--assets 100 500 2000] [--trades 50] [--days 1260]
+"""
+import argparse
+
+import numpy as np
+from scipy.stats import norm
+
+from common import make_returns, timed
+
+from app.algorithms.universe import ReturnsUniverse
+from app.algorithms.what_if import Trade, WhatIfAnalyzer
+
+
+def full_recalculation(universe, weights, trades, z):
+    cov = universe.cov
+    volatility = np.sqrt(np.diag(cov))
+    results = []
+    for trade in trades:
+        after = weights.copy()
+        for asset, change in trade.changes.items():
+            after[universe.assets.index(asset)] += change
+        cov_weights = cov @ after
+        variance = after @ cov_weights
+        results.append((
+            np.sqrt(variance * 252),
+            z * np.sqrt(variance) - universe.mean @ after,
+            volatility @ np.abs(after) / np.sqrt(variance),
+            after * cov_weights / variance
+        ))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--trades", type=int, default=50)
+    parser.add_argument("--days", type=int, default=1260)
+    args = parser.parse_args()
+    rng = np.random.default_rng(1)
+
+    header = f"{'assets':>7}{'trades':>8}{'full (ms)':>11}{'incremental (ms)':>18}{'speedup':>9}{'max diff':>10}"
+    print(header)
+    print("-" * len(header))
+    for n_assets in args.assets:
+        universe = ReturnsUniverse(make_returns(args.days, n_assets))
+        held = rng.choice(n_assets, size=min(n_assets, 30), replace=False)
+        weights = dict(zip([universe.assets[i] for i in held], rng.dirichlet(np.ones(len(held)))))
+        trades = [
+            Trade(f"t{i}", {
+                universe.assets[j]: float(rng.normal(0.0, 0.05))
+                for j in rng.choice(n_assets, size=rng.integers(1, 4), replace=False)
+            })
+            for i in range(args.trades)
+        ]
+        analyzer = WhatIfAnalyzer(universe, weights)
+        vector = np.array([weights.get(asset, 0.0) for asset in universe.assets])
+
+        reference, slow = timed(lambda: full_recalculation(universe, vector, trades, norm.ppf(0.95)), repeats=3)
+        impacts, fast = timed(lambda: analyzer.evaluate(trades), repeats=3)
+        diff = max(
+            max(abs(impact.after.volatility - full[0]), abs(impact.after.value_at_risk - full[1]))
+            for impact, full in zip(impacts, reference)
+        )
+        print(f"{n_assets:>7}{args.trades:>8}{slow * 1e3:>11.2f}{fast * 1e3:>18.2f}{slow / fast:>8.1f}x{diff:>10.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Initialize app package
@@ -0,0 +1,375 @@
+import logging
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Type, Union
+
+from .base import PortfolioOptimizer
+from .covariance import RollingMoments, SampleCovariance
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
+
+# Rebalancing schedule: a pandas period frequency ('D', 'W', 'M', 'Q', 'Y'),
+# every n-th row, or explicit rebalance dates from the returns index
+Schedule = Union[str, int, Sequence[Any]]
+
+WeightsPolicy = Callable[[pd.DataFrame], Dict[str, float]]
+
+@dataclass
+class BacktestStrategy:
+    """
+    A weights policy and how it trades.
+
+    Exactly one of ``weights`` (static target weights), ``optimizer`` (a
+    PortfolioOptimizer class fitted on the trailing ``lookback`` returns at
+    every rebalance, walk-forward) or ``policy`` (a callable mapping the
+    trailing returns to target weights) must be given. Weights summing to
+    less than 1 leave the remainder in cash, which earns nothing.
+    """
+    name: str
+    weights: Optional[Dict[str, float]] = None
+    optimizer: Optional[Type[PortfolioOptimizer]] = None
+    optimizer_options: Dict[str, Any] = field(default_factory=dict)
+    policy: Optional[WeightsPolicy] = None
+    schedule: Optional[Schedule] = None  # Default: the backtester's schedule
+    transaction_cost: Optional[float] = None  # Default: the backtester's cost
+    warm_start: bool = True  # Start each re-optimization from the previous targets
+
+    def __post_init__(self):
+        if sum(x is not None for x in (self.weights, self.optimizer, self.policy)) != 1:
+            raise ValueError(f"Strategy '{self.name}' needs exactly one of weights, optimizer or policy")
+
+    @property
+    def is_static(self) -> bool:
+        return self.weights is not None
+
+@dataclass
+class BacktestResult:
+    """Equity curve, drawdowns and trading of one strategy."""
+    name: str
+    equity: pd.Series  # Portfolio value, 1.0 at the first allocation
+    drawdown: pd.Series  # Equity relative to its running peak, minus 1
+    turnover: pd.Series  # Sum of absolute weight changes at each rebalance
+    weights: pd.DataFrame  # Target weights at each rebalance
+    transaction_costs: float  # Total costs paid, in units of initial equity
+    risk_free_rate: float = 0.0
+
+    @property
+    def returns(self) -> pd.Series:
+        return self.equity.pct_change().iloc[1:]
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        """Annualized performance and risk metrics (assuming daily returns)."""
+        returns = self.returns
+        total_return = float(self.equity.iloc[-1] / self.equity.iloc[0] - 1)
+        years = max(len(returns), 1) / 252
+        annual_return = (1 + total_return) ** (1 / years) - 1 if total_return > -1 else -1.0
+        annual_volatility = float(returns.std() * np.sqrt(252)) if len(returns) > 1 else 0.0
+        return {
+            'total_return': total_return,
+            'annual_return': annual_return,
+            'annual_volatility': annual_volatility,
+            'sharpe_ratio': (annual_return - self.risk_free_rate) / (annual_volatility + 1e-8),
+            'max_drawdown': float(self.drawdown.min()),
+            'average_turnover': float(self.turnover.mean()),
+            'transaction_costs': self.transaction_costs
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serializable dictionary."""
+        return {
+            'name': self.name,
+            'metrics': self.metrics,
+            'dates': [str(date) for date in self.equity.index],
+            'equity': self.equity.tolist(),
+            'drawdown': self.drawdown.tolist(),
+            'turnover': {str(date): value for date, value in self.turnover.items()}
+        }
+
+class Backtester:
+    """
+    Vectorized historical backtest of many strategies over one returns panel.
+
+    Target weights are decided at the close of each rebalance date from
+    the returns up to and including it, and held from the next day on,
+    drifting with prices until the next rebalance. All strategies are
+    simulated together in a single pass over the rebalance periods: within
+    a period the growth of every asset is one cumulative product shared by
+    all strategies, and the equity of all strategies is one matrix product,
+    so there is no Python loop over days or over strategies.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        schedule: Schedule = 'M',
+        lookback: int = 252,
+        transaction_cost: float = 0.0,
+        risk_free_rate: float = 0.0
+    ):
+        """
+        Initialize the backtester.
+
+        Args:
+            returns: DataFrame with asset returns (rows=time, columns=assets)
+            schedule: Default rebalancing schedule: a period frequency ('D',
+                'W', 'M', 'Q' or 'Y', rebalancing on the last row of each
+                period; needs a DatetimeIndex), every n-th row, or a sequence
+                of dates from the index
+            lookback: Rows of trailing returns passed to optimizer and callable
+                policies. When any strategy uses one, all strategies make their
+                first allocation once this much history is available.
+            transaction_cost: Default proportional cost per unit of weight traded
+            risk_free_rate: Annual risk-free rate used for Sharpe ratios
+        """
+        if returns.isna().values.any():
+            raise ValueError("Returns contain missing values")
+        if lookback < 1:
+            raise ValueError("lookback must be at least 1")
+        if transaction_cost < 0:
+            raise ValueError("transaction_cost must be non-negative")
+        self.returns = returns
+        self.schedule = schedule
+        self.lookback = lookback
+        self.transaction_cost = transaction_cost
+        self.risk_free_rate = risk_free_rate
+        self.assets = returns.columns.tolist()
+        self.num_assets = len(self.assets)
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, **kwargs) -> 'Backtester':
+        """Backtester over the simple returns of a price panel."""
+        return cls(prices.pct_change().iloc[1:], **kwargs)
+
+    def rebalance_positions(self, schedule: Schedule) -> np.ndarray:
+        """Row positions at which a schedule rebalances."""
+        index = self.returns.index
+        if isinstance(schedule, str):
+            if not isinstance(index, pd.DatetimeIndex):
+                raise ValueError("Calendar schedules need returns with a DatetimeIndex")
+            periods = index.to_period('Y' if schedule == 'A' else schedule).asi8
+            return np.append(np.flatnonzero(periods[1:] != periods[:-1]), len(index) - 1)
+        if isinstance(schedule, (int, np.integer)):
+            if schedule < 1:
+                raise ValueError("Rebalancing every n rows needs n >= 1")
+            return np.arange(schedule - 1, len(index), schedule)
+        positions = index.get_indexer(list(schedule))
+        if (positions < 0).any():
+            raise ValueError("Rebalance dates must be in the returns index")
+        return np.unique(positions)
+
+    def _weights_vector(self, weights: Dict[str, float]) -> np.ndarray:
+        unknown = set(weights) - set(self.assets)
+        if unknown:
+            raise ValueError(f"Weights reference unknown assets: {sorted(unknown)}")
+        vector = np.array([weights.get(asset, 0.0) for asset in self.assets], dtype=float)
+        if not np.isfinite(vector).all():
+            raise ValueError("Weights must be finite")
+        return vector
+
+    def target_weights(
+        self,
+        strategy: BacktestStrategy,
+        positions: np.ndarray
+    ) -> np.ndarray:
+        """
+        Target weights of a strategy at each rebalance position (rows=positions).
+
+        A failing optimizer keeps the previous targets for that rebalance.
+        """
+        if strategy.is_static:
+            return np.tile(self._weights_vector(strategy.weights), (len(positions), 1))
+        if strategy.optimizer is not None:
+            return self.walk_forward(strategy, positions)
+
+        targets = np.empty((len(positions), self.num_assets))
+        previous = None
+        for i, position in enumerate(positions):
+            window = self.returns.iloc[max(0, position - self.lookback + 1):position + 1]
+            try:
+                previous = self._weights_vector(strategy.policy(window))
+            except (ValueError, RuntimeError) as e:
+                if previous is None:
+                    raise
+                logger.warning(
+                    f"Strategy '{strategy.name}' failed at {self.returns.index[position]}, keeping previous weights: {e}"
+                )
+            targets[i] = previous
+        return targets
+
+    def walk_forward(self, strategy: BacktestStrategy, positions: np.ndarray) -> np.ndarray:
+        """
+        Re-optimize an optimizer strategy on the trailing window at each rebalance position.
+
+        Consecutive windows share most of their rows, so instead of being
+        re-estimated per window the mean and, with the sample covariance
+        estimator, the covariance are carried from one window to the next
+        by adding the rows that entered and removing those that left
+        (RollingMoments), then handed to the optimizer as the known moments
+        of the window's ReturnsUniverse. Unless the strategy disables it,
+        each solve is warm-started from the previous targets. A failing
+        optimizer keeps the previous targets for that rebalance.
+
+        Returns:
+            Target weights (rows=positions)
+        """
+        options = dict(strategy.optimizer_options)
+        covariance = options.get('covariance', 'sample')
+        incremental = covariance == 'sample' or isinstance(covariance, SampleCovariance)
+        values = self.returns.values
+        targets = np.empty((len(positions), self.num_assets))
+        previous = None
+        moments = None
+        start = stop = 0
+        for i, position in enumerate(positions):
+            new_start, new_stop = max(0, position - self.lookback + 1), position + 1
+            if incremental:
+                if moments is None or new_start >= stop:
+                    moments = RollingMoments(values[new_start:new_stop])
+                else:
+                    moments.slide(values[stop:new_stop], values[start:new_start], values[new_start:new_stop])
+                start, stop = new_start, new_stop
+                window = ReturnsUniverse(
+                    self.returns.iloc[new_start:new_stop], mean=moments.mean, cov=moments.covariance
+                )
+            else:
+                window = ReturnsUniverse(self.returns.iloc[new_start:new_stop])
+            try:
+                optimizer = strategy.optimizer(window, **options)
+                if strategy.warm_start and previous is not None:
+                    optimizer.warm_start(previous)
+                previous = self._weights_vector(optimizer.optimize().weights)
+            except (ValueError, RuntimeError) as e:
+                if previous is None:
+                    raise
+                logger.warning(
+                    f"Strategy '{strategy.name}' failed at {self.returns.index[position]}, keeping previous weights: {e}"
+                )
+            targets[i] = previous
+        return targets
+
+    def run(
+        self,
+        strategies: Sequence[BacktestStrategy],
+        progress: Optional[Callable[[float], None]] = None
+    ) -> Dict[str, BacktestResult]:
+        """
+        Backtest strategies side by side.
+
+        Args:
+            strategies: Strategies to simulate; names must be unique
+            progress: Optional callback receiving the completed fraction, e.g.
+                to report progress of a long-running simulation
+
+        Returns:
+            BacktestResult per strategy name
+        """
+        names = [strategy.name for strategy in strategies]
+        if not names or len(set(names)) != len(names):
+            raise ValueError("Backtest needs strategies with unique names")
+        n_rows = len(self.returns)
+        start = 0 if all(s.is_static for s in strategies) else self.lookback - 1
+        if start >= n_rows - 1:
+            raise ValueError(f"Need more than {start + 1} rows of returns to backtest")
+
+        # Rebalance positions and targets per strategy; every strategy allocates at `start`
+        positions, targets = [], []
+        for i, strategy in enumerate(strategies):
+            scheduled = self.rebalance_positions(strategy.schedule or self.schedule)
+            positions.append(np.union1d([start], scheduled[(scheduled > start) & (scheduled < n_rows - 1)]))
+            targets.append(self.target_weights(strategy, positions[-1]))
+            if progress is not None:
+                progress(0.9 * (i + 1) / len(strategies))
+
+        # Row of the stacked targets each strategy trades to at each boundary, -1 to keep drifting
+        n_strategies = len(strategies)
+        boundaries = np.unique(np.concatenate(positions))
+        stacked = np.vstack(targets)
+        offsets = np.cumsum([0] + [len(p) for p in positions[:-1]])
+        plan = np.full((n_strategies, len(boundaries)), -1)
+        for s, strategy_positions in enumerate(positions):
+            plan[s, np.searchsorted(boundaries, strategy_positions)] = offsets[s] + np.arange(len(strategy_positions))
+
+        costs = np.array([
+            self.transaction_cost if s.transaction_cost is None else s.transaction_cost for s in strategies
+        ])
+        returns = self.returns.values
+        equity = np.empty((n_strategies, n_rows - start))
+        value = np.ones(n_strategies)
+        current = np.zeros((n_strategies, self.num_assets))  # Start in cash
+        turnover = np.zeros((n_strategies, len(boundaries)))
+        paid = np.zeros(n_strategies)
+
+        for k, position in enumerate(boundaries):
+            end = boundaries[k + 1] if k + 1 < len(boundaries) else n_rows - 1
+            weights = current.copy()
+            rebalancing = plan[:, k] >= 0
+            weights[rebalancing] = stacked[plan[rebalancing, k]]
+            turnover[:, k] = np.abs(weights - current).sum(axis=1)
+            paid += value * costs * turnover[:, k]
+            value *= 1.0 - costs * turnover[:, k]
+            if position == start:
+                equity[:, 0] = value
+
+            # Growth of every asset since the rebalance, shared by all strategies
+            growth = np.cumprod(1.0 + returns[position + 1:end + 1], axis=0)
+            portfolio_growth = weights @ growth.T + (1.0 - weights.sum(axis=1))[:, None]
+            equity[:, position + 1 - start:end + 1 - start] = value[:, None] * portfolio_growth
+            final = portfolio_growth[:, -1]
+            current = np.divide(
+                weights * growth[-1], final[:, None],
+                out=np.zeros_like(weights), where=final[:, None] > 0
+            )
+            value = value * final
+
+        running_peak = np.maximum.accumulate(equity, axis=1)
+        drawdown = equity / running_peak - 1.0
+        index = self.returns.index[start:]
+        results = {}
+        for s, strategy in enumerate(strategies):
+            dates = self.returns.index[positions[s]]
+            results[strategy.name] = BacktestResult(
+                name=strategy.name,
+                equity=pd.Series(equity[s], index=index, name=strategy.name),
+                drawdown=pd.Series(drawdown[s], index=index, name=strategy.name),
+                turnover=pd.Series(turnover[s, plan[s] >= 0], index=dates, name=strategy.name),
+                weights=pd.DataFrame(targets[s], index=dates, columns=self.assets),
+                transaction_costs=float(paid[s]),
+                risk_free_rate=self.risk_free_rate
+            )
+        if progress is not None:
+            progress(1.0)
+        return results
+
+def run_backtest(
+    returns: pd.DataFrame,
+    strategies: Sequence[BacktestStrategy],
+    schedule: Schedule = 'M',
+    lookback: int = 252,
+    transaction_cost: float = 0.0,
+    risk_free_rate: float = 0.0
+) -> Dict[str, BacktestResult]:
+    """
+    Convenience function to backtest strategies over a returns panel.
+
+    Args:
+        returns: DataFrame with asset returns (rows=time, columns=assets)
+        strategies: Strategies to simulate
+        schedule: Default rebalancing schedule
+        lookback: Rows of trailing returns for optimizer and callable policies
+        transaction_cost: Default proportional cost per unit of weight traded
+        risk_free_rate: Annual risk-free rate used for Sharpe ratios
+
+    Returns:
+        BacktestResult per strategy name
+    """
+    backtester = Backtester(
+        returns,
+        schedule=schedule,
+        lookback=lookback,
+        transaction_cost=transaction_cost,
+        risk_free_rate=risk_free_rate
+    )
+    return backtester.run(strategies)
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+from .covariance import CovarianceLike, CovarianceModel, DenseCovariance
+from .qp_solvers import AUTO_QP_MIN_ASSETS, QPProblem, QPResult, QPSolver, get_qp_solver
+from .universe import ReturnsUniverse
+
 @dataclass
 class PortfolioWeights:
     """Data class to store portfolio weights and metadata."""
@@ -24,32 +28,101 @@ class PortfolioWeights:
                 "risk_free_rate": self.risk_free_rate
             }
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PortfolioWeights':
+        """Rebuild portfolio weights from the output of ``to_dict``."""
+        return cls(weights=dict(data["weights"]), **data["metrics"])
+
+@dataclass
+class LinearConstraint:
+    """
+    Linear constraint on portfolio weights: lower <= sum(coefficients[asset] * weight) <= upper.
+    
+    Assets missing from ``coefficients`` have a coefficient of 0. Use equal
+    lower and upper bounds for an equality constraint, e.g. a sector cap is
+    ``LinearConstraint({'AAPL': 1, 'MSFT': 1}, upper=0.3)``.
+    """
+    coefficients: Dict[str, float]  # Ticker -> coefficient
+    lower: float = -np.inf
+    upper: float = np.inf
 
 class PortfolioOptimizer(ABC):
     """Abstract base class for portfolio optimization algorithms."""
     
-    def __init__(self, returns: pd.DataFrame, risk_free_rate: float = 0.0):
+    def __init__(
+        self,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
+        risk_free_rate: float = 0.0,
+        solver: Union[str, QPSolver] = 'auto',
+        covariance: CovarianceLike = 'sample'
+    ):
         """
         Initialize the portfolio optimizer.
         
         Args:
-            returns: DataFrame with asset returns (rows=time, columns=assets)
+            returns: DataFrame with asset returns (rows=time, columns=assets), or
+                a ReturnsUniverse whose memoized moments are shared with other
+                optimizers on the same returns
             risk_free_rate: Annual risk-free rate (default: 0.0)
+            solver: QP backend for optimizers with a convex QP formulation:
+                'admm', 'slsqp', a QPSolver instance, or 'auto' (ADMM from
+                AUTO_QP_MIN_ASSETS assets on, SLSQP below)
+            covariance: Covariance estimator ('sample', 'ledoit_wolf', 'ewma',
+                'factor'), a CovarianceEstimator, or a pre-estimated CovarianceModel
         """
-        self.returns = returns
+        self.universe = ReturnsUniverse.of(returns)
         self.risk_free_rate = risk_free_rate
-        self.assets = returns.columns.tolist()
+        self.solver = solver
+        self.covariance = covariance
+        self.assets = self.universe.assets
         self.num_assets = len(self.assets)
+        self.initial_weights: Optional[np.ndarray] = None
         self.expected_returns = self._calculate_expected_returns()
-        self.cov_matrix = self._calculate_covariance_matrix()
+        self.covariance_model = self._calculate_covariance_model()
         
+    @property
+    def returns(self) -> pd.DataFrame:
+        """Asset returns as a DataFrame (rows=time, columns=assets)."""
+        return self.universe.frame
+    
     def _calculate_expected_returns(self) -> np.ndarray:
         """Calculate expected returns for each asset."""
-        return self.returns.mean().values
+        return self.universe.mean
+    
+    def _calculate_covariance_model(self) -> CovarianceModel:
+        """Estimate the covariance of asset returns with the configured estimator."""
+        return self.universe.covariance_model(self.covariance)
     
     def _calculate_covariance_matrix(self) -> np.ndarray:
         """Calculate the covariance matrix of asset returns."""
-        return self.returns.cov().values
+        return self.covariance_model.to_dense()
+    
+    @property
+    def covariance_model(self) -> CovarianceModel:
+        return self._covariance_model
+    
+    @covariance_model.setter
+    def covariance_model(self, model: CovarianceModel) -> None:
+        self._covariance_model = model
+        self._cov_matrix = None
+    
+    @property
+    def cov_matrix(self) -> np.ndarray:
+        """
+        Dense covariance matrix, built on first use.
+        
+        Structured models (e.g. a factor model) are only expanded to N x N
+        when an algorithm needs the full matrix; risk metrics use
+        ``covariance_model`` directly.
+        """
+        if self._cov_matrix is None:
+            self._cov_matrix = self._calculate_covariance_matrix()
+        return self._cov_matrix
+    
+    @cov_matrix.setter
+    def cov_matrix(self, matrix: np.ndarray) -> None:
+        self.covariance_model = DenseCovariance(matrix)
     
     def calculate_portfolio_metrics(
         self, 
@@ -69,7 +142,7 @@ class PortfolioOptimizer(ABC):
         
         # Calculate portfolio metrics
         port_return = np.sum(self.expected_returns * weights)
-        port_volatility = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
+        port_volatility = np.sqrt(max(self.covariance_model.quadratic_form(weights), 0.0))
         
         # Annualize the metrics (assuming daily returns)
         port_return_annual = (1 + port_return) ** 252 - 1
@@ -84,6 +157,74 @@ class PortfolioOptimizer(ABC):
         """Convert numpy array of weights to a dictionary with asset names."""
         return {asset: weight for asset, weight in zip(self.assets, weights)}
     
+    def constraint_vector(self, constraint: LinearConstraint) -> np.ndarray:
+        """Coefficients of a linear constraint in asset order."""
+        unknown = set(constraint.coefficients) - set(self.assets)
+        if unknown:
+            raise ValueError(f"Linear constraint references unknown assets: {sorted(unknown)}")
+        return np.array([constraint.coefficients.get(asset, 0.0) for asset in self.assets], dtype=float)
+    
+    @property
+    def qp_solver(self) -> Optional[QPSolver]:
+        """
+        The QP backend to use, or None when the SLSQP code path should be used.
+        
+        SLSQP handles the problems directly (nonlinear objectives included), so
+        only a dedicated QP backend needs a QP formulation from the subclass.
+        """
+        solver = self.solver
+        if solver == 'auto':
+            solver = 'admm' if self.num_assets >= AUTO_QP_MIN_ASSETS else 'slsqp'
+        if solver == 'slsqp':
+            return None
+        return get_qp_solver(solver)
+    
+    def solve_qp(
+        self,
+        problem: QPProblem,
+        x0: Optional[np.ndarray] = None,
+        y0: Optional[np.ndarray] = None
+    ) -> QPResult:
+        """
+        Solve a QP with the configured backend.
+        
+        Args:
+            problem: Problem to solve
+            x0: Optional primal warm start
+            y0: Optional dual warm start
+            
+        Returns:
+            QPResult of the backend
+            
+        Raises:
+            RuntimeError: If the backend does not converge
+        """
+        solver = self.qp_solver or get_qp_solver('slsqp')
+        result = solver.solve(problem, x0=x0, y0=y0)
+        if not result.success:
+            raise RuntimeError(f"QP solver '{solver.name}' failed: {result.status}")
+        return result
+    
+    def warm_start(self, weights: Union[PortfolioWeights, Dict[str, float], np.ndarray]) -> None:
+        """
+        Start the next optimization from nearby weights.
+        
+        Iterative solvers use them as their starting point, e.g. the solution
+        for the previous point of a parameter sweep; optimizers without an
+        iterative solve ignore them.
+        
+        Args:
+            weights: PortfolioWeights, ticker -> weight, or weights in asset order
+        """
+        if isinstance(weights, PortfolioWeights):
+            weights = weights.weights
+        if isinstance(weights, dict):
+            weights = [weights.get(asset, 0.0) for asset in self.assets]
+        weights = np.asarray(weights, dtype=float)
+        if weights.shape != (self.num_assets,):
+            raise ValueError(f"Warm start needs {self.num_assets} weights, got {weights.shape}")
+        self.initial_weights = weights
+    
     @abstractmethod
     def optimize(self) -> PortfolioWeights:
         """Optimize portfolio weights. Must be implemented by subclasses."""
@@ -0,0 +1,377 @@
+import asyncio
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from .base import LinearConstraint, PortfolioWeights
+from .covariance import CovarianceLike
+from .mean_variance import MeanVarianceOptimizer
+from .qp_solvers import QPSolver
+from .result_cache import ResultCache, UniverseVersion
+from .shared_panel import PanelHandle, SharedPanelPool, attach_attributes, share_attributes, workers_inherit_memory
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+@dataclass
+class BatchOptimizationRequest:
+    """One user's mean-variance problem against the shared universe."""
+    request_id: str
+    target_return: Optional[float] = None
+    target_volatility: Optional[float] = None
+    weight_bounds: Tuple[float, float] = (0, 1)
+    linear_constraints: List[LinearConstraint] = field(default_factory=list)
+
+@dataclass
+class BatchOptimizationResult:
+    """Outcome of one request: the portfolio, or the error that prevented it."""
+    request_id: str
+    portfolio: Optional[PortfolioWeights] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serializable dictionary."""
+        result = {
+            "request_id": self.request_id,
+            "status": "success" if self.success else "failed",
+            "seconds": self.seconds
+        }
+        if self.success:
+            result.update(self.portfolio.to_dict())
+        else:
+            result["error"] = self.error
+        return result
+
+class _SharedMomentsOptimizer(MeanVarianceOptimizer):
+    """MeanVarianceOptimizer that reuses the batch's moments instead of re-estimating them."""
+
+    def __init__(self, batch: 'BatchOptimizer', request: BatchOptimizationRequest):
+        self._batch = batch
+        super().__init__(
+            batch.returns,
+            risk_free_rate=batch.risk_free_rate,
+            target_return=request.target_return,
+            target_volatility=request.target_volatility,
+            weight_bounds=request.weight_bounds,
+            max_iterations=batch.max_iterations,
+            linear_constraints=request.linear_constraints,
+            solver=batch.solver,
+            covariance=batch.covariance_model
+        )
+
+    def _calculate_expected_returns(self) -> np.ndarray:
+        return self._batch.expected_returns
+
+    def _calculate_covariance_matrix(self) -> np.ndarray:
+        return self._batch.cov_matrix
+
+class BatchOptimizer:
+    """
+    Mean-variance optimization for many users sharing one asset universe.
+
+    Expected returns and the covariance model are estimated once; each request
+    only carries its own bounds, target and constraints. Requests are solved
+    in a process pool whose workers attach to the returns and covariance in
+    shared memory at start up, rather than receiving copies with every task.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        risk_free_rate: float = 0.0,
+        covariance: CovarianceLike = 'sample',
+        solver: Union[str, QPSolver] = 'auto',
+        max_iterations: int = 1000,
+        max_workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        pool_slots: Optional[threading.Semaphore] = None
+    ):
+        """
+        Initialize the batch optimizer and estimate the shared moments.
+
+        Args:
+            returns: DataFrame with asset returns (rows=time, columns=assets)
+            risk_free_rate: Annual risk-free rate (default: 0.0)
+            covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+            solver: QP backend passed to every MeanVarianceOptimizer
+            max_iterations: Maximum number of iterations for each solve
+            max_workers: Worker processes (default: one per CPU). With 1 the
+                requests are solved in the calling process.
+            cache: Optional result cache. Requests seen before for the same
+                return window are answered from it without solving; only
+                used with a named covariance estimator and solver.
+            pool_slots: Optional semaphore held while this batch's process
+                pool runs, shared across batches to bound the pools (and
+                so the worker processes) open at once
+        """
+        self.returns = returns
+        self.covariance = covariance
+        self.risk_free_rate = risk_free_rate
+        self.solver = solver
+        self.max_iterations = max_iterations
+        self.max_workers = max_workers
+        self.cache = cache if isinstance(covariance, str) and isinstance(solver, str) else None
+        self.pool_slots = pool_slots
+        universe = ReturnsUniverse.of(returns)
+        self.expected_returns = universe.mean
+        self.covariance_model = universe.covariance_model(covariance)
+        self._cov_matrix = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Workers get a pickled copy; they neither read the cache nor take pool
+        # slots, and both hold locks, which cannot be pickled
+        state = dict(self.__dict__)
+        state['cache'] = None
+        state['pool_slots'] = None
+        return state
+
+    @property
+    def cov_matrix(self) -> np.ndarray:
+        """Dense covariance matrix, built once on first use and shared by all solves."""
+        if self._cov_matrix is None:
+            matrix = self.covariance_model.to_dense()
+            matrix.flags.writeable = False
+            self._cov_matrix = matrix
+        return self._cov_matrix
+
+    def cache_params(self, request: BatchOptimizationRequest) -> Dict[str, Any]:
+        """Everything that determines a request's result besides the returns."""
+        return {
+            'risk_free_rate': self.risk_free_rate,
+            'covariance': self.covariance,
+            'solver': self.solver,
+            'max_iterations': self.max_iterations,
+            'target_return': request.target_return,
+            'target_volatility': request.target_volatility,
+            'weight_bounds': request.weight_bounds,
+            'linear_constraints': request.linear_constraints
+        }
+
+    def optimize_one(self, request: BatchOptimizationRequest) -> BatchOptimizationResult:
+        """
+        Solve a single request in the calling process.
+
+        Infeasible or failing requests are reported in the result instead of
+        raised, so one user's constraints cannot abort the rest of a batch.
+        """
+        start = time.perf_counter()
+        try:
+            portfolio = _SharedMomentsOptimizer(self, request).optimize()
+        except Exception as e:
+            logger.warning(f"Batch request {request.request_id} failed: {e!r}")
+            return BatchOptimizationResult(
+                request.request_id, error=str(e), seconds=time.perf_counter() - start
+            )
+        return BatchOptimizationResult(
+            request.request_id, portfolio=portfolio, seconds=time.perf_counter() - start
+        )
+
+    def optimize(
+        self,
+        requests: Iterable[BatchOptimizationRequest],
+        executor: Optional[Executor] = None
+    ) -> Iterator[BatchOptimizationResult]:
+        """
+        Solve all requests, yielding each result as soon as it is available.
+
+        Args:
+            requests: Requests to solve; ``request_id`` identifies the results,
+                which arrive in completion order
+            executor: Optional executor to use instead of a new process pool.
+                It must already hold this batch, e.g. one created by ``executor()``.
+
+        Yields:
+            BatchOptimizationResult per request
+        """
+        requests = list(requests)
+        if self.cache is None:
+            yield from self._solve(requests, executor)
+            return
+
+        # Answer repeated parameters from the cache and solve each distinct miss once
+        version = self.cache.version(self.returns)
+        params_list = [self.cache_params(request) for request in requests]
+        cached = self.cache.get_many(version, 'mean_variance', params_list)
+        hits, misses = self._split(version, requests, params_list, cached)
+        yield from hits
+
+        representatives = [replace(group[0], request_id=key) for key, group in misses.items()]
+        for result in self._solve(representatives, executor):
+            group = misses[result.request_id]
+            if result.success:
+                self.cache.put(version, 'mean_variance', self.cache_params(group[0]), result.portfolio)
+            for request in group:
+                yield replace(result, request_id=request.request_id)
+
+    async def optimize_async(
+        self,
+        requests: Iterable[BatchOptimizationRequest]
+    ) -> AsyncIterator[BatchOptimizationResult]:
+        """
+        ``optimize()`` for a cache backed by an async Redis client.
+
+        Cache lookups and stores are awaited on the event loop, while the
+        solves run from a worker thread so they never block it.
+
+        Yields:
+            BatchOptimizationResult per request, in completion order
+        """
+        requests = list(requests)
+        if self.cache is None:
+            async for result in _iterate_in_thread(self._solve(requests, None)):
+                yield result
+            return
+
+        version = await self.cache.aversion(self.returns)
+        params_list = [self.cache_params(request) for request in requests]
+        cached = await self.cache.aget_many(version, 'mean_variance', params_list)
+        hits, misses = self._split(version, requests, params_list, cached)
+        for result in hits:
+            yield result
+
+        representatives = [replace(group[0], request_id=key) for key, group in misses.items()]
+        async for result in _iterate_in_thread(self._solve(representatives, None)):
+            group = misses[result.request_id]
+            if result.success:
+                await self.cache.aput(version, 'mean_variance', self.cache_params(group[0]), result.portfolio)
+            for request in group:
+                yield replace(result, request_id=request.request_id)
+
+    def _split(
+        self,
+        version: UniverseVersion,
+        requests: List[BatchOptimizationRequest],
+        params_list: List[Dict[str, Any]],
+        cached: List[Optional[PortfolioWeights]]
+    ) -> Tuple[List[BatchOptimizationResult], Dict[str, List[BatchOptimizationRequest]]]:
+        """Results of the cached requests, and the rest grouped by cache key."""
+        hits = []
+        misses: Dict[str, List[BatchOptimizationRequest]] = {}
+        for request, params, portfolio in zip(requests, params_list, cached):
+            if portfolio is not None:
+                hits.append(BatchOptimizationResult(request.request_id, portfolio=portfolio))
+            else:
+                misses.setdefault(self.cache.key(version, 'mean_variance', params), []).append(request)
+        return hits, misses
+
+    def _solve(
+        self,
+        requests: List[BatchOptimizationRequest],
+        executor: Optional[Executor]
+    ) -> Iterator[BatchOptimizationResult]:
+        if executor is not None:
+            yield from self._optimize_with(executor, requests)
+        elif self.max_workers == 1 or len(requests) <= 1:
+            for request in requests:
+                yield self.optimize_one(request)
+        else:
+            with self.pool_slots or nullcontext(), self.executor() as pool:
+                yield from self._optimize_with(pool, requests)
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool whose workers hold this batch's returns and moments."""
+        # Build the dense matrix before pickling so the workers don't each expand it
+        if self.solver != 'slsqp':
+            self.cov_matrix
+        # Spawned workers attach to the returns and covariance in shared memory
+        # instead of unpickling copies; forked ones already share them
+        published: Dict[int, PanelHandle] = {}
+        batch = self
+        if not workers_inherit_memory():
+            batch = share_attributes(self, ['returns', '_cov_matrix'], published)
+            batch.covariance_model = share_attributes(self.covariance_model, ['matrix'], published)
+        return SharedPanelPool(
+            published.values(),
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(batch,)
+        )
+
+    def _optimize_with(
+        self,
+        executor: Executor,
+        requests: List[BatchOptimizationRequest]
+    ) -> Iterator[BatchOptimizationResult]:
+        submitted: Dict[Future, BatchOptimizationRequest] = {
+            executor.submit(_optimize_in_worker, request): request for request in requests
+        }
+        pending = set(submitted)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # e.g. a worker died: fail its request, not the whole batch
+                        request_id = submitted[future].request_id
+                        logger.warning(f"Batch request {request_id} failed in its worker: {e!r}")
+                        yield BatchOptimizationResult(request_id, error=str(e) or type(e).__name__)
+        finally:
+            # The consumer stopped early (e.g. a dropped client): don't solve the rest
+            for future in pending:
+                future.cancel()
+
+async def _iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Drive a blocking iterator from a worker thread, closing it if the consumer stops early."""
+    done = object()
+    try:
+        while True:
+            result = await asyncio.to_thread(next, iterator, done)
+            if result is done:
+                return
+            yield result
+    finally:
+        await asyncio.to_thread(iterator.close)
+
+# The batch a pool worker was started with, set once per process by _init_worker
+_worker_batch: Optional[BatchOptimizer] = None
+
+def _init_worker(batch: BatchOptimizer) -> None:
+    global _worker_batch
+    attach_attributes(batch.covariance_model)
+    _worker_batch = attach_attributes(batch)
+
+def _optimize_in_worker(request: BatchOptimizationRequest) -> BatchOptimizationResult:
+    return _worker_batch.optimize_one(request)
+
+def optimize_batch(
+    returns: pd.DataFrame,
+    requests: Iterable[BatchOptimizationRequest],
+    risk_free_rate: float = 0.0,
+    covariance: CovarianceLike = 'sample',
+    max_workers: Optional[int] = None
+) -> Iterator[BatchOptimizationResult]:
+    """
+    Optimize many requests over one returns panel, yielding results as they complete.
+
+    Args:
+        returns: DataFrame with asset returns (rows=time, columns=assets)
+        requests: Per-user bounds, targets and constraints
+        risk_free_rate: Annual risk-free rate (default: 0.0)
+        covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        Iterator of BatchOptimizationResult in completion order
+    """
+    batch = BatchOptimizer(
+        returns,
+        risk_free_rate=risk_free_rate,
+        covariance=covariance,
+        max_workers=max_workers
+    )
+    return batch.optimize(requests)
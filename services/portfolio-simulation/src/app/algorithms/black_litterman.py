@@ -1,9 +1,34 @@
+import threading
 import numpy as np
 import pandas as pd
+import scipy.linalg
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .base import PortfolioOptimizer, PortfolioWeights
+from .covariance import CovarianceLike, CovarianceModel
+from .mean_variance import MeanVarianceOptimizer
+from .universe import ReturnsUniverse
+
+# Priors by (returns fingerprint, covariance estimator), least recently used first.
+# A dense covariance model is N x N, so only a few universes are kept.
+PRIOR_CACHE_SIZE = 8
+EQUILIBRIA_PER_PRIOR = 32
+
+@dataclass
+class _Prior:
+    """Covariance of a universe and its equilibrium returns per (market weights, risk aversion)."""
+    covariance_model: CovarianceModel
+    equilibrium_returns: Dict[Tuple[bytes, float], np.ndarray] = field(default_factory=dict)
+
+_prior_cache: 'OrderedDict[Tuple[str, str], _Prior]' = OrderedDict()
+_prior_cache_lock = threading.Lock()
+
+def clear_prior_cache() -> None:
+    """Drop all cached covariance models and equilibrium returns."""
+    with _prior_cache_lock:
+        _prior_cache.clear()
 
 @dataclass
 class View:
@@ -26,23 +51,30 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
     
     Combines market equilibrium returns with investor views to produce
     more intuitive portfolio allocations.
+    
+    With a named covariance estimator, the covariance model and the
+    equilibrium returns are cached per universe (returns panel), market
+    weights and risk aversion, so re-running with different views only
+    costs the posterior update.
     """
     
     def __init__(
         self,
-        returns: pd.DataFrame,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
         market_caps: Optional[Dict[str, float]] = None,
         risk_aversion: float = 2.5,
         tau: float = 0.05,
         risk_free_rate: float = 0.0,
         weight_bounds: Tuple[float, float] = (0, 1),
-        max_iterations: int = 1000
+        max_iterations: int = 1000,
+        covariance: CovarianceLike = 'sample'
     ):
         """
         Initialize the Black-Litterman Optimizer.
         
         Args:
-            returns: DataFrame with asset returns (rows=time, columns=assets)
+            returns: DataFrame with asset returns (rows=time, columns=assets),
+                or a ReturnsUniverse
             market_caps: Dictionary of market capitalizations for each asset.
                         If None, equal market weights are assumed.
             risk_aversion: Risk aversion parameter (lambda) for the market portfolio
@@ -50,8 +82,12 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
             risk_free_rate: Annual risk-free rate (default: 0.0)
             weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
             max_iterations: Maximum number of iterations for the optimizer
+            covariance: Covariance estimator ('sample', 'ledoit_wolf', 'ewma', 'factor'),
+                a CovarianceEstimator, or a pre-estimated CovarianceModel
         """
-        super().__init__(returns, risk_free_rate)
+        self._prior: Optional[_Prior] = None
+        self.prior_cache_hit = False
+        super().__init__(returns, risk_free_rate, covariance=covariance)
         self.risk_aversion = risk_aversion
         self.tau = tau
         self.weight_bounds = weight_bounds
@@ -77,15 +113,52 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
         # Normalize to sum to 1
         return market_caps_array / np.sum(market_caps_array)
     
+    def _calculate_covariance_model(self) -> CovarianceModel:
+        """Estimate the covariance, reusing the cached prior of the same universe."""
+        # Only named estimators are cached: instances may carry arbitrary parameters or data
+        if not isinstance(self.covariance, str):
+            return super()._calculate_covariance_model()
+        
+        key = (self.universe.fingerprint, self.covariance)
+        with _prior_cache_lock:
+            prior = _prior_cache.get(key)
+            if prior is not None:
+                _prior_cache.move_to_end(key)
+        self.prior_cache_hit = prior is not None
+        if prior is None:
+            prior = _Prior(super()._calculate_covariance_model())
+            with _prior_cache_lock:
+                _prior_cache[key] = prior
+                while len(_prior_cache) > PRIOR_CACHE_SIZE:
+                    _prior_cache.popitem(last=False)
+        self._prior = prior
+        return prior.covariance_model
+    
     def _calculate_equilibrium_returns(self) -> np.ndarray:
         """Calculate equilibrium returns using reverse optimization."""
+        key = (self.market_weights.tobytes(), float(self.risk_aversion))
+        if self._prior is not None:
+            with _prior_cache_lock:
+                cached = self._prior.equilibrium_returns.get(key)
+            if cached is not None:
+                return cached
+        
         # Π = λ * Σ * w_mkt
         # Where:
         #   Π = equilibrium excess returns
         #   λ = risk aversion coefficient
         #   Σ = covariance matrix
         #   w_mkt = market capitalization weights
-        return self.risk_aversion * np.dot(self.cov_matrix, self.market_weights)
+        equilibrium_returns = self.risk_aversion * self.covariance_model.matvec(self.market_weights)
+        
+        if self._prior is not None:
+            equilibrium_returns.flags.writeable = False  # Shared through the cache
+            with _prior_cache_lock:
+                cache = self._prior.equilibrium_returns
+                cache[key] = equilibrium_returns
+                while len(cache) > EQUILIBRIA_PER_PRIOR:
+                    del cache[next(iter(cache))]
+        return equilibrium_returns
     
     def _create_view_matrices(self, views: List[View]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -151,10 +224,6 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
             # No views, return equilibrium returns
             return self.equilibrium_returns
         
-        # Calculate the uncertainty in the prior
-        # Σ_pi = τΣ
-        sigma_pi = tau * self.cov_matrix
-        
         # Calculate the posterior estimate of the mean
         # μ = [(τΣ)^-1 + P'Ω^-1 P]^-1 * [(τΣ)^-1 * Π + P'Ω^-1 Q]
         # Where:
@@ -163,24 +232,23 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
         #   P = pick matrix
         #   Q = view returns
         #   Ω = uncertainty matrix
+        #
+        # By the Woodbury identity this equals
+        #   μ = Π + τΣP' (τPΣP' + Ω)^-1 (Q - PΠ)
+        # which needs only ΣP' (k products with Σ) and a k x k Cholesky solve
+        # instead of inverting N x N matrices
         
-        # Calculate (τΣ)^-1
-        tau_sigma_inv = np.linalg.inv(sigma_pi)
-        
-        # Calculate Ω^-1
-        omega_inv = np.linalg.inv(Omega)
-        
-        # Calculate the first term: (τΣ)^-1 * Π
-        first_term = np.dot(tau_sigma_inv, self.equilibrium_returns)
+        # Prior covariance of the view portfolios: τΣP' (n x k)
+        sigma_pt = tau * self.covariance_model.matvec(P.T)
         
-        # Calculate the second term: P' * Ω^-1 * Q
-        second_term = np.dot(np.dot(P.T, omega_inv), Q)
-        
-        # Calculate the coefficient matrix: (τΣ)^-1 + P'Ω^-1 P
-        coef_matrix = tau_sigma_inv + np.dot(np.dot(P.T, omega_inv), P)
+        # Covariance of the views: τPΣP' + Ω (k x k)
+        view_cov = P @ sigma_pt + Omega
         
         # Solve for μ
-        mu = np.linalg.solve(coef_matrix, first_term + second_term)
+        view_cov_factor = scipy.linalg.cho_factor(view_cov)
+        mu = self.equilibrium_returns + sigma_pt @ scipy.linalg.cho_solve(
+            view_cov_factor, Q - P @ self.equilibrium_returns
+        )
         
         return mu
     
@@ -205,32 +273,18 @@ class BlackLittermanOptimizer(PortfolioOptimizer):
         # Calculate posterior returns
         posterior_returns = self.combine_views(views, tau)
         
-        # Create a mean-variance optimizer with the posterior returns
-        # We'll use the same covariance matrix but replace the expected returns
-        class BLPortfolioOptimizer(PortfolioOptimizer):
-            def _calculate_expected_returns(self):
-                return posterior_returns
-            
-            def optimize(self):
-                # This is a placeholder - we'll use the parent's optimize method
-                pass
-        
-        # Create the optimizer with the posterior returns
-        bl_optimizer = BLPortfolioOptimizer(self.returns, self.risk_free_rate)
-        
-        # We need to set the covariance matrix (since we overrode _calculate_expected_returns)
-        bl_optimizer.cov_matrix = self.cov_matrix
-        
         # Now use mean-variance optimization with the posterior returns
         # We'll maximize the Sharpe ratio by default
         mvo = MeanVarianceOptimizer(
-            returns=self.returns,
+            returns=self.universe,
             risk_free_rate=self.risk_free_rate,
-            weight_bounds=self.weight_bounds
+            weight_bounds=self.weight_bounds,
+            covariance=self.covariance_model
         )
         
         # Replace the expected returns with our posterior estimates
         mvo.expected_returns = posterior_returns
+        mvo.initial_weights = self.initial_weights
         
         # Optimize the portfolio
         return mvo.optimize()
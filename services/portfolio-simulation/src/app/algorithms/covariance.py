@@ -0,0 +1,499 @@
+import numpy as np
+import pandas as pd
+import scipy.linalg
+from scipy.sparse.linalg import svds
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Optional, Type, Union
+
+if TYPE_CHECKING:
+    from .universe import ReturnsUniverse
+
+
+class CovarianceModel(ABC):
+    """
+    Covariance matrix of asset returns in whatever form its estimator produces.
+
+    Risk calculations only need products with the matrix, so they go through
+    ``matvec`` and ``quadratic_form`` instead of the dense N x N matrix. A
+    structured model (e.g. a factor model) implements these in less than
+    O(N^2); ``to_dense`` is there for algorithms that need the full matrix.
+    """
+
+    @property
+    @abstractmethod
+    def num_assets(self) -> int:
+        pass
+
+    @abstractmethod
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        """Σw for a weight vector (or Σ @ W for an N x m matrix of weight vectors)."""
+
+    @abstractmethod
+    def diagonal(self) -> np.ndarray:
+        """Asset variances."""
+
+    @abstractmethod
+    def to_dense(self) -> np.ndarray:
+        """The full N x N covariance matrix."""
+
+    @abstractmethod
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """Σ^-1 b for a vector (or an N x m matrix)."""
+
+    def quadratic_form(self, w: np.ndarray) -> float:
+        """Portfolio variance w'Σw."""
+        return float(w @ self.matvec(w))
+
+    def columns(self, indices: np.ndarray) -> np.ndarray:
+        """Columns Σ[:, indices] (N x k), e.g. for Σ times a weight change in a few assets."""
+        return self.to_dense()[:, indices]
+
+    def solve_shifted(self, b: np.ndarray, shift: np.ndarray) -> np.ndarray:
+        """(Σ + diag(shift))^-1 b, e.g. for Newton steps on objectives with a separable term."""
+        return scipy.linalg.solve(self.to_dense() + np.diag(shift), b, assume_a='pos')
+
+    def subset(self, indices: np.ndarray) -> 'CovarianceModel':
+        """Covariance model of a subset of the assets."""
+        return DenseCovariance(self.to_dense()[np.ix_(indices, indices)])
+
+
+class DenseCovariance(CovarianceModel):
+    """Covariance stored as a full N x N matrix."""
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = np.asarray(matrix, dtype=float)
+        if self.matrix.ndim != 2 or self.matrix.shape[0] != self.matrix.shape[1]:
+            raise ValueError("Covariance matrix must be square")
+        self._cholesky = None
+
+    @property
+    def num_assets(self) -> int:
+        return self.matrix.shape[0]
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        return self.matrix @ w
+
+    def diagonal(self) -> np.ndarray:
+        return np.diag(self.matrix).copy()
+
+    def columns(self, indices: np.ndarray) -> np.ndarray:
+        return self.matrix[:, indices]
+
+    def to_dense(self) -> np.ndarray:
+        return self.matrix
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        if self._cholesky is None:
+            self._cholesky = scipy.linalg.cho_factor(self.matrix)
+        return scipy.linalg.cho_solve(self._cholesky, b)
+
+    def solve_shifted(self, b: np.ndarray, shift: np.ndarray) -> np.ndarray:
+        shifted = self.matrix.copy()
+        shifted[np.diag_indices_from(shifted)] += shift
+        return scipy.linalg.cho_solve(scipy.linalg.cho_factor(shifted, overwrite_a=True), b)
+
+    def subset(self, indices: np.ndarray) -> 'CovarianceModel':
+        return DenseCovariance(self.matrix[np.ix_(indices, indices)])
+
+
+class FactorCovariance(CovarianceModel):
+    """
+    Low-rank plus diagonal covariance: Σ = B F B' + diag(d).
+
+    B is the N x k loading matrix, F the k x k factor covariance and d the
+    specific (idiosyncratic) variances. Storage is O(Nk) and w'Σw costs
+    O(Nk) instead of O(N^2).
+    """
+
+    def __init__(self, loadings: np.ndarray, factor_cov: np.ndarray, specific_variance: np.ndarray):
+        self.loadings = np.asarray(loadings, dtype=float)
+        self.factor_cov = np.asarray(factor_cov, dtype=float)
+        self.specific_variance = np.asarray(specific_variance, dtype=float)
+        n, k = self.loadings.shape
+        if self.factor_cov.shape != (k, k) or self.specific_variance.shape != (n,):
+            raise ValueError("Factor model dimensions do not match: need B (N x k), F (k x k) and d (N)")
+        if np.any(self.specific_variance <= 0):
+            raise ValueError("Specific variances must be positive")
+        self._capacitance = None
+
+    @property
+    def num_assets(self) -> int:
+        return self.loadings.shape[0]
+
+    @property
+    def num_factors(self) -> int:
+        return self.loadings.shape[1]
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        d = self.specific_variance if w.ndim == 1 else self.specific_variance[:, None]
+        return self.loadings @ (self.factor_cov @ (self.loadings.T @ w)) + d * w
+
+    def quadratic_form(self, w: np.ndarray) -> float:
+        exposures = self.loadings.T @ w
+        return float(exposures @ self.factor_cov @ exposures + np.sum(self.specific_variance * w * w))
+
+    def diagonal(self) -> np.ndarray:
+        return np.einsum('ij,jk,ik->i', self.loadings, self.factor_cov, self.loadings) + self.specific_variance
+
+    def columns(self, indices: np.ndarray) -> np.ndarray:
+        columns = self.loadings @ (self.factor_cov @ self.loadings[indices].T)
+        columns[indices, np.arange(len(indices))] += self.specific_variance[indices]
+        return columns
+
+    def to_dense(self) -> np.ndarray:
+        dense = self.loadings @ self.factor_cov @ self.loadings.T
+        dense[np.diag_indices_from(dense)] += self.specific_variance
+        return dense
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        # Woodbury: Σ^-1 = D^-1 - D^-1 B (F^-1 + B'D^-1 B)^-1 B'D^-1, a k x k solve
+        d_inv = 1.0 / self.specific_variance
+        if b.ndim == 2:
+            d_inv = d_inv[:, None]
+        if self._capacitance is None:
+            self._capacitance = self._woodbury_factor(self.specific_variance)
+        return self._woodbury_solve(self._capacitance, d_inv, b)
+
+    def solve_shifted(self, b: np.ndarray, shift: np.ndarray) -> np.ndarray:
+        # Shifting the diagonal only changes the specific variances
+        diagonal = self.specific_variance + shift
+        d_inv = 1.0 / diagonal if b.ndim == 1 else 1.0 / diagonal[:, None]
+        return self._woodbury_solve(self._woodbury_factor(diagonal), d_inv, b)
+
+    def subset(self, indices: np.ndarray) -> 'CovarianceModel':
+        return FactorCovariance(self.loadings[indices], self.factor_cov, self.specific_variance[indices])
+
+    def _woodbury_factor(self, diagonal: np.ndarray):
+        """Cholesky factor of the k x k capacitance matrix F^-1 + B'D^-1 B."""
+        capacitance = np.linalg.inv(self.factor_cov) + self.loadings.T @ (self.loadings / diagonal[:, None])
+        return scipy.linalg.cho_factor(capacitance)
+
+    def _woodbury_solve(self, capacitance, d_inv: np.ndarray, b: np.ndarray) -> np.ndarray:
+        db = d_inv * b
+        return db - d_inv * (self.loadings @ scipy.linalg.cho_solve(capacitance, self.loadings.T @ db))
+
+
+class CovarianceEstimator(ABC):
+    """Estimates a CovarianceModel from a DataFrame of returns (rows=time, columns=assets)."""
+
+    name: str = 'base'
+
+    @abstractmethod
+    def estimate(self, returns: pd.DataFrame) -> CovarianceModel:
+        pass
+
+    def estimate_universe(self, universe: 'ReturnsUniverse') -> CovarianceModel:
+        """Estimate from a ReturnsUniverse, reusing the moments it has memoized."""
+        return self.estimate(universe.frame)
+
+
+class SampleCovariance(CovarianceEstimator):
+    """Unbiased sample covariance (``returns.cov()``)."""
+
+    name = 'sample'
+
+    def estimate(self, returns: pd.DataFrame) -> CovarianceModel:
+        return DenseCovariance(returns.cov().values)
+
+    def estimate_universe(self, universe: 'ReturnsUniverse') -> CovarianceModel:
+        return DenseCovariance(universe.cov)
+
+
+class LedoitWolfCovariance(CovarianceEstimator):
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+    Σ = (1 - δ) S + δ μ I with μ = trace(S) / N, where S is the maximum
+    likelihood (divided by T) sample covariance the intensity is derived for,
+    as in scikit-learn's ``LedoitWolf``. The intensity δ minimizes the
+    expected Frobenius loss (Ledoit & Wolf, 2004, "A well-conditioned
+    estimator for large-dimensional covariance matrices"). The estimate is
+    always well conditioned, also when there are fewer observations than assets.
+    """
+
+    name = 'ledoit_wolf'
+
+    def __init__(self, shrinkage: Optional[float] = None):
+        """
+        Args:
+            shrinkage: Fixed shrinkage intensity in [0, 1]; estimated from the data if None
+        """
+        if shrinkage is not None and not 0.0 <= shrinkage <= 1.0:
+            raise ValueError("Shrinkage intensity must be between 0 and 1")
+        self.shrinkage = shrinkage
+        self.shrinkage_: Optional[float] = None  # Intensity used by the last estimate()
+
+    @staticmethod
+    def shrinkage_intensity(centered: np.ndarray, emp_cov: Optional[np.ndarray] = None) -> float:
+        """
+        Optimal shrinkage intensity for demeaned returns (T x N).
+
+        Args:
+            centered: Demeaned returns
+            emp_cov: Their maximum likelihood covariance ``centered.T @ centered / T``,
+                if already computed
+        """
+        n_samples, n_features = centered.shape
+        if emp_cov is None:
+            emp_cov = centered.T @ centered / n_samples
+        mu = np.trace(emp_cov) / n_features
+        squared = centered ** 2
+        # Variance of the sample covariance entries, then the distance to the target
+        beta = (np.sum(squared.T @ squared) / n_samples - np.sum(emp_cov ** 2)) / (n_features * n_samples)
+        delta = (np.sum(emp_cov ** 2) - 2 * mu * np.trace(emp_cov) + n_features * mu ** 2) / n_features
+        if delta <= 0:
+            return 0.0
+        return float(min(beta, delta) / delta)
+
+    def estimate(self, returns: pd.DataFrame) -> CovarianceModel:
+        values = returns.values
+        centered = values - values.mean(axis=0)
+        return self._shrink(centered, centered.T @ centered / len(centered))
+
+    def estimate_universe(self, universe: 'ReturnsUniverse') -> CovarianceModel:
+        centered = universe.values - universe.mean
+        n_samples = len(centered)
+        # The universe memoizes the unbiased covariance; rescale it to divide by T
+        return self._shrink(centered, universe.cov * ((n_samples - 1) / n_samples))
+
+    def _shrink(self, centered: np.ndarray, emp_cov: np.ndarray) -> CovarianceModel:
+        # The intensity and the matrix it is applied to use the same (divided by T) covariance
+        shrinkage = self.shrinkage
+        if shrinkage is None:
+            shrinkage = self.shrinkage_intensity(centered, emp_cov)
+        self.shrinkage_ = shrinkage
+
+        mu = np.trace(emp_cov) / emp_cov.shape[0]
+        shrunk = (1 - shrinkage) * emp_cov
+        shrunk[np.diag_indices_from(shrunk)] += shrinkage * mu
+        return DenseCovariance(shrunk)
+
+
+class EWMACovariance(CovarianceEstimator):
+    """
+    Exponentially weighted covariance (RiskMetrics style).
+
+    The observation k periods before the last one gets weight proportional
+    to decay^k, so the estimate follows changes in volatility and
+    correlation faster than the equally weighted sample covariance.
+    """
+
+    name = 'ewma'
+
+    def __init__(self, decay: float = 0.94, halflife: Optional[float] = None, demean: bool = True):
+        """
+        Args:
+            decay: Decay factor per period (RiskMetrics uses 0.94 for daily data)
+            halflife: Half-life in periods; overrides ``decay`` when given
+            demean: Subtract the weighted mean (RiskMetrics assumes a zero mean)
+        """
+        if halflife is not None:
+            if halflife <= 0:
+                raise ValueError("EWMA half-life must be positive")
+            decay = 0.5 ** (1.0 / halflife)
+        if not 0.0 < decay < 1.0:
+            raise ValueError("EWMA decay must be between 0 and 1")
+        self.decay = decay
+        self.demean = demean
+
+    def estimate(self, returns: pd.DataFrame) -> CovarianceModel:
+        values = returns.values
+        weights = self.decay ** np.arange(len(values) - 1, -1, -1, dtype=float)
+        weights /= weights.sum()
+        if self.demean:
+            values = values - weights @ values
+        # Same debiasing as pandas' ewm(...).cov(bias=False) for reliability weights
+        bias_correction = 1.0 / (1.0 - np.sum(weights ** 2))
+        return DenseCovariance(bias_correction * (values * weights[:, None]).T @ values)
+
+
+class FactorModelCovariance(CovarianceEstimator):
+    """
+    Factor model covariance stored as low-rank plus diagonal.
+
+    With ``factor_returns`` the loadings come from regressing each asset on
+    the given factors (a fundamental or macro model). Without them a
+    statistical model is fitted: the factors are the leading principal
+    components of the returns. Specific variances are what the factors
+    leave of each asset's variance.
+    """
+
+    name = 'factor'
+
+    def __init__(
+        self,
+        num_factors: int = 5,
+        factor_returns: Optional[pd.DataFrame] = None,
+        min_specific_variance: float = 1e-4
+    ):
+        """
+        Args:
+            num_factors: Number of principal components (statistical model only)
+            factor_returns: Factor returns aligned with the asset returns' index
+            min_specific_variance: Floor for each specific variance as a
+                fraction of the asset's variance (keeps Σ positive definite)
+        """
+        if num_factors < 1:
+            raise ValueError("A factor model needs at least one factor")
+        self.num_factors = num_factors
+        self.factor_returns = factor_returns
+        self.min_specific_variance = min_specific_variance
+
+    def estimate(self, returns: pd.DataFrame) -> CovarianceModel:
+        values = returns.values
+        centered = values - values.mean(axis=0)
+        n_samples = len(values)
+        variance = np.sum(centered ** 2, axis=0) / (n_samples - 1)
+
+        if self.factor_returns is not None:
+            factors = self.factor_returns.loc[returns.index].values
+            factors = factors - factors.mean(axis=0)
+            # Least squares loadings of every asset on the factors at once
+            loadings = np.linalg.lstsq(factors, centered, rcond=None)[0].T
+            factor_cov = factors.T @ factors / (n_samples - 1)
+            residuals = centered - factors @ loadings.T
+            specific = np.sum(residuals ** 2, axis=0) / (n_samples - 1)
+        else:
+            k = min(self.num_factors, min(centered.shape) - 1)
+            if k < min(centered.shape) - 1:
+                _, singular_values, components = svds(centered, k=k)
+            else:
+                _, singular_values, components = np.linalg.svd(centered, full_matrices=False)
+                singular_values, components = singular_values[:k], components[:k]
+            # Unit-variance principal component factors: Σ ≈ B B' + diag(d)
+            loadings = components.T * (singular_values / np.sqrt(n_samples - 1))
+            factor_cov = np.eye(len(singular_values))
+            specific = variance - np.sum(loadings ** 2, axis=1)
+
+        specific = np.maximum(specific, self.min_specific_variance * variance)
+        return FactorCovariance(loadings, factor_cov, specific)
+
+
+COVARIANCE_ESTIMATORS: Dict[str, Type[CovarianceEstimator]] = {
+    SampleCovariance.name: SampleCovariance,
+    LedoitWolfCovariance.name: LedoitWolfCovariance,
+    EWMACovariance.name: EWMACovariance,
+    FactorModelCovariance.name: FactorModelCovariance,
+}
+
+CovarianceLike = Union[str, CovarianceEstimator, CovarianceModel]
+
+
+def estimate_covariance(returns: pd.DataFrame, covariance: CovarianceLike = 'sample') -> CovarianceModel:
+    """
+    Estimate the covariance of ``returns``.
+
+    Args:
+        returns: DataFrame with asset returns (rows=time, columns=assets)
+        covariance: Estimator name ('sample', 'ledoit_wolf', 'ewma', 'factor'),
+            a CovarianceEstimator instance, or an already estimated CovarianceModel
+
+    Returns:
+        CovarianceModel for the columns of ``returns``
+    """
+    if isinstance(covariance, CovarianceModel):
+        model = covariance
+    elif isinstance(covariance, CovarianceEstimator):
+        model = covariance.estimate(returns)
+    elif covariance in COVARIANCE_ESTIMATORS:
+        model = COVARIANCE_ESTIMATORS[covariance]().estimate(returns)
+    else:
+        raise ValueError(
+            f"Unknown covariance estimator: {covariance}. Use one of {sorted(COVARIANCE_ESTIMATORS)}"
+        )
+    if model.num_assets != returns.shape[1]:
+        raise ValueError("Covariance model does not match the number of assets")
+    return model
+
+
+class RollingMoments:
+    """
+    Mean and sample covariance of a sliding window of returns, updated in place.
+
+    Adding and removing observations x_i (signs s_i = +1 / -1) is one
+    low-rank update of the centred cross-product matrix around the current
+    mean μ:
+
+        M2' = M2 + sum(s_i (x_i - μ)(x_i - μ)') - n' δδ',  δ = μ' - μ
+
+    For a single observation this is Welford's rank-1 update; sliding the
+    window by k rows is a rank-(2k + 1) update costing O(k·N²), against the
+    O(T·N²) of re-estimating a T-row window. The result equals
+    ``SampleCovariance().estimate(window)`` up to rounding; every
+    ``refresh`` slides the window is re-estimated exactly, so rounding
+    cannot accumulate.
+    """
+
+    def __init__(self, window: np.ndarray, refresh: int = 250):
+        """
+        Start from an initial window.
+
+        Args:
+            window: Returns of the window (rows=time, columns=assets), without NaNs
+            refresh: Slides between exact re-estimations (0 for never)
+        """
+        self.refresh = refresh
+        self.reset(window)
+
+    def reset(self, window: np.ndarray) -> None:
+        """Re-estimate the moments of ``window`` from scratch."""
+        window = np.asarray(window, dtype=float)
+        if len(window) < 2:
+            raise ValueError("Need at least 2 observations for a covariance")
+        self.count = len(window)
+        self.mean = window.mean(axis=0)
+        centered = window - self.mean
+        self._m2 = centered.T @ centered
+        # Scratch space for the update products, so sliding allocates no N x N arrays
+        self._buffer = np.empty_like(self._m2)
+        self._slides = 0
+
+    def add(self, rows: np.ndarray) -> None:
+        """Add observations (one row or a 2-D block) to the window."""
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        self._update(rows, np.ones(len(rows)))
+
+    def remove(self, rows: np.ndarray) -> None:
+        """Remove observations (one row or a 2-D block) that are in the window."""
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        self._update(rows, -np.ones(len(rows)))
+
+    def slide(self, added: np.ndarray, removed: np.ndarray, window: Optional[np.ndarray] = None) -> None:
+        """
+        Move the window: add the rows entering it and drop those leaving it.
+
+        Args:
+            added: Rows entering the window
+            removed: Rows leaving the window
+            window: The resulting window; if given, it is re-estimated
+                exactly instead whenever a refresh is due
+        """
+        self._slides += 1
+        if window is not None and self.refresh and self._slides >= self.refresh:
+            self.reset(window)
+            return
+        added = np.atleast_2d(np.asarray(added, dtype=float))
+        removed = np.atleast_2d(np.asarray(removed, dtype=float))
+        self._update(np.vstack([added, removed]), np.r_[np.ones(len(added)), -np.ones(len(removed))])
+
+    def _update(self, rows: np.ndarray, signs: np.ndarray) -> None:
+        if len(rows) == 0:
+            return
+        count = self.count + int(signs.sum())
+        if count < 2:
+            raise ValueError("Need at least 2 observations for a covariance")
+        centered = rows - self.mean
+        shift = signs @ centered / count
+        vectors = np.vstack([centered, shift])
+        np.matmul(vectors.T, vectors * np.append(signs, -count)[:, None], out=self._buffer)
+        self._m2 += self._buffer
+        self.mean = self.mean + shift
+        self.count = count
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Unbiased sample covariance of the window."""
+        return self._m2 / (self.count - 1)
+
+    def covariance_model(self) -> DenseCovariance:
+        return DenseCovariance(self.covariance)
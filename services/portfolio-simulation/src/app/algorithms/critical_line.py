@@ -0,0 +1,289 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+BoundsLike = Union[float, Sequence[float], np.ndarray]
+
+
+def max_return_weights(
+    expected_returns: np.ndarray,
+    lower_bounds: np.ndarray,
+    upper_bounds: np.ndarray
+) -> Tuple[np.ndarray, int]:
+    """
+    Maximum expected return portfolio under box bounds and full investment.
+
+    Starts every asset at its lower bound and fills the highest-return
+    assets up to their upper bounds until the budget is spent.
+
+    Returns:
+        Tuple of (weights, index of the asset that absorbed the remaining budget)
+
+    Raises:
+        ValueError: If no weights within the bounds sum to 1
+    """
+    w = np.array(lower_bounds, dtype=float)
+    # Bounds such as n caps of 1/n only reach 1 up to rounding
+    if w.sum() > 1 + 1e-12 or np.sum(upper_bounds) < 1 - 1e-12:
+        raise ValueError("weight bounds are infeasible")
+    order = np.argsort(expected_returns, kind='stable')
+    i = order[-1]
+    for k in order[::-1]:
+        if w.sum() >= 1 - 1e-12:
+            break
+        i = k
+        w[i] = upper_bounds[i]
+    w[i] += 1 - w.sum()
+    return w, int(i)
+
+
+class CriticalLineAlgorithm:
+    """
+    Markowitz's Critical Line Algorithm (CLA) for the bounded efficient frontier.
+
+    Solves min w'Σw - λ μ'w subject to sum(w) = 1 and lower <= w <= upper for
+    every λ >= 0 at once. The optimal weights are piecewise linear in λ, so
+    the whole frontier is described exactly by the "turning points" where a
+    weight enters or leaves its bound. Any portfolio on the frontier between
+    two adjacent turning points is a convex combination of them.
+
+    Based on Bailey & López de Prado (2013), "An Open-Source Implementation
+    of the Critical-Line Algorithm for Portfolio Optimization".
+    """
+
+    def __init__(
+        self,
+        expected_returns: np.ndarray,
+        cov_matrix: np.ndarray,
+        lower_bounds: BoundsLike = 0.0,
+        upper_bounds: BoundsLike = 1.0,
+        tolerance: float = 1e-9
+    ):
+        """
+        Initialize the algorithm.
+
+        Args:
+            expected_returns: Expected return of each asset
+            cov_matrix: Covariance matrix of asset returns
+            lower_bounds: Lower bound per asset (or one bound for all)
+            upper_bounds: Upper bound per asset (or one bound for all)
+            tolerance: Tolerance for discarding numerically invalid turning points
+        """
+        self.mean = np.asarray(expected_returns, dtype=float)
+        self.cov = np.asarray(cov_matrix, dtype=float)
+        n = len(self.mean)
+        self.lower = np.broadcast_to(np.asarray(lower_bounds, dtype=float), n).copy()
+        self.upper = np.broadcast_to(np.asarray(upper_bounds, dtype=float), n).copy()
+        self.tolerance = tolerance
+
+        if self.lower.sum() > 1 + tolerance or self.upper.sum() < 1 - tolerance:
+            raise ValueError("Weight bounds are infeasible: they cannot sum to 1")
+
+        # Turning points, ordered from highest to lowest expected return
+        self.weights: List[np.ndarray] = []
+        self.lambdas: List[Optional[float]] = []
+        self.gammas: List[Optional[float]] = []
+        self.free_sets: List[List[int]] = []
+
+    def solve(self) -> 'CriticalLineAlgorithm':
+        """
+        Compute all turning points of the efficient frontier.
+
+        Returns:
+            self, with ``weights``, ``lambdas``, ``gammas`` and ``free_sets`` filled in
+        """
+        free, w = self._initial_solution()
+        self._store(w, None, None, free)
+
+        while True:
+            # Case a) a free weight moves to one of its bounds
+            lambda_in, i_in, bound_in = -np.inf, None, None
+            if len(free) > 1:
+                cov_f_inv, cov_fb, mean_f, w_b = self._matrices(free, w)
+                for j, i in enumerate(free):
+                    lam, bound = self._compute_lambda(
+                        cov_f_inv, cov_fb, mean_f, w_b, j, (self.lower[i], self.upper[i])
+                    )
+                    if lam is not None and lam > lambda_in:
+                        lambda_in, i_in, bound_in = lam, i, bound
+
+            # Case b) a bounded weight becomes free
+            lambda_out, i_out = -np.inf, None
+            if len(free) < len(self.mean):
+                for i in self._bounded(free):
+                    cov_f_inv, cov_fb, mean_f, w_b = self._matrices(free + [i], w)
+                    lam, _ = self._compute_lambda(
+                        cov_f_inv, cov_fb, mean_f, w_b, len(mean_f) - 1, w[i]
+                    )
+                    # Strictly below the previous λ: an asset that just hit its bound
+                    # must not re-enter at the same λ (float noise would cycle forever)
+                    previous = self.lambdas[-1]
+                    if lam is None or (
+                        previous is not None and lam >= previous - self.tolerance * max(1.0, abs(previous))
+                    ):
+                        continue
+                    if lam > lambda_out:
+                        lambda_out, i_out = lam, i
+
+            if (i_in is None or lambda_in < 0) and (i_out is None or lambda_out < 0):
+                # No more turning points: finish at the minimum variance portfolio
+                lam = 0.0
+                cov_f_inv, cov_fb, mean_f, w_b = self._matrices(free, w)
+                mean_f = np.zeros_like(mean_f)
+            else:
+                if lambda_in > lambda_out:
+                    lam = lambda_in
+                    free.remove(i_in)
+                    w[i_in] = bound_in
+                else:
+                    lam = lambda_out
+                    free.append(i_out)
+                cov_f_inv, cov_fb, mean_f, w_b = self._matrices(free, w)
+
+            w_f, gamma = self._compute_weights(cov_f_inv, cov_fb, mean_f, w_b, lam)
+            w[free] = w_f
+            self._store(w, lam, gamma, free)
+            if lam == 0:
+                break
+
+        self._purge_numerical_errors()
+        self._purge_excess()
+        return self
+
+    def _store(self, w: np.ndarray, lam: Optional[float], gamma: Optional[float], free: List[int]) -> None:
+        self.weights.append(w.copy())
+        self.lambdas.append(lam)
+        self.gammas.append(gamma)
+        self.free_sets.append(list(free))
+
+    def _initial_solution(self) -> Tuple[List[int], np.ndarray]:
+        """Start from the maximum-return portfolio with a single free asset."""
+        w, i = max_return_weights(self.mean, self.lower, self.upper)
+        return [i], w
+
+    def _bounded(self, free: List[int]) -> List[int]:
+        free_set = set(free)
+        return [i for i in range(len(self.mean)) if i not in free_set]
+
+    def _matrices(
+        self,
+        free: List[int],
+        w: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Slice the problem into free (F) and bounded (B) assets."""
+        bounded = self._bounded(free)
+        cov_f_inv = np.linalg.inv(self.cov[np.ix_(free, free)])
+        cov_fb = self.cov[np.ix_(free, bounded)]
+        mean_f = self.mean[free]
+        w_b = w[bounded] if bounded else None
+        return cov_f_inv, cov_fb, mean_f, w_b
+
+    @staticmethod
+    def _compute_lambda(
+        cov_f_inv: np.ndarray,
+        cov_fb: np.ndarray,
+        mean_f: np.ndarray,
+        w_b: Optional[np.ndarray],
+        i: int,
+        bound: Union[float, Tuple[float, float]]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """λ at which free asset ``i`` reaches ``bound`` (or the relevant one of (lower, upper))."""
+        ones_f = np.ones(len(mean_f))
+        c1 = ones_f @ cov_f_inv @ ones_f
+        c2 = cov_f_inv @ mean_f
+        c3 = ones_f @ cov_f_inv @ mean_f
+        c4 = cov_f_inv @ ones_f
+        c = -c1 * c2[i] + c3 * c4[i]
+        if c == 0:
+            return None, None
+
+        if isinstance(bound, tuple):
+            bound = bound[1] if c > 0 else bound[0]
+
+        if w_b is None:
+            return float((c4[i] - c1 * bound) / c), bound
+
+        l1 = w_b.sum()
+        l3 = cov_f_inv @ cov_fb @ w_b
+        l2 = ones_f @ l3
+        return float(((1 - l1 + l2) * c4[i] - c1 * (bound + l3[i])) / c), bound
+
+    @staticmethod
+    def _compute_weights(
+        cov_f_inv: np.ndarray,
+        cov_fb: np.ndarray,
+        mean_f: np.ndarray,
+        w_b: Optional[np.ndarray],
+        lam: float
+    ) -> Tuple[np.ndarray, float]:
+        """Free weights and the budget multiplier γ at a given λ."""
+        ones_f = np.ones(len(mean_f))
+        g1 = ones_f @ cov_f_inv @ mean_f
+        g2 = ones_f @ cov_f_inv @ ones_f
+        if w_b is None:
+            gamma = float(-lam * g1 / g2 + 1 / g2)
+            w1 = np.zeros(len(mean_f))
+        else:
+            g3 = w_b.sum()
+            w1 = cov_f_inv @ cov_fb @ w_b
+            g4 = ones_f @ w1
+            gamma = float(-lam * g1 / g2 + (1 - g3 + g4) / g2)
+
+        w2 = cov_f_inv @ ones_f
+        w3 = cov_f_inv @ mean_f
+        return -w1 + gamma * w2 + lam * w3, gamma
+
+    def _drop(self, index: int) -> None:
+        del self.weights[index], self.lambdas[index], self.gammas[index], self.free_sets[index]
+
+    def _purge_numerical_errors(self) -> None:
+        """Drop turning points that violate the constraints (ill-conditioned covariance)."""
+        i = 0
+        while i < len(self.weights):
+            w = self.weights[i]
+            if (
+                abs(w.sum() - 1) > self.tolerance
+                or np.any(w - self.lower < -self.tolerance)
+                or np.any(w - self.upper > self.tolerance)
+            ):
+                self._drop(i)
+            else:
+                i += 1
+
+    def _purge_excess(self) -> None:
+        """Drop turning points whose expected return is not strictly decreasing."""
+        i = 0
+        while i < len(self.weights) - 1:
+            if self.weights[i] @ self.mean < self.weights[i + 1] @ self.mean:
+                self._drop(i + 1)
+            else:
+                i += 1
+
+    def frontier_weights(self, target_returns: Sequence[float]) -> List[np.ndarray]:
+        """
+        Exact frontier weights for target expected returns.
+
+        Targets outside the range of the turning points are clipped to it.
+
+        Args:
+            target_returns: Target expected returns (same units as ``expected_returns``)
+
+        Returns:
+            List of weight vectors, one per target
+        """
+        if not self.weights:
+            self.solve()
+
+        turning_returns = np.array([w @ self.mean for w in self.weights])
+        results = []
+        for target in target_returns:
+            target = float(np.clip(target, turning_returns[-1], turning_returns[0]))
+            # Turning points are ordered by decreasing return
+            k = int(np.searchsorted(-turning_returns, -target, side='right'))
+            k = min(max(k, 1), len(self.weights) - 1) if len(self.weights) > 1 else 0
+            if len(self.weights) == 1:
+                results.append(self.weights[0].copy())
+                continue
+            hi, lo = turning_returns[k - 1], turning_returns[k]
+            a = 1.0 if hi == lo else (target - lo) / (hi - lo)
+            results.append(a * self.weights[k - 1] + (1 - a) * self.weights[k])
+        return results
@@ -0,0 +1,206 @@
+import logging
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .covariance import CovarianceLike
+from .critical_line import CriticalLineAlgorithm, max_return_weights
+from .mean_variance import MeanVarianceOptimizer
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
+
+FRONTIER_METHODS = ('warm_start', 'cla')
+
+
+class EfficientFrontier:
+    """
+    Efficient frontier engine.
+
+    Computes the expected returns and covariance matrix once and reuses them
+    for every frontier point. Two methods are available:
+
+    - ``warm_start``: walks target returns from low to high, solving each
+      minimum-variance problem with SLSQP starting from the previous point's
+      weights. Adjacent frontier portfolios are close, so each solve needs
+      only a few iterations.
+    - ``cla``: traces the exact frontier with the Critical Line Algorithm and
+      interpolates between its turning points. No iterative solves at all.
+    """
+
+    def __init__(
+        self,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
+        risk_free_rate: float = 0.0,
+        weight_bounds: Tuple[float, float] = (0, 1),
+        method: str = 'warm_start',
+        max_iterations: int = 1000,
+        covariance: CovarianceLike = 'sample'
+    ):
+        """
+        Initialize the frontier engine.
+
+        Args:
+            returns: DataFrame with asset returns (rows=time, columns=assets),
+                or a ReturnsUniverse
+            risk_free_rate: Annual risk-free rate (default: 0.0)
+            weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
+            method: 'warm_start' (SLSQP) or 'cla' (Critical Line Algorithm)
+            max_iterations: Maximum SLSQP iterations per frontier point
+            covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+        """
+        if method not in FRONTIER_METHODS:
+            raise ValueError(f"Unknown frontier method: {method}. Use one of {FRONTIER_METHODS}")
+
+        # The optimizer computes the moments once; it is also used for max Sharpe and metrics
+        self.optimizer = MeanVarianceOptimizer(
+            returns=returns,
+            risk_free_rate=risk_free_rate,
+            weight_bounds=weight_bounds,
+            max_iterations=max_iterations,
+            covariance=covariance
+        )
+        self.expected_returns = self.optimizer.expected_returns
+        self.cov_matrix = self.optimizer.cov_matrix
+        self.num_assets = self.optimizer.num_assets
+        self.risk_free_rate = risk_free_rate
+        self.weight_bounds = weight_bounds
+        self.method = method
+        self.max_iterations = max_iterations
+
+        self.lower_bounds = np.full(self.num_assets, weight_bounds[0], dtype=float)
+        self.upper_bounds = np.full(self.num_assets, weight_bounds[1], dtype=float)
+        self._cla: Optional[CriticalLineAlgorithm] = None
+
+        # Scale the objective to O(1); raw daily variances sit below SLSQP's default ftol
+        self._scaled_cov = self.cov_matrix / np.mean(np.diag(self.cov_matrix))
+
+        # Solver statistics for the warm-start method
+        self.solves = 0
+        self.iterations = 0
+
+    def _min_variance(self, x0: np.ndarray, target_return: Optional[float] = None) -> np.ndarray:
+        """Minimize portfolio variance, optionally at a target (per-period) expected return."""
+        cov = self._scaled_cov
+        mu = self.expected_returns
+        constraints = [
+            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0, 'jac': lambda w: np.ones_like(w)}
+        ]
+        if target_return is not None:
+            constraints.append(
+                {'type': 'eq', 'fun': lambda w: mu @ w - target_return, 'jac': lambda w: mu}
+            )
+
+        result = minimize(
+            lambda w: w @ cov @ w,
+            x0,
+            jac=lambda w: 2 * cov @ w,
+            method='SLSQP',
+            bounds=tuple(self.weight_bounds for _ in range(self.num_assets)),
+            constraints=constraints,
+            options={'maxiter': self.max_iterations}
+        )
+        self.solves += 1
+        self.iterations += result.nit
+        if not result.success:
+            raise RuntimeError(f"Frontier optimization failed: {result.message}")
+        return result.x
+
+    def _get_cla(self) -> CriticalLineAlgorithm:
+        if self._cla is None:
+            self._cla = CriticalLineAlgorithm(
+                self.expected_returns, self.cov_matrix, self.lower_bounds, self.upper_bounds
+            ).solve()
+        return self._cla
+
+    def min_volatility_weights(self) -> np.ndarray:
+        """Weights of the global minimum variance portfolio."""
+        if self.method == 'cla':
+            return self._get_cla().weights[-1]
+        return self._min_variance(np.full(self.num_assets, 1.0 / self.num_assets))
+
+    def max_return_weights(self) -> np.ndarray:
+        """Weights of the maximum expected return portfolio."""
+        weights, _ = max_return_weights(self.expected_returns, self.lower_bounds, self.upper_bounds)
+        return weights
+
+    def frontier_weights(
+        self,
+        target_returns: Sequence[float],
+        initial_weights: Optional[np.ndarray] = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Minimum variance weights for each target expected return.
+
+        Args:
+            target_returns: Per-period target expected returns
+            initial_weights: Starting point for the first warm-started solve
+
+        Returns:
+            List of weight vectors in the order of ``target_returns``
+            (None where a warm-started solve failed)
+        """
+        if self.method == 'cla':
+            return self._get_cla().frontier_weights(target_returns)
+
+        results: List[Optional[np.ndarray]] = [None] * len(target_returns)
+        weights = initial_weights
+        if weights is None:
+            weights = np.full(self.num_assets, 1.0 / self.num_assets)
+
+        # Walk targets in increasing order so each solve starts next to its solution
+        for index in np.argsort(target_returns):
+            try:
+                weights = self._min_variance(weights, float(target_returns[index]))
+                results[index] = weights
+            except RuntimeError as e:
+                logger.warning(f"Skipping target return {target_returns[index]}: {e}")
+        return results
+
+    def _point(self, weights: np.ndarray) -> Dict:
+        expected_return, volatility, sharpe_ratio = self.optimizer.calculate_portfolio_metrics(weights)
+        return {
+            'expected_return': expected_return,
+            'volatility': volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'weights': self.optimizer.get_weights_dict(weights)
+        }
+
+    def calculate(self, num_points: int = 20) -> Dict[str, Dict]:
+        """
+        Calculate the efficient frontier.
+
+        Args:
+            num_points: Number of points to calculate on the efficient frontier
+
+        Returns:
+            Dictionary with efficient frontier data points
+        """
+        min_vol_weights = self.min_volatility_weights()
+        max_ret_weights = self.max_return_weights()
+
+        # Targets span the per-period returns of the two end portfolios
+        target_returns = np.linspace(
+            self.expected_returns @ min_vol_weights,
+            self.expected_returns @ max_ret_weights,
+            num_points
+        )
+        frontier_points = [
+            self._point(weights)
+            for weights in self.frontier_weights(target_returns, initial_weights=min_vol_weights)
+            if weights is not None
+        ]
+        frontier_points.sort(key=lambda x: x['volatility'])
+
+        # Find the tangency portfolio (maximum Sharpe ratio)
+        tangency_port = max(frontier_points, key=lambda x: x['sharpe_ratio'])
+
+        return {
+            'frontier': frontier_points,
+            'min_volatility': self._point(min_vol_weights),
+            'max_return': self._point(max_ret_weights),
+            'tangency': tangency_port,
+            'risk_free_rate': self.risk_free_rate,
+            'method': self.method
+        }
@@ -0,0 +1,322 @@
+import logging
+import numpy as np
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Draws held in memory at once per chunk of paths
+GOAL_CHUNK_CELLS = 2_000_000
+
+# Trading days per month, for compounding daily returns into monthly ones
+TRADING_DAYS_PER_MONTH = 21
+
+class PeriodReturnSampler(ABC):
+    """Draws portfolio returns per period (e.g. per month) for many paths."""
+
+    # Random draws needed per path and period, to size the chunks of paths
+    draws_per_period: int = 1
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        """Period returns (paths x periods)."""
+
+class BootstrapSampler(PeriodReturnSampler):
+    """Period returns compounded from daily returns drawn with replacement from history."""
+
+    def __init__(self, daily_returns: np.ndarray, days_per_period: int = TRADING_DAYS_PER_MONTH):
+        """
+        Args:
+            daily_returns: Historical daily portfolio returns
+            days_per_period: Trading days compounded into one period
+        """
+        daily_returns = np.asarray(daily_returns, dtype=float)
+        if daily_returns.ndim != 1 or len(daily_returns) == 0:
+            raise ValueError("Need a non-empty series of daily portfolio returns")
+        if np.any(daily_returns <= -1):
+            raise ValueError("Daily returns must be above -100%")
+        if days_per_period < 1:
+            raise ValueError("days_per_period must be at least 1")
+        # Sums of log returns compound without a product over days
+        self._log_growth = np.log1p(daily_returns)
+        self.draws_per_period = days_per_period
+
+    def sample(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        draws = rng.integers(0, len(self._log_growth), size=(paths, periods, self.draws_per_period))
+        return np.expm1(self._log_growth[draws].sum(axis=2))
+
+class LognormalSampler(PeriodReturnSampler):
+    """Period returns with lognormal growth matching an annual expected return and volatility."""
+
+    def __init__(self, expected_return: float, volatility: float, periods_per_year: int = 12):
+        """
+        Args:
+            expected_return: Annual expected (arithmetic) return, e.g. 0.06
+            volatility: Annual volatility of returns, e.g. 0.15
+            periods_per_year: Periods per year (12 for monthly)
+        """
+        if expected_return <= -1:
+            raise ValueError("Expected return must be above -100%")
+        if volatility < 0:
+            raise ValueError("Volatility must be non-negative")
+        # Log-growth moments whose annual growth has the given mean and standard deviation
+        variance = np.log1p((volatility / (1 + expected_return)) ** 2) / periods_per_year
+        self._mu = np.log1p(expected_return) / periods_per_year - variance / 2
+        self._sigma = np.sqrt(variance)
+
+    def sample(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        draws = rng.standard_normal((paths, periods))
+        draws *= self._sigma
+        draws += self._mu
+        return np.expm1(draws, out=draws)
+
+@dataclass
+class CashFlow:
+    """
+    Recurring contribution (positive amount) or withdrawal (negative) per period.
+
+    The amount is paid at the start of each period from ``start`` up to,
+    not including, ``end`` and grows by ``growth`` a year, e.g. with salary
+    raises or to keep pace with inflation.
+    """
+    amount: float
+    start: int = 0
+    end: Optional[int] = None  # Default: until the end of the projection
+    growth: float = 0.0  # Annual growth of the amount
+
+def cash_flow_schedule(cash_flows: Sequence[CashFlow], periods: int, periods_per_year: int = 12) -> np.ndarray:
+    """Net amount paid in at the start of each period."""
+    schedule = np.zeros(periods)
+    elapsed = np.arange(periods)
+    for flow in cash_flows:
+        end = periods if flow.end is None else min(flow.end, periods)
+        start = max(flow.start, 0)
+        if start >= end:
+            continue
+        # Grows from the flow's first payment on
+        schedule[start:end] += flow.amount * (1 + flow.growth) ** ((elapsed[start:end] - start) / periods_per_year)
+    return schedule
+
+class StreamingQuantiles:
+    """
+    Quantiles of values per time step over a stream of paths, in bounded memory.
+
+    Each time step keeps a histogram with log-spaced bins between ``low``
+    and ``high``, plus one bin for values of 0 or less (e.g. depleted
+    paths), one for values between 0 and ``low`` and one for values above
+    ``high``. Adding a chunk of paths is one bincount; memory is
+    steps x bins counts whatever the number of paths. A quantile between
+    ``low`` and ``high`` is exact up to the width of its bin, a relative
+    error below (high / low) ** (1 / bins) - 1; below ``low`` it is
+    interpolated linearly, above ``high`` reported as ``high``.
+    """
+
+    def __init__(self, steps: int, low: float, high: float, bins: int = 4096):
+        if not 0 < low < high:
+            raise ValueError("Need 0 < low < high")
+        self.steps = steps
+        self.bins = bins
+        self.low = low
+        self.high = high
+        self._log_low = np.log(low)
+        self._log_width = (np.log(high) - self._log_low) / bins
+        # Bins: <= 0, (0, low), the log-spaced ones, > high
+        self.counts = np.zeros((steps, bins + 3), dtype=np.int64)
+        self.count = 0
+
+    def update(self, values: np.ndarray) -> None:
+        """Add paths (rows) of values at every step (columns)."""
+        position = np.clip(values, self.low, self.high)
+        np.log(position, out=position)
+        position -= self._log_low
+        position /= self._log_width
+        index = np.minimum(position.astype(np.int64), self.bins - 1)
+        del position
+        index += 2
+        index[values < self.low] = 1
+        index[values <= 0] = 0
+        index[values > self.high] = self.bins + 2
+        index += np.arange(self.steps) * (self.bins + 3)
+        self.counts += np.bincount(index.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.count += values.shape[0]
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+        """
+        Quantiles per step.
+
+        Args:
+            q: Quantiles in [0, 1]
+
+        Returns:
+            Array (len(q) x steps)
+        """
+        if self.count == 0:
+            raise ValueError("No values have been added")
+        cumulative = np.cumsum(self.counts, axis=1)
+        edges = np.exp(self._log_low + self._log_width * np.arange(self.bins + 1))
+        # Lower and upper edge of every bin, the open-ended ones included
+        lower = np.r_[0.0, 0.0, edges[:-1], self.high]
+        upper = np.r_[0.0, self.low, edges[1:], self.high]
+        result = np.empty((len(q), self.steps))
+        rows = np.arange(self.steps)
+        for i, quantile in enumerate(q):
+            rank = quantile * (self.count - 1) + 1
+            # First bin whose cumulative count reaches the rank
+            bin_index = (cumulative < rank).sum(axis=1)
+            below = np.where(bin_index > 0, cumulative[rows, np.maximum(bin_index - 1, 0)], 0)
+            fraction = (rank - below) / np.maximum(self.counts[rows, bin_index], 1)
+            # Interpolate linearly below low, geometrically in the log-spaced bins
+            low, high = lower[bin_index], upper[bin_index]
+            geometric = low * (high / np.where(low > 0, low, 1.0)) ** fraction
+            result[i] = np.where(low > 0, geometric, low + fraction * (high - low))
+        return result
+
+@dataclass
+class GoalProjection:
+    """Distribution of projected portfolio values, in today's money, and the odds of reaching a goal."""
+    periods_per_year: int
+    percentiles: Dict[str, List[float]]  # 'p50' -> value at the end of each period
+    mean_terminal_value: float
+    median_terminal_value: float
+    total_contributions: float  # Sum of scheduled contributions (nominal)
+    total_withdrawals: float  # Sum of scheduled withdrawals (nominal)
+    probability_of_depletion: float  # Paths that ran out of money for a withdrawal
+    goal: Optional[float] = None
+    probability_of_success: Optional[float] = None  # Terminal value at least the goal
+    success_by_period: Optional[List[float]] = None  # Probability of having reached the goal by each period
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class GoalProjector:
+    """
+    Monte Carlo projection of a portfolio with recurring cash flows, vectorized over paths and time.
+
+    With cash flow c_t paid at the start of period t and period growth
+    factors g_t = 1 + r_t, the value after period t is
+    V_t = (V_{t-1} + c_t) g_t. Unrolled with P_t = g_1 ... g_t:
+
+        V_t = P_t (V_0 + sum_{s <= t} c_s / P_{s-1})
+
+    one cumulative product and one cumulative sum over each chunk of paths,
+    with no loop over periods. A path whose balance cannot cover a
+    withdrawal is depleted and stays at 0. Paths are simulated in chunks
+    and their values fed into StreamingQuantiles, so memory is bounded by
+    the chunk size and the percentile histograms, not by paths x periods.
+    """
+
+    def __init__(
+        self,
+        sampler: PeriodReturnSampler,
+        periods_per_year: int = 12,
+        num_paths: int = 10000,
+        seed: Optional[int] = None,
+        chunk_cells: int = GOAL_CHUNK_CELLS,
+        bins: int = 4096
+    ):
+        """
+        Initialize the projector.
+
+        Args:
+            sampler: Draws the period returns
+            periods_per_year: Periods per year (12 for monthly)
+            num_paths: Simulated paths
+            seed: Random seed
+            chunk_cells: Random draws held in memory at once
+            bins: Histogram bins per period for the streaming percentiles
+        """
+        if num_paths < 1:
+            raise ValueError("num_paths must be positive")
+        self.sampler = sampler
+        self.periods_per_year = periods_per_year
+        self.num_paths = num_paths
+        self.seed = seed
+        self.chunk_cells = chunk_cells
+        self.bins = bins
+
+    def project(
+        self,
+        periods: int,
+        initial_value: float = 0.0,
+        cash_flows: Sequence[CashFlow] = (),
+        goal: Optional[float] = None,
+        inflation_rate: float = 0.0,
+        quantiles: Sequence[int] = (5, 25, 50, 75, 95),
+        progress: Optional[Callable[[float], None]] = None
+    ) -> GoalProjection:
+        """
+        Project the portfolio value over ``periods`` periods.
+
+        Args:
+            periods: Number of periods, e.g. 360 for 30 years of months
+            initial_value: Value today
+            cash_flows: Recurring contributions and withdrawals
+            goal: Target terminal value in today's money
+            inflation_rate: Annual inflation; values are reported in today's money
+            quantiles: Percentiles (0 to 100) to report per period
+            progress: Optional callback receiving the completed fraction
+
+        Returns:
+            GoalProjection
+        """
+        if periods < 1:
+            raise ValueError("periods must be positive")
+        if initial_value < 0:
+            raise ValueError("initial_value must be non-negative")
+        flows = cash_flow_schedule(cash_flows, periods, self.periods_per_year)
+        elapsed = np.arange(1, periods + 1) / self.periods_per_year
+        deflator = (1.0 + inflation_rate) ** -elapsed
+
+        # Histogram range from the money put in; values beyond it only lose precision
+        scale = max(initial_value + flows[flows > 0].sum(), np.abs(flows).max(initial=0.0), 1e-9)
+        bands = StreamingQuantiles(periods, scale * 1e-3, scale * 1e4, bins=self.bins)
+        rng = np.random.default_rng(self.seed)
+        terminal_sum = 0.0
+        depleted_paths = 0
+        reached = np.zeros(periods, dtype=np.int64)
+        succeeded = 0
+        chunk = max(1, self.chunk_cells // (periods * self.sampler.draws_per_period))
+        for start in range(0, self.num_paths, chunk):
+            paths = min(chunk, self.num_paths - start)
+            growth = self.sampler.sample(rng, paths, periods)
+            growth += 1.0
+            np.cumprod(growth, axis=1, out=growth)
+            # In place, so a chunk holds two paths x periods arrays
+            values = np.empty_like(growth)
+            values[:, 0] = initial_value + flows[0]
+            np.divide(flows[1:], growth[:, :-1], out=values[:, 1:])
+            np.cumsum(values, axis=1, out=values)
+            values *= growth
+            del growth
+            # Exact until a withdrawal exceeds the balance; from then on the path is empty
+            depleted = np.logical_or.accumulate(values < 0, axis=1)
+            values[depleted] = 0.0
+            values *= deflator
+
+            bands.update(values)
+            terminal_sum += values[:, -1].sum()
+            depleted_paths += int(depleted[:, -1].sum())
+            if goal is not None:
+                # Reached by a period: at or above the goal then or at any earlier period
+                reached += np.logical_or.accumulate(values >= goal, axis=1).sum(axis=0)
+                succeeded += int((values[:, -1] >= goal).sum())
+            if progress is not None:
+                progress((start + paths) / self.num_paths)
+
+        *percentiles, median = bands.quantiles([q / 100 for q in quantiles] + [0.5])
+        projection = GoalProjection(
+            periods_per_year=self.periods_per_year,
+            percentiles={f"p{q}": row.tolist() for q, row in zip(quantiles, percentiles)},
+            mean_terminal_value=float(terminal_sum / self.num_paths),
+            median_terminal_value=float(median[-1]),
+            total_contributions=float(flows[flows > 0].sum()),
+            total_withdrawals=float(-flows[flows < 0].sum()),
+            probability_of_depletion=depleted_paths / self.num_paths
+        )
+        if goal is not None:
+            projection.goal = goal
+            projection.probability_of_success = succeeded / self.num_paths
+            projection.success_by_period = (reached / self.num_paths).tolist()
+        logger.debug(f"Projected {self.num_paths} paths over {periods} periods in chunks of {chunk}")
+        return projection
@@ -1,10 +1,33 @@
+import hashlib
+import threading
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
-from scipy.cluster.hierarchy import linkage, to_tree
+from scipy.cluster.hierarchy import leaves_list, linkage
 from scipy.spatial.distance import squareform
 
 from .base import PortfolioOptimizer, PortfolioWeights
+from .covariance import CovarianceLike, SampleCovariance
+from .universe import ReturnsUniverse
+
+HRP_BISECTIONS = ('tree', 'midpoint')
+
+# Linkage matrices by correlation fingerprint, least recently used first
+LINKAGE_CACHE_SIZE = 64
+_linkage_cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+_linkage_cache_lock = threading.Lock()
+
+def correlation_fingerprint(corr_matrix: np.ndarray, linkage_method: str) -> str:
+    """Digest identifying a correlation matrix (values and asset order) and linkage method."""
+    digest = hashlib.sha256(f"{linkage_method}:{corr_matrix.shape[0]}".encode())
+    digest.update(memoryview(np.ascontiguousarray(corr_matrix, dtype=float)).cast('B'))
+    return digest.hexdigest()
+
+def clear_linkage_cache() -> None:
+    """Drop all cached linkage matrices."""
+    with _linkage_cache_lock:
+        _linkage_cache.clear()
 
 class HierarchicalRiskParityOptimizer(PortfolioOptimizer):
     """
@@ -19,45 +42,75 @@ class HierarchicalRiskParityOptimizer(PortfolioOptimizer):
     
     def __init__(
         self,
-        returns: pd.DataFrame,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
         risk_free_rate: float = 0.0,
         weight_bounds: Tuple[float, float] = (0, 1),
         linkage_method: str = 'single',
-        max_clusters: Optional[int] = None
+        max_clusters: Optional[int] = None,
+        covariance: CovarianceLike = 'sample',
+        bisection: str = 'tree'
     ):
         """
         Initialize the Hierarchical Risk Parity Optimizer.
         
         Args:
-            returns: DataFrame with asset returns (rows=time, columns=assets)
+            returns: DataFrame with asset returns (rows=time, columns=assets),
+                or a ReturnsUniverse
             risk_free_rate: Annual risk-free rate (default: 0.0)
             weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
             linkage_method: Linkage method for hierarchical clustering.
                           Options: 'single', 'complete', 'average', 'ward', etc.
             max_clusters: Maximum number of clusters to form (optional)
+            covariance: Covariance estimator ('sample', 'ledoit_wolf', 'ewma', 'factor'),
+                a CovarianceEstimator, or a pre-estimated CovarianceModel
+            bisection: 'tree' splits each cluster into its two dendrogram children;
+                'midpoint' halves the quasi-diagonal order (López de Prado, 2016)
         """
-        super().__init__(returns, risk_free_rate)
+        if bisection not in HRP_BISECTIONS:
+            raise ValueError(f"Unknown HRP bisection: {bisection}. Use one of {HRP_BISECTIONS}")
+        super().__init__(returns, risk_free_rate, covariance=covariance)
         self.weight_bounds = weight_bounds
         self.linkage_method = linkage_method
         self.max_clusters = max_clusters
+        self.bisection = bisection
         
-        # Calculate correlation and covariance matrices
-        self.corr_matrix = self.returns.corr().values
-        self.cov_matrix = self.returns.cov().values
+        # Correlation matrix implied by the covariance estimate (clustering needs it dense)
+        if self.covariance == 'sample' or isinstance(self.covariance, SampleCovariance):
+            self.corr_matrix = self.universe.corr
+        else:
+            std = np.sqrt(self.covariance_model.diagonal())
+            self.corr_matrix = self.cov_matrix / std[:, None]
+            self.corr_matrix /= std
+            np.clip(self.corr_matrix, -1.0, 1.0, out=self.corr_matrix)
         
         # Initialize variables for clustering
         self.linkage_matrix = None
+        self.linkage_cache_hit = False
         self.clusters = None
     
     def _compute_linkage_matrix(self) -> np.ndarray:
         """
         Compute the linkage matrix for hierarchical clustering.
         
+        Linkages are cached by a fingerprint of the correlation matrix and the
+        linkage method, so repeated runs on the same universe skip clustering.
+        Cache entries are read-only; each optimizer gets its own copy, since
+        older scipy releases reject read-only buffers.
+        
         Returns:
             Linkage matrix for hierarchical clustering
         """
+        key = correlation_fingerprint(self.corr_matrix, self.linkage_method)
+        with _linkage_cache_lock:
+            cached = _linkage_cache.get(key)
+            if cached is not None:
+                _linkage_cache.move_to_end(key)
+                self.linkage_cache_hit = True
+                return cached.copy()
+        self.linkage_cache_hit = False
+        
         # Convert correlation to distance matrix
-        distance_matrix = np.sqrt(0.5 * (1 - self.corr_matrix))
+        distance_matrix = np.sqrt(np.maximum(0.5 * (1 - self.corr_matrix), 0.0))
         
         # Make sure the distance matrix is symmetric and has zeros on diagonal
         distance_matrix = (distance_matrix + distance_matrix.T) / 2
@@ -67,82 +120,128 @@ class HierarchicalRiskParityOptimizer(PortfolioOptimizer):
         condensed_dist = squareform(distance_matrix, checks=False)
         
         # Perform hierarchical clustering
-        return linkage(condensed_dist, method=self.linkage_method)
+        link = linkage(condensed_dist, method=self.linkage_method)
+        cached = link.copy()
+        cached.flags.writeable = False  # Shared through the cache
+        with _linkage_cache_lock:
+            _linkage_cache[key] = cached
+            while len(_linkage_cache) > LINKAGE_CACHE_SIZE:
+                _linkage_cache.popitem(last=False)
+        return link
     
     def _compute_quasi_diagonal_order(self, link: np.ndarray) -> List[int]:
         """
         Compute quasi-diagonal order of the assets.
         
+        The leaves of the dendrogram in left-to-right order put similar assets
+        next to each other, so every cluster of the tree is a contiguous range.
+        
         Args:
             link: Linkage matrix from hierarchical clustering
             
         Returns:
             List of indices representing the quasi-diagonal order
         """
-        # Convert linkage matrix to tree
-        tree = to_tree(link, rd=False)
-        
-        # Initialize queue with the root of the tree
-        queue = [tree]
-        result = []
+        return leaves_list(link).tolist()
+    
+    def _tree_splits(self, link: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bisections given by the dendrogram, as ranges of the quasi-diagonal order.
         
-        # Perform breadth-first traversal
-        while queue:
-            node = queue.pop(0)
-            
-            if node.is_leaf():
-                result.append(int(node.id))
-            else:
-                # Add left and right children to the queue
-                queue.append(node.left)
-                queue.append(node.right)
-        
-        return result
+        Returns:
+            Arrays (start, middle, stop): each split divides [start, stop) into
+            its left child [start, middle) and right child [middle, stop)
+        """
+        n = len(link) + 1
+        sizes = np.concatenate([np.ones(n, dtype=int), link[:, 3].astype(int)])
+        starts = np.zeros(2 * n - 1, dtype=int)
+        children = link[:, :2].astype(int)
+        # Parents come after their children in the linkage matrix, so walk it
+        # backwards from the root and hand each child its offset
+        for i in range(n - 2, -1, -1):
+            left, right = children[i]
+            starts[left] = starts[n + i]
+            starts[right] = starts[n + i] + sizes[left]
+        start = starts[n:]
+        middle = start + sizes[children[:, 0]]
+        return start, middle, start + sizes[n:]
+    
+    def _midpoint_splits(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bisections at the midpoint of each range (López de Prado's original scheme)."""
+        splits = []
+        ranges = [(0, n)]
+        while ranges:
+            start, stop = ranges.pop()
+            if stop - start < 2:
+                continue
+            middle = (start + stop) // 2
+            splits.append((start, middle, stop))
+            ranges.extend([(start, middle), (middle, stop)])
+        return tuple(np.array(column, dtype=int) for column in zip(*splits))
     
-    def _compute_hrp_weights(self, cov: np.ndarray, sort_order: List[int]) -> np.ndarray:
+    def _compute_hrp_weights(
+        self,
+        cov: np.ndarray,
+        sort_order: List[int],
+        link: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
-        Compute HRP weights using the hierarchical structure.
+        Compute HRP weights by recursive bisection.
+        
+        Each split allocates between its two sub-clusters in inverse proportion
+        to their variances, where a cluster's variance is that of its
+        inverse-variance portfolio. Every cluster is a contiguous range of the
+        quasi-diagonal order, so all cluster variances come from one 2-D prefix
+        sum and the per-split factors are combined with a prefix sum of logs.
         
         Args:
             cov: Covariance matrix
             sort_order: Asset order from quasi-diagonalization
+            link: Linkage matrix; splits follow the dendrogram when given
+                (and ``bisection`` is 'tree'), else the midpoint of each range
             
         Returns:
             Array of portfolio weights
         """
-        # Initialize weights
-        weights = np.ones(cov.shape[0])
+        order = np.asarray(sort_order, dtype=int)
+        n = len(order)
+        if n == 1:
+            return np.ones(1)
+        if link is not None and self.bisection == 'tree':
+            start, middle, stop = self._tree_splits(link)
+        else:
+            start, middle, stop = self._midpoint_splits(n)
         
-        # Start with all assets in one cluster
-        clusters = [sort_order]
+        # Inverse-variance weights scaled into the covariance: the block sum of
+        # `scaled` over a range divided by the squared sum of `inv_var` is the
+        # variance of that range's inverse-variance portfolio. `block` holds
+        # the 2-D prefix sums of `scaled` with a leading row and column of zeros
+        inv_var = 1.0 / np.diag(cov)[order]
+        block = np.zeros((n + 1, n + 1))
+        scaled = block[1:, 1:]
+        scaled[...] = cov[np.ix_(order, order)]
+        scaled *= inv_var[:, None]
+        scaled *= inv_var
+        np.cumsum(scaled, axis=0, out=scaled)
+        np.cumsum(scaled, axis=1, out=scaled)
+        inv_var_sum = np.concatenate([[0.0], np.cumsum(inv_var)])
         
-        while len(clusters) > 0:
-            # Get the next cluster to process
-            cluster = clusters.pop(0)
-            
-            if len(cluster) == 1:
-                continue  # Skip single-asset clusters
-                
-            # Split the cluster into two sub-clusters
-            # (This is a simplified version - in practice, you'd use the hierarchical structure)
-            split_point = len(cluster) // 2
-            left_cluster = cluster[:split_point]
-            right_cluster = cluster[split_point:]
-            
-            # Compute the variance of each sub-cluster
-            var_left = self._compute_cluster_variance(cov, left_cluster)
-            var_right = self._compute_cluster_variance(cov, right_cluster)
-            
-            # Update weights based on inverse variance
-            alpha = 1 - var_left / (var_left + var_right)
-            weights[left_cluster] *= alpha
-            weights[right_cluster] *= 1 - alpha
-            
-            # Add sub-clusters to the queue if they have more than one asset
-            if len(left_cluster) > 1:
-                clusters.append(left_cluster)
-            if len(right_cluster) > 1:
-                clusters.append(right_cluster)
+        def cluster_variance(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+            total = block[hi, hi] - block[lo, hi] - block[hi, lo] + block[lo, lo]
+            return total / (inv_var_sum[hi] - inv_var_sum[lo]) ** 2
+        
+        var_left = cluster_variance(start, middle)
+        var_right = cluster_variance(middle, stop)
+        alpha = var_right / (var_left + var_right)  # Share of the left sub-cluster
+        
+        # A weight is the product of the factors of all splits above it; add the
+        # log factors over each sub-cluster's range with a difference array
+        log_weights = np.zeros(n + 1)
+        np.add.at(log_weights, start, np.log(alpha))
+        np.add.at(log_weights, middle, np.log1p(-alpha) - np.log(alpha))
+        np.add.at(log_weights, stop, -np.log1p(-alpha))
+        weights = np.empty(n)
+        weights[order] = np.exp(np.cumsum(log_weights[:n]))
         
         # Normalize weights to sum to 1
         weights = weights / np.sum(weights)
@@ -154,20 +253,6 @@ class HierarchicalRiskParityOptimizer(PortfolioOptimizer):
         
         return weights
     
-    def _compute_cluster_variance(self, cov: np.ndarray, cluster: List[int]) -> float:
-        """
-        Compute the variance of a cluster of assets.
-        
-        Args:
-            cov: Covariance matrix
-            cluster: List of asset indices in the cluster
-            
-        Returns:
-            Variance of the cluster
-        """
-        # Simple average variance of the cluster
-        return np.mean(np.diag(cov)[cluster])
-    
     def optimize(self) -> PortfolioWeights:
         """
         Optimize portfolio weights using Hierarchical Risk Parity.
@@ -182,7 +267,7 @@ class HierarchicalRiskParityOptimizer(PortfolioOptimizer):
         sort_order = self._compute_quasi_diagonal_order(self.linkage_matrix)
         
         # Compute HRP weights
-        weights = self._compute_hrp_weights(self.cov_matrix, sort_order)
+        weights = self._compute_hrp_weights(self.cov_matrix, sort_order, self.linkage_matrix)
         
         # Calculate portfolio metrics
         expected_return, volatility, sharpe_ratio = self.calculate_portfolio_metrics(weights)
@@ -202,7 +287,8 @@ def calculate_hrp_weights(
     risk_free_rate: float = 0.0,
     weight_bounds: Tuple[float, float] = (0, 1),
     linkage_method: str = 'single',
-    max_clusters: Optional[int] = None
+    max_clusters: Optional[int] = None,
+    bisection: str = 'tree'
 ) -> Dict:
     """
     Calculate portfolio weights using Hierarchical Risk Parity.
@@ -214,6 +300,7 @@ def calculate_hrp_weights(
         linkage_method: Linkage method for hierarchical clustering.
                       Options: 'single', 'complete', 'average', 'ward', etc.
         max_clusters: Maximum number of clusters to form (optional)
+        bisection: 'tree' (dendrogram children) or 'midpoint' recursive bisection
         
     Returns:
         Dictionary with portfolio weights and metrics
@@ -224,7 +311,8 @@ def calculate_hrp_weights(
         risk_free_rate=risk_free_rate,
         weight_bounds=weight_bounds,
         linkage_method=linkage_method,
-        max_clusters=max_clusters
+        max_clusters=max_clusters,
+        bisection=bisection
     )
     
     # Get the optimized portfolio
@@ -1,9 +1,16 @@
+import logging
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
-from typing import Dict, Optional, Tuple
+import scipy.sparse as sp
+from scipy.optimize import linprog, minimize, minimize_scalar
+from typing import Dict, List, Optional, Tuple, Union
 
-from .base import PortfolioOptimizer, PortfolioWeights
+from .base import LinearConstraint, PortfolioOptimizer, PortfolioWeights
+from .covariance import CovarianceLike
+from .qp_solvers import QPProblem, QPSolver
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
 
 class MeanVarianceOptimizer(PortfolioOptimizer):
     """
@@ -15,29 +22,47 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
     
     def __init__(
         self, 
-        returns: pd.DataFrame, 
+        returns: Union[pd.DataFrame, ReturnsUniverse], 
         risk_free_rate: float = 0.0,
         target_return: Optional[float] = None,
         target_volatility: Optional[float] = None,
         weight_bounds: Tuple[float, float] = (0, 1),
-        max_iterations: int = 1000
+        max_iterations: int = 1000,
+        analytic_gradients: bool = True,
+        linear_constraints: Optional[List[LinearConstraint]] = None,
+        solver: Union[str, QPSolver] = 'auto',
+        covariance: CovarianceLike = 'sample'
     ):
         """
         Initialize the Mean-Variance Optimizer.
         
         Args:
-            returns: DataFrame with asset returns (rows=time, columns=assets)
+            returns: DataFrame with asset returns (rows=time, columns=assets),
+                or a ReturnsUniverse
             risk_free_rate: Annual risk-free rate (default: 0.0)
             target_return: If provided, optimize for minimum variance with this target return
             target_volatility: If provided, optimize for maximum return with this target volatility
             weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
             max_iterations: Maximum number of iterations for the optimizer
+            analytic_gradients: Pass closed-form gradients to SLSQP instead of
+                letting it use finite differences (one objective call per asset)
+            linear_constraints: Additional linear constraints on the weights
+                (e.g. sector or group caps)
+            solver: QP backend ('auto', 'admm', 'slsqp' or a QPSolver instance).
+                The QP backends handle target return and max Sharpe; target
+                volatility is not a QP and always uses SLSQP.
+            covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel.
+                SLSQP works with a structured model in O(Nk) per evaluation; the
+                QP backends use the dense matrix.
         """
-        super().__init__(returns, risk_free_rate)
+        super().__init__(returns, risk_free_rate, solver=solver, covariance=covariance)
         self.target_return = target_return
         self.target_volatility = target_volatility
         self.weight_bounds = weight_bounds
         self.max_iterations = max_iterations
+        self.analytic_gradients = analytic_gradients
+        self.linear_constraints = linear_constraints or []
+        self.optimization_result = None  # OptimizeResult (SLSQP) or QPResult of the last optimize()
         
         # Validate that only one target is provided
         if target_return is not None and target_volatility is not None:
@@ -50,7 +75,7 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
     
     def _portfolio_volatility(self, weights: np.ndarray) -> float:
         """Calculate portfolio volatility for a given set of weights."""
-        return np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
+        return np.sqrt(max(self.covariance_model.quadratic_form(weights), 0.0))
     
     def _portfolio_return(self, weights: np.ndarray) -> float:
         """Calculate portfolio return for a given set of weights."""
@@ -60,6 +85,55 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
         """Constraint: weights must sum to 1."""
         return np.sum(weights) - 1.0
     
+    def _neg_sharpe_ratio_grad(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Gradient of ``_neg_sharpe_ratio`` with respect to the weights.
+        
+        Differentiates the annualized Sharpe ratio computed by
+        ``calculate_portfolio_metrics``, including its normalization of the
+        weights to sum to 1.
+        """
+        total = np.sum(weights)
+        w = weights / total
+        
+        cov_w = self.covariance_model.matvec(w)
+        port_return = self.expected_returns @ w
+        port_volatility = np.sqrt(w @ cov_w)
+        
+        return_annual = (1 + port_return) ** 252 - 1
+        volatility_annual = port_volatility * np.sqrt(252)
+        denominator = volatility_annual + 1e-8
+        
+        # Gradients of annualized return and volatility w.r.t. normalized weights
+        d_return = 252 * (1 + port_return) ** 251 * self.expected_returns
+        d_volatility = np.sqrt(252) * cov_w / port_volatility if port_volatility > 0 else np.zeros_like(w)
+        d_sharpe = (d_return * denominator - (return_annual - self.risk_free_rate) * d_volatility) / denominator**2
+        
+        # Chain rule through w = weights / sum(weights)
+        return -(d_sharpe - d_sharpe @ w) / total
+    
+    def _portfolio_volatility_grad(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of ``_portfolio_volatility`` with respect to the weights."""
+        cov_w = self.covariance_model.matvec(weights)
+        volatility = np.sqrt(weights @ cov_w)
+        if volatility <= 0:
+            return np.zeros_like(weights)
+        return cov_w / volatility
+    
+    def _portfolio_return_grad(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of ``_portfolio_return`` with respect to the weights."""
+        return self.expected_returns
+    
+    def _check_sum_constraint_grad(self, weights: np.ndarray) -> np.ndarray:
+        """Gradient of ``_check_sum_constraint`` with respect to the weights."""
+        return np.ones_like(weights)
+    
+    def _with_jac(self, spec: Dict, jac) -> Dict:
+        """Attach a gradient to a constraint spec when analytic gradients are enabled."""
+        if self.analytic_gradients:
+            spec['jac'] = jac
+        return spec
+    
     def optimize(self) -> PortfolioWeights:
         """
         Optimize portfolio weights using Mean-Variance Optimization.
@@ -67,25 +141,288 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
         Returns:
             PortfolioWeights object containing optimized weights and metrics
         """
-        # Initial guess (equal weights)
-        init_weights = np.array([1.0 / self.num_assets] * self.num_assets)
+        if self.qp_solver is not None and self.target_volatility is None:
+            try:
+                optimal_weights = self._optimize_qp()
+            except RuntimeError as e:
+                logger.warning(f"QP backend failed, falling back to SLSQP: {e}")
+                optimal_weights = self._optimize_slsqp()
+        else:
+            optimal_weights = self._optimize_slsqp()
+        
+        # Calculate portfolio metrics
+        expected_return, volatility, sharpe_ratio = self.calculate_portfolio_metrics(optimal_weights)
+        
+        # Create and return portfolio weights object
+        return PortfolioWeights(
+            weights=self.get_weights_dict(optimal_weights),
+            expected_return=expected_return,
+            volatility=volatility,
+            sharpe_ratio=sharpe_ratio,
+            risk_free_rate=self.risk_free_rate
+        )
+    
+    def _bounds_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Lower and upper weight bounds per asset (None becomes -inf / inf)."""
+        lower, upper = self.weight_bounds
+        return (
+            np.full(self.num_assets, -np.inf if lower is None else lower, dtype=float),
+            np.full(self.num_assets, np.inf if upper is None else upper, dtype=float)
+        )
+    
+    def _constraint_rows(self) -> Tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+        """Budget, weight bounds and linear constraints as QP rows l <= Aw <= u."""
+        n = self.num_assets
+        lower, upper = self._bounds_arrays()
+        linear = [
+            (self.constraint_vector(c), c.lower, c.upper) for c in self.linear_constraints
+        ]
+        A = sp.vstack(
+            [sp.csr_matrix(np.ones(n)), sp.identity(n)] + [sp.csr_matrix(a) for a, _, _ in linear]
+        )
+        l = np.concatenate([[1.0], lower, [lo for _, lo, _ in linear]])
+        u = np.concatenate([[1.0], upper, [hi for _, _, hi in linear]])
+        return sp.csr_matrix(A), l, u
+    
+    def _qp_data(self) -> Tuple[np.ndarray, np.ndarray, sp.csr_matrix, np.ndarray, np.ndarray]:
+        """
+        Data of the QP formulation: P, the return vector r and the rows l <= Ax <= u.
+        
+        The frontier portfolio for risk tolerance t is argmin ½x'Px - t·r'x
+        under the rows. Here x are the weights, P = 2Σ and r = μ; subclasses
+        may add variables (e.g. trade sizes) after the weights.
+        """
+        A, l, u = self._constraint_rows()
+        return 2 * self.cov_matrix, self.expected_returns, A, l, u
+    
+    def _qp_weights(self, x: np.ndarray) -> np.ndarray:
+        """Portfolio weights of a solution of the QP formulation."""
+        return x
+    
+    def _qp_start(self) -> Optional[np.ndarray]:
+        """Primal warm start for the first QP solve (None: the backend's default)."""
+        return self.initial_weights
+    
+    def _qp_start_duals(self, problem: QPProblem) -> Optional[np.ndarray]:
+        """Dual warm start for the first QP solve, which lets the backend polish the primal start's active set first."""
+        return None
+    
+    def _sharpe_search_start(self) -> Optional[float]:
+        """log(t) at which to start the max-Sharpe search (None: at the minimum variance end)."""
+        if self.initial_weights is None:
+            return None
+        return self._tangency_log_tolerance(self.initial_weights)
+    
+    def _tangency_log_tolerance(self, weights: np.ndarray) -> Optional[float]:
+        """
+        log of the risk tolerance at which ``weights`` would be the tangency portfolio.
+        
+        Weights that were max-Sharpe for nearby inputs (the previous holdings or
+        sweep point) sit close to t = 2 w'Σw / (μ'w - r_f), so the search can
+        start there instead of walking up the whole frontier.
+        """
+        daily_risk_free = (1 + self.risk_free_rate) ** (1 / 252) - 1
+        excess = self.expected_returns @ weights - daily_risk_free
+        variance = self.covariance_model.quadratic_form(weights)
+        if excess <= 0 or variance <= 0:
+            return None
+        return float(np.log(2 * variance / excess))
+    
+    def _target_return_problem(self, target_return: float) -> QPProblem:
+        """min w'Σw subject to r'x = target and the portfolio constraints."""
+        P, r, A, l, u = self._qp_data()
+        return QPProblem(
+            P,
+            np.zeros(len(r)),
+            sp.vstack([A, sp.csr_matrix(r)]),
+            np.append(l, target_return),
+            np.append(u, target_return)
+        )
+    
+    def _max_return_portfolio(self) -> np.ndarray:
+        """
+        Weights of the highest expected return portfolio under the portfolio constraints (an LP).
+        
+        Raises:
+            RuntimeError: If the constraints are infeasible
+        """
+        A, l, u = self._constraint_rows()
+        A = A.toarray()
+        n = self.num_assets
+        # linprog takes variable bounds separately and general rows as A_ub x <= b_ub
+        bounds = [
+            (None if np.isinf(lo) else lo, None if np.isinf(hi) else hi)
+            for lo, hi in zip(l[1:n + 1], u[1:n + 1])
+        ]
+        general, lower, upper = A[n + 1:], l[n + 1:], u[n + 1:]
+        has_upper, has_lower = np.isfinite(upper), np.isfinite(lower)
+        A_ub = np.vstack([general[has_upper], -general[has_lower]])
+        b_ub = np.concatenate([upper[has_upper], -lower[has_lower]])
+        
+        result = linprog(
+            -self.expected_returns,
+            A_ub=A_ub if len(b_ub) else None,
+            b_ub=b_ub if len(b_ub) else None,
+            A_eq=np.ones((1, n)),
+            b_eq=[1.0],
+            bounds=bounds,
+            method='highs'
+        )
+        if not result.success:
+            raise RuntimeError(f"Portfolio constraints are infeasible: {result.message}")
+        return result.x
+    
+    def _optimize_qp(self) -> np.ndarray:
+        """
+        Solve the target-return or max-Sharpe problem with the QP backend.
+        
+        Returns:
+            Optimal weights (summing to 1)
+        """
+        if self.target_return is not None:
+            problem = self._target_return_problem(self.target_return)
+            result = self.solve_qp(problem, x0=self._qp_start(), y0=self._qp_start_duals(problem))
+            self.optimization_result = result
+            weights = self._qp_weights(result.x)
+            return weights / np.sum(weights)
+        return self._max_sharpe_qp()
+    
+    def _max_sharpe_qp(self) -> np.ndarray:
+        """
+        Maximize the Sharpe ratio by a bounded search over risk aversion.
+        
+        Each risk tolerance t gives the frontier portfolio
+        argmin w'Σw - t·μ'w under the portfolio constraints. The objective is
+        the annualized Sharpe ratio that ``calculate_portfolio_metrics``
+        reports (and SLSQP maximizes); it rises with the return and falls with
+        the volatility, so its maximum lies on the frontier. It is bracketed by
+        a coarse walk over log(t) and then refined with Brent's method. Each step
+        warm-starts the QP from the previous one; adjacent steps share almost
+        all active constraints, so most are a single active-set solve without
+        ADMM iterations.
+        
+        Returns:
+            Optimal weights (summing to 1)
+        """
+        daily_risk_free = (1 + self.risk_free_rate) ** (1 / 252) - 1
+        P, r, A, l, u = self._qp_data()
+        max_return_x = self._max_return_portfolio()
+        if r @ max_return_x <= daily_risk_free:
+            raise RuntimeError("No feasible portfolio has a positive excess return")
+        
+        solutions = {}
+        
+        def neg_sharpe(log_tolerance: float) -> float:
+            problem = QPProblem(P, -np.exp(log_tolerance) * r, A, l, u)
+            # Warm-start from the closest tolerance solved so far
+            x0, y0 = self._qp_start(), self._qp_start_duals(problem)
+            if solutions:
+                nearest = solutions[min(solutions, key=lambda t: abs(t - log_tolerance))]
+                x0, y0 = nearest.x, nearest.y
+            result = self.solve_qp(problem, x0=x0, y0=y0)
+            solutions[log_tolerance] = result
+            weights = self._qp_weights(result.x)
+            volatility = np.sqrt(max(self.covariance_model.quadratic_form(weights), 0.0))
+            # Annualized as in calculate_portfolio_metrics, on the return of the formulation
+            annual_return = (1 + r @ result.x) ** 252 - 1
+            return -(annual_return - self.risk_free_rate) / (volatility * np.sqrt(252) + 1e-8)
+        
+        # Walk in small steps of log(t), so every solve is warm-started from a
+        # close neighbour, until the Sharpe ratio turns down; then refine inside
+        # the bracket. Without a better guess, walk up from (almost) the minimum
+        # variance portfolio.
+        step = 0.25
+        start = self._sharpe_search_start()
+        if start is None:
+            typical = np.log(np.mean(self.covariance_model.diagonal()) / np.max(np.abs(self.expected_returns)))
+            start, directions = typical - 8.0, (step,)
+        else:
+            directions = (step, -step)
+        values = {start: neg_sharpe(start)}
+        for direction in directions:
+            previous = start
+            for k in range(1, 65):
+                log_tolerance = start + k * direction
+                values[log_tolerance] = neg_sharpe(log_tolerance)
+                if values[log_tolerance] > values[previous]:
+                    break
+                previous = log_tolerance
+        log_tolerances = sorted(values)
+        peak = int(np.argmin([values[t] for t in log_tolerances]))
+        search = minimize_scalar(
+            neg_sharpe,
+            bounds=(log_tolerances[max(peak - 1, 0)], log_tolerances[min(peak + 1, len(log_tolerances) - 1)]),
+            method='bounded',
+            options={'xatol': 1e-4}
+        )
+        if search.fun > values[log_tolerances[peak]]:
+            search.x = log_tolerances[peak]
+        # The bounded search returns its best evaluated point
+        result = solutions[search.x]
+        result.info['sharpe_search_evaluations'] = len(solutions)
+        self.optimization_result = result
+        weights = self._qp_weights(result.x)
+        return weights / np.sum(weights)
+    
+    def _linear_constraint_specs(self) -> List[Dict]:
+        """SLSQP constraint specs for the additional linear constraints."""
+        specs = []
+        for constraint in self.linear_constraints:
+            a = self.constraint_vector(constraint)
+            if constraint.lower == constraint.upper:
+                specs.append(self._with_jac(
+                    {'type': 'eq', 'fun': lambda w, a=a, b=constraint.lower: a @ w - b},
+                    lambda w, a=a: a
+                ))
+                continue
+            if np.isfinite(constraint.lower):
+                specs.append(self._with_jac(
+                    {'type': 'ineq', 'fun': lambda w, a=a, b=constraint.lower: a @ w - b},
+                    lambda w, a=a: a
+                ))
+            if np.isfinite(constraint.upper):
+                specs.append(self._with_jac(
+                    {'type': 'ineq', 'fun': lambda w, a=a, b=constraint.upper: b - a @ w},
+                    lambda w, a=a: -a
+                ))
+        return specs
+    
+    def _optimize_slsqp(self) -> np.ndarray:
+        """
+        Optimize with SLSQP directly on the (nonlinear) objective.
+        
+        Returns:
+            Optimal weights (summing to 1)
+        """
+        # Initial guess (the warm start, else equal weights)
+        if self.initial_weights is not None:
+            init_weights = self.initial_weights
+        else:
+            init_weights = np.array([1.0 / self.num_assets] * self.num_assets)
         
         # Define constraints
         constraints = [
-            {'type': 'eq', 'fun': self._check_sum_constraint}
+            self._with_jac(
+                {'type': 'eq', 'fun': self._check_sum_constraint},
+                self._check_sum_constraint_grad
+            )
         ]
         
         # Add target return constraint if specified
         if self.target_return is not None:
-            constraints.append(
-                {'type': 'eq', 'fun': lambda w: self._portfolio_return(w) - self.target_return}
-            )
+            constraints.append(self._with_jac(
+                {'type': 'eq', 'fun': lambda w: self._portfolio_return(w) - self.target_return},
+                self._portfolio_return_grad
+            ))
         
         # Add target volatility constraint if specified
         if self.target_volatility is not None:
-            constraints.append(
-                {'type': 'eq', 'fun': lambda w: self._portfolio_volatility(w) - self.target_volatility}
-            )
+            constraints.append(self._with_jac(
+                {'type': 'eq', 'fun': lambda w: self._portfolio_volatility(w) - self.target_volatility},
+                self._portfolio_volatility_grad
+            ))
+        
+        constraints.extend(self._linear_constraint_specs())
         
         # Define bounds for weights (default: no short selling)
         bounds = tuple(self.weight_bounds for _ in range(self.num_assets))
@@ -97,6 +434,7 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
                 self._portfolio_volatility,
                 init_weights,
                 method='SLSQP',
+                jac=self._portfolio_volatility_grad if self.analytic_gradients else None,
                 bounds=bounds,
                 constraints=constraints,
                 options={'maxiter': self.max_iterations}
@@ -107,6 +445,7 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
                 lambda w: -self._portfolio_return(w),
                 init_weights,
                 method='SLSQP',
+                jac=(lambda w: -self._portfolio_return_grad(w)) if self.analytic_gradients else None,
                 bounds=bounds,
                 constraints=constraints,
                 options={'maxiter': self.max_iterations}
@@ -117,35 +456,28 @@ class MeanVarianceOptimizer(PortfolioOptimizer):
                 self._neg_sharpe_ratio,
                 init_weights,
                 method='SLSQP',
+                jac=self._neg_sharpe_ratio_grad if self.analytic_gradients else None,
                 bounds=bounds,
                 constraints=constraints,
                 options={'maxiter': self.max_iterations}
             )
         
+        self.optimization_result = result
+        
         if not result.success:
             raise RuntimeError(f"Portfolio optimization failed: {result.message}")
         
-        # Get optimized weights
-        optimal_weights = result.x / np.sum(result.x)  # Ensure weights sum to 1
-        
-        # Calculate portfolio metrics
-        expected_return, volatility, sharpe_ratio = self.calculate_portfolio_metrics(optimal_weights)
-        
-        # Create and return portfolio weights object
-        return PortfolioWeights(
-            weights=self.get_weights_dict(optimal_weights),
-            expected_return=expected_return,
-            volatility=volatility,
-            sharpe_ratio=sharpe_ratio,
-            risk_free_rate=self.risk_free_rate
-        )
+        # Ensure weights sum to 1
+        return result.x / np.sum(result.x)
 
 
 def calculate_efficient_frontier(
     returns: pd.DataFrame,
     risk_free_rate: float = 0.0,
     num_points: int = 20,
-    weight_bounds: Tuple[float, float] = (0, 1)
+    weight_bounds: Tuple[float, float] = (0, 1),
+    method: str = 'warm_start',
+    covariance: CovarianceLike = 'sample'
 ) -> Dict[str, Dict]:
     """
     Calculate the efficient frontier for a set of assets.
@@ -155,82 +487,18 @@ def calculate_efficient_frontier(
         risk_free_rate: Annual risk-free rate (default: 0.0)
         num_points: Number of points to calculate on the efficient frontier
         weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
+        method: 'warm_start' (warm-started SLSQP walk) or 'cla' (Critical Line Algorithm)
+        covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
         
     Returns:
         Dictionary with efficient frontier data points
     """
-    # Calculate minimum variance portfolio
-    min_vol_port = MeanVarianceOptimizer(
-        returns=returns,
-        risk_free_rate=risk_free_rate,
-        weight_bounds=weight_bounds
-    ).optimize()
+    from .efficient_frontier import EfficientFrontier
     
-    # Calculate maximum return portfolio
-    max_ret_port = MeanVarianceOptimizer(
+    return EfficientFrontier(
         returns=returns,
         risk_free_rate=risk_free_rate,
-        weight_bounds=weight_bounds
-    )
-    max_ret_port.target_return = max_ret_port.expected_returns.max()
-    max_ret_port = max_ret_port.optimize()
-    
-    # Generate target returns between min and max
-    target_returns = np.linspace(
-        min_vol_port.expected_return,
-        max_ret_port.expected_return,
-        num_points
-    )
-    
-    # Calculate efficient frontier points
-    frontier_points = []
-    for target_ret in target_returns:
-        try:
-            mvo = MeanVarianceOptimizer(
-                returns=returns,
-                risk_free_rate=risk_free_rate,
-                target_return=target_ret,
-                weight_bounds=weight_bounds
-            )
-            port = mvo.optimize()
-            frontier_points.append({
-                'expected_return': port.expected_return,
-                'volatility': port.volatility,
-                'sharpe_ratio': port.sharpe_ratio,
-                'weights': port.weights
-            })
-        except Exception as e:
-            print(f"Skipping target return {target_ret}: {str(e)}")
-    
-    # Add the maximum return portfolio if not already included
-    if not any(p['expected_return'] == max_ret_port.expected_return for p in frontier_points):
-        frontier_points.append({
-            'expected_return': max_ret_port.expected_return,
-            'volatility': max_ret_port.volatility,
-            'sharpe_ratio': max_ret_port.sharpe_ratio,
-            'weights': max_ret_port.weights
-        })
-    
-    # Sort by volatility
-    frontier_points.sort(key=lambda x: x['volatility'])
-    
-    # Find the tangency portfolio (maximum Sharpe ratio)
-    tangency_port = max(frontier_points, key=lambda x: x['sharpe_ratio'])
-    
-    return {
-        'frontier': frontier_points,
-        'min_volatility': {
-            'expected_return': min_vol_port.expected_return,
-            'volatility': min_vol_port.volatility,
-            'sharpe_ratio': min_vol_port.sharpe_ratio,
-            'weights': min_vol_port.weights
-        },
-        'max_return': {
-            'expected_return': max_ret_port.expected_return,
-            'volatility': max_ret_port.volatility,
-            'sharpe_ratio': max_ret_port.sharpe_ratio,
-            'weights': max_ret_port.weights
-        },
-        'tangency': tangency_port,
-        'risk_free_rate': risk_free_rate
-    }
+        weight_bounds=weight_bounds,
+        method=method,
+        covariance=covariance
+    ).calculate(num_points)
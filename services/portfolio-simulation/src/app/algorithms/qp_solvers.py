@@ -0,0 +1,639 @@
+import logging
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from scipy.optimize import linprog, minimize
+from typing import Dict, Optional, Type, Union
+
+logger = logging.getLogger(__name__)
+
+Matrix = Union[np.ndarray, sp.spmatrix]
+
+# Universe size from which solver='auto' uses the ADMM backend instead of SLSQP
+AUTO_QP_MIN_ASSETS = 250
+
+
+@dataclass
+class QPProblem:
+    """
+    Convex quadratic program in the form
+
+        minimize    1/2 x'Px + q'x
+        subject to  l <= Ax <= u
+
+    Equality rows have l == u; one-sided rows use -inf / +inf. Variable
+    bounds are ordinary rows of A (identity rows), so long-only, box and
+    general linear constraints all share one representation.
+    """
+    P: np.ndarray
+    q: np.ndarray
+    A: Matrix
+    l: np.ndarray
+    u: np.ndarray
+
+    def __post_init__(self):
+        self.P = np.asarray(self.P, dtype=float)
+        self.q = np.asarray(self.q, dtype=float)
+        self.A = sp.csr_matrix(self.A, dtype=float)
+        self.A.eliminate_zeros()
+        self.l = np.asarray(self.l, dtype=float)
+        self.u = np.asarray(self.u, dtype=float)
+        n = len(self.q)
+        m = self.A.shape[0]
+        if self.P.shape != (n, n) or self.A.shape[1] != n:
+            raise ValueError("QP dimensions do not match: P must be n x n and A must be m x n")
+        if self.l.shape != (m,) or self.u.shape != (m,):
+            raise ValueError("QP constraint bounds must have one entry per row of A")
+        if np.any(self.l > self.u):
+            raise ValueError("QP constraint bounds are infeasible: l > u")
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.q)
+
+    @property
+    def num_constraints(self) -> int:
+        return self.A.shape[0]
+
+    def objective(self, x: np.ndarray) -> float:
+        return float(0.5 * x @ self.P @ x + self.q @ x)
+
+    def max_violation(self, x: np.ndarray) -> float:
+        """Largest constraint violation of ``x`` (0 when feasible)."""
+        if self.num_constraints == 0:
+            return 0.0
+        Ax = self.A @ x
+        return float(max(np.max(self.l - Ax), np.max(Ax - self.u), 0.0))
+
+
+@dataclass
+class QPResult:
+    """Solution of a QPProblem."""
+    x: np.ndarray
+    success: bool
+    status: str
+    iterations: int
+    objective: float
+    solver: str
+    y: Optional[np.ndarray] = None  # Constraint multipliers (if the solver provides them)
+    info: Dict = field(default_factory=dict)
+
+
+class QPSolver(ABC):
+    """Abstract base class for QP solver backends."""
+
+    name: str = ''
+
+    @abstractmethod
+    def solve(
+        self,
+        problem: QPProblem,
+        x0: Optional[np.ndarray] = None,
+        y0: Optional[np.ndarray] = None
+    ) -> QPResult:
+        """
+        Solve a QP.
+
+        Args:
+            problem: Problem to solve
+            x0: Optional primal warm start
+            y0: Optional dual warm start (ignored by solvers that do not use it)
+
+        Returns:
+            QPResult with the solution and solver status
+        """
+        pass
+
+
+class ADMMSolver(QPSolver):
+    """
+    Operator-splitting (ADMM) QP solver following OSQP (Stellato et al., 2020).
+
+    Each iteration costs a couple of matrix-vector products and one solve with
+    a cached Cholesky factor of P + σI + A'diag(ρ)A, so the per-iteration cost
+    is O(n²) instead of the O(n³) dense QP subproblems SLSQP solves. The data
+    are Ruiz-equilibrated first, and ρ is adapted to balance the primal and
+    dual residuals. A new ρ needs a new O(n³) factorization, so ρ moves on a
+    grid of powers of ``adaptive_rho_tolerance`` (a ρ seen before reuses its
+    factor) and changes at most ``max_rho_updates`` times per solve.
+    """
+
+    name = 'admm'
+
+    def __init__(
+        self,
+        eps_abs: float = 1e-4,
+        eps_rel: float = 1e-4,
+        max_iter: int = 20000,
+        rho: float = 0.1,
+        sigma: float = 1e-6,
+        alpha: float = 1.6,
+        scaling_iterations: int = 10,
+        adaptive_rho_interval: int = 25,
+        adaptive_rho_tolerance: float = 2.0,
+        max_rho_updates: int = 10,
+        check_interval: int = 5,
+        polish: bool = True,
+        polish_interval: int = 50,
+        polish_refinements: int = 10,
+        min_eps_ratio: float = 1e-4
+    ):
+        """
+        Initialize the ADMM solver.
+
+        Args:
+            eps_abs: Absolute tolerance on the primal and dual residuals
+            eps_rel: Relative tolerance on the primal and dual residuals
+            max_iter: Maximum number of ADMM iterations
+            rho: Initial ADMM step size
+            sigma: Regularization on the primal variable (keeps the KKT system definite)
+            alpha: Over-relaxation parameter in (0, 2)
+            scaling_iterations: Number of Ruiz equilibration passes (0 disables scaling)
+            adaptive_rho_interval: Iterations between step size updates (0 disables them)
+            adaptive_rho_tolerance: Only change ρ when it is off by more than this factor
+                (also the spacing of the grid ρ is rounded to)
+            max_rho_updates: Maximum ρ changes per solve, which bounds the refactorizations
+            check_interval: Iterations between convergence checks
+            polish: Refine the solution with an active-set method (see ``_polish``)
+            polish_interval: Iterations between polishing attempts before convergence (0 disables them)
+            polish_refinements: Maximum active-set corrections per polishing attempt
+            min_eps_ratio: When polishing fails, tolerances are tightened tenfold and
+                iteration continues, down to this fraction of eps_abs / eps_rel
+        """
+        self.eps_abs = eps_abs
+        self.eps_rel = eps_rel
+        self.max_iter = max_iter
+        self.rho = rho
+        self.sigma = sigma
+        self.alpha = alpha
+        self.scaling_iterations = scaling_iterations
+        self.adaptive_rho_interval = adaptive_rho_interval
+        self.adaptive_rho_tolerance = adaptive_rho_tolerance
+        self.max_rho_updates = max_rho_updates
+        self.check_interval = check_interval
+        self.polish = polish
+        self.polish_interval = polish_interval
+        self.polish_refinements = polish_refinements
+        self.min_eps_ratio = min_eps_ratio
+
+    def _scale(self, problem: QPProblem):
+        """Ruiz equilibration of the KKT matrix [[P, A'], [A, 0]] plus cost scaling."""
+        P, q, A = problem.P.copy(), problem.q.copy(), problem.A.copy()
+        n, m = problem.num_variables, problem.num_constraints
+        D = np.ones(n)
+        E = np.ones(m)
+        c = 1.0
+
+        for _ in range(self.scaling_iterations):
+            col_norms = np.abs(P).max(axis=0)
+            if m:
+                col_norms = np.maximum(col_norms, abs(A).max(axis=0).toarray().ravel())
+                row_norms = abs(A).max(axis=1).toarray().ravel()
+            else:
+                row_norms = np.ones(0)
+            d = 1.0 / np.sqrt(np.clip(col_norms, 1e-4, 1e4))
+            e = 1.0 / np.sqrt(np.clip(row_norms, 1e-4, 1e4))
+
+            P = d[:, None] * P * d[None, :]
+            q = d * q
+            A = sp.diags(e) @ A @ sp.diags(d)
+            D *= d
+            E *= e
+
+            # Cost scaling keeps the objective O(1)
+            gamma = 1.0 / np.clip(max(np.abs(P).max(axis=0).mean(), np.abs(q).max(initial=0.0)), 1e-4, 1e4)
+            P *= gamma
+            q *= gamma
+            c *= gamma
+
+        l = np.where(np.isfinite(problem.l), E * problem.l, problem.l)
+        u = np.where(np.isfinite(problem.u), E * problem.u, problem.u)
+        return P, q, sp.csr_matrix(A), l, u, D, E, c
+
+    def _rho_vector(self, rho: float, l: np.ndarray, u: np.ndarray) -> np.ndarray:
+        # Equality rows get a much larger step, loose rows a tiny one (as in OSQP)
+        rho_vec = np.full(len(l), rho)
+        rho_vec[np.isinf(l) & np.isinf(u)] = 1e-6
+        rho_vec[np.abs(u - l) < 1e-9] = 1e3 * rho
+        return rho_vec
+
+    def _snap_rho(self, rho: float) -> float:
+        """Round ρ to the initial ρ times a power of the tolerance factor, so revisits hit the factor cache."""
+        ratio = self.adaptive_rho_tolerance
+        if ratio <= 1:
+            return rho
+        return self.rho * ratio ** round(np.log(rho / self.rho) / np.log(ratio))
+
+    def _factor(self, P: np.ndarray, A: sp.csr_matrix, rho_vec: np.ndarray):
+        K = P + self.sigma * np.eye(P.shape[0])
+        if A.shape[0]:
+            K = K + (A.T @ sp.diags(rho_vec) @ A).toarray()
+        return scipy.linalg.cho_factor(K, check_finite=False)
+
+    def solve(
+        self,
+        problem: QPProblem,
+        x0: Optional[np.ndarray] = None,
+        y0: Optional[np.ndarray] = None
+    ) -> QPResult:
+        # A warm start from a neighbouring problem usually has the right active
+        # set already, in which case no ADMM iterations are needed at all
+        if self.polish and x0 is not None and y0 is not None:
+            polished_x, polished_y = self._polish(problem, np.asarray(x0, dtype=float), np.asarray(y0, dtype=float))
+            if polished_x is not None:
+                return QPResult(
+                    x=polished_x,
+                    success=True,
+                    status='solved',
+                    iterations=0,
+                    objective=problem.objective(polished_x),
+                    solver=self.name,
+                    y=polished_y,
+                    info={'factorizations': 0, 'polished': True}
+                )
+
+        P, q, A, l, u, D, E, c = self._scale(problem)
+        n, m = problem.num_variables, problem.num_constraints
+
+        x = np.zeros(n) if x0 is None else np.asarray(x0, dtype=float) / D
+        y = np.zeros(m) if y0 is None else c * np.asarray(y0, dtype=float) / E
+        z = np.clip(A @ x, l, u)
+
+        rho = self.rho
+        rho_vec = self._rho_vector(rho, l, u)
+        factor = self._factor(P, A, rho_vec)
+        factors = {rho: factor}
+        factorizations = 1
+        rho_updates = 0
+        status = 'max_iter_reached'
+        iteration = 0
+        eps_abs, eps_rel = self.eps_abs, self.eps_rel
+        polished_x = polished_y = None
+
+        for iteration in range(1, self.max_iter + 1):
+            x_tilde = scipy.linalg.cho_solve(
+                factor, self.sigma * x - q + A.T @ (rho_vec * z - y), check_finite=False
+            )
+            z_tilde = A @ x_tilde
+
+            x = self.alpha * x_tilde + (1 - self.alpha) * x
+            z_relaxed = self.alpha * z_tilde + (1 - self.alpha) * z
+            z = np.clip(z_relaxed + y / rho_vec, l, u)
+            y_previous = y
+            y = y + rho_vec * (z_relaxed - z)
+
+            check = iteration % self.check_interval == 0
+            adapt = self.adaptive_rho_interval and iteration % self.adaptive_rho_interval == 0
+            if not (check or adapt):
+                continue
+
+            # Residuals are measured in the unscaled problem
+            Ax, Px, Aty = A @ x, P @ x, A.T @ y
+            prim_res = np.max(np.abs((Ax - z) / E), initial=0.0)
+            dual_res = np.max(np.abs((Px + q + Aty) / D), initial=0.0) / c
+            prim_norm = max(np.max(np.abs(Ax / E), initial=0.0), np.max(np.abs(z / E), initial=0.0))
+            dual_norm = max(
+                np.max(np.abs(Px / D)), np.max(np.abs(Aty / D), initial=0.0), np.max(np.abs(q / D))
+            ) / c
+
+            if self._primal_infeasible((y - y_previous) * E / c, A.T @ (y - y_previous) / (D * c), problem):
+                status = 'primal_infeasible'
+                break
+
+            converged = (
+                prim_res <= eps_abs + eps_rel * prim_norm
+                and dual_res <= eps_abs + eps_rel * dual_norm
+            )
+            # A polished point is a verified KKT point, so it is worth trying
+            # before convergence too: the active set often settles early
+            if self.polish and (converged or (self.polish_interval and iteration % self.polish_interval == 0)):
+                polished_x, polished_y = self._polish(problem, D * x, E * y / c)
+                if polished_x is not None:
+                    status = 'solved'
+                    break
+            if converged:
+                if not self.polish or eps_abs <= self.eps_abs * self.min_eps_ratio:
+                    status = 'solved'
+                    break
+                # The active set is not settled yet: keep iterating to a tighter tolerance
+                eps_abs, eps_rel = eps_abs / 10, eps_rel / 10
+
+            if adapt and rho_updates < self.max_rho_updates:
+                new_rho = rho * np.sqrt(
+                    (prim_res / (prim_norm + 1e-10)) / (dual_res / (dual_norm + 1e-10) + 1e-10)
+                )
+                new_rho = float(np.clip(new_rho, 1e-6, 1e6))
+                if new_rho > rho * self.adaptive_rho_tolerance or new_rho < rho / self.adaptive_rho_tolerance:
+                    rho = self._snap_rho(new_rho)
+                    rho_vec = self._rho_vector(rho, l, u)
+                    if rho not in factors:
+                        factors[rho] = self._factor(P, A, rho_vec)
+                        factorizations += 1
+                    factor = factors[rho]
+                    rho_updates += 1
+
+        polished = polished_x is not None
+        if polished:
+            x_out, y_out = polished_x, polished_y
+        else:
+            x_out, y_out = D * x, E * y / c
+
+        return QPResult(
+            x=x_out,
+            success=status == 'solved',
+            status=status,
+            iterations=iteration,
+            objective=problem.objective(x_out),
+            solver=self.name,
+            y=y_out,
+            info={'rho': rho, 'factorizations': factorizations, 'rho_updates': rho_updates, 'polished': polished}
+        )
+
+    def _primal_infeasible(self, delta_y: np.ndarray, At_delta_y: np.ndarray, problem: QPProblem) -> bool:
+        """
+        Check the ADMM dual step for a certificate of primal infeasibility.
+
+        The dual iterates diverge along a direction δy with A'δy = 0 and
+        u'max(δy, 0) + l'min(δy, 0) < 0 when no x satisfies l <= Ax <= u.
+        """
+        norm = np.max(np.abs(delta_y), initial=0.0)
+        if norm <= 1e-12:
+            return False
+        eps = self.eps_abs * norm
+        positive, negative = delta_y > eps, delta_y < -eps
+        # Infinite bounds cannot be part of a certificate
+        if np.any(positive & np.isinf(problem.u)) or np.any(negative & np.isinf(problem.l)):
+            return False
+        support = (
+            problem.u[positive] @ delta_y[positive] + problem.l[negative] @ delta_y[negative]
+        )
+        return bool(np.max(np.abs(At_delta_y), initial=0.0) <= eps and support < -eps)
+
+    def _polish(self, problem: QPProblem, x: np.ndarray, y: np.ndarray):
+        """
+        Refine the ADMM iterate into an exact solution with a primal-dual active-set method.
+
+        ADMM converges to modest accuracy but usually identifies early which
+        constraints bind. Starting from that guess, each step solves the
+        equality-constrained QP on the active constraints, then adds the rows
+        it violates and drops the rows whose multiplier has the wrong sign
+        (Hintermüller, Ito & Kunisch, 2002). A point that passes both checks
+        and is stationary satisfies the KKT conditions, so it is the exact optimum.
+
+        Returns:
+            Tuple of (x, y), or (None, None) if no KKT point was reached
+        """
+        A, l, u = problem.A, problem.l, problem.u
+        equality = l == u
+        Ax = A @ x
+        tol = 1e-5
+        scale = np.maximum(1.0, np.abs(Ax))
+        lower_active = (Ax - l <= tol * scale) | (y < -tol)
+        upper_active = (u - Ax <= tol * scale) | (y > tol)
+
+        for _ in range(self.polish_refinements + 1):
+            lower_active &= np.isfinite(l)
+            upper_active &= np.isfinite(u)
+            lower_active[equality] = upper_active[equality] = True
+            x_polished, y_polished = self._solve_active_set(problem, lower_active, upper_active)
+
+            Ax = A @ x_polished
+            violated_lower = Ax - l < -1e-9 * np.maximum(1.0, np.abs(l))
+            violated_upper = Ax - u > 1e-9 * np.maximum(1.0, np.abs(u))
+            sign_tol = 1e-9 * max(1.0, np.abs(y_polished).max(initial=0.0))
+            wrong_sign = ~equality & (
+                (upper_active & (y_polished < -sign_tol)) | (lower_active & (y_polished > sign_tol))
+            )
+            if not (violated_lower.any() or violated_upper.any() or wrong_sign.any()):
+                if not self._stationary(problem, x_polished, y_polished):
+                    # Singular reduced system (e.g. an LP with too few active rows)
+                    return None, None
+                return x_polished, y_polished
+
+            drop = wrong_sign
+            if np.count_nonzero(lower_active | upper_active) >= problem.num_variables:
+                # At a degenerate vertex dropping every wrong-signed row at once makes
+                # the iteration erratic, so only the worst quarter of them is dropped
+                worst = np.argsort(-np.abs(np.where(wrong_sign, y_polished, 0.0)))
+                drop = np.zeros_like(wrong_sign)
+                worst = worst[:max(1, int(wrong_sign.sum()) // 4)]
+                drop[worst] = wrong_sign[worst]
+            new_upper = (upper_active & ~drop) | violated_upper
+            new_lower = (lower_active & ~drop) | violated_lower
+            if np.array_equal(new_upper, upper_active) and np.array_equal(new_lower, lower_active):
+                break
+            upper_active, lower_active = new_upper, new_lower
+        return None, None
+
+    @staticmethod
+    def _stationary(problem: QPProblem, x: np.ndarray, y: np.ndarray) -> bool:
+        """Whether Px + q + A'y = 0 holds to working precision."""
+        Px, Aty = problem.P @ x, problem.A.T @ y
+        residual = np.max(np.abs(Px + problem.q + Aty))
+        norm = max(np.max(np.abs(Px)), np.max(np.abs(Aty), initial=0.0), np.max(np.abs(problem.q)))
+        return bool(residual <= 1e-9 * max(norm, 1e-12))
+
+    @staticmethod
+    def _solve_active_set(problem: QPProblem, lower_active: np.ndarray, upper_active: np.ndarray):
+        """
+        Solve the QP with the active rows as equalities and all other rows dropped.
+
+        Active single-variable rows (bounds) fix their variable, so the linear
+        system only spans the free variables and the active general rows.
+        """
+        A = problem.A
+        n = problem.num_variables
+        active = lower_active | upper_active
+        targets = np.where(upper_active, problem.u, problem.l)
+
+        single = A.getnnz(axis=1) == 1
+        fixed_rows = np.flatnonzero(active & single)
+        fixed_cols = A[fixed_rows].indices
+        fixed_coefs = A[fixed_rows].data
+        fixed_cols, first = np.unique(fixed_cols, return_index=True)
+        fixed_rows, fixed_coefs = fixed_rows[first], fixed_coefs[first]
+
+        x = np.zeros(n)
+        x[fixed_cols] = targets[fixed_rows] / fixed_coefs
+        free = np.setdiff1d(np.arange(n), fixed_cols)
+        general = np.flatnonzero(active & ~single)
+        G = A[general].toarray()
+
+        f, k = len(free), len(general)
+        kkt = np.zeros((f + k, f + k))
+        kkt[:f, :f] = problem.P[np.ix_(free, free)]
+        kkt[:f, f:] = G[:, free].T
+        kkt[f:, :f] = G[:, free]
+        rhs = np.concatenate([
+            -problem.q[free] - problem.P[np.ix_(free, fixed_cols)] @ x[fixed_cols],
+            targets[general] - G[:, fixed_cols] @ x[fixed_cols]
+        ])
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        x[free] = solution[:f]
+        y_general = solution[f:]
+
+        gradient = problem.P @ x + problem.q
+        if k > f:
+            # Degenerate vertex: more active rows than free variables, so the
+            # multipliers are not unique. Pick ones with the right signs, if any.
+            y_general = ADMMSolver._degenerate_multipliers(
+                gradient, G, free, fixed_cols, fixed_coefs,
+                upper_active[fixed_rows], problem.l[fixed_rows] == problem.u[fixed_rows],
+                upper_active[general], problem.l[general] == problem.u[general],
+                y_general
+            )
+
+        # Bound multipliers follow from stationarity: Px + q + A'y = 0
+        y = np.zeros(problem.num_constraints)
+        y[general] = y_general
+        residual = gradient + G.T @ y_general
+        y[fixed_rows] = -residual[fixed_cols] / fixed_coefs
+        return x, y
+
+    @staticmethod
+    def _degenerate_multipliers(
+        gradient: np.ndarray,
+        G: np.ndarray,
+        free: np.ndarray,
+        fixed_cols: np.ndarray,
+        fixed_coefs: np.ndarray,
+        fixed_upper: np.ndarray,
+        fixed_equality: np.ndarray,
+        general_upper: np.ndarray,
+        general_equality: np.ndarray,
+        fallback: np.ndarray
+    ) -> np.ndarray:
+        """
+        Multipliers of the active general rows at a degenerate vertex (a small LP).
+
+        Finds y_G with stationarity on the free variables and with every bound
+        multiplier -(g + G'y_G)_j / a_j on the sign side of its active bound.
+        Returns ``fallback`` when no such multipliers exist.
+        """
+        # Sign of each fixed row's multiplier: +1 at an upper bound, -1 at a lower bound
+        side = np.where(fixed_upper, 1.0, -1.0) / fixed_coefs
+        inequality = ~fixed_equality
+        # side·y_j >= 0  <=>  side·(G'y_G)_j <= -side·g_j
+        A_ub = (side[:, None] * G[:, fixed_cols].T)[inequality]
+        b_ub = (-side * gradient[fixed_cols])[inequality]
+        bounds = [
+            (None, None) if equality else ((0, None) if upper else (None, 0))
+            for upper, equality in zip(general_upper, general_equality)
+        ]
+        result = linprog(
+            np.zeros(G.shape[0]),
+            A_ub=A_ub if len(b_ub) else None,
+            b_ub=b_ub if len(b_ub) else None,
+            A_eq=G[:, free].T if len(free) else None,
+            b_eq=-gradient[free] if len(free) else None,
+            bounds=bounds,
+            method='highs'
+        )
+        return result.x if result.success else fallback
+
+
+class SLSQPSolver(QPSolver):
+    """QP backend on scipy's SLSQP. Dense and O(n³) per iteration; used as the fallback."""
+
+    name = 'slsqp'
+
+    def __init__(self, max_iter: int = 1000, ftol: float = 1e-12):
+        """
+        Initialize the SLSQP solver.
+
+        Args:
+            max_iter: Maximum number of SLSQP iterations
+            ftol: Precision goal for the objective value
+        """
+        self.max_iter = max_iter
+        self.ftol = ftol
+
+    def solve(
+        self,
+        problem: QPProblem,
+        x0: Optional[np.ndarray] = None,
+        y0: Optional[np.ndarray] = None
+    ) -> QPResult:
+        n = problem.num_variables
+        A = problem.A.toarray()
+        l, u = problem.l, problem.u
+
+        # Rows of A with a single unit entry become variable bounds
+        lower = np.full(n, -np.inf)
+        upper = np.full(n, np.inf)
+        general = []
+        for i in range(problem.num_constraints):
+            nonzero = np.flatnonzero(A[i])
+            if len(nonzero) == 1 and A[i, nonzero[0]] == 1.0 and l[i] < u[i]:
+                j = nonzero[0]
+                lower[j] = max(lower[j], l[i])
+                upper[j] = min(upper[j], u[i])
+            else:
+                general.append(i)
+
+        constraints = []
+        for i in general:
+            a = A[i]
+            if l[i] == u[i]:
+                constraints.append({'type': 'eq', 'fun': lambda x, a=a, b=l[i]: a @ x - b, 'jac': lambda x, a=a: a})
+                continue
+            if np.isfinite(l[i]):
+                constraints.append({'type': 'ineq', 'fun': lambda x, a=a, b=l[i]: a @ x - b, 'jac': lambda x, a=a: a})
+            if np.isfinite(u[i]):
+                constraints.append({'type': 'ineq', 'fun': lambda x, a=a, b=u[i]: b - a @ x, 'jac': lambda x, a=-a: a})
+
+        bounds = [
+            (None if np.isinf(lo) else lo, None if np.isinf(hi) else hi)
+            for lo, hi in zip(lower, upper)
+        ]
+        if x0 is None:
+            x0 = np.clip(np.zeros(n), np.where(np.isinf(lower), 0.0, lower), np.where(np.isinf(upper), 0.0, upper))
+
+        # Scale the objective to O(1) so SLSQP's ftol is meaningful
+        scale = 1.0 / max(np.abs(np.diag(problem.P)).mean(), np.abs(problem.q).max(initial=0.0), 1e-12)
+        P, q = scale * problem.P, scale * problem.q
+        result = minimize(
+            lambda x: 0.5 * x @ P @ x + q @ x,
+            x0,
+            jac=lambda x: P @ x + q,
+            method='SLSQP',
+            bounds=bounds,
+            constraints=constraints,
+            options={'maxiter': self.max_iter, 'ftol': self.ftol}
+        )
+        return QPResult(
+            x=result.x,
+            success=bool(result.success),
+            status=result.message,
+            iterations=int(result.nit),
+            objective=problem.objective(result.x),
+            solver=self.name
+        )
+
+
+QP_SOLVERS: Dict[str, Type[QPSolver]] = {
+    ADMMSolver.name: ADMMSolver,
+    SLSQPSolver.name: SLSQPSolver,
+}
+
+
+def get_qp_solver(solver: Union[str, QPSolver]) -> QPSolver:
+    """
+    Resolve a QP solver backend.
+
+    Args:
+        solver: Backend name (see ``QP_SOLVERS``) or a QPSolver instance
+
+    Returns:
+        QPSolver instance
+    """
+    if isinstance(solver, QPSolver):
+        return solver
+    if solver not in QP_SOLVERS:
+        raise ValueError(f"Unknown QP solver: {solver}. Use one of {sorted(QP_SOLVERS)}")
+    return QP_SOLVERS[solver]()
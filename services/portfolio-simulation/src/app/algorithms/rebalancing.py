@@ -0,0 +1,348 @@
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from dataclasses import dataclass
+from scipy.optimize import brentq, linprog
+from typing import Dict, List, Optional, Tuple, Union
+
+from .base import LinearConstraint, PortfolioWeights
+from .covariance import CovarianceLike
+from .mean_variance import MeanVarianceOptimizer
+from .qp_solvers import QPProblem, QPResult, QPSolver
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RebalanceResult:
+    """Trades that move the current holdings to the rebalanced portfolio."""
+    portfolio: PortfolioWeights
+    trades: Dict[str, float]  # Ticker -> weight change; assets that are not traded are omitted
+    turnover: float  # Sum of absolute weight changes
+    transaction_cost: float  # Cost of the trades as a fraction of portfolio value
+    iterations: int  # QP iterations over all solves
+    solves: int
+
+class RebalancingOptimizer(MeanVarianceOptimizer):
+    """
+    Mean-variance rebalancing from the current holdings.
+
+    Adds trade variables t >= |w - w0| to the QP formulation of
+    MeanVarianceOptimizer. Transaction costs c'|w - w0|, amortized over
+    ``cost_horizon`` days, are charged against the expected return, and an
+    optional limit caps the turnover sum |w - w0|. Every objective (max
+    Sharpe, target return, target volatility) is evaluated on the return net
+    of costs, so trades are only made when they pay for themselves; the L1
+    cost leaves most positions exactly untouched.
+
+    The first solve starts from the current holdings and their active set:
+    every asset untraded and the bounds the holdings sit on. For a recurring
+    rebalance that is the previous solution, which usually differs from the
+    new optimum in a few trades, so the active-set polish of the QP backend
+    finds it without ADMM iterations.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        current_weights: Dict[str, float],
+        risk_free_rate: float = 0.0,
+        target_return: Optional[float] = None,
+        target_volatility: Optional[float] = None,
+        weight_bounds: Tuple[float, float] = (0, 1),
+        max_iterations: int = 1000,
+        linear_constraints: Optional[List[LinearConstraint]] = None,
+        solver: Union[str, QPSolver] = 'auto',
+        covariance: CovarianceLike = 'sample',
+        transaction_costs: Union[float, Dict[str, float]] = 0.0,
+        max_turnover: Optional[float] = None,
+        cost_horizon: int = 21,
+        trade_tolerance: float = 1e-6
+    ):
+        """
+        Initialize the Rebalancing Optimizer.
+
+        Args:
+            returns: DataFrame with asset returns (rows=time, columns=assets)
+            current_weights: Current holdings (Ticker -> weight); assets not
+                listed are not held
+            risk_free_rate: Annual risk-free rate (default: 0.0)
+            target_return: If provided, minimize variance at this daily return net of costs
+            target_volatility: If provided, maximize the net return at this daily volatility
+            weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
+            max_iterations: Maximum number of iterations for the optimizer
+            linear_constraints: Additional linear constraints on the weights
+            solver: QP backend ('auto', 'admm', 'slsqp' or a QPSolver instance)
+            covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+            transaction_costs: Cost per unit of weight traded (e.g. 0.001 for
+                10bp), for all assets or per asset
+            max_turnover: Optional limit on the sum of absolute weight changes
+                (a full switch between two portfolios is 2)
+            cost_horizon: Trading days over which transaction costs are
+                amortized against the daily expected return (default: a month)
+            trade_tolerance: Weight changes up to this size are solver noise
+                and are not traded
+        """
+        super().__init__(
+            returns,
+            risk_free_rate=risk_free_rate,
+            target_return=target_return,
+            target_volatility=target_volatility,
+            weight_bounds=weight_bounds,
+            max_iterations=max_iterations,
+            linear_constraints=linear_constraints,
+            solver=solver,
+            covariance=covariance
+        )
+        unknown = set(current_weights) - set(self.assets)
+        if unknown:
+            raise ValueError(f"Current weights reference unknown assets: {sorted(unknown)}")
+        if isinstance(transaction_costs, dict):
+            unknown = set(transaction_costs) - set(self.assets)
+            if unknown:
+                raise ValueError(f"Transaction costs reference unknown assets: {sorted(unknown)}")
+            costs = np.array([transaction_costs.get(asset, 0.0) for asset in self.assets], dtype=float)
+        else:
+            costs = np.full(self.num_assets, float(transaction_costs))
+        if np.any(costs < 0):
+            raise ValueError("Transaction costs must be non-negative")
+        if max_turnover is not None and max_turnover < 0:
+            raise ValueError("max_turnover must be non-negative")
+        if cost_horizon <= 0:
+            raise ValueError("cost_horizon must be positive")
+
+        self.current_weights = np.array([current_weights.get(asset, 0.0) for asset in self.assets], dtype=float)
+        self.transaction_costs = costs
+        self.max_turnover = max_turnover
+        self.cost_horizon = cost_horizon
+        self.trade_tolerance = trade_tolerance
+        self.qp_iterations = 0
+        self.qp_solves = 0
+
+    def _qp_data(self) -> Tuple[np.ndarray, np.ndarray, sp.csr_matrix, np.ndarray, np.ndarray]:
+        """QP formulation over x = [w; t] with t >= |w - w0| and the net return r'x = μ'w - c't / horizon."""
+        P, r, A, l, u = super()._qp_data()
+        n = self.num_assets
+        w0 = self.current_weights
+        # A trade row is implied by the weight bounds when the holding sits at
+        # or beyond that bound (e.g. unheld assets can only be bought when
+        # long-only). Leaving such rows out keeps the active sets of untraded
+        # assets nondegenerate.
+        weight_lower, weight_upper = self._bounds_arrays()
+        buys = np.flatnonzero(w0 < weight_upper)
+        sells = np.flatnonzero(w0 > weight_lower)
+        identity = sp.identity(n, format='csr')
+        rows = [
+            sp.hstack([A, sp.csr_matrix((A.shape[0], n))]),
+            sp.hstack([identity[buys], -identity[buys]]),  # w - t <= w0
+            sp.hstack([identity[sells], identity[sells]])  # w + t >= w0
+        ]
+        lower = [l, np.full(len(buys), -np.inf), w0[sells]]
+        upper = [u, w0[buys], np.full(len(sells), np.inf)]
+        if self.max_turnover is not None:
+            rows.append(sp.hstack([sp.csr_matrix((1, n)), sp.csr_matrix(np.ones(n))]))
+            lower.append([-np.inf])
+            upper.append([self.max_turnover])
+
+        lifted_P = np.zeros((2 * n, 2 * n))
+        lifted_P[:n, :n] = P
+        return (
+            lifted_P,
+            np.concatenate([r, -self.transaction_costs / self.cost_horizon]),
+            sp.csr_matrix(sp.vstack(rows)),
+            np.concatenate(lower),
+            np.concatenate(upper)
+        )
+
+    def _qp_weights(self, x: np.ndarray) -> np.ndarray:
+        return x[:self.num_assets]
+
+    def _qp_start(self) -> Optional[np.ndarray]:
+        # The current holdings with no trades: feasible whenever the holdings are
+        return np.concatenate([self.current_weights, np.zeros(self.num_assets)])
+
+    def _qp_start_duals(self, problem: QPProblem) -> Optional[np.ndarray]:
+        # Zero duals: the active set is read from the rows the holdings sit on
+        return np.zeros(problem.num_constraints)
+
+    def _sharpe_search_start(self) -> Optional[float]:
+        # Holdings that were max-Sharpe at the last rebalance sit near the tangency portfolio
+        return self._tangency_log_tolerance(self.current_weights)
+
+    def _max_return_portfolio(self) -> np.ndarray:
+        """
+        Solution [w; t] of the highest net return under the rebalancing constraints (an LP).
+
+        Raises:
+            RuntimeError: If the constraints are infeasible
+        """
+        _, r, A, l, u = self._qp_data()
+        equal = l == u
+        has_upper = np.isfinite(u) & ~equal
+        has_lower = np.isfinite(l) & ~equal
+        result = linprog(
+            -r,
+            A_ub=sp.vstack([A[has_upper], -A[has_lower]]),
+            b_ub=np.concatenate([u[has_upper], -l[has_lower]]),
+            A_eq=A[equal] if equal.any() else None,
+            b_eq=l[equal] if equal.any() else None,
+            bounds=(None, None),
+            method='highs'
+        )
+        if not result.success:
+            raise RuntimeError(f"Portfolio constraints are infeasible: {result.message}")
+        return result.x
+
+    def solve_qp(
+        self,
+        problem: QPProblem,
+        x0: Optional[np.ndarray] = None,
+        y0: Optional[np.ndarray] = None
+    ) -> QPResult:
+        result = super().solve_qp(problem, x0=x0, y0=y0)
+        self.qp_iterations += result.iterations
+        self.qp_solves += 1
+        return result
+
+    def _target_volatility_qp(self) -> np.ndarray:
+        """
+        Maximize the net return at the target volatility.
+
+        Volatility increases with the risk tolerance t along the frontier
+        argmin w'Σw - t·r'x, so the target is bracketed in log(t) and found
+        with Brent's method, each solve warm-started from the previous one.
+
+        Returns:
+            Optimal weights (summing to 1)
+        """
+        P, r, A, l, u = self._qp_data()
+        solutions = {}
+
+        def excess_volatility(log_tolerance: float) -> float:
+            problem = QPProblem(P, -np.exp(log_tolerance) * r, A, l, u)
+            x0, y0 = self._qp_start(), self._qp_start_duals(problem)
+            if solutions:
+                nearest = solutions[min(solutions, key=lambda t: abs(t - log_tolerance))]
+                x0, y0 = nearest.x, nearest.y
+            result = self.solve_qp(problem, x0=x0, y0=y0)
+            solutions[log_tolerance] = result
+            weights = self._qp_weights(result.x)
+            return np.sqrt(max(self.covariance_model.quadratic_form(weights), 0.0)) - self.target_volatility
+
+        typical = np.log(np.mean(self.covariance_model.diagonal()) / np.max(np.abs(self.expected_returns)))
+        low, high = typical - 8.0, typical + 8.0
+        if excess_volatility(low) > 0:
+            raise RuntimeError("Target volatility is below the minimum volatility of the feasible portfolios")
+        if excess_volatility(high) < 0:
+            raise RuntimeError("Target volatility is above the volatility of the maximum return portfolio")
+        log_tolerance = brentq(excess_volatility, low, high, xtol=1e-6)
+        if log_tolerance not in solutions:
+            excess_volatility(log_tolerance)
+        result = solutions[log_tolerance]
+        self.optimization_result = result
+        weights = self._qp_weights(result.x)
+        return weights / np.sum(weights)
+
+    def _rebalanced_weights(self) -> np.ndarray:
+        if self.target_volatility is not None:
+            return self._target_volatility_qp()
+        return self._optimize_qp()
+
+    def optimize(self) -> PortfolioWeights:
+        """
+        Optimize the rebalanced portfolio.
+
+        All objectives are solved as QPs (the trade variables make the
+        direct SLSQP formulation non-smooth); the 'slsqp' solver uses the
+        SLSQP QP backend.
+
+        Returns:
+            PortfolioWeights object containing the rebalanced weights and metrics
+        """
+        try:
+            weights = self._rebalanced_weights()
+        except RuntimeError as e:
+            if self.qp_solver is None:
+                raise
+            logger.warning(f"QP backend failed, falling back to SLSQP: {e}")
+            solver, self.solver = self.solver, 'slsqp'
+            try:
+                weights = self._rebalanced_weights()
+            finally:
+                self.solver = solver
+
+        # Snap solver noise back to the current holdings
+        trades = weights - self.current_weights
+        trades[np.abs(trades) <= self.trade_tolerance] = 0.0
+        weights = self.current_weights + trades
+
+        expected_return, volatility, sharpe_ratio = self.calculate_portfolio_metrics(weights)
+        return PortfolioWeights(
+            weights=self.get_weights_dict(weights),
+            expected_return=expected_return,
+            volatility=volatility,
+            sharpe_ratio=sharpe_ratio,
+            risk_free_rate=self.risk_free_rate
+        )
+
+    def rebalance(self) -> RebalanceResult:
+        """
+        Optimize and return the trades from the current holdings.
+
+        Returns:
+            RebalanceResult with the rebalanced portfolio and only the assets that trade
+        """
+        self.qp_iterations = 0
+        self.qp_solves = 0
+        portfolio = self.optimize()
+        trades = np.array([portfolio.weights[asset] for asset in self.assets]) - self.current_weights
+        traded = np.flatnonzero(trades)
+        return RebalanceResult(
+            portfolio=portfolio,
+            trades={self.assets[i]: float(trades[i]) for i in traded},
+            turnover=float(np.abs(trades).sum()),
+            transaction_cost=float(self.transaction_costs @ np.abs(trades)),
+            iterations=self.qp_iterations,
+            solves=self.qp_solves
+        )
+
+def calculate_rebalance_trades(
+    returns: pd.DataFrame,
+    current_weights: Dict[str, float],
+    risk_free_rate: float = 0.0,
+    weight_bounds: Tuple[float, float] = (0, 1),
+    transaction_costs: Union[float, Dict[str, float]] = 0.0,
+    max_turnover: Optional[float] = None,
+    covariance: CovarianceLike = 'sample'
+) -> Dict:
+    """
+    Calculate the trades of a max-Sharpe rebalance from the current holdings.
+
+    Args:
+        returns: DataFrame with asset returns (rows=time, columns=assets)
+        current_weights: Current holdings (Ticker -> weight)
+        risk_free_rate: Annual risk-free rate (default: 0.0)
+        weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
+        transaction_costs: Cost per unit of weight traded, for all assets or per asset
+        max_turnover: Optional limit on the sum of absolute weight changes
+        covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+
+    Returns:
+        Dictionary with the trades, turnover, costs and the rebalanced portfolio
+    """
+    result = RebalancingOptimizer(
+        returns=returns,
+        current_weights=current_weights,
+        risk_free_rate=risk_free_rate,
+        weight_bounds=weight_bounds,
+        transaction_costs=transaction_costs,
+        max_turnover=max_turnover,
+        covariance=covariance
+    ).rebalance()
+
+    return {
+        'trades': result.trades,
+        'turnover': result.turnover,
+        'transaction_cost': result.transaction_cost,
+        'portfolio': result.portfolio.to_dict()
+    }
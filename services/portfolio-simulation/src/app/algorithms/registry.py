@@ -0,0 +1,22 @@
+from typing import Dict, Type
+
+from .base import PortfolioOptimizer
+from .black_litterman import BlackLittermanOptimizer
+from .hierarchical_risk_parity import HierarchicalRiskParityOptimizer
+from .mean_variance import MeanVarianceOptimizer
+from .risk_parity import RiskParityOptimizer
+
+# Optimizers addressable by name from the API and from stored simulations
+OPTIMIZERS: Dict[str, Type[PortfolioOptimizer]] = {
+    'mean_variance': MeanVarianceOptimizer,
+    'risk_parity': RiskParityOptimizer,
+    'black_litterman': BlackLittermanOptimizer,
+    'hierarchical_risk_parity': HierarchicalRiskParityOptimizer
+}
+
+def get_optimizer_class(algorithm: str) -> Type[PortfolioOptimizer]:
+    """Optimizer class registered under ``algorithm``."""
+    try:
+        return OPTIMIZERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unsupported algorithm: {algorithm}") from None
@@ -0,0 +1,385 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .base import PortfolioWeights
+from .universe import returns_fingerprint
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_PREFIX = 'portfolio-sim:result'
+
+@dataclasses.dataclass(frozen=True)
+class UniverseVersion:
+    """
+    A universe (its asset set and lookback) and the version of its return window.
+
+    ``universe`` stays the same as a window of fixed length rolls forward;
+    ``version`` changes with every new date or revised return. ``end`` is
+    the last date of the window in nanoseconds, or None if the returns are
+    not indexed by date.
+    """
+    universe: str
+    version: str
+    end: Optional[int] = None
+
+    def succeeds(self, previous: 'UniverseVersion') -> bool:
+        """
+        Whether this window replaces ``previous``: both are dated and this one ends later.
+
+        Undated panels of the same shape can't be ordered, so none of them
+        replaces another; their results expire through the LRU and the TTL.
+        """
+        if self.end is None or previous.end is None:
+            return False
+        return self.version != previous.version and self.end > previous.end
+
+def universe_version(returns: pd.DataFrame) -> UniverseVersion:
+    """Identify the asset set and lookback of ``returns`` and the exact return window."""
+    universe = hashlib.sha256(json.dumps([returns.columns.tolist(), len(returns)]).encode()).hexdigest()[:16]
+    end = None
+    if isinstance(returns.index, pd.DatetimeIndex) and len(returns):
+        end = int(returns.index[-1].value)
+    return UniverseVersion(universe, returns_fingerprint(returns)[:16], end)
+
+def canonical_params(value: Any) -> Any:
+    """
+    Normalize optimizer parameters to plain JSON values.
+
+    Equal parameters map to equal values whatever their container or number
+    type: tuples become lists, integers and NumPy scalars become floats and
+    dataclasses (e.g. LinearConstraint or View) become dictionaries.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return canonical_params(dataclasses.asdict(value))
+    if isinstance(value, dict):
+        return {str(k): canonical_params(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [canonical_params(v) for v in value]
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        if math.isnan(value) or math.isinf(value):
+            return repr(value)
+        return value + 0.0  # -0.0 -> 0.0
+    raise TypeError(f"Cannot cache on parameter of type {type(value).__name__}")
+
+def params_hash(algorithm: str, params: Dict[str, Any]) -> str:
+    """Digest of an algorithm name and its canonical parameters."""
+    payload = json.dumps(
+        {'algorithm': algorithm, 'params': canonical_params(params)},
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+class ResultCache:
+    """
+    Optimization results keyed by universe version and a canonical parameter hash.
+
+    Results live in an in-process LRU tier backed by Redis, so a result
+    computed by any worker is reused by all. Keys embed the version of the
+    return window, so a rolled window can never return a stale result;
+    ``version()`` additionally purges the entries of the previous window
+    from both tiers when it sees a universe's window move forward. Each
+    window's Redis keys are tracked in a set, so the purge never scans the
+    keyspace.
+
+    With a ``redis.asyncio`` client use the awaitable ``aversion``,
+    ``aget_many`` and ``aput`` instead, so Redis round trips never block
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        memory_size: int = 1024,
+        ttl: int = 24 * 60 * 60,
+        prefix: str = RESULT_CACHE_PREFIX
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Optional Redis client for the shared tier: a
+                ``redis.Redis`` for the synchronous methods or a
+                ``redis.asyncio.Redis`` for the ``a``-prefixed ones.
+                Without one only the in-process tier is used.
+            memory_size: Number of results kept in process
+            ttl: Expiry of Redis entries in seconds, a backstop for
+                universes that are never seen again
+            prefix: Namespace of the Redis keys
+        """
+        self.redis = redis_client
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.prefix = prefix
+        self._memory: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._versions: Dict[str, UniverseVersion] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, version: UniverseVersion, algorithm: str, params: Dict[str, Any]) -> str:
+        return f"{self.prefix}:{version.universe}:{version.version}:{params_hash(algorithm, params)}"
+
+    def _index_key(self, version: UniverseVersion) -> str:
+        """Redis set of the result keys stored for one window."""
+        return f"{self.prefix}:{version.universe}:{version.version}:keys"
+
+    def _latest_key(self, universe: str) -> str:
+        """Redis key of the universe's latest window."""
+        return f"{self.prefix}:{universe}:version"
+
+    def version(self, returns: pd.DataFrame) -> UniverseVersion:
+        """
+        Version of ``returns``, invalidating the universe's previous window if it rolled forward.
+
+        A window of another length is another universe, and a window that
+        ends no later than the latest one seen, or is not indexed by date,
+        leaves that one in place.
+
+        Compute it once per returns panel and pass it to ``get``/``put``;
+        hashing the panel is O(T x N).
+        """
+        version = universe_version(returns)
+        if self._roll_memory(version):
+            self._roll_redis(version)
+        return version
+
+    async def aversion(self, returns: pd.DataFrame) -> UniverseVersion:
+        """``version()`` for an async Redis client; the panel is hashed in a worker thread."""
+        version = await asyncio.to_thread(universe_version, returns)
+        if self._roll_memory(version):
+            await self._aroll_redis(version)
+        return version
+
+    def get(self, version: UniverseVersion, algorithm: str, params: Dict[str, Any]) -> Optional[PortfolioWeights]:
+        """Cached result for the parameters, or None."""
+        return self.get_many(version, algorithm, [params])[0]
+
+    def get_many(
+        self,
+        version: UniverseVersion,
+        algorithm: str,
+        params_list: List[Dict[str, Any]]
+    ) -> List[Optional[PortfolioWeights]]:
+        """Cached results for several parameter sets, with one Redis round trip for all misses."""
+        keys, found, missing = self._memory_get_many(version, algorithm, params_list)
+        if missing and self.redis is not None:
+            self._fill(keys, found, missing, self._redis_get_many([keys[i] for i in missing]))
+        return self._count(found)
+
+    async def aget_many(
+        self,
+        version: UniverseVersion,
+        algorithm: str,
+        params_list: List[Dict[str, Any]]
+    ) -> List[Optional[PortfolioWeights]]:
+        """``get_many()`` for an async Redis client."""
+        keys, found, missing = self._memory_get_many(version, algorithm, params_list)
+        if missing and self.redis is not None:
+            self._fill(keys, found, missing, await self._aredis_get_many([keys[i] for i in missing]))
+        return self._count(found)
+
+    def put(
+        self,
+        version: UniverseVersion,
+        algorithm: str,
+        params: Dict[str, Any],
+        portfolio: PortfolioWeights
+    ) -> None:
+        """Store a result in both tiers."""
+        key = self.key(version, algorithm, params)
+        data = portfolio.to_dict()
+        self._remember(key, data)
+        if self.redis is not None:
+            index = self._index_key(version)
+            try:
+                pipe = self.redis.pipeline()
+                pipe.setex(key, self.ttl, json.dumps(data))
+                pipe.sadd(index, key)
+                pipe.expire(index, self.ttl)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Result cache set error for key {key}: {e}")
+
+    async def aput(
+        self,
+        version: UniverseVersion,
+        algorithm: str,
+        params: Dict[str, Any],
+        portfolio: PortfolioWeights
+    ) -> None:
+        """``put()`` for an async Redis client."""
+        key = self.key(version, algorithm, params)
+        data = portfolio.to_dict()
+        self._remember(key, data)
+        if self.redis is not None:
+            index = self._index_key(version)
+            try:
+                pipe = self.redis.pipeline()
+                pipe.setex(key, self.ttl, json.dumps(data))
+                pipe.sadd(index, key)
+                pipe.expire(index, self.ttl)
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Result cache set error for key {key}: {e}")
+
+    def get_or_compute(
+        self,
+        returns: pd.DataFrame,
+        algorithm: str,
+        params: Dict[str, Any],
+        compute: Callable[[], PortfolioWeights]
+    ) -> Tuple[PortfolioWeights, bool]:
+        """
+        Cached result for the parameters, computing and storing it on a miss.
+
+        Returns:
+            Tuple of (portfolio, whether it came from the cache)
+        """
+        version = self.version(returns)
+        portfolio = self.get(version, algorithm, params)
+        if portfolio is not None:
+            return portfolio, True
+        portfolio = compute()
+        self.put(version, algorithm, params, portfolio)
+        return portfolio, False
+
+    def clear(self) -> None:
+        """Drop the in-process tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._memory.clear()
+            self._versions.clear()
+
+    def _roll_memory(self, version: UniverseVersion) -> bool:
+        """Record a universe's new or rolled window, dropping the previous window's results; True if recorded."""
+        with self._lock:
+            previous = self._versions.get(version.universe)
+            if previous is not None and not version.succeeds(previous):
+                return False
+            self._versions[version.universe] = version
+            if previous is not None:
+                stale = f"{self.prefix}:{version.universe}:{previous.version}:"
+                for key in [k for k in self._memory if k.startswith(stale)]:
+                    del self._memory[key]
+        return True
+
+    def _memory_get_many(
+        self,
+        version: UniverseVersion,
+        algorithm: str,
+        params_list: List[Dict[str, Any]]
+    ) -> Tuple[List[str], List[Optional[Dict]], List[int]]:
+        keys = [self.key(version, algorithm, params) for params in params_list]
+        found: List[Optional[Dict]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                found[i] = self._memory.get(key)
+                if found[i] is not None:
+                    self._memory.move_to_end(key)
+        return keys, found, [i for i, data in enumerate(found) if data is None]
+
+    def _fill(
+        self,
+        keys: List[str],
+        found: List[Optional[Dict]],
+        missing: List[int],
+        values: List[Optional[Dict]]
+    ) -> None:
+        for i, data in zip(missing, values):
+            if data is not None:
+                found[i] = data
+                self._remember(keys[i], data)
+
+    def _count(self, found: List[Optional[Dict]]) -> List[Optional[PortfolioWeights]]:
+        with self._lock:
+            hits = sum(data is not None for data in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+        return [None if data is None else PortfolioWeights.from_dict(data) for data in found]
+
+    def _remember(self, key: str, data: Dict) -> None:
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _redis_get_many(self, keys: List[str]) -> List[Optional[Dict]]:
+        try:
+            values = self.redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Result cache get error for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+        return [json.loads(value) if value else None for value in values]
+
+    async def _aredis_get_many(self, keys: List[str]) -> List[Optional[Dict]]:
+        try:
+            values = await self.redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Result cache get error for {len(keys)} keys: {e}")
+            return [None] * len(keys)
+        return [json.loads(value) if value else None for value in values]
+
+    def _roll_redis(self, version: UniverseVersion) -> None:
+        """Record the universe's window in Redis if it is the latest, deleting the previous window's results."""
+        if self.redis is None:
+            return
+        try:
+            previous = self._load_version(version.universe, self.redis.get(self._latest_key(version.universe)))
+            if previous is not None and not version.succeeds(previous):
+                return
+            self.redis.set(self._latest_key(version.universe), self._dump_version(version), ex=self.ttl)
+            if previous is not None:
+                index = self._index_key(previous)
+                stale = list(self.redis.smembers(index))
+                self.redis.delete(index, *stale)
+                self._log_dropped(previous, stale)
+        except Exception as e:
+            logger.error(f"Result cache invalidation error for universe {version.universe}: {e}")
+
+    async def _aroll_redis(self, version: UniverseVersion) -> None:
+        """``_roll_redis()`` for an async Redis client."""
+        if self.redis is None:
+            return
+        try:
+            previous = self._load_version(version.universe, await self.redis.get(self._latest_key(version.universe)))
+            if previous is not None and not version.succeeds(previous):
+                return
+            await self.redis.set(self._latest_key(version.universe), self._dump_version(version), ex=self.ttl)
+            if previous is not None:
+                index = self._index_key(previous)
+                stale = list(await self.redis.smembers(index))
+                await self.redis.delete(index, *stale)
+                self._log_dropped(previous, stale)
+        except Exception as e:
+            logger.error(f"Result cache invalidation error for universe {version.universe}: {e}")
+
+    @staticmethod
+    def _dump_version(version: UniverseVersion) -> str:
+        return json.dumps({'version': version.version, 'end': version.end})
+
+    @staticmethod
+    def _load_version(universe: str, value: Optional[bytes]) -> Optional[UniverseVersion]:
+        if not value:
+            return None
+        stored = json.loads(value)
+        return UniverseVersion(universe, stored['version'], stored['end'])
+
+    @staticmethod
+    def _log_dropped(previous: UniverseVersion, stale: List) -> None:
+        if stale:
+            logger.info(f"Result cache dropped {len(stale)} results of universe {previous.universe}")
@@ -1,9 +1,116 @@
+import logging
 import numpy as np
 import pandas as pd
+from dataclasses import dataclass
 from scipy.optimize import minimize
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple, Union
 
 from .base import PortfolioOptimizer, PortfolioWeights
+from .covariance import CovarianceLike, CovarianceModel
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
+
+RISK_PARITY_METHODS = ('newton', 'slsqp')
+
+
+@dataclass
+class RiskBudgetResult:
+    """Outcome of a risk budgeting solve."""
+    weights: np.ndarray  # Fully invested weights
+    iterations: int
+    residual: float  # Largest gap between a risk contribution share and its budget
+    converged: bool
+
+
+def risk_budget_residual(covariance: CovarianceModel, weights: np.ndarray, budgets: np.ndarray) -> float:
+    """Largest absolute difference between an asset's share of portfolio variance and its budget."""
+    cov_w = covariance.matvec(weights)
+    shares = weights * cov_w / (weights @ cov_w)
+    return float(np.max(np.abs(shares - budgets)))
+
+
+def solve_risk_budget(
+    covariance: CovarianceModel,
+    budgets: np.ndarray,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+    initial_weights: Optional[np.ndarray] = None
+) -> RiskBudgetResult:
+    """
+    Long-only risk budgeting portfolio by Newton's method.
+    
+    The portfolio whose risk contributions w_i (Σw)_i / w'Σw equal the
+    budgets b is w = y / sum(y), where y minimizes the strictly convex
+    
+        f(y) = 1/2 y'Σy - sum(b_i log y_i),  y > 0
+    
+    (Roncalli, 2013, "Introduction to Risk Parity and Budgeting"): its
+    first-order conditions are y_i (Σy)_i = b_i. Damped Newton steps with a
+    backtracking line search converge quadratically, typically in under ten
+    iterations regardless of the number of assets. Each step solves with
+    Σ + diag(b / y^2), which a factor model does in O(Nk^2).
+    
+    Args:
+        covariance: Covariance model of the assets
+        budgets: Positive risk budget per asset (normalized to sum to 1)
+        tolerance: Stop when every risk contribution share is within this of its budget
+        max_iterations: Maximum number of Newton steps
+        initial_weights: Optional positive starting weights, e.g. the solution
+            for nearby budgets or covariances (default: inverse volatility)
+    
+    Returns:
+        RiskBudgetResult with the weights, iteration count and final residual
+    """
+    budgets = np.asarray(budgets, dtype=float)
+    if np.any(budgets <= 0):
+        raise ValueError("Risk budgets must be positive")
+    budgets = budgets / budgets.sum()
+    
+    def objective(y: np.ndarray, cov_y: np.ndarray) -> float:
+        return 0.5 * y @ cov_y - budgets @ np.log(y)
+    
+    # Inverse-volatility (or warm) start, scaled to the minimum of f along its ray
+    if initial_weights is not None and np.all(initial_weights > 0):
+        y = np.array(initial_weights, dtype=float)
+    else:
+        y = budgets / np.sqrt(covariance.diagonal())
+    y /= np.sqrt(covariance.quadratic_form(y))
+    cov_y = covariance.matvec(y)
+    
+    iterations = 0
+    residual = np.inf
+    while iterations < max_iterations:
+        residual = float(np.max(np.abs(y * cov_y / (y @ cov_y) - budgets)))
+        if residual <= tolerance:
+            break
+        iterations += 1
+        gradient = cov_y - budgets / y
+        step = covariance.solve_shifted(gradient, budgets / y ** 2)
+        decrement = gradient @ step
+        
+        # Stay inside y > 0, then backtrack until f decreases enough (Armijo).
+        # Close to the solution (e.g. from a warm start) the decrease is below
+        # the rounding of f and cannot be measured: take the Newton step.
+        negative = step > 0
+        t = min(1.0, 0.99 * np.min(y[negative] / step[negative])) if negative.any() else 1.0
+        value = objective(y, cov_y)
+        measurable = decrement > 1e-12 * max(1.0, abs(value))
+        while True:
+            y_new = y - t * step
+            cov_y_new = covariance.matvec(y_new)
+            if not measurable or objective(y_new, cov_y_new) <= value - 0.25 * t * decrement or t < 1e-10:
+                break
+            t *= 0.5
+        y, cov_y = y_new, cov_y_new
+    
+    return RiskBudgetResult(
+        weights=y / y.sum(),
+        iterations=iterations,
+        residual=residual,
+        converged=residual <= tolerance
+    )
+
 
 class RiskParityOptimizer(PortfolioOptimizer):
     """
@@ -11,38 +118,59 @@ class RiskParityOptimizer(PortfolioOptimizer):
     
     Implements the risk parity approach that allocates risk equally among all assets
     in the portfolio, rather than allocating capital equally.
+    
+    The default 'newton' method solves the risk budgeting problem exactly
+    (see ``solve_risk_budget``). The 'slsqp' method is the original penalized
+    least-squares formulation; it is also the fallback when the exact
+    solution violates the weight bounds, since exact budgets and binding
+    bounds are incompatible.
     """
     
     def __init__(
         self,
-        returns: pd.DataFrame,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
         risk_free_rate: float = 0.0,
         risk_weights: Optional[Dict[str, float]] = None,
         weight_bounds: Tuple[float, float] = (0, 1),
         max_iterations: int = 1000,
-        risk_aversion: float = 1.0
+        risk_aversion: float = 1.0,
+        covariance: CovarianceLike = 'sample',
+        method: str = 'newton',
+        tolerance: float = 1e-10
     ):
         """
         Initialize the Risk Parity Optimizer.
         
         Args:
-            returns: DataFrame with asset returns (rows=time, columns=assets)
+            returns: DataFrame with asset returns (rows=time, columns=assets),
+                or a ReturnsUniverse
             risk_free_rate: Annual risk-free rate (default: 0.0)
             risk_weights: Dictionary with custom risk weights for each asset.
                          If None, equal risk contribution is targeted.
             weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
             max_iterations: Maximum number of iterations for the optimizer
             risk_aversion: Risk aversion parameter (higher values result in more conservative allocations)
+            covariance: Covariance estimator ('sample', 'ledoit_wolf', 'ewma', 'factor'),
+                a CovarianceEstimator, or a pre-estimated CovarianceModel
+            method: 'newton' (exact risk budgeting) or 'slsqp' (penalized least squares)
+            tolerance: Newton stopping tolerance on the risk contribution shares
         """
-        super().__init__(returns, risk_free_rate)
+        if method not in RISK_PARITY_METHODS:
+            raise ValueError(f"Unknown risk parity method: {method}. Use one of {RISK_PARITY_METHODS}")
+        super().__init__(returns, risk_free_rate, covariance=covariance)
         self.risk_weights = risk_weights or {asset: 1.0/self.num_assets for asset in self.assets}
         self.weight_bounds = weight_bounds
         self.max_iterations = max_iterations
         self.risk_aversion = risk_aversion
+        self.method = method
+        self.tolerance = tolerance
+        self.optimization_result = None  # RiskBudgetResult (Newton) or OptimizeResult (SLSQP)
         
         # Validate risk weights
         if not np.isclose(sum(self.risk_weights.values()), 1.0):
             raise ValueError("Risk weights must sum to 1.0")
+        if any(weight < 0 for weight in self.risk_weights.values()):
+            raise ValueError("Risk weights must not be negative")
     
     def _calculate_risk_contributions(self, weights: np.ndarray) -> np.ndarray:
         """
@@ -58,10 +186,11 @@ class RiskParityOptimizer(PortfolioOptimizer):
         weights = weights / np.sum(weights)
         
         # Calculate portfolio volatility
-        port_volatility = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
+        cov_w = self.covariance_model.matvec(weights)
+        port_volatility = np.sqrt(max(weights @ cov_w, 0.0))
         
         # Calculate marginal risk contribution
-        mrc = np.dot(self.cov_matrix, weights) / (port_volatility + 1e-10)
+        mrc = cov_w / (port_volatility + 1e-10)
         
         # Calculate risk contribution
         risk_contributions = weights * mrc
@@ -81,15 +210,17 @@ class RiskParityOptimizer(PortfolioOptimizer):
         # Ensure weights sum to 1
         weights = weights / np.sum(weights)
         
-        # Calculate risk contributions
+        # Calculate risk contributions as shares of portfolio volatility, the
+        # units of the budgets (raw contributions are in volatility units)
         risk_contributions = self._calculate_risk_contributions(weights)
+        risk_shares = risk_contributions / (np.sum(risk_contributions) + 1e-10)
         
         # Calculate target risk contributions (from risk_weights)
-        target_risk = np.array([self.risk_weights[asset] for asset in self.assets])
+        target_risk = self._risk_budgets()
         
         # Calculate the risk parity objective
-        # We want to minimize the sum of squared differences between actual and target risk contributions
-        obj_value = np.sum((risk_contributions - target_risk) ** 2)
+        # We want to minimize the sum of squared differences between actual and target risk shares
+        obj_value = np.sum((risk_shares - target_risk) ** 2)
         
         # Add penalty for weights outside bounds
         penalty = 0
@@ -105,15 +236,55 @@ class RiskParityOptimizer(PortfolioOptimizer):
         """Constraint: weights must sum to 1."""
         return np.sum(weights) - 1.0
     
-    def optimize(self) -> PortfolioWeights:
+    def _risk_budgets(self) -> np.ndarray:
+        """Risk budget per asset in asset order (assets missing from risk_weights get 0)."""
+        return np.array([self.risk_weights.get(asset, 0.0) for asset in self.assets], dtype=float)
+    
+    def _optimize_newton(self, budgets: np.ndarray) -> Optional[np.ndarray]:
         """
-        Optimize portfolio weights using Risk Parity.
+        Exact risk budgeting weights, or None if they are not usable.
         
-        Returns:
-            PortfolioWeights object containing optimized weights and metrics
+        Assets with a zero budget get zero weight. The result is rejected
+        (with a warning) when Newton does not converge or the weights violate
+        the weight bounds.
         """
-        # Initial guess (equal weights)
-        init_weights = np.array([1.0 / self.num_assets] * self.num_assets)
+        active = np.flatnonzero(budgets > 0)
+        covariance = self.covariance_model
+        if len(active) < self.num_assets:
+            covariance = covariance.subset(active)
+        result = solve_risk_budget(
+            covariance,
+            budgets[active],
+            tolerance=self.tolerance,
+            max_iterations=self.max_iterations,
+            initial_weights=None if self.initial_weights is None else self.initial_weights[active]
+        )
+        weights = np.zeros(self.num_assets)
+        weights[active] = result.weights
+        result.weights = weights
+        self.optimization_result = result
+        
+        if not result.converged:
+            logger.warning(
+                f"Risk budgeting did not converge in {result.iterations} iterations "
+                f"(residual {result.residual:.2e}); falling back to SLSQP"
+            )
+            return None
+        lower, upper = self.weight_bounds
+        if (lower is not None and np.any(weights < lower - 1e-9)) or (
+            upper is not None and np.any(weights > upper + 1e-9)
+        ):
+            logger.warning("Exact risk budgets violate the weight bounds; falling back to SLSQP")
+            return None
+        return weights
+    
+    def _optimize_slsqp(self) -> np.ndarray:
+        """Penalized least-squares risk parity with SLSQP."""
+        # Initial guess (the warm start, else equal weights)
+        if self.initial_weights is not None:
+            init_weights = self.initial_weights
+        else:
+            init_weights = np.array([1.0 / self.num_assets] * self.num_assets)
         
         # Define constraints
         constraints = [
@@ -135,9 +306,31 @@ class RiskParityOptimizer(PortfolioOptimizer):
         
         if not result.success:
             raise RuntimeError(f"Risk parity optimization failed: {result.message}")
+        self.optimization_result = result
         
         # Get optimized weights (ensuring they sum to 1)
-        optimal_weights = result.x / np.sum(result.x)
+        return result.x / np.sum(result.x)
+    
+    def optimize(self) -> PortfolioWeights:
+        """
+        Optimize portfolio weights using Risk Parity.
+        
+        Returns:
+            PortfolioWeights object containing optimized weights and metrics.
+            ``solver_info`` holds the method used, its iteration count and the
+            residual (largest gap between a risk contribution share and its budget).
+        """
+        budgets = self._risk_budgets()
+        optimal_weights = None
+        if self.method == 'newton':
+            optimal_weights = self._optimize_newton(budgets)
+        method = 'newton'
+        if optimal_weights is None:
+            optimal_weights = self._optimize_slsqp()
+            method = 'slsqp'
+        iterations = (
+            self.optimization_result.iterations if method == 'newton' else self.optimization_result.nit
+        )
         
         # Calculate portfolio metrics
         expected_return, volatility, sharpe_ratio = self.calculate_portfolio_metrics(optimal_weights)
@@ -158,6 +351,11 @@ class RiskParityOptimizer(PortfolioOptimizer):
         
         # Add risk contribution information to the portfolio object
         portfolio.risk_contributions = risk_contribution_pct
+        portfolio.solver_info = {
+            'method': method,
+            'iterations': int(iterations),
+            'residual': risk_budget_residual(self.covariance_model, optimal_weights, budgets / budgets.sum())
+        }
         
         return portfolio
 
@@ -181,7 +379,7 @@ def calculate_risk_parity_weights(
         weight_bounds: Bounds for asset weights (default: 0 to 1, no short selling)
         max_iterations: Maximum number of iterations for the optimizer
         risk_aversion: Risk aversion parameter (higher values result in more conservative allocations)
-        
+    
     Returns:
         Dictionary with portfolio weights and metrics
     """
@@ -207,7 +405,8 @@ def calculate_risk_parity_weights(
             'sharpe_ratio': portfolio.sharpe_ratio,
             'risk_free_rate': portfolio.risk_free_rate
         },
-        'risk_contributions': portfolio.risk_contributions
+        'risk_contributions': portfolio.risk_contributions,
+        'solver': portfolio.solver_info
     }
     
     return result
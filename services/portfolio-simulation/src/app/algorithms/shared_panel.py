@@ -0,0 +1,275 @@
+import atexit
+import copy
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterable, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+SHARED_PANEL_PREFIX = 'psim'
+
+Panel = Union[pd.DataFrame, np.ndarray]
+T = TypeVar('T')
+
+@dataclass(frozen=True)
+class PanelHandle:
+    """
+    Picklable reference to a panel in shared memory.
+
+    Sending a handle to a worker costs a few hundred bytes whatever the
+    panel's size; ``attach`` maps the data without copying it.
+    """
+    name: str  # Shared memory block
+    shape: Tuple[int, ...]
+    dtype: str
+    columns: Optional[Tuple[Any, ...]] = None  # Set for DataFrames
+    index: Optional[pd.Index] = field(default=None, compare=False)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+class SharedPanelRegistry:
+    """
+    Publishes read-only panels (returns matrices, covariance matrices) in shared memory.
+
+    The publishing process owns the blocks. Each block is reference counted:
+    ``publish`` and ``acquire`` take a reference, ``release`` drops one, and
+    the block is unlinked when the last reference goes. Processes that
+    attached keep their mapping until they detach or exit. Blocks still
+    published when the owner exits are unlinked at exit.
+    """
+
+    def __init__(self, prefix: str = SHARED_PANEL_PREFIX):
+        self.prefix = prefix
+        self._blocks: Dict[str, SharedMemory] = {}
+        self._handles: Dict[str, PanelHandle] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._keys: Dict[str, str] = {}  # Caller key -> block name
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def publish(self, data: Panel, key: Optional[str] = None) -> PanelHandle:
+        """
+        Copy a panel into shared memory once.
+
+        Args:
+            data: DataFrame or 2-D array; stored as float64 in C order
+            key: Optional identity of the data (e.g. a returns fingerprint).
+                Publishing an already published key returns its handle with
+                one more reference instead of copying again.
+
+        Returns:
+            Handle to pass to workers; ``release`` it when done
+        """
+        with self._lock:
+            if key is not None and key in self._keys:
+                name = self._keys[key]
+                self._refcounts[name] += 1
+                return self._handles[name]
+
+        values = data.values if isinstance(data, pd.DataFrame) else data
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2:
+            raise ValueError("Shared panels must be 2-dimensional")
+        # SharedMemory rejects empty blocks
+        block = SharedMemory(
+            name=f"{self.prefix}_{uuid.uuid4().hex[:16]}", create=True, size=max(values.nbytes, 1)
+        )
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        handle = PanelHandle(
+            name=block.name,
+            shape=values.shape,
+            dtype=values.dtype.str,
+            columns=tuple(data.columns) if isinstance(data, pd.DataFrame) else None,
+            index=data.index if isinstance(data, pd.DataFrame) else None
+        )
+        with self._lock:
+            self._blocks[block.name] = block
+            self._handles[block.name] = handle
+            self._refcounts[block.name] = 1
+            if key is not None:
+                self._keys[key] = block.name
+        logger.debug(f"Published shared panel {block.name} ({values.nbytes} bytes)")
+        return handle
+
+    def acquire(self, handle: PanelHandle) -> PanelHandle:
+        """Take another reference to a published panel."""
+        with self._lock:
+            if handle.name not in self._refcounts:
+                raise KeyError(f"Shared panel {handle.name} is not published")
+            self._refcounts[handle.name] += 1
+        return handle
+
+    def release(self, handle: PanelHandle) -> None:
+        """Drop a reference, unlinking the block with the last one."""
+        with self._lock:
+            count = self._refcounts.get(handle.name)
+            if count is None:
+                return
+            if count > 1:
+                self._refcounts[handle.name] = count - 1
+                return
+            block = self._blocks.pop(handle.name)
+            del self._handles[handle.name], self._refcounts[handle.name]
+            for key in [k for k, name in self._keys.items() if name == handle.name]:
+                del self._keys[key]
+        _close(block)
+        block.unlink()
+        logger.debug(f"Unlinked shared panel {handle.name}")
+
+    def refcount(self, handle: PanelHandle) -> int:
+        with self._lock:
+            return self._refcounts.get(handle.name, 0)
+
+    def close(self) -> None:
+        """Unlink every published panel, whatever its references."""
+        if os.getpid() != self._pid:
+            return  # A forked child does not own its parent's blocks
+        with self._lock:
+            blocks = list(self._blocks.values())
+            self._blocks.clear()
+            self._handles.clear()
+            self._refcounts.clear()
+            self._keys.clear()
+        for block in blocks:
+            _close(block)
+            block.unlink()
+
+def _close(block: SharedMemory) -> None:
+    try:
+        block.close()
+    except BufferError:
+        # Arrays of this process still view the block; the mapping goes with them
+        pass
+
+_registry: Optional[SharedPanelRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_panel_registry() -> SharedPanelRegistry:
+    """The process-wide registry, created on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SharedPanelRegistry()
+            atexit.register(_registry.close)
+        return _registry
+
+# Blocks attached in this process: name -> (block, panel viewing it)
+_attached: Dict[str, Tuple[SharedMemory, Panel]] = {}
+_attached_lock = threading.Lock()
+
+def attach(handle: PanelHandle) -> Panel:
+    """
+    Map a published panel without copying it.
+
+    Returns a read-only DataFrame (or array, if an array was published).
+    Attaching the same handle again in a process returns the same panel.
+    Attach from processes started by the publisher, such as its pool
+    workers: before Python 3.13 an unrelated process's resource tracker
+    would unlink the block when that process exits.
+    """
+    with _attached_lock:
+        attached = _attached.get(handle.name)
+        if attached is not None:
+            return attached[1]
+        if sys.version_info >= (3, 13):
+            block = SharedMemory(name=handle.name, track=False)
+        else:
+            block = SharedMemory(name=handle.name)
+        values = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=block.buf)
+        values.flags.writeable = False
+        panel: Panel = values
+        if handle.columns is not None:
+            panel = pd.DataFrame(values, index=handle.index, columns=list(handle.columns), copy=False)
+        _attached[handle.name] = (block, panel)
+        return panel
+
+def detach(handle: PanelHandle) -> None:
+    """Forget an attached panel; its mapping closes once no array views it."""
+    with _attached_lock:
+        attached = _attached.pop(handle.name, None)
+    if attached is not None:
+        _close(attached[0])
+
+def share_attributes(
+    obj: T,
+    names: Iterable[str],
+    published: Dict[int, PanelHandle],
+    registry: Optional[SharedPanelRegistry] = None
+) -> T:
+    """
+    Shallow copy of ``obj`` with the named panel attributes replaced by handles.
+
+    Pickling the copy sends handles instead of data; ``attach_attributes``
+    restores the panels on the other side. Attributes that are not 2-D
+    arrays or DataFrames (e.g. None) are left as they are.
+
+    Args:
+        obj: Object whose panels to publish
+        names: Attributes holding panels
+        published: id(panel) -> handle of panels published so far, updated
+            in place, so a panel held by several objects is published once
+        registry: Registry to publish in (default: the process-wide one)
+    """
+    registry = registry or get_panel_registry()
+    clone = copy.copy(obj)
+    for name in names:
+        value = getattr(obj, name, None)
+        if isinstance(value, (pd.DataFrame, np.ndarray)) and value.ndim == 2:
+            if id(value) not in published:
+                published[id(value)] = registry.publish(value)
+            setattr(clone, name, published[id(value)])
+    return clone
+
+def attach_attributes(obj: T) -> T:
+    """Replace every PanelHandle attribute of ``obj`` with the attached panel, in place."""
+    for name, value in list(vars(obj).items()):
+        if isinstance(value, PanelHandle):
+            setattr(obj, name, attach(value))
+    return obj
+
+def workers_inherit_memory(mp_context: Optional[BaseContext] = None) -> bool:
+    """
+    Whether pool workers are forked, and so already see the parent's panels.
+
+    Forked workers inherit the parent's memory copy-on-write and need no
+    shared panels; spawned and forkserver workers unpickle whatever they
+    are given.
+    """
+    method = mp_context.get_start_method() if mp_context is not None else multiprocessing.get_start_method()
+    return method == 'fork'
+
+class SharedPanelPool(ProcessPoolExecutor):
+    """
+    Process pool that holds references to shared panels for its lifetime.
+
+    The references are released when the pool shuts down, after its workers
+    have finished, so panels published for one pool are unlinked with it.
+    """
+
+    def __init__(
+        self,
+        handles: Iterable[PanelHandle],
+        registry: Optional[SharedPanelRegistry] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self._registry = registry or get_panel_registry()
+        self._panel_handles = list(handles)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        handles, self._panel_handles = self._panel_handles, []
+        for handle in handles:
+            self._registry.release(handle)
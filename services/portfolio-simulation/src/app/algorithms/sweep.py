@@ -0,0 +1,374 @@
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
+
+from .base import PortfolioOptimizer, PortfolioWeights
+from .batch import _iterate_in_thread
+from .covariance import CovarianceModel, estimate_covariance
+from .result_cache import ResultCache, canonical_params
+from .shared_panel import PanelHandle, SharedPanelPool, attach_attributes, share_attributes, workers_inherit_memory
+from .universe import ReturnsUniverse
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SweepResult:
+    """Outcome of one grid point: the portfolio, or the error that prevented it."""
+    index: int  # Position of the point in the grid's row-major order
+    params: Dict[str, Any]
+    portfolio: Optional[PortfolioWeights] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    warm_started: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to a JSON-serializable dictionary."""
+        result = {
+            "index": self.index,
+            "params": self.params,
+            "status": "success" if self.success else "failed",
+            "seconds": self.seconds,
+            "warm_started": self.warm_started
+        }
+        if self.success:
+            result.update(self.portfolio.to_dict())
+        else:
+            result["error"] = self.error
+        return result
+
+def snake_order(shape: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    Grid indices ordered so that consecutive points differ by one step in one parameter.
+
+    Like row-major order, but every other pass over an axis runs backwards
+    (a boustrophedon), so each point is a close neighbour of the one before it.
+    """
+    order: List[Tuple[int, ...]] = [()]
+    for size in shape:
+        forward, backward = range(size), range(size - 1, -1, -1)
+        order = [point + (i,) for k, point in enumerate(order) for i in (backward if k % 2 else forward)]
+    return order
+
+class ParameterSweep:
+    """
+    Runs one optimizer over every point of a parameter grid.
+
+    The grid is walked in snake order and cut into contiguous chunks; each
+    chunk is solved in a worker process, warm-starting every point from the
+    solution of the previous, neighbouring point. The returns panel and,
+    unless the covariance estimator is itself swept, the covariance model
+    are built once and published in shared memory, where the workers attach
+    to them when the pool starts instead of receiving copies with every task.
+
+    With a result cache, ``run_async`` answers the points already solved for
+    the same return window from it and only solves the rest.
+    """
+
+    def __init__(
+        self,
+        optimizer_class: Type[PortfolioOptimizer],
+        returns: pd.DataFrame,
+        grid: Mapping[str, Sequence[Any]],
+        options: Optional[Dict[str, Any]] = None,
+        optimize_options: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+        chunks_per_worker: int = 4,
+        warm_start: bool = True,
+        cache: Optional[ResultCache] = None,
+        pool_slots: Optional[threading.Semaphore] = None
+    ):
+        """
+        Initialize the sweep.
+
+        Args:
+            optimizer_class: PortfolioOptimizer subclass to run
+            returns: DataFrame with asset returns (rows=time, columns=assets)
+            grid: Constructor argument -> values to sweep, e.g.
+                ``{'risk_aversion': [1, 2.5, 5], 'tau': [0.025, 0.05]}``
+            options: Constructor arguments shared by all points
+            optimize_options: Arguments of every ``optimize()`` call, e.g.
+                the ``views`` of a Black-Litterman sweep
+            max_workers: Worker processes (default: one per CPU). With 1 the
+                grid is solved in the calling process.
+            chunks_per_worker: Chunks the grid is cut into per worker; more
+                chunks balance load better, fewer keep more warm starts
+            warm_start: Start each point from the previous point's solution
+            cache: Optional result cache used by ``run_async``; only used
+                when all settings are plain values (e.g. a named covariance
+                estimator rather than an estimator object)
+            pool_slots: Optional semaphore held while this sweep's process
+                pool runs, shared across sweeps and batches to bound the
+                pools open at once
+        """
+        options = dict(options or {})
+        accepted = inspect.signature(optimizer_class.__init__).parameters
+        unknown = (set(grid) | set(options)) - set(accepted) - {'self'}
+        if unknown:
+            raise ValueError(f"{optimizer_class.__name__} does not accept: {sorted(unknown)}")
+        overlap = set(grid) & set(options)
+        if overlap:
+            raise ValueError(f"Parameters both swept and fixed: {sorted(overlap)}")
+        optimize_options = dict(optimize_options or {})
+        unknown = set(optimize_options) - set(inspect.signature(optimizer_class.optimize).parameters) - {'self'}
+        if unknown:
+            raise ValueError(f"{optimizer_class.__name__}.optimize does not accept: {sorted(unknown)}")
+        if not grid or any(len(values) == 0 for values in grid.values()):
+            raise ValueError("Sweep needs at least one parameter with at least one value")
+        if chunks_per_worker < 1:
+            raise ValueError("chunks_per_worker must be at least 1")
+
+        self.optimizer_class = optimizer_class
+        self.returns = returns
+        self.grid = {name: list(values) for name, values in grid.items()}
+        self.max_workers = max_workers
+        self.chunks_per_worker = chunks_per_worker
+        self.optimize_options = optimize_options
+        self.warm_start = warm_start
+        self.cache = cache
+        self.pool_slots = pool_slots
+        # Cache keys use the settings as given, before the covariance is estimated
+        self._cache_options = {**options, **optimize_options}
+        if cache is not None:
+            try:
+                canonical_params([self._cache_options, self.grid])
+            except TypeError:
+                self.cache = None
+        # Estimate a fixed covariance once rather than at every grid point
+        if 'covariance' in accepted and 'covariance' not in self.grid:
+            options['covariance'] = estimate_covariance(returns, options.get('covariance', 'sample'))
+        self.options = options
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Workers get a pickled copy; they neither read the cache nor take pool
+        # slots, and both hold locks, which cannot be pickled
+        state = dict(self.__dict__)
+        state['cache'] = None
+        state['pool_slots'] = None
+        return state
+
+    @property
+    def num_points(self) -> int:
+        return math.prod(len(values) for values in self.grid.values())
+
+    def points(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """(row-major index, parameters) of every grid point, in snake order."""
+        names = list(self.grid)
+        shape = [len(self.grid[name]) for name in names]
+        points = []
+        for indices in snake_order(shape):
+            index = 0
+            for i, size in zip(indices, shape):
+                index = index * size + i
+            points.append((index, {name: self.grid[name][i] for name, i in zip(names, indices)}))
+        return points
+
+    def chunks(
+        self,
+        workers: int,
+        points: Optional[List[Tuple[int, Dict[str, Any]]]] = None
+    ) -> List[List[Tuple[int, Dict[str, Any]]]]:
+        """Contiguous runs of the snake order (or of ``points``), about ``chunks_per_worker`` per worker."""
+        points = self.points() if points is None else points
+        size = max(1, math.ceil(len(points) / (workers * self.chunks_per_worker)))
+        return [points[i:i + size] for i in range(0, len(points), size)]
+
+    def cache_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Everything that determines a point's result besides the returns."""
+        return {**self._cache_options, **params}
+
+    def solve_chunk(self, chunk: List[Tuple[int, Dict[str, Any]]]) -> List[SweepResult]:
+        """Solve a run of neighbouring points in the calling process."""
+        return list(self._solve_points(chunk))
+
+    def _solve_points(self, points: List[Tuple[int, Dict[str, Any]]]) -> Iterator[SweepResult]:
+        """
+        Solve points in order, yielding each result as soon as it is available.
+
+        Failing points are reported in their result instead of raised, and
+        the next point falls back to the last successful solution.
+        """
+        previous: Optional[PortfolioWeights] = None
+        # The points share one universe, so moments are computed once per run
+        universe = ReturnsUniverse(self.returns)
+        for index, params in points:
+            start = time.perf_counter()
+            try:
+                optimizer = self.optimizer_class(universe, **self.options, **params)
+                if self.warm_start and previous is not None:
+                    optimizer.warm_start(previous)
+                portfolio = optimizer.optimize(**self.optimize_options)
+            except Exception as e:
+                # e.g. an option of the wrong type: fail the point, not the sweep
+                logger.warning(f"Sweep point {params} failed: {e!r}")
+                yield SweepResult(index, params, error=str(e), seconds=time.perf_counter() - start)
+                continue
+            yield SweepResult(
+                index,
+                params,
+                portfolio=portfolio,
+                seconds=time.perf_counter() - start,
+                warm_started=self.warm_start and previous is not None
+            )
+            previous = portfolio
+
+    def run(self, executor: Optional[Executor] = None) -> Iterator[SweepResult]:
+        """
+        Solve every grid point, yielding results chunk by chunk as they complete.
+
+        Args:
+            executor: Optional executor to use instead of a new process pool.
+                It must already hold this sweep, e.g. one created by ``executor()``.
+
+        Yields:
+            SweepResult per grid point; ``index`` identifies its position in the grid
+        """
+        yield from self._run_points(self.points(), executor)
+
+    async def run_async(self) -> AsyncIterator[SweepResult]:
+        """
+        ``run()`` with cache lookups and stores awaited on the event loop.
+
+        Points found in the cache are yielded first; the rest are solved
+        from a worker thread, so the solves never block the event loop.
+
+        Yields:
+            SweepResult per grid point, in completion order
+        """
+        if self.cache is None:
+            async for result in _iterate_in_thread(self.run()):
+                yield result
+            return
+
+        algorithm = self.optimizer_class.__name__
+        version = await self.cache.aversion(self.returns)
+        points = self.points()
+        cached = await self.cache.aget_many(
+            version, algorithm, [self.cache_params(params) for _, params in points]
+        )
+        misses = []
+        for (index, params), portfolio in zip(points, cached):
+            if portfolio is None:
+                misses.append((index, params))
+            else:
+                yield SweepResult(index, params, portfolio=portfolio)
+
+        async for result in _iterate_in_thread(self._run_points(misses, None)):
+            if result.success:
+                await self.cache.aput(version, algorithm, self.cache_params(result.params), result.portfolio)
+            yield result
+
+    def _run_points(
+        self,
+        points: List[Tuple[int, Dict[str, Any]]],
+        executor: Optional[Executor]
+    ) -> Iterator[SweepResult]:
+        workers = self.max_workers or os.cpu_count() or 1
+        if executor is not None:
+            yield from self._run_with(executor, self.chunks(workers, points))
+        elif workers == 1 or len(points) <= 1:
+            # One unbroken chain of warm starts
+            yield from self._solve_points(points)
+        else:
+            with self.pool_slots or nullcontext(), self.executor() as pool:
+                yield from self._run_with(pool, self.chunks(workers, points))
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool whose workers hold this sweep's returns and options."""
+        # Spawned workers attach to the returns and a fixed dense covariance in shared memory
+        published: Dict[int, PanelHandle] = {}
+        sweep = self
+        if not workers_inherit_memory():
+            sweep = share_attributes(self, ['returns'], published)
+            covariance = self.options.get('covariance')
+            if isinstance(covariance, CovarianceModel):
+                sweep.options = {**self.options, 'covariance': share_attributes(covariance, ['matrix'], published)}
+        return SharedPanelPool(
+            published.values(),
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(sweep,)
+        )
+
+    def _run_with(
+        self,
+        executor: Executor,
+        chunks: List[List[Tuple[int, Dict[str, Any]]]]
+    ) -> Iterator[SweepResult]:
+        submitted: Dict[Future, List[Tuple[int, Dict[str, Any]]]] = {
+            executor.submit(_solve_in_worker, chunk): chunk for chunk in chunks
+        }
+        pending = set(submitted)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # e.g. a worker died: fail the points of its chunk, not the whole sweep
+                        logger.warning(f"Sweep chunk of {len(submitted[future])} points failed in its worker: {e!r}")
+                        results = [
+                            SweepResult(index, params, error=str(e) or type(e).__name__)
+                            for index, params in submitted[future]
+                        ]
+                    yield from results
+        finally:
+            # The consumer stopped early (e.g. a dropped client): don't solve the rest
+            for future in pending:
+                future.cancel()
+
+# The sweep a pool worker was started with, set once per process by _init_worker
+_worker_sweep: Optional[ParameterSweep] = None
+
+def _init_worker(sweep: ParameterSweep) -> None:
+    global _worker_sweep
+    covariance = sweep.options.get('covariance')
+    if isinstance(covariance, CovarianceModel):
+        attach_attributes(covariance)
+    _worker_sweep = attach_attributes(sweep)
+
+def _solve_in_worker(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[SweepResult]:
+    return _worker_sweep.solve_chunk(chunk)
+
+def sweep_parameters(
+    optimizer_class: Type[PortfolioOptimizer],
+    returns: pd.DataFrame,
+    grid: Mapping[str, Sequence[Any]],
+    options: Optional[Dict[str, Any]] = None,
+    optimize_options: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None
+) -> Iterator[SweepResult]:
+    """
+    Run an optimizer over every point of a parameter grid, yielding results as they complete.
+
+    Args:
+        optimizer_class: PortfolioOptimizer subclass to run
+        returns: DataFrame with asset returns (rows=time, columns=assets)
+        grid: Constructor argument -> values to sweep
+        options: Constructor arguments shared by all points
+        optimize_options: Arguments of every ``optimize()`` call, e.g. Black-Litterman ``views``
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        Iterator of SweepResult in completion order
+    """
+    return ParameterSweep(
+        optimizer_class,
+        returns,
+        grid,
+        options=options,
+        optimize_options=optimize_options,
+        max_workers=max_workers
+    ).run()
@@ -0,0 +1,181 @@
+import hashlib
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .covariance import (
+    COVARIANCE_ESTIMATORS,
+    CovarianceEstimator,
+    CovarianceLike,
+    CovarianceModel,
+)
+
+
+class ReturnsUniverse:
+    """
+    Returns panel with lazily computed, memoized statistics.
+
+    Every optimizer accepts a universe in place of a returns DataFrame;
+    optimizers built on the same universe share its moments, so within one
+    request each of mean, covariance, standard deviation and correlation is
+    computed at most once, and only if something uses it. Covariance models
+    of named estimators are memoized too.
+
+    The statistics are NumPy arrays in asset order and read-only, as they
+    are shared. Panels without missing values are handled in NumPy; with
+    missing values the statistics follow pandas (``mean`` skips NaNs,
+    ``cov`` uses pairwise complete observations).
+    """
+
+    def __init__(
+        self,
+        returns: Union[pd.DataFrame, np.ndarray],
+        assets: Optional[Sequence[str]] = None,
+        index: Optional[pd.Index] = None,
+        mean: Optional[np.ndarray] = None,
+        cov: Optional[np.ndarray] = None
+    ):
+        """
+        Wrap a returns panel.
+
+        Args:
+            returns: Asset returns (rows=time, columns=assets) as a DataFrame
+                or a 2-D array
+            assets: Asset names of an array (default: '0', '1', ...)
+            index: Dates of an array (default: a RangeIndex)
+            mean: Known expected returns of the panel, used instead of computing them
+            cov: Known sample covariance of the panel, used instead of computing it
+                (e.g. carried forward by RollingMoments)
+        """
+        if isinstance(returns, pd.DataFrame):
+            self._frame: Optional[pd.DataFrame] = returns
+            values = returns.to_numpy(dtype=float)
+            assets = returns.columns.tolist()
+            index = returns.index
+        else:
+            self._frame = None
+            values = np.asarray(returns, dtype=float)
+            if values.ndim != 2:
+                raise ValueError("Returns must be a 2-D array (rows=time, columns=assets)")
+            assets = [str(i) for i in range(values.shape[1])] if assets is None else list(assets)
+            index = pd.RangeIndex(len(values)) if index is None else pd.Index(index)
+            if len(assets) != values.shape[1] or len(index) != len(values):
+                raise ValueError("Asset names and dates must match the shape of the returns")
+        # A read-only view, leaving the caller's array writeable
+        self.values = _read_only(values.view())
+        self.assets: List[str] = assets
+        self.index = index
+        if mean is not None:
+            self.__dict__['mean'] = self._seed(mean, (self.num_assets,))
+        if cov is not None:
+            self.__dict__['cov'] = self._seed(cov, (self.num_assets, self.num_assets))
+        self._models: Dict[str, CovarianceModel] = {}
+
+    @classmethod
+    def of(cls, returns: Union['ReturnsUniverse', pd.DataFrame, np.ndarray]) -> 'ReturnsUniverse':
+        """The universe itself, or a new universe wrapping a returns panel."""
+        return returns if isinstance(returns, cls) else cls(returns)
+
+    @staticmethod
+    def _seed(values: np.ndarray, shape: tuple) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if values.shape != shape:
+            raise ValueError(f"Expected statistics of shape {shape}, got {values.shape}")
+        return _read_only(values.view())
+
+    @property
+    def num_assets(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def num_observations(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The panel as a DataFrame, for code that needs dates or labels."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.values, index=self.index, columns=self.assets)
+        return self._frame
+
+    @cached_property
+    def has_missing(self) -> bool:
+        return bool(np.isnan(self.values).any())
+
+    @cached_property
+    def mean(self) -> np.ndarray:
+        """Mean return of each asset."""
+        if self.has_missing:
+            return _read_only(self.frame.mean().to_numpy())
+        return _read_only(self.values.mean(axis=0))
+
+    @cached_property
+    def cov(self) -> np.ndarray:
+        """Unbiased sample covariance matrix."""
+        if self.has_missing:
+            return _read_only(self.frame.cov().to_numpy())
+        if self.num_observations < 2:
+            return _read_only(np.full((self.num_assets, self.num_assets), np.nan))
+        centered = self.values - self.mean
+        return _read_only(centered.T @ centered / (self.num_observations - 1))
+
+    @cached_property
+    def std(self) -> np.ndarray:
+        """Sample standard deviation of each asset."""
+        return _read_only(np.sqrt(np.diag(self.cov)))
+
+    @cached_property
+    def corr(self) -> np.ndarray:
+        """Sample correlation matrix, clipped to [-1, 1] against rounding."""
+        corr = self.cov / self.std[:, None]
+        corr /= self.std
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return _read_only(corr)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest identifying the panel: its assets, dates and values."""
+        digest = hashlib.sha256(repr((self.assets, self.index.tolist())).encode())
+        digest.update(memoryview(np.ascontiguousarray(self.values)).cast('B'))
+        return digest.hexdigest()
+
+    def covariance_model(self, covariance: CovarianceLike = 'sample') -> CovarianceModel:
+        """
+        Covariance model of the panel.
+
+        Models of named estimators are estimated once per universe; the
+        sample estimator uses ``cov``. Estimator instances may carry
+        arbitrary parameters or data and are not memoized.
+
+        Args:
+            covariance: Estimator name ('sample', 'ledoit_wolf', 'ewma', 'factor'),
+                a CovarianceEstimator instance, or an already estimated CovarianceModel
+        """
+        if isinstance(covariance, CovarianceModel):
+            model = covariance
+        elif isinstance(covariance, CovarianceEstimator):
+            model = covariance.estimate_universe(self)
+        elif covariance in COVARIANCE_ESTIMATORS:
+            model = self._models.get(covariance)
+            if model is None:
+                model = COVARIANCE_ESTIMATORS[covariance]().estimate_universe(self)
+                self._models[covariance] = model
+        else:
+            raise ValueError(
+                f"Unknown covariance estimator: {covariance}. Use one of {sorted(COVARIANCE_ESTIMATORS)}"
+            )
+        if model.num_assets != self.num_assets:
+            raise ValueError("Covariance model does not match the number of assets")
+        return model
+
+
+def returns_fingerprint(returns: Union[ReturnsUniverse, pd.DataFrame]) -> str:
+    """Digest identifying a returns panel: its assets, dates and values."""
+    return ReturnsUniverse.of(returns).fingerprint
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
@@ -0,0 +1,280 @@
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from .covariance import CovarianceLike
+from .universe import ReturnsUniverse
+
+WHAT_IF_FUNDING = ('cash', 'pro_rata')
+
+# Analyzers by (returns fingerprint, covariance estimator, weights, confidence, horizon),
+# least recently used first. Each holds an N-vector state plus its covariance model.
+ANALYZER_CACHE_SIZE = 16
+
+_analyzer_cache: 'OrderedDict[Tuple[Any, ...], WhatIfAnalyzer]' = OrderedDict()
+_analyzer_cache_lock = threading.Lock()
+
+
+def clear_analyzer_cache() -> None:
+    """Drop all cached what-if analyzers."""
+    with _analyzer_cache_lock:
+        _analyzer_cache.clear()
+
+
+@dataclass
+class Trade:
+    """A proposed trade: the change in portfolio weight per asset (positive buys, negative sells)."""
+    trade_id: str
+    changes: Dict[str, float]
+
+
+@dataclass
+class RiskProfile:
+    """Risk of a portfolio; returns and volatility are annualized from daily returns."""
+    expected_return: float
+    volatility: float
+    value_at_risk: float  # Loss over the horizon, as a fraction of the portfolio value
+    diversification_ratio: float  # Weighted asset volatilities over portfolio volatility
+    risk_contributions: Dict[str, float]  # Ticker -> share of the portfolio variance
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TradeImpact:
+    """Risk of the portfolio after a trade and its change, or why the trade could not be evaluated."""
+    trade_id: str
+    changes: Dict[str, float]
+    after: Optional[RiskProfile] = None
+    change: Dict[str, float] = field(default_factory=dict)  # Metric -> after minus before
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the impact to a JSON-serializable dictionary."""
+        result = {
+            'trade_id': self.trade_id,
+            'status': 'success' if self.success else 'failed',
+            'changes': self.changes
+        }
+        if self.success:
+            result['after'] = self.after.to_dict()
+            result['change'] = self.change
+        else:
+            result['error'] = self.error
+        return result
+
+
+class WhatIfAnalyzer:
+    """
+    Effect of proposed trades on a portfolio's risk, without a full risk calculation per trade.
+
+    The products a risk calculation is built from are computed once for the
+    current weights w: Σw, the variance w'Σw, the asset volatilities and
+    the risk contributions. A trade changing the weights of k assets by Δ
+    gives Σ(αw + Δ) = αΣw + Σ[:, k]Δ, so only the k covariance columns of
+    the traded assets are needed and the new volatility, VaR,
+    diversification ratio and risk contributions follow in O(N·k) instead
+    of O(N²). Many trades are evaluated at once as matrix products.
+
+    Funding: with 'cash' the changes are applied as given (a buy without a
+    matching sell is paid from cash, which carries no risk); with 'pro_rata'
+    the net amount bought is raised by scaling down every holding, so the
+    total invested stays the same.
+    """
+
+    def __init__(
+        self,
+        returns: Union[pd.DataFrame, ReturnsUniverse],
+        weights: Mapping[str, float],
+        covariance: CovarianceLike = 'sample',
+        confidence: float = 0.95,
+        horizon: int = 1
+    ):
+        """
+        Compute the risk state of the current portfolio.
+
+        Args:
+            returns: Daily asset returns (rows=time, columns=assets) or a ReturnsUniverse;
+                trades can buy any of its assets
+            weights: Ticker -> current portfolio weight; missing assets are not held
+            covariance: Covariance estimator name, CovarianceEstimator or CovarianceModel
+            confidence: Confidence level of the parametric (normal) value at risk
+            horizon: Value at risk horizon in days
+
+        Raises:
+            ValueError: For weights of unknown assets or invalid settings
+        """
+        if not 0.5 < confidence < 1.0:
+            raise ValueError("Confidence must be between 0.5 and 1")
+        if horizon < 1:
+            raise ValueError("Horizon must be at least one day")
+        self.universe = ReturnsUniverse.of(returns)
+        self.assets = self.universe.assets
+        self._positions = {asset: i for i, asset in enumerate(self.assets)}
+        self.weights = _weights_vector(self.assets, weights)
+        self.confidence = confidence
+        self.horizon = horizon
+        self._z = float(norm.ppf(confidence))
+
+        self.expected_returns = self.universe.mean
+        self.covariance_model = self.universe.covariance_model(covariance)
+        self.asset_volatility = np.sqrt(np.maximum(self.covariance_model.diagonal(), 0.0))
+        # The one O(N²) product; every trade is evaluated from it
+        self.cov_weights = self.covariance_model.matvec(self.weights)
+        # Risk of the current portfolio, with the contributions of the assets held
+        held = [asset for asset, weight in zip(self.assets, self.weights) if weight != 0]
+        self.profile = self._profiles(self.weights[:, None], self.cov_weights[:, None], [held])[0]
+
+    def evaluate(self, trades: Sequence[Trade], funding: str = 'cash') -> List[TradeImpact]:
+        """
+        Evaluate trades independently, each against the current portfolio.
+
+        The risk contributions after a trade are reported for the traded
+        assets and for the asset contributing most.
+
+        Args:
+            trades: Proposed trades
+            funding: 'cash' or 'pro_rata' (see the class docstring)
+
+        Returns:
+            TradeImpact per trade, in order; trades with unknown assets or
+            without changes report an error instead
+        """
+        if funding not in WHAT_IF_FUNDING:
+            raise ValueError(f"Unknown funding: {funding}. Use one of {WHAT_IF_FUNDING}")
+        impacts: List[Optional[TradeImpact]] = [None] * len(trades)
+        valid = []
+        for i, trade in enumerate(trades):
+            unknown = set(trade.changes) - set(self._positions)
+            if unknown:
+                impacts[i] = TradeImpact(trade.trade_id, trade.changes, error=f"Unknown assets: {sorted(unknown)}")
+            elif not trade.changes:
+                impacts[i] = TradeImpact(trade.trade_id, trade.changes, error="Trade changes no weights")
+            else:
+                valid.append(i)
+        if not valid:
+            return impacts
+
+        # Weight changes of the traded assets only (k x trades)
+        traded = sorted({self._positions[asset] for i in valid for asset in trades[i].changes})
+        rows = {position: row for row, position in enumerate(traded)}
+        deltas = np.zeros((len(traded), len(valid)))
+        for column, i in enumerate(valid):
+            for asset, change in trades[i].changes.items():
+                deltas[rows[self._positions[asset]], column] += change
+        traded = np.array(traded, dtype=int)
+
+        scale = np.ones(len(valid))
+        if funding == 'pro_rata':
+            invested = self.weights.sum()
+            if np.isclose(invested, 0.0):
+                raise ValueError("Pro rata funding needs a portfolio with holdings")
+            scale -= deltas.sum(axis=0) / invested
+        weights = self.weights[:, None] * scale
+        weights[traded] += deltas
+        cov_weights = self.cov_weights[:, None] * scale + self.covariance_model.columns(traded) @ deltas
+
+        profiles = self._profiles(weights, cov_weights, [list(trades[i].changes) for i in valid])
+        for i, after in zip(valid, profiles):
+            impacts[i] = TradeImpact(
+                trades[i].trade_id,
+                trades[i].changes,
+                after=after,
+                change={
+                    'expected_return': after.expected_return - self.profile.expected_return,
+                    'volatility': after.volatility - self.profile.volatility,
+                    'value_at_risk': after.value_at_risk - self.profile.value_at_risk,
+                    'diversification_ratio': after.diversification_ratio - self.profile.diversification_ratio
+                }
+            )
+        return impacts
+
+    def _profiles(
+        self,
+        weights: np.ndarray,
+        cov_weights: np.ndarray,
+        reported: List[List[str]]
+    ) -> List[RiskProfile]:
+        """
+        Risk profiles of portfolios given as columns, from their weights and Σ times the weights.
+
+        Args:
+            weights: Weights (N x portfolios)
+            cov_weights: Σ @ weights
+            reported: Assets whose risk contributions to report per portfolio,
+                besides the largest contributor
+        """
+        variance = np.maximum(np.einsum('ij,ij->j', weights, cov_weights), 0.0)
+        volatility = np.sqrt(variance)
+        mean = self.expected_returns @ weights
+        value_at_risk = self._z * volatility * np.sqrt(self.horizon) - mean * self.horizon
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diversification = np.where(volatility > 0, self.asset_volatility @ np.abs(weights) / volatility, 1.0)
+            contributions = np.where(variance > 0, weights * cov_weights / variance, 0.0)
+
+        largest = np.argmax(contributions, axis=0)
+        profiles = []
+        for j in range(weights.shape[1]):
+            assets = list(reported[j])
+            if self.assets[largest[j]] not in assets:
+                assets.append(self.assets[largest[j]])
+            risk_contributions = {asset: float(contributions[self._positions[asset], j]) for asset in assets}
+            profiles.append(RiskProfile(
+                expected_return=float((1 + mean[j]) ** 252 - 1),
+                volatility=float(volatility[j] * np.sqrt(252)),
+                value_at_risk=float(value_at_risk[j]),
+                diversification_ratio=float(diversification[j]),
+                risk_contributions=risk_contributions
+            ))
+        return profiles
+
+
+def what_if_analyzer(
+    returns: Union[pd.DataFrame, ReturnsUniverse],
+    weights: Mapping[str, float],
+    covariance: CovarianceLike = 'sample',
+    confidence: float = 0.95,
+    horizon: int = 1
+) -> WhatIfAnalyzer:
+    """
+    WhatIfAnalyzer of a portfolio, reused by later calls for the same portfolio.
+
+    A user trying out trades sends the same returns and weights again and
+    again; with a named covariance estimator the covariance model and Σw
+    are then taken from the cache instead of being recomputed. Arguments
+    are those of WhatIfAnalyzer.
+    """
+    if not isinstance(covariance, str):
+        return WhatIfAnalyzer(returns, weights, covariance=covariance, confidence=confidence, horizon=horizon)
+
+    universe = ReturnsUniverse.of(returns)
+    vector = _weights_vector(universe.assets, weights)
+    key = (universe.fingerprint, covariance, vector.tobytes(), confidence, horizon)
+    with _analyzer_cache_lock:
+        analyzer = _analyzer_cache.get(key)
+        if analyzer is not None:
+            _analyzer_cache.move_to_end(key)
+            return analyzer
+    analyzer = WhatIfAnalyzer(universe, weights, covariance=covariance, confidence=confidence, horizon=horizon)
+    with _analyzer_cache_lock:
+        _analyzer_cache[key] = analyzer
+        while len(_analyzer_cache) > ANALYZER_CACHE_SIZE:
+            _analyzer_cache.popitem(last=False)
+    return analyzer
+
+
+def _weights_vector(assets: List[str], weights: Mapping[str, float]) -> np.ndarray:
+    unknown = set(weights) - set(assets)
+    if unknown:
+        raise ValueError(f"Weights reference assets without returns: {sorted(unknown)}")
+    return np.array([weights.get(asset, 0.0) for asset in assets], dtype=float)
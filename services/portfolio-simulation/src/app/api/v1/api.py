@@ -1,24 +1,54 @@
 """
 API v1 router for Portfolio Simulation Service
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+import json
+import threading
+
+import pandas as pd
+from redis import asyncio as aioredis
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
+from uuid import UUID
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.security import get_current_user_id
-from ..models.portfolio import Portfolio, PortfolioCreate, PortfolioUpdate
-from ..models.asset import Asset, AssetCreate
-from ..models.simulation import Simulation, SimulationCreate, SimulationResult
-from ..algorithms.mean_variance import MeanVarianceOptimizer
-from ..algorithms.risk_parity import RiskParityOptimizer
-from ..algorithms.black_litterman import BlackLittermanOptimizer
-from ..algorithms.hierarchical_risk_parity import HierarchicalRiskParityOptimizer
+from ...core.config import settings
+from ...core.database import get_db
+from ...core.security import get_current_user_id
+from ...models.portfolio import Portfolio
+from ...models.simulation import Simulation, SimulationStatus
+from ...algorithms.risk_parity import RiskParityOptimizer
+from ...algorithms.batch import BatchOptimizer
+from ...algorithms.registry import get_optimizer_class
+from ...algorithms.result_cache import ResultCache
+from ...algorithms.sweep import ParameterSweep
+from ...algorithms.what_if import what_if_analyzer
+from ...schemas.optimization import BatchOptimizationIn, MeanVarianceIn, ParameterSweepIn, RiskParityIn
+from ...schemas.portfolio import (
+    Asset, PortfolioCreate, PortfolioResponse, PortfolioUpdate,
+    SimulationCreate, SimulationParameters, SimulationResult
+)
+from ...schemas.risk import WhatIfIn
+from ...jobs.runner import SimulationRunner
+from ...storage.results import ResultStore, find_series, get_result_store
 
 # Create API router
 api_router = APIRouter()
 
+# Optimization results shared across requests (and, through Redis, across workers)
+result_cache = ResultCache(
+    aioredis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=1),
+    memory_size=settings.RESULT_CACHE_MEMORY_SIZE,
+    ttl=settings.RESULT_CACHE_TTL
+)
+
+# Held while a batch or sweep process pool runs, bounding the pools open at once
+optimization_pools = threading.BoundedSemaphore(settings.OPTIMIZATION_MAX_POOLS)
+
 # Portfolio endpoints
-@api_router.get("/portfolios", response_model=List[Portfolio])
+@api_router.get("/portfolios", response_model=List[PortfolioResponse])
 async def get_portfolios(
     user_id: str = Depends(get_current_user_id),
     skip: int = 0,
@@ -28,37 +58,45 @@ async def get_portfolios(
     # TODO: Implement database query
     return []
 
-@api_router.post("/portfolios", response_model=Portfolio)
+@api_router.post("/portfolios", response_model=PortfolioResponse)
 async def create_portfolio(
     portfolio: PortfolioCreate,
     user_id: str = Depends(get_current_user_id)
 ):
     """Create a new portfolio"""
     # TODO: Implement portfolio creation
-    return Portfolio(
+    return PortfolioResponse(
         id="portfolio_1",
         name=portfolio.name,
-        user_id=user_id,
-        assets=[],
-        created_at="2024-01-01T00:00:00Z"
+        description=portfolio.description,
+        base_currency=portfolio.base_currency,
+        current_value=portfolio.initial_balance,
+        initial_balance=portfolio.initial_balance,
+        return_percentage=0.0,
+        created_at="2024-01-01T00:00:00Z",
+        updated_at="2024-01-01T00:00:00Z"
     )
 
-@api_router.get("/portfolios/{portfolio_id}", response_model=Portfolio)
+@api_router.get("/portfolios/{portfolio_id}", response_model=PortfolioResponse)
 async def get_portfolio(
     portfolio_id: str,
     user_id: str = Depends(get_current_user_id)
 ):
     """Get a specific portfolio"""
     # TODO: Implement portfolio retrieval
-    return Portfolio(
+    return PortfolioResponse(
         id=portfolio_id,
         name="Sample Portfolio",
-        user_id=user_id,
-        assets=[],
-        created_at="2024-01-01T00:00:00Z"
+        description=None,
+        base_currency="USD",
+        current_value=10000.0,
+        initial_balance=10000.0,
+        return_percentage=0.0,
+        created_at="2024-01-01T00:00:00Z",
+        updated_at="2024-01-01T00:00:00Z"
     )
 
-@api_router.put("/portfolios/{portfolio_id}", response_model=Portfolio)
+@api_router.put("/portfolios/{portfolio_id}", response_model=PortfolioResponse)
 async def update_portfolio(
     portfolio_id: str,
     portfolio_update: PortfolioUpdate,
@@ -66,12 +104,16 @@ async def update_portfolio(
 ):
     """Update a portfolio"""
     # TODO: Implement portfolio update
-    return Portfolio(
+    return PortfolioResponse(
         id=portfolio_id,
         name=portfolio_update.name or "Updated Portfolio",
-        user_id=user_id,
-        assets=[],
-        created_at="2024-01-01T00:00:00Z"
+        description=portfolio_update.description,
+        base_currency=portfolio_update.base_currency or "USD",
+        current_value=10000.0,
+        initial_balance=10000.0,
+        return_percentage=0.0,
+        created_at="2024-01-01T00:00:00Z",
+        updated_at="2024-01-01T00:00:00Z"
     )
 
 @api_router.delete("/portfolios/{portfolio_id}")
@@ -86,36 +128,29 @@ async def delete_portfolio(
 # Asset endpoints
 @api_router.post("/assets", response_model=Asset)
 async def add_asset(
-    asset: AssetCreate,
+    asset: Asset,
     portfolio_id: str,
     user_id: str = Depends(get_current_user_id)
 ):
     """Add an asset to a portfolio"""
     # TODO: Implement asset addition
-    return Asset(
-        id="asset_1",
-        symbol=asset.symbol,
-        name=asset.name,
-        weight=asset.weight,
-        portfolio_id=portfolio_id
-    )
+    return asset
 
 # Simulation endpoints
-@api_router.post("/simulations", response_model=Simulation)
+@api_router.post("/simulations")
 async def create_simulation(
     simulation: SimulationCreate,
     user_id: str = Depends(get_current_user_id)
 ):
     """Create a new simulation"""
     # TODO: Implement simulation creation
-    return Simulation(
-        id="simulation_1",
-        name=simulation.name,
-        portfolio_id=simulation.portfolio_id,
-        algorithm=simulation.algorithm,
-        status="running",
-        created_at="2024-01-01T00:00:00Z"
-    )
+    return {
+        "id": "simulation_1",
+        "name": simulation.name,
+        "portfolio_id": simulation.portfolio_id,
+        "status": SimulationStatus.PENDING.value,
+        "created_at": "2024-01-01T00:00:00Z"
+    }
 
 @api_router.get("/simulations/{simulation_id}", response_model=SimulationResult)
 async def get_simulation_result(
@@ -126,107 +161,409 @@ async def get_simulation_result(
     # TODO: Implement simulation result retrieval
     return SimulationResult(
         simulation_id=simulation_id,
-        status="completed",
-        results={
+        portfolio_id="portfolio_1",
+        parameters=SimulationParameters(),
+        metrics={
             "expected_return": 0.08,
             "volatility": 0.15,
             "sharpe_ratio": 0.53,
             "weights": {"AAPL": 0.4, "GOOGL": 0.3, "MSFT": 0.3}
         },
+        percentiles={},
         created_at="2024-01-01T00:00:00Z"
     )
 
-@api_router.post("/simulations/{simulation_id}/run")
+def get_simulation_runner(request: Request) -> SimulationRunner:
+    """The application's simulation job runner."""
+    return request.app.state.simulation_runner
+
+def parse_simulation_id(simulation_id: str) -> UUID:
+    """Parse a simulation id, treating malformed ids as unknown simulations."""
+    try:
+        return UUID(simulation_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Simulation {simulation_id} not found"
+        )
+
+async def get_user_simulation(simulation_id: str, user_id: str, db: AsyncSession) -> Simulation:
+    """
+    A simulation of one of the user's portfolios.
+
+    Simulations of other users' portfolios are reported as not found, so
+    their ids cannot be probed.
+    """
+    sim_id = parse_simulation_id(simulation_id)
+    try:
+        owner = UUID(user_id)
+    except ValueError:
+        owner = None
+    simulation = None
+    if owner is not None:
+        simulation = (await db.execute(
+            select(Simulation)
+            .join(Portfolio, Simulation.portfolio_id == Portfolio.id)
+            .where(Simulation.id == sim_id, Portfolio.user_id == owner)
+        )).scalar_one_or_none()
+    if simulation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Simulation {simulation_id} not found"
+        )
+    return simulation
+
+@api_router.post("/simulations/{simulation_id}/run", status_code=status.HTTP_202_ACCEPTED)
 async def run_simulation(
     simulation_id: str,
-    algorithm: str = "mean_variance",
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    runner: SimulationRunner = Depends(get_simulation_runner)
 ):
-    """Run a portfolio simulation"""
-    try:
-        # Initialize optimizer based on algorithm
-        if algorithm == "mean_variance":
-            optimizer = MeanVarianceOptimizer()
-        elif algorithm == "risk_parity":
-            optimizer = RiskParityOptimizer()
-        elif algorithm == "black_litterman":
-            optimizer = BlackLittermanOptimizer()
-        elif algorithm == "hierarchical_risk_parity":
-            optimizer = HierarchicalRiskParityOptimizer()
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported algorithm: {algorithm}"
-            )
+    """Queue a simulation for the job runner; returns without waiting for it to run"""
+    simulation = await get_user_simulation(simulation_id, user_id, db)
+    if not await runner.submit(simulation.id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Simulation {simulation_id} is already running"
+        )
 
-        # TODO: Get portfolio data from database
-        # TODO: Run optimization
-        # TODO: Save results to database
+    return {
+        "simulation_id": simulation_id,
+        "status": SimulationStatus.PENDING.value,
+        "message": "Simulation queued"
+    }
+
+@api_router.post("/simulations/{simulation_id}/cancel")
+async def cancel_simulation(
+    simulation_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    runner: SimulationRunner = Depends(get_simulation_runner)
+):
+    """Cancel a queued or running simulation"""
+    simulation = await get_user_simulation(simulation_id, user_id, db)
+    if not await runner.cancel(simulation.id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Simulation {simulation_id} already finished"
+        )
+
+    return {
+        "simulation_id": simulation_id,
+        "status": SimulationStatus.CANCELLED.value
+    }
+
+@api_router.get("/simulations/{simulation_id}/status")
+async def get_simulation_status(
+    simulation_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status and progress of a simulation"""
+    simulation = await get_user_simulation(simulation_id, user_id, db)
 
-        return {
-            "simulation_id": simulation_id,
-            "status": "running",
-            "message": f"Simulation started with {algorithm} algorithm"
-        }
+    return {
+        "simulation_id": simulation_id,
+        "status": simulation.status.value,
+        "progress": simulation.progress,
+        "estimated_seconds_remaining": simulation.get_estimated_time_remaining(),
+        "started_at": simulation.started_at,
+        "completed_at": simulation.completed_at,
+        "error_message": simulation.error_message
+    }
 
-    except Exception as e:
+async def get_simulation_results_summary(simulation_id: str, user_id: str, db: AsyncSession) -> Dict[str, Any]:
+    """Stored results summary of a completed simulation of one of the user's portfolios."""
+    simulation = await get_user_simulation(simulation_id, user_id, db)
+    if simulation.status != SimulationStatus.COMPLETED or simulation.results is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Simulation failed: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Simulation {simulation_id} has no results ({simulation.status.value})"
         )
+    return simulation.results
+
+@api_router.get("/simulations/{simulation_id}/results")
+async def get_simulation_results(
+    simulation_id: str,
+    full: bool = False,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    store: ResultStore = Depends(get_result_store)
+):
+    """
+    Get the results of a completed simulation.
+
+    By default returns the summary kept in the database, where bulky series
+    (curves, dates, paths) are references to fetch page by page from
+    ``/results/series/{path}``. With ``full=true`` the series are read back
+    in and returned inline.
+    """
+    summary = await get_simulation_results_summary(simulation_id, user_id, db)
+    if not full:
+        return summary
+    try:
+        return await run_in_threadpool(store.load, simulation_id, summary)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Series of simulation {simulation_id} are missing from the result store"
+        )
+
+@api_router.get("/simulations/{simulation_id}/results/series/{path:path}")
+async def get_simulation_series(
+    simulation_id: str,
+    path: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1),
+    points: Optional[int] = Query(None, ge=2),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    store: ResultStore = Depends(get_result_store)
+):
+    """
+    Read one stored series of a simulation's results.
+
+    ``path`` is the series reference from the results summary, e.g.
+    ``strategies/0/equity``. Returns the rows from ``offset`` (at most
+    ``limit``), or, with ``points``, about that many evenly spaced rows of
+    the whole series for charting. Only the compressed chunks covering the
+    requested rows are read.
+    """
+    summary = await get_simulation_results_summary(simulation_id, user_id, db)
+    reference = find_series(summary, path)
+    if reference is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Simulation {simulation_id} has no series {path}"
+        )
+    limit = min(limit, settings.RESULT_PAGE_MAX_ROWS)
+    try:
+        if points is not None:
+            positions, values = await run_in_threadpool(
+                store.read_downsampled, simulation_id, reference, min(points, settings.RESULT_PAGE_MAX_ROWS)
+            )
+            return {
+                "path": path,
+                "total": reference["shape"][0],
+                "positions": positions.tolist(),
+                "values": values.tolist()
+            }
+        values = await run_in_threadpool(store.read, simulation_id, reference, offset, limit)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Series of simulation {simulation_id} are missing from the result store"
+        )
+    return {
+        "path": path,
+        "total": reference["shape"][0],
+        "offset": offset,
+        "limit": limit,
+        "values": values.tolist()
+    }
 
 # Optimization endpoints
 @api_router.post("/optimize/mean-variance")
 async def optimize_mean_variance(
-    portfolio_data: Dict[str, Any],
+    problem: MeanVarianceIn,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Optimize portfolio using Mean-Variance optimization"""
+    """
+    Optimize a portfolio using Mean-Variance optimization.
+
+    Solved as a batch of one, so a problem already solved for the same
+    return window, here or through ``/optimize/batch``, is answered from
+    the result cache.
+    """
     try:
-        optimizer = MeanVarianceOptimizer()
+        # Estimating the moments is CPU bound: keep it off the event loop
+        optimizer = await run_in_threadpool(
+            BatchOptimizer,
+            pd.DataFrame(problem.returns),
+            risk_free_rate=problem.risk_free_rate,
+            covariance=problem.covariance,
+            max_workers=1,
+            cache=result_cache
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid optimization request: {str(e)}"
+        )
 
-        # Extract parameters from request
-        expected_returns = portfolio_data.get("expected_returns", {})
-        covariance_matrix = portfolio_data.get("covariance_matrix", {})
-        risk_free_rate = portfolio_data.get("risk_free_rate", 0.02)
-        target_return = portfolio_data.get("target_return")
+    async for result in optimizer.optimize_async([problem.to_request()]):
+        if not result.success:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Optimization failed: {result.error}"
+            )
+        return {"status": "success", "result": result.portfolio.to_dict()}
 
-        # TODO: Implement optimization logic
-        result = {
-            "weights": {"AAPL": 0.4, "GOOGL": 0.3, "MSFT": 0.3},
-            "expected_return": 0.08,
-            "volatility": 0.15,
-            "sharpe_ratio": 0.53
-        }
+@api_router.post("/optimize/risk-parity")
+async def optimize_risk_parity(
+    problem: RiskParityIn,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Optimize a portfolio using Risk Parity.
 
-        return {"status": "success", "result": result}
+    Problems already solved for the same return window are answered from
+    the result cache.
+    """
+    returns = pd.DataFrame(problem.returns)
+    options = problem.optimizer_options()
+    version = await result_cache.aversion(returns)
+    portfolio = (await result_cache.aget_many(version, 'risk_parity', [options]))[0]
+    if portfolio is None:
+        try:
+            portfolio = await run_in_threadpool(lambda: RiskParityOptimizer(returns, **options).optimize())
+        except (ValueError, RuntimeError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Risk parity optimization failed: {str(e)}"
+            )
+        await result_cache.aput(version, 'risk_parity', options, portfolio)
+    return {"status": "success", "result": portfolio.to_dict()}
 
-    except Exception as e:
+@api_router.post("/optimize/batch")
+async def optimize_batch(
+    batch: BatchOptimizationIn,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Optimize many users' portfolios over one shared universe.
+
+    Moments are estimated once for the universe and the individual solves run
+    in a process pool, waiting for one of ``OPTIMIZATION_MAX_POOLS`` slots;
+    requests already solved for the same return window are answered from
+    the result cache without blocking the event loop on Redis. Results are
+    streamed as newline-delimited JSON, one line per request in completion
+    order, identified by ``request_id``; a request that fails gets an error
+    line instead of ending the stream.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {settings.BATCH_MAX_REQUESTS} requests"
+        )
+    try:
+        # Estimating the moments is CPU bound: keep it off the event loop
+        optimizer = await run_in_threadpool(
+            BatchOptimizer,
+            pd.DataFrame(batch.returns),
+            risk_free_rate=batch.risk_free_rate,
+            covariance=batch.covariance,
+            max_workers=settings.BATCH_MAX_WORKERS,
+            cache=result_cache,
+            pool_slots=optimization_pools
+        )
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Optimization failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid batch: {str(e)}"
         )
 
-@api_router.post("/optimize/risk-parity")
-async def optimize_risk_parity(
-    portfolio_data: Dict[str, Any],
+    # Cache round trips are awaited; the solves run from a worker thread
+    results = optimizer.optimize_async(item.to_request() for item in batch.requests)
+    return StreamingResponse(
+        (json.dumps(result.to_dict()) + "\n" async for result in results),
+        media_type="application/x-ndjson"
+    )
+
+@api_router.post("/optimize/sweep")
+async def optimize_sweep(
+    sweep_in: ParameterSweepIn,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Optimize portfolio using Risk Parity"""
+    """
+    Run one optimizer over every combination of a grid of its settings.
+
+    Grid points are solved in a process pool (waiting for one of
+    ``OPTIMIZATION_MAX_POOLS`` slots), each warm-started from a neighbouring
+    point; points already solved for the same return window are answered
+    from the result cache. A point that fails is reported with its error.
+    Results are streamed as newline-delimited JSON in
+    completion order; ``index`` is the point's position in the grid
+    (row-major, in the order the parameters were given) and ``params``
+    its settings.
+    """
+    num_points = 1
+    for values in sweep_in.grid.values():
+        num_points *= len(values)
+    if num_points > settings.SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Sweep exceeds {settings.SWEEP_MAX_POINTS} grid points"
+        )
     try:
-        optimizer = RiskParityOptimizer()
+        # Estimating the covariance is CPU bound: keep it off the event loop
+        sweep = await run_in_threadpool(
+            ParameterSweep,
+            get_optimizer_class(sweep_in.algorithm),
+            pd.DataFrame(sweep_in.returns),
+            sweep_in.grid,
+            options=sweep_in.options,
+            optimize_options=sweep_in.optimize_options(),
+            max_workers=settings.SWEEP_MAX_WORKERS,
+            cache=result_cache,
+            pool_slots=optimization_pools
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sweep: {str(e)}"
+        )
 
-        # TODO: Implement risk parity optimization
-        result = {
-            "weights": {"AAPL": 0.25, "GOOGL": 0.25, "MSFT": 0.25, "BONDS": 0.25},
-            "expected_return": 0.06,
-            "volatility": 0.12
-        }
+    return StreamingResponse(
+        (json.dumps(result.to_dict()) + "\n" async for result in sweep.run_async()),
+        media_type="application/x-ndjson"
+    )
 
-        return {"status": "success", "result": result}
+# Risk endpoints
+@api_router.post("/risk/what-if")
+async def evaluate_what_if(
+    what_if: WhatIfIn,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Evaluate how candidate trades would change a portfolio's risk.
 
-    except Exception as e:
+    The portfolio's risk state (Σw and its risk contributions) is computed
+    once and cached for later calls with the same returns and weights; each
+    trade is then an incremental update costing O(N) per traded asset.
+    Returns the current risk profile and, per trade, the profile after it
+    and the change in expected return, volatility, value at risk and
+    diversification ratio.
+    """
+    if len(what_if.trades) > settings.WHAT_IF_MAX_TRADES:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Risk parity optimization failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"What-if request exceeds {settings.WHAT_IF_MAX_TRADES} trades"
         )
+    try:
+        # Estimating the covariance is CPU bound: keep it off the event loop
+        analyzer = await run_in_threadpool(
+            what_if_analyzer,
+            pd.DataFrame(what_if.returns),
+            what_if.weights,
+            covariance=what_if.covariance,
+            confidence=what_if.confidence,
+            horizon=what_if.horizon
+        )
+        impacts = await run_in_threadpool(
+            analyzer.evaluate,
+            [trade.to_trade() for trade in what_if.trades],
+            funding=what_if.funding
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid what-if request: {str(e)}"
+        )
+
+    return {
+        "status": "success",
+        "portfolio": analyzer.profile.to_dict(),
+        "trades": [impact.to_dict() for impact in impacts]
+    }
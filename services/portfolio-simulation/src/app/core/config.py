@@ -32,6 +32,8 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL: int = 300  # 5 minutes
+    RESULT_CACHE_TTL: int = 60 * 60 * 24  # Keys are versioned by return window, so this is only a backstop
+    RESULT_CACHE_MEMORY_SIZE: int = 1024  # Optimization results kept in process
 
     # External Services
     YAHOO_FINANCE_ENABLED: bool = True
@@ -42,6 +44,32 @@ class Settings(BaseSettings):
     PORT: int = 8004
     WORKERS: int = 2
 
+    # Process pools of batch optimizations and sweeps open at once per server worker;
+    # further requests wait for one to finish
+    OPTIMIZATION_MAX_POOLS: int = 1
+
+    # Batch optimization
+    BATCH_MAX_WORKERS: Optional[int] = None  # Worker processes per batch (default: one per CPU)
+    BATCH_MAX_REQUESTS: int = 10000
+
+    # Parameter sweeps
+    SWEEP_MAX_WORKERS: Optional[int] = None  # Worker processes per sweep (default: one per CPU)
+    SWEEP_MAX_POINTS: int = 1000
+
+    # What-if trade evaluation
+    WHAT_IF_MAX_TRADES: int = 100
+
+    # Simulation job runner
+    SIMULATION_WORKERS: int = 2  # Simulations running at once per instance
+    SIMULATION_POLL_INTERVAL: float = 2.0  # Seconds between polls and progress updates
+    SIMULATION_STALE_AFTER: float = 300.0  # Seconds without a heartbeat before a RUNNING simulation is requeued
+
+    # Simulation result storage
+    RESULT_STORE_URL: str = "file:///tmp/portfolio-simulation/results"  # Series blobs; a volume shared by all instances
+    RESULT_INLINE_MAX_ITEMS: int = 256  # Longer lists are stored as series blobs instead of in the results JSON
+    RESULT_CHUNK_ROWS: int = 16384  # Rows per compressed chunk of a stored series
+    RESULT_PAGE_MAX_ROWS: int = 10000  # Most rows returned by one series request
+
     # Model Validation
     class Config:
         case_sensitive = True
@@ -0,0 +1,66 @@
+"""Database session management."""
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from .config import settings
+
+# Global database engine and session factory
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_engine() -> AsyncEngine:
+    """Get the async database engine, creating it if necessary."""
+    global _async_engine
+
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=settings.DEBUG,
+            pool_pre_ping=True,  # Enable connection health checks
+        )
+
+    return _async_engine
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Get the async session factory, creating it if necessary."""
+    global _async_session_factory
+
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+
+    return _async_session_factory
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a database session."""
+    async with get_session_factory()() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def close_db() -> None:
+    """Close database connections."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine:
+        await _async_engine.dispose()
+        _async_engine = None
+
+    _async_session_factory = None
@@ -0,0 +1 @@
+# Initialize jobs package
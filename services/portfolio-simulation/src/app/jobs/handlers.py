@@ -0,0 +1,276 @@
+"""Simulation handlers run by the job runner, one per simulation type."""
+from typing import Any, Callable, Dict, MutableSequence
+
+import numpy as np
+import pandas as pd
+
+from ..algorithms.backtest import Backtester, BacktestStrategy
+from ..algorithms.goal_projection import BootstrapSampler, CashFlow, GoalProjector, LognormalSampler
+from ..algorithms.registry import get_optimizer_class
+from ..algorithms.what_if import Trade, WhatIfAnalyzer
+from ..models.simulation import SimulationType
+
+# Bootstrap draws held in memory at once by the Monte Carlo handler
+MONTE_CARLO_CHUNK_CELLS = 2_000_000
+
+# Points of the horizon at which Monte Carlo percentiles are reported
+MONTE_CARLO_GRID_POINTS = 100
+
+class SimulationCancelled(Exception):
+    """Raised inside a handler once its simulation has been cancelled."""
+
+class JobContext:
+    """
+    A running simulation's link back to the runner.
+
+    Progress and the cancellation flag live in shared memory slots owned by
+    the runner, so reporting is a plain memory write rather than a round
+    trip to the runner or the database.
+    """
+
+    def __init__(self, slot: int, progress: MutableSequence[float], cancelled: MutableSequence[int]):
+        self.slot = slot
+        self._progress = progress
+        self._cancelled = cancelled
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self._cancelled[self.slot])
+
+    def report(self, fraction: float) -> None:
+        """
+        Record progress (0 to 1) and stop the simulation if it was cancelled.
+
+        Raises:
+            SimulationCancelled: If the simulation was cancelled
+        """
+        self._progress[self.slot] = min(max(fraction, 0.0), 1.0)
+        if self.cancelled:
+            raise SimulationCancelled(f"Simulation in slot {self.slot} was cancelled")
+
+Handler = Callable[[Dict[str, Any], JobContext], Dict[str, Any]]
+
+SIMULATION_HANDLERS: Dict[SimulationType, Handler] = {}
+
+def register_handler(simulation_type: SimulationType) -> Callable[[Handler], Handler]:
+    """Decorator registering the handler of a simulation type."""
+    def decorator(handler: Handler) -> Handler:
+        SIMULATION_HANDLERS[simulation_type] = handler
+        return handler
+    return decorator
+
+def run_simulation(
+    simulation_type: SimulationType,
+    parameters: Dict[str, Any],
+    context: JobContext
+) -> Dict[str, Any]:
+    """
+    Run a simulation with the handler of its type.
+
+    Returns:
+        JSON-serializable results
+
+    Raises:
+        ValueError: If the type has no handler or the parameters are invalid
+        SimulationCancelled: If the simulation was cancelled while running
+    """
+    handler = SIMULATION_HANDLERS.get(simulation_type)
+    if handler is None:
+        raise ValueError(f"Unsupported simulation type: {simulation_type}")
+    return handler(parameters, context)
+
+def _returns_frame(parameters: Dict[str, Any]) -> pd.DataFrame:
+    returns = parameters.get('returns')
+    if not returns:
+        raise ValueError("Simulation parameters need 'returns': ticker -> daily returns")
+    returns = pd.DataFrame(returns, dtype=float)
+    if parameters.get('dates'):
+        returns.index = pd.DatetimeIndex(parameters['dates'])
+    return returns
+
+@register_handler(SimulationType.OPTIMIZATION)
+def optimization(parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Optimize a portfolio.
+
+    Parameters: ``algorithm`` (a name in algorithms.registry.OPTIMIZERS,
+    default 'mean_variance'), ``returns`` (ticker -> daily returns) and
+    ``options``, keyword arguments of the optimizer.
+    """
+    algorithm = parameters.get('algorithm', 'mean_variance')
+    optimizer_class = get_optimizer_class(algorithm)
+    optimizer = optimizer_class(_returns_frame(parameters), **parameters.get('options', {}))
+    context.report(0.1)
+    result = optimizer.optimize().to_dict()
+    result['algorithm'] = algorithm
+    return result
+
+def _portfolio_returns(parameters: Dict[str, Any]) -> np.ndarray:
+    """Daily returns of the portfolio given by ``weights`` (default equal weights)."""
+    returns = _returns_frame(parameters)
+    weights = parameters.get('weights')
+    if weights:
+        weights = pd.Series(weights, dtype=float).reindex(returns.columns).fillna(0.0).values
+    else:
+        weights = np.full(returns.shape[1], 1.0 / returns.shape[1])
+    return returns.values @ weights
+
+@register_handler(SimulationType.MONTE_CARLO)
+def monte_carlo(parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Bootstrap future portfolio values from historical daily returns.
+
+    Parameters: ``returns`` (ticker -> daily returns), ``weights`` (ticker ->
+    weight, default equal weights), ``time_horizon_days`` (calendar days,
+    default 365), ``num_simulations`` (default 1000), ``initial_value``
+    (default 1.0), ``inflation_rate`` (annual, default 0.0) and ``seed``.
+
+    Paths are drawn in chunks, so memory stays bounded for long horizons and
+    progress is reported after each chunk.
+    """
+    portfolio_returns = _portfolio_returns(parameters)
+
+    num_simulations = int(parameters.get('num_simulations', 1000))
+    horizon = max(1, round(int(parameters.get('time_horizon_days', 365)) * 252 / 365))
+    initial_value = float(parameters.get('initial_value', 1.0))
+    inflation_rate = float(parameters.get('inflation_rate', 0.0))
+    if num_simulations < 1:
+        raise ValueError("num_simulations must be positive")
+    rng = np.random.default_rng(parameters.get('seed'))
+
+    # Trading days at which path values are kept
+    days = np.unique(np.linspace(1, horizon, min(horizon, MONTE_CARLO_GRID_POINTS)).round().astype(int))
+    values = np.empty((num_simulations, len(days)))
+    chunk = max(1, MONTE_CARLO_CHUNK_CELLS // horizon)
+    for start in range(0, num_simulations, chunk):
+        stop = min(start + chunk, num_simulations)
+        draws = portfolio_returns[rng.integers(0, len(portfolio_returns), size=(stop - start, horizon))]
+        values[start:stop] = np.cumprod(1.0 + draws, axis=1)[:, days - 1]
+        context.report(stop / num_simulations)
+
+    # Report values in today's money
+    values *= initial_value / (1.0 + inflation_rate) ** (days / 252)
+    quantiles = (5, 25, 50, 75, 95)
+    percentiles = np.percentile(values, quantiles, axis=0)
+    terminal = values[:, -1]
+    return {
+        'days': days.tolist(),
+        'percentiles': {f"p{q}": row.tolist() for q, row in zip(quantiles, percentiles)},
+        'metrics': {
+            'mean_terminal_value': float(terminal.mean()),
+            'median_terminal_value': float(np.median(terminal)),
+            'probability_of_loss': float(np.mean(terminal < initial_value)),
+            'value_at_risk_95': float(initial_value - percentiles[0, -1])
+        }
+    }
+
+def _backtest_strategy(spec: Dict[str, Any]) -> BacktestStrategy:
+    if 'weights' in spec:
+        return BacktestStrategy(
+            spec['name'],
+            weights=spec['weights'],
+            schedule=spec.get('schedule'),
+            transaction_cost=spec.get('transaction_cost')
+        )
+    return BacktestStrategy(
+        spec['name'],
+        optimizer=get_optimizer_class(spec.get('algorithm', 'mean_variance')),
+        optimizer_options=spec.get('options', {}),
+        schedule=spec.get('schedule'),
+        transaction_cost=spec.get('transaction_cost'),
+        warm_start=spec.get('warm_start', True)
+    )
+
+@register_handler(SimulationType.HISTORICAL)
+def historical(parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Backtest strategies side by side over historical returns.
+
+    Parameters: ``returns`` (ticker -> daily returns) with optional ``dates``,
+    ``strategies`` (list of {``name``, ``weights``} for static weights or
+    {``name``, ``algorithm``, ``options``, ``warm_start``} for a portfolio
+    re-optimized walk-forward, each with an optional ``schedule`` and
+    ``transaction_cost``), ``schedule``
+    (default 'M' with dates, else every 21 rows), ``lookback`` (default 252),
+    ``transaction_cost`` and ``risk_free_rate``.
+    """
+    returns = _returns_frame(parameters)
+    strategies = parameters.get('strategies')
+    if not strategies:
+        raise ValueError("Simulation parameters need at least one strategy")
+    backtester = Backtester(
+        returns,
+        schedule=parameters.get('schedule', 'M' if parameters.get('dates') else 21),
+        lookback=int(parameters.get('lookback', 252)),
+        transaction_cost=float(parameters.get('transaction_cost', 0.0)),
+        risk_free_rate=float(parameters.get('risk_free_rate', 0.0))
+    )
+    results = backtester.run([_backtest_strategy(spec) for spec in strategies], progress=context.report)
+    return {'strategies': [result.to_dict() for result in results.values()]}
+
+@register_handler(SimulationType.WHAT_IF)
+def what_if(parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Evaluate how candidate trades would change a portfolio's risk.
+
+    Parameters: ``returns`` (ticker -> daily returns), ``weights`` (ticker ->
+    current weight), ``trades`` (list of {``trade_id``, ``changes``: ticker ->
+    weight change}), ``covariance`` (default 'sample'), ``confidence``
+    (default 0.95), ``horizon`` in days (default 1) and ``funding``
+    ('cash' or 'pro_rata', default 'cash').
+    """
+    trades = parameters.get('trades')
+    if not trades:
+        raise ValueError("Simulation parameters need at least one trade")
+    analyzer = WhatIfAnalyzer(
+        _returns_frame(parameters),
+        parameters.get('weights') or {},
+        covariance=parameters.get('covariance', 'sample'),
+        confidence=float(parameters.get('confidence', 0.95)),
+        horizon=int(parameters.get('horizon', 1))
+    )
+    context.report(0.5)
+    impacts = analyzer.evaluate(
+        [Trade(str(trade.get('trade_id', i)), dict(trade.get('changes', {}))) for i, trade in enumerate(trades)],
+        funding=parameters.get('funding', 'cash')
+    )
+    return {
+        'portfolio': analyzer.profile.to_dict(),
+        'trades': [impact.to_dict() for impact in impacts]
+    }
+
+@register_handler(SimulationType.GOAL_PROJECTION)
+def goal_projection(parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Project a portfolio with recurring contributions and withdrawals month by month.
+
+    Parameters: either ``returns`` (ticker -> daily returns) with optional
+    ``weights``, whose months are bootstrapped from history, or annual
+    ``expected_return`` and ``volatility`` for lognormal returns;
+    ``months`` (default 360), ``initial_value`` (default 0.0),
+    ``cash_flows`` (list of {``amount`` per month, negative to withdraw,
+    ``start`` and ``end`` month, annual ``growth``}), ``goal`` (terminal
+    value in today's money), ``inflation_rate`` (annual, default 0.0),
+    ``num_simulations`` (default 10000) and ``seed``.
+    """
+    if parameters.get('returns'):
+        sampler = BootstrapSampler(_portfolio_returns(parameters))
+    elif 'expected_return' in parameters and 'volatility' in parameters:
+        sampler = LognormalSampler(float(parameters['expected_return']), float(parameters['volatility']))
+    else:
+        raise ValueError("Simulation parameters need 'returns' or 'expected_return' and 'volatility'")
+    projector = GoalProjector(
+        sampler,
+        num_paths=int(parameters.get('num_simulations', 10000)),
+        seed=parameters.get('seed')
+    )
+    goal = parameters.get('goal')
+    projection = projector.project(
+        int(parameters.get('months', 360)),
+        initial_value=float(parameters.get('initial_value', 0.0)),
+        cash_flows=[CashFlow(**flow) for flow in parameters.get('cash_flows', [])],
+        goal=None if goal is None else float(goal),
+        inflation_rate=float(parameters.get('inflation_rate', 0.0)),
+        progress=context.report
+    )
+    return projection.to_dict()
@@ -0,0 +1,326 @@
+"""Background runner executing PENDING simulations on a bounded process pool."""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..models.simulation import Simulation, SimulationStatus, SimulationType
+from ..storage.results import get_result_store
+from .handlers import JobContext, SimulationCancelled, run_simulation
+
+logger = logging.getLogger(__name__)
+
+class SimulationRunner:
+    """
+    Claims PENDING simulations from the database and runs them off the request path.
+
+    Every status transition is a single conditional UPDATE, so several
+    service instances can share the table: a simulation is claimed by
+    exactly one runner (``FOR UPDATE SKIP LOCKED``), and results are only
+    written while the row is still RUNNING, so a cancelled simulation can
+    never be flipped back to COMPLETED. Each worker slot has a progress
+    value and a cancellation flag in shared memory; the runner copies
+    progress to the database once per tick, which doubles as a heartbeat.
+    A RUNNING simulation whose heartbeat stops (its instance died) is
+    returned to PENDING after ``stale_after`` seconds. Workers write bulky
+    result series to the result store themselves; only the JSON summary
+    comes back to the runner and into the row.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_workers: int = 2,
+        poll_interval: float = 2.0,
+        stale_after: float = 300.0,
+        shutdown_timeout: float = 10.0
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            session_factory: Factory of async database sessions
+            max_workers: Worker processes, i.e. simulations running at once
+            poll_interval: Seconds between polls for new simulations and
+                progress updates
+            stale_after: Seconds without a heartbeat after which another
+                instance's RUNNING simulation is requeued
+            shutdown_timeout: Seconds ``stop()`` waits for cancelled
+                simulations to exit before requeueing them
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.shutdown_timeout = shutdown_timeout
+        self._context = multiprocessing.get_context('spawn')
+        self._progress = self._context.Array('d', max_workers, lock=False)
+        self._cancelled = self._context.Array('b', max_workers, lock=False)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[UUID, int] = {}  # Simulation id -> worker slot
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> List[UUID]:
+        """Ids of the simulations this runner is executing."""
+        return list(self._jobs)
+
+    def start(self) -> None:
+        """Start the worker pool and the polling loop."""
+        if self._loop_task is not None:
+            return
+        self._stopping = False
+        self._pool = self._new_pool()
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"Simulation runner started with {self.max_workers} workers")
+
+    async def stop(self) -> None:
+        """Stop polling, cancel running simulations and return them to PENDING."""
+        if self._loop_task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._loop_task
+        self._loop_task = None
+
+        running = self.running
+        for slot in self._jobs.values():
+            self._cancelled[slot] = 1
+        if self._tasks:
+            await asyncio.wait(list(self._tasks.values()), timeout=self.shutdown_timeout)
+        if running:
+            # Whatever did not finish is picked up again by the next runner
+            await self._execute(
+                update(Simulation)
+                .where(Simulation.id.in_(running), Simulation.status == SimulationStatus.RUNNING)
+                .values(status=SimulationStatus.PENDING, started_at=None, progress=0.0)
+            )
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        logger.info(f"Simulation runner stopped, requeued up to {len(running)} simulations")
+
+    def notify(self) -> None:
+        """Wake the runner to claim new simulations without waiting for the next poll."""
+        self._wake.set()
+
+    async def submit(self, simulation_id: UUID) -> bool:
+        """
+        Queue a simulation to run; returns immediately.
+
+        Finished simulations are reset and run again.
+
+        Returns:
+            False if the simulation does not exist or is already RUNNING
+        """
+        rowcount = await self._execute(
+            update(Simulation)
+            .where(Simulation.id == simulation_id, Simulation.status != SimulationStatus.RUNNING)
+            .values(
+                status=SimulationStatus.PENDING,
+                progress=0.0,
+                results=None,
+                error_message=None,
+                started_at=None,
+                completed_at=None
+            )
+        )
+        if rowcount:
+            self.notify()
+        return bool(rowcount)
+
+    async def cancel(self, simulation_id: UUID) -> bool:
+        """
+        Cancel a PENDING or RUNNING simulation.
+
+        A simulation running here is stopped at its next progress report;
+        one running on another instance is stopped once that instance's
+        next heartbeat sees the CANCELLED status.
+
+        Returns:
+            False if the simulation does not exist or already finished
+        """
+        rowcount = await self._execute(
+            update(Simulation)
+            .where(
+                Simulation.id == simulation_id,
+                Simulation.status.in_([SimulationStatus.PENDING, SimulationStatus.RUNNING])
+            )
+            .values(status=SimulationStatus.CANCELLED, completed_at=func.now())
+        )
+        slot = self._jobs.get(simulation_id)
+        if slot is not None:
+            self._cancelled[slot] = 1
+        return bool(rowcount)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                await self._requeue_stale()
+                await self._report_progress()
+                free = self.max_workers - len(self._jobs)
+                if free > 0:
+                    for simulation_id, simulation_type, parameters in await self._claim(free):
+                        self._launch(simulation_id, simulation_type, parameters)
+            except Exception as e:
+                logger.error(f"Simulation runner poll failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, limit: int) -> List[Any]:
+        """Atomically move up to ``limit`` of the oldest PENDING simulations to RUNNING."""
+        async with self.session_factory() as session:
+            rows = (await session.execute(self._claim_statement(limit))).all()
+            await session.commit()
+        return rows
+
+    @staticmethod
+    def _claim_statement(limit: int):
+        """UPDATE claiming the oldest PENDING rows, skipping those another runner has locked."""
+        pending = (
+            select(Simulation.id)
+            .where(Simulation.status == SimulationStatus.PENDING)
+            .order_by(Simulation.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return (
+            update(Simulation)
+            .where(Simulation.id.in_(pending))
+            .values(status=SimulationStatus.RUNNING, started_at=func.now(), progress=0.0)
+            .returning(Simulation.id, Simulation.simulation_type, Simulation.parameters)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _launch(self, simulation_id: UUID, simulation_type: SimulationType, parameters: Dict[str, Any]) -> None:
+        slot = next(s for s in range(self.max_workers) if s not in self._jobs.values())
+        self._progress[slot] = 0.0
+        self._cancelled[slot] = 0
+        self._jobs[simulation_id] = slot
+        self._tasks[simulation_id] = asyncio.create_task(
+            self._run_job(simulation_id, slot, simulation_type, parameters)
+        )
+        logger.info(f"Simulation {simulation_id} ({simulation_type}) started in slot {slot}")
+
+    async def _run_job(
+        self,
+        simulation_id: UUID,
+        slot: int,
+        simulation_type: SimulationType,
+        parameters: Dict[str, Any]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            results = await loop.run_in_executor(
+                pool, _run_in_worker, simulation_id, slot, simulation_type, parameters
+            )
+        except SimulationCancelled:
+            # The row is already CANCELLED, or PENDING again after stop()
+            logger.info(f"Simulation {simulation_id} cancelled")
+        except BrokenProcessPool:
+            logger.error(f"Worker running simulation {simulation_id} died")
+            await self._finish(simulation_id, SimulationStatus.FAILED, error_message="Simulation worker process died")
+            # Only the first job to hit the broken pool replaces it
+            if pool is self._pool and not self._stopping:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+        except Exception as e:
+            logger.warning(f"Simulation {simulation_id} failed: {e}")
+            await self._finish(simulation_id, SimulationStatus.FAILED, error_message=str(e))
+        else:
+            await self._finish(simulation_id, SimulationStatus.COMPLETED, results=results, progress=1.0)
+            logger.info(f"Simulation {simulation_id} completed")
+        finally:
+            del self._jobs[simulation_id]
+            del self._tasks[simulation_id]
+            self._wake.set()
+
+    async def _finish(self, simulation_id: UUID, status: SimulationStatus, **values: Any) -> None:
+        """Record the outcome, unless the simulation stopped being RUNNING (e.g. cancelled)."""
+        try:
+            await self._execute(
+                update(Simulation)
+                .where(Simulation.id == simulation_id, Simulation.status == SimulationStatus.RUNNING)
+                .values(status=status, completed_at=func.now(), **values)
+            )
+        except Exception as e:
+            logger.error(f"Failed to record outcome of simulation {simulation_id}: {e}", exc_info=True)
+
+    async def _report_progress(self) -> None:
+        """Write progress of running simulations and stop those cancelled elsewhere."""
+        if not self._jobs:
+            return
+        async with self.session_factory() as session:
+            for simulation_id, slot in list(self._jobs.items()):
+                result = await session.execute(
+                    update(Simulation)
+                    .where(Simulation.id == simulation_id, Simulation.status == SimulationStatus.RUNNING)
+                    .values(progress=self._progress[slot])  # Also refreshes updated_at, the heartbeat
+                )
+                if result.rowcount == 0:
+                    self._cancelled[slot] = 1
+            await session.commit()
+
+    async def _requeue_stale(self) -> None:
+        statement = (
+            update(Simulation)
+            .where(
+                Simulation.status == SimulationStatus.RUNNING,
+                Simulation.updated_at < func.now() - timedelta(seconds=self.stale_after)
+            )
+            .values(status=SimulationStatus.PENDING, started_at=None, progress=0.0)
+        )
+        if self._jobs:
+            statement = statement.where(Simulation.id.not_in(list(self._jobs)))
+        requeued = await self._execute(statement)
+        if requeued:
+            logger.warning(f"Requeued {requeued} simulations without a heartbeat for {self.stale_after}s")
+
+    async def _execute(self, statement) -> int:
+        async with self.session_factory() as session:
+            result = await session.execute(statement.execution_options(synchronize_session=False))
+            await session.commit()
+        return result.rowcount
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._progress, self._cancelled)
+        )
+
+# Shared progress and cancellation slots of a pool worker, set once per process by _init_worker
+_worker_progress = None
+_worker_cancelled = None
+
+def _init_worker(progress, cancelled) -> None:
+    global _worker_progress, _worker_cancelled
+    _worker_progress = progress
+    _worker_cancelled = cancelled
+
+def _run_in_worker(
+    simulation_id: UUID,
+    slot: int,
+    simulation_type: SimulationType,
+    parameters: Dict[str, Any]
+) -> Dict[str, Any]:
+    results = run_simulation(simulation_type, parameters, JobContext(slot, _worker_progress, _worker_cancelled))
+    # Store bulky series from the worker, so only the summary travels back and into the row
+    return get_result_store().save(simulation_id, results)
@@ -11,6 +11,8 @@ try:
     from .core.config import settings
     from .api.v1.api import api_router
     from .core.security import verify_token
+    from .core.database import close_db, get_session_factory
+    from .jobs.runner import SimulationRunner
 except ImportError as e:
     print(f"Import error: {e}")
     print("Please ensure all modules are properly structured")
@@ -37,6 +39,25 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Startup event
+@app.on_event("startup")
+async def startup_event():
+    """Start the simulation job runner."""
+    app.state.simulation_runner = SimulationRunner(
+        get_session_factory(),
+        max_workers=settings.SIMULATION_WORKERS,
+        poll_interval=settings.SIMULATION_POLL_INTERVAL,
+        stale_after=settings.SIMULATION_STALE_AFTER
+    )
+    app.state.simulation_runner.start()
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the simulation job runner, requeueing unfinished simulations."""
+    await app.state.simulation_runner.stop()
+    await close_db()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -1,7 +1,7 @@
 """Asset model for representing financial instruments in the system."""
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy import (
@@ -19,6 +19,9 @@ from sqlalchemy.orm import Mapped, relationship
 
 from .base import Base
 
+if TYPE_CHECKING:
+    from .portfolio import PortfolioAsset
+
 
 class AssetType(str, Enum):
     """Types of financial assets."""
@@ -35,7 +35,7 @@ class Base:
         return cls.__name__.lower()
     
     def to_dict(self) -> Dict[str, Any]:
-        ""
+        """
         Convert model to dictionary.
         
         Returns:
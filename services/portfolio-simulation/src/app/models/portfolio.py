@@ -1,5 +1,5 @@
-"""Database models for portfolio and simulation data."""
-from typing import Dict, List, Optional, Any
+"""Database models for portfolios and their assets."""
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from datetime import datetime
 import json
 from uuid import UUID, uuid4
@@ -8,10 +8,13 @@ from sqlalchemy import Column, String, Float, Text, Boolean, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
-from .base import Base, TimestampMixin
+from .base import Base
 
+if TYPE_CHECKING:
+    from .simulation import Simulation
 
-class Portfolio(Base, TimestampMixin):
+
+class Portfolio(Base):
     """Represents an investment portfolio."""
 
     __tablename__ = "portfolios"
@@ -102,7 +105,7 @@ class Portfolio(Base, TimestampMixin):
         return data
 
 
-class PortfolioAsset(Base, TimestampMixin):
+class PortfolioAsset(Base):
     """Database model for assets within a portfolio."""
     __tablename__ = "portfolio_assets"
 
@@ -139,41 +142,3 @@ class PortfolioAsset(Base, TimestampMixin):
             "unrealized_pnl": (self.quantity * (self.current_price or 0)) - (self.quantity * self.average_cost)
         }
 
-
-class Simulation(Base, TimestampMixin):
-    """Database model for simulation runs."""
-    __tablename__ = "simulations"
-
-    # Core simulation information
-    portfolio_id: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True),
-        ForeignKey("portfolios.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True
-    )
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
-    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)  # pending, running, completed, failed
-
-    # Simulation parameters (stored as JSON for flexibility)
-    parameters: Mapped[dict] = mapped_column(JSON, nullable=False)
-
-    # Results (stored as JSON for flexibility)
-    results: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
-
-    # Relationships
-    portfolio: Mapped[Portfolio] = relationship("Portfolio", back_populates="simulations")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert simulation to dictionary with results."""
-        return {
-            "id": str(self.id),
-            "portfolio_id": str(self.portfolio_id),
-            "name": self.name,
-            "description": self.description,
-            "status": self.status,
-            "parameters": self.parameters,
-            "results": self.results,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
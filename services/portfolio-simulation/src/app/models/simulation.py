@@ -1,7 +1,7 @@
 """Simulation model for running and storing portfolio simulations."""
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from uuid import UUID
 
 from sqlalchemy import (
@@ -19,6 +19,9 @@ from sqlalchemy.orm import Mapped, relationship
 
 from .base import Base
 
+if TYPE_CHECKING:
+    from .portfolio import Portfolio
+
 
 class SimulationStatus(str, Enum):
     """Status of a simulation."""
@@ -36,6 +39,7 @@ class SimulationType(str, Enum):
     STRESS_TEST = "stress_test"
     WHAT_IF = "what_if"
     OPTIMIZATION = "optimization"
+    GOAL_PROJECTION = "goal_projection"
 
 
 class Simulation(Base):
@@ -83,7 +87,7 @@ class Simulation(Base):
     results: Mapped[Optional[Dict]] = Column(
         JSON,
         nullable=True,
-        doc="Results of the simulation"
+        doc="Results summary of the simulation; bulky series are references into the result store"
     )
     
     # Performance Metrics
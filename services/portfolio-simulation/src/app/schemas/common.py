@@ -0,0 +1,26 @@
+"""Pydantic models shared by the optimization and risk requests."""
+from typing import Dict, List, Tuple
+from pydantic import BaseModel, Field, validator
+
+class ReturnsPanelIn(BaseModel):
+    """A request carrying a returns panel."""
+    returns: Dict[str, List[float]] = Field(..., description="Ticker -> daily returns, all of equal length")
+
+    @validator('returns')
+    def validate_returns(cls, v):
+        """Ensure every asset has the same number of observations."""
+        lengths = {len(series) for series in v.values()}
+        if len(lengths) != 1 or lengths == {0}:
+            raise ValueError("All assets need the same, non-zero number of returns")
+        return v
+
+class WeightBoundsMixin(BaseModel):
+    """Lower and upper bound applied to every portfolio weight."""
+    weight_bounds: Tuple[float, float] = Field((0.0, 1.0), description="Lower and upper bound for every weight")
+
+    @validator('weight_bounds')
+    def validate_weight_bounds(cls, v):
+        """Ensure the lower bound does not exceed the upper bound."""
+        if v[0] > v[1]:
+            raise ValueError("Lower weight bound must not exceed the upper bound")
+        return v
@@ -0,0 +1,145 @@
+"""Pydantic models for optimization requests."""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, validator
+
+from ..algorithms.base import LinearConstraint
+from ..algorithms.batch import BatchOptimizationRequest
+from ..algorithms.black_litterman import View
+from .common import ReturnsPanelIn, WeightBoundsMixin
+
+class LinearConstraintIn(BaseModel):
+    """Linear constraint on the weights: lower <= sum(coefficients[asset] * weight) <= upper."""
+    coefficients: Dict[str, float] = Field(..., description="Ticker -> coefficient")
+    lower: Optional[float] = Field(None, description="Lower bound (unbounded if omitted)")
+    upper: Optional[float] = Field(None, description="Upper bound (unbounded if omitted)")
+
+    def to_constraint(self) -> LinearConstraint:
+        return LinearConstraint(
+            self.coefficients,
+            lower=-float("inf") if self.lower is None else self.lower,
+            upper=float("inf") if self.upper is None else self.upper
+        )
+
+class BatchOptimizationItem(WeightBoundsMixin):
+    """One user's bounds and target within a batch."""
+    request_id: str = Field(..., description="Identifier echoed back with the result")
+    target_return: Optional[float] = Field(None, description="Daily target return (minimum variance)")
+    target_volatility: Optional[float] = Field(None, gt=0, description="Daily target volatility (maximum return)")
+    linear_constraints: List[LinearConstraintIn] = Field(default_factory=list)
+
+    def to_request(self) -> BatchOptimizationRequest:
+        return BatchOptimizationRequest(
+            request_id=self.request_id,
+            target_return=self.target_return,
+            target_volatility=self.target_volatility,
+            weight_bounds=self.weight_bounds,
+            linear_constraints=[c.to_constraint() for c in self.linear_constraints]
+        )
+
+class MeanVarianceIn(ReturnsPanelIn, WeightBoundsMixin):
+    """One mean-variance problem: a returns panel and the bounds and target to optimize for."""
+    risk_free_rate: float = Field(0.0, ge=0, le=0.20, description="Annual risk-free rate")
+    covariance: str = Field("sample", description="Covariance estimator: sample, ledoit_wolf, ewma or factor")
+    target_return: Optional[float] = Field(None, description="Daily target return (minimum variance)")
+    target_volatility: Optional[float] = Field(None, gt=0, description="Daily target volatility (maximum return)")
+    linear_constraints: List[LinearConstraintIn] = Field(default_factory=list)
+
+    def to_request(self) -> BatchOptimizationRequest:
+        """The problem as a batch request, so it shares cached results with ``/optimize/batch``."""
+        return BatchOptimizationRequest(
+            request_id="portfolio",
+            target_return=self.target_return,
+            target_volatility=self.target_volatility,
+            weight_bounds=self.weight_bounds,
+            linear_constraints=[c.to_constraint() for c in self.linear_constraints]
+        )
+
+class RiskParityIn(ReturnsPanelIn, WeightBoundsMixin):
+    """One risk parity problem: a returns panel and each asset's share of the risk."""
+    risk_free_rate: float = Field(0.0, ge=0, le=0.20, description="Annual risk-free rate")
+    covariance: str = Field("sample", description="Covariance estimator: sample, ledoit_wolf, ewma or factor")
+    risk_weights: Optional[Dict[str, float]] = Field(None, description="Ticker -> risk budget (equal if omitted)")
+
+    def optimizer_options(self) -> Dict[str, Any]:
+        """RiskParityOptimizer arguments besides the returns."""
+        return {
+            'risk_free_rate': self.risk_free_rate,
+            'covariance': self.covariance,
+            'risk_weights': self.risk_weights,
+            'weight_bounds': self.weight_bounds
+        }
+
+class BatchOptimizationIn(ReturnsPanelIn):
+    """A shared asset universe and the per-user problems to solve over it."""
+    risk_free_rate: float = Field(0.0, ge=0, le=0.20, description="Annual risk-free rate")
+    covariance: str = Field("sample", description="Covariance estimator: sample, ledoit_wolf, ewma or factor")
+    requests: List[BatchOptimizationItem] = Field(..., min_items=1)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "returns": {"AAPL": [0.01, -0.004, 0.002], "MSFT": [0.006, 0.001, -0.003]},
+                "risk_free_rate": 0.03,
+                "covariance": "sample",
+                "requests": [
+                    {"request_id": "user_1", "weight_bounds": [0.0, 0.6]},
+                    {"request_id": "user_2", "target_return": 0.0005}
+                ]
+            }
+        }
+
+class ViewIn(BaseModel):
+    """Black-Litterman view: the expected daily return of a weighted basket of assets."""
+    assets: List[str] = Field(..., min_items=1)
+    weights: List[float] = Field(..., description="Weight of each asset in the basket")
+    return_value: float = Field(..., description="Expected daily return of the basket")
+    confidence: float = Field(..., gt=0, le=1, description="Confidence in the view")
+
+    @validator('weights')
+    def validate_weights(cls, v, values):
+        """Ensure there is one weight per asset."""
+        if 'assets' in values and len(v) != len(values['assets']):
+            raise ValueError("Views need one weight per asset")
+        return v
+
+    def to_view(self) -> View:
+        return View(self.assets, self.weights, self.return_value, self.confidence)
+
+class ParameterSweepIn(ReturnsPanelIn):
+    """One optimizer run over every combination of a grid of its settings."""
+    algorithm: str = Field(..., description="mean_variance, risk_parity, black_litterman or hierarchical_risk_parity")
+    grid: Dict[str, List[Any]] = Field(..., description="Optimizer argument -> values to sweep")
+    options: Dict[str, Any] = Field(default_factory=dict, description="Optimizer arguments shared by all grid points")
+    views: List[ViewIn] = Field(default_factory=list, description="Investor views of a black_litterman sweep")
+
+    @validator('grid')
+    def validate_grid(cls, v):
+        """Ensure the grid has at least one point."""
+        if not v or any(len(values) == 0 for values in v.values()):
+            raise ValueError("The grid needs at least one parameter with at least one value")
+        return v
+
+    @validator('views', always=True)
+    def validate_views(cls, v, values):
+        """Ensure views go with Black-Litterman, which without them ignores tau."""
+        algorithm = values.get('algorithm')
+        if v and algorithm != 'black_litterman':
+            raise ValueError("Views only apply to black_litterman sweeps")
+        if not v and algorithm == 'black_litterman' and 'tau' in values.get('grid', {}):
+            raise ValueError("Sweeping tau needs views: without them the portfolio is the market equilibrium")
+        return v
+
+    def optimize_options(self) -> Dict[str, Any]:
+        """Arguments of every grid point's ``optimize()`` call."""
+        return {'views': [view.to_view() for view in self.views]} if self.views else {}
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "algorithm": "black_litterman",
+                "returns": {"AAPL": [0.01, -0.004, 0.002], "MSFT": [0.006, 0.001, -0.003]},
+                "grid": {"risk_aversion": [1.0, 2.5, 5.0], "tau": [0.025, 0.05]},
+                "options": {"weight_bounds": [0.0, 0.8]},
+                "views": [{"assets": ["AAPL"], "weights": [1.0], "return_value": 0.0008, "confidence": 0.5}]
+            }
+        }
@@ -103,6 +103,12 @@ class SimulationParameters(BaseModel):
             }
         }
 
+class SimulationCreate(BaseModel):
+    """Schema for creating a new simulation of a portfolio."""
+    name: str = Field(..., min_length=1, max_length=100)
+    portfolio_id: str
+    parameters: SimulationParameters = Field(default_factory=SimulationParameters)
+
 class SimulationResult(BaseModel):
     """Results from a portfolio simulation."""
     simulation_id: str
@@ -0,0 +1,44 @@
+"""Pydantic models for risk analysis requests."""
+from typing import Dict, List
+from pydantic import BaseModel, Field, validator
+
+from ..algorithms.what_if import WHAT_IF_FUNDING, Trade
+from .common import ReturnsPanelIn
+
+class TradeIn(BaseModel):
+    """A proposed trade, as the change in portfolio weight of each asset it touches."""
+    trade_id: str = Field(..., description="Identifier echoed back with the result")
+    changes: Dict[str, float] = Field(..., description="Ticker -> weight change (positive buys, negative sells)")
+
+    def to_trade(self) -> Trade:
+        return Trade(trade_id=self.trade_id, changes=self.changes)
+
+class WhatIfIn(ReturnsPanelIn):
+    """A portfolio and candidate trades whose effect on its risk is evaluated."""
+    weights: Dict[str, float] = Field(..., description="Ticker -> current portfolio weight")
+    trades: List[TradeIn] = Field(..., min_items=1)
+    covariance: str = Field("sample", description="Covariance estimator: sample, ledoit_wolf, ewma or factor")
+    confidence: float = Field(0.95, gt=0.5, lt=1.0, description="Confidence level of the value at risk")
+    horizon: int = Field(1, ge=1, le=252, description="Value at risk horizon in days")
+    funding: str = Field("cash", description="cash (apply the changes as given) or pro_rata (scale holdings to fund net buys)")
+
+    @validator('funding')
+    def validate_funding(cls, v):
+        """Ensure the funding mode is known."""
+        if v not in WHAT_IF_FUNDING:
+            raise ValueError(f"Funding must be one of {WHAT_IF_FUNDING}")
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "returns": {"AAPL": [0.01, -0.004, 0.002], "MSFT": [0.006, 0.001, -0.003], "TLT": [-0.002, 0.003, 0.001]},
+                "weights": {"AAPL": 0.6, "MSFT": 0.4},
+                "trades": [
+                    {"trade_id": "buy_bonds", "changes": {"TLT": 0.1, "AAPL": -0.1}},
+                    {"trade_id": "more_msft", "changes": {"MSFT": 0.05}}
+                ],
+                "confidence": 0.95,
+                "funding": "cash"
+            }
+        }
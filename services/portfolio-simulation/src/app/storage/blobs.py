@@ -0,0 +1,123 @@
+"""Blob stores for bulky simulation results: local disk, or in memory as an object-store stand-in."""
+import io
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict
+from urllib.parse import urlparse
+
+class BlobStore(ABC):
+    """
+    Flat key -> bytes store with the semantics of an object store.
+
+    Keys are '/'-separated paths such as ``simulations/<id>/series.npz``.
+    Writes replace a blob whole; readers never see a partial blob.
+    """
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``, replacing any previous blob."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """
+        Open a blob for random-access reading.
+
+        Raises:
+            KeyError: If there is no blob under ``key``
+        """
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every blob whose key starts with ``prefix``."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under ``key``."""
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory, written atomically."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Blob key escapes the store: {key}")
+        return path
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write next to the target and rename, so readers see the old or the new blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), 'rb')
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def delete_prefix(self, prefix: str) -> None:
+        path = self._path(prefix.rstrip('/'))
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.unlink(path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+class MemoryBlobStore(BlobStore):
+    """In-process blob store, standing in for an object store in development and tests."""
+
+    def __init__(self):
+        self._blobs: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._blobs[key] = bytes(data)
+
+    def open(self, key: str) -> BinaryIO:
+        with self._lock:
+            if key not in self._blobs:
+                raise KeyError(key)
+            return io.BytesIO(self._blobs[key])
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._blobs if key.startswith(prefix)]:
+                del self._blobs[key]
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self._blobs
+
+def blob_store_from_url(url: str) -> BlobStore:
+    """
+    Create a blob store from a URL.
+
+    Args:
+        url: ``file:///path/to/dir`` (or a plain path) for a LocalBlobStore,
+            ``memory://`` for a MemoryBlobStore
+
+    Raises:
+        ValueError: For unsupported schemes
+    """
+    parsed = urlparse(url)
+    if parsed.scheme in ('', 'file'):
+        return LocalBlobStore(parsed.path if parsed.scheme else url)
+    if parsed.scheme == 'memory':
+        return MemoryBlobStore()
+    raise ValueError(f"Unsupported blob store URL: {url}")
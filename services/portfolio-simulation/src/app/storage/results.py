@@ -0,0 +1,253 @@
+"""Simulation results split into a small JSON summary and compressed columnar series blobs."""
+import io
+import logging
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .blobs import BlobStore, blob_store_from_url
+
+logger = logging.getLogger(__name__)
+
+# Key marking a series reference in a results summary
+SERIES_MARKER = '$series'
+
+class ResultStore:
+    """
+    Stores bulky arrays of simulation results outside the database row.
+
+    Every list in the results with more than ``inline_max_items`` values
+    (equity curves, dates, frontiers, path matrices) is moved into one
+    compressed npz blob per simulation and replaced in the JSON by a small
+    reference: ``{'$series': <path>, 'shape': [...], 'dtype': ..., ...}``, where
+    the path is the list's location in the results as a JSON pointer
+    (e.g. ``strategies/0/equity``). Each series is its own column of the
+    blob, cut into chunks of ``chunk_rows`` rows, so reading a page
+    decompresses only the chunks it covers and no other series.
+    """
+
+    def __init__(self, blobs: BlobStore, inline_max_items: int = 256, chunk_rows: int = 16384):
+        """
+        Initialize the store.
+
+        Args:
+            blobs: Where series blobs are kept
+            inline_max_items: Lists up to this length stay in the JSON summary
+            chunk_rows: Rows per compressed chunk of a series
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be at least 1")
+        self.blobs = blobs
+        self.inline_max_items = inline_max_items
+        self.chunk_rows = chunk_rows
+
+    @staticmethod
+    def blob_key(simulation_id: Any) -> str:
+        return f"simulations/{simulation_id}/series.npz"
+
+    def save(self, simulation_id: Any, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store the bulky series of a simulation's results.
+
+        Replaces any series stored earlier for the simulation.
+
+        Returns:
+            JSON summary to keep in the database, with series references
+            in place of the bulky lists
+        """
+        columns: Dict[str, np.ndarray] = {}
+        summary = self._extract(results, '', columns)
+        key = self.blob_key(simulation_id)
+        if not columns:
+            self.blobs.delete_prefix(key)
+            return summary
+
+        buffer = io.BytesIO()
+        members = {}
+        for path, values in columns.items():
+            for chunk, start in enumerate(range(0, len(values), self.chunk_rows)):
+                members[f"{path}/{chunk}"] = values[start:start + self.chunk_rows]
+        np.savez_compressed(buffer, **members)
+        self.blobs.put(key, buffer.getvalue())
+        logger.debug(
+            f"Stored {len(columns)} series of simulation {simulation_id} ({buffer.tell()} bytes)"
+        )
+        return summary
+
+    def _extract(self, value: Any, path: str, columns: Dict[str, np.ndarray]) -> Any:
+        if isinstance(value, dict):
+            return {key: self._extract(item, _join(path, key), columns) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            array = _as_column(value)
+            if array is not None and array.size > self.inline_max_items:
+                columns[path] = array
+                return {
+                    SERIES_MARKER: path,
+                    'shape': list(array.shape),
+                    'dtype': _dtype_name(array),
+                    'chunk_rows': self.chunk_rows
+                }
+            return [self._extract(item, _join(path, str(i)), columns) for i, item in enumerate(value)]
+        return value
+
+    def read(
+        self,
+        simulation_id: Any,
+        reference: Dict[str, Any],
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Read rows ``offset`` to ``offset + limit`` of a stored series.
+
+        Args:
+            simulation_id: Simulation the series belongs to
+            reference: Series reference from the summary
+            offset: First row
+            limit: Number of rows (default: to the end)
+
+        Raises:
+            KeyError: If the simulation has no stored series or not this one
+        """
+        length = reference['shape'][0]
+        stop = length if limit is None else min(length, offset + max(limit, 0))
+        offset = min(max(offset, 0), stop)
+        with self._open(simulation_id) as archive:
+            parts = [
+                archive[_member(reference, chunk)][max(offset - start, 0):stop - start]
+                for chunk, start in _chunks(reference, offset, stop)
+            ]
+        if not parts:
+            return np.empty((0,) + tuple(reference['shape'][1:]), dtype=_dtype(reference))
+        return np.concatenate(parts)
+
+    def read_downsampled(
+        self,
+        simulation_id: Any,
+        reference: Dict[str, Any],
+        points: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read about ``points`` evenly spaced rows of a series, always including the first and last.
+
+        Returns:
+            (row positions, rows)
+        """
+        length = reference['shape'][0]
+        positions = np.unique(np.linspace(0, length - 1, min(max(points, 1), length)).round().astype(int))
+        rows = []
+        with self._open(simulation_id) as archive:
+            for chunk, start in _chunks(reference, positions[0], positions[-1] + 1):
+                in_chunk = positions[(positions >= start) & (positions < start + reference['chunk_rows'])]
+                if len(in_chunk):
+                    rows.append(archive[_member(reference, chunk)][in_chunk - start])
+        return positions, np.concatenate(rows)
+
+    def load(self, simulation_id: Any, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the full results of a simulation from its summary and series."""
+        references = list(iter_series(summary))
+        if not references:
+            return summary
+        with self._open(simulation_id) as archive:
+            def restore(value: Any) -> Any:
+                if isinstance(value, dict) and SERIES_MARKER in value:
+                    chunks = _chunks(value, 0, value['shape'][0])
+                    return np.concatenate([archive[_member(value, chunk)] for chunk, _ in chunks]).tolist()
+                if isinstance(value, dict):
+                    return {key: restore(item) for key, item in value.items()}
+                if isinstance(value, list):
+                    return [restore(item) for item in value]
+                return value
+            return restore(summary)
+
+    def delete(self, simulation_id: Any) -> None:
+        self.blobs.delete_prefix(f"simulations/{simulation_id}/")
+
+    def _open(self, simulation_id: Any) -> '_Archive':
+        return _Archive(self.blobs.open(self.blob_key(simulation_id)))
+
+class _Archive:
+    """Lazily read npz blob: members are decompressed only when indexed."""
+
+    def __init__(self, file):
+        self._file = file
+        self._npz = np.load(file, allow_pickle=False)
+
+    def __getitem__(self, member: str) -> np.ndarray:
+        try:
+            return self._npz[member]
+        except KeyError:
+            raise KeyError(f"No stored series chunk {member}") from None
+
+    def __enter__(self) -> '_Archive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._npz.close()
+        self._file.close()
+
+def iter_series(summary: Any) -> Iterator[Dict[str, Any]]:
+    """Every series reference in a results summary."""
+    if isinstance(summary, dict):
+        if SERIES_MARKER in summary:
+            yield summary
+            return
+        for value in summary.values():
+            yield from iter_series(value)
+    elif isinstance(summary, list):
+        for value in summary:
+            yield from iter_series(value)
+
+def find_series(summary: Any, path: str) -> Optional[Dict[str, Any]]:
+    """The reference of the series stored from ``path``, if there is one."""
+    return next((reference for reference in iter_series(summary) if reference[SERIES_MARKER] == path), None)
+
+def _as_column(values: List[Any]) -> Optional[np.ndarray]:
+    """Values as a numeric or string array, or None if they are not a regular array."""
+    try:
+        array = np.asarray(values)
+    except ValueError:  # Ragged nested lists
+        return None
+    if array.dtype.kind in 'biuf':
+        return array
+    # NumPy turns numbers mixed into a list of strings into strings
+    if array.dtype.kind == 'U' and array.ndim == 1 and all(isinstance(value, str) for value in values):
+        return array
+    return None
+
+_DTYPES = {'b': ('bool', bool), 'i': ('int', int), 'u': ('int', int), 'f': ('float', float), 'U': ('str', str)}
+
+def _dtype_name(array: np.ndarray) -> str:
+    return _DTYPES[array.dtype.kind][0]
+
+def _dtype(reference: Dict[str, Any]) -> type:
+    return next(kind for name, kind in _DTYPES.values() if name == reference['dtype'])
+
+def _join(path: str, key: str) -> str:
+    # JSON pointer escaping, so keys containing '/' cannot collide
+    key = key.replace('~', '~0').replace('/', '~1')
+    return f"{path}/{key}" if path else key
+
+def _chunks(reference: Dict[str, Any], start: int, stop: int) -> Iterator[Tuple[int, int]]:
+    """(chunk number, first row) of the chunks of a series covering rows ``start`` to ``stop``."""
+    size = reference['chunk_rows']
+    for chunk in range(start // size, math.ceil(stop / size)):
+        yield chunk, chunk * size
+
+def _member(reference: Dict[str, Any], chunk: int) -> str:
+    return f"{reference[SERIES_MARKER]}/{chunk}"
+
+_store: Optional[ResultStore] = None
+
+def get_result_store() -> ResultStore:
+    """The result store configured by RESULT_STORE_URL, created on first use."""
+    global _store
+    if _store is None:
+        _store = ResultStore(
+            blob_store_from_url(settings.RESULT_STORE_URL),
+            inline_max_items=settings.RESULT_INLINE_MAX_ITEMS,
+            chunk_rows=settings.RESULT_CHUNK_ROWS
+        )
+    return _store
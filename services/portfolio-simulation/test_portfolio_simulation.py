@@ -5,14 +5,1237 @@ Run this script to verify the service is working correctly.
 """
 
 import asyncio
+import multiprocessing
 import sys
 import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from datetime import datetime, timedelta, timezone
+from multiprocessing.shared_memory import SharedMemory
+from uuid import UUID, uuid4
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from scipy.cluster.hierarchy import leaves_list, to_tree
+from scipy.optimize import Bounds, LinearConstraint, approx_fprime, minimize
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from app.algorithms.backtest import Backtester, BacktestStrategy
+from app.algorithms.batch import BatchOptimizationRequest, BatchOptimizer
+from app.algorithms.black_litterman import BlackLittermanOptimizer, View, clear_prior_cache
+from app.algorithms.covariance import (
+    COVARIANCE_ESTIMATORS,
+    DenseCovariance,
+    EWMACovariance,
+    FactorCovariance,
+    FactorModelCovariance,
+    LedoitWolfCovariance,
+    RollingMoments
+)
+from app.algorithms.critical_line import CriticalLineAlgorithm, max_return_weights
+from app.algorithms.efficient_frontier import EfficientFrontier
+from app.algorithms.goal_projection import CashFlow, GoalProjector, LognormalSampler, cash_flow_schedule
+from app.algorithms.hierarchical_risk_parity import HierarchicalRiskParityOptimizer
 from app.algorithms.mean_variance import MeanVarianceOptimizer
-from app.algorithms.risk_parity import RiskParityOptimizer
+from app.algorithms.qp_solvers import ADMMSolver, QPProblem, get_qp_solver
+from app.algorithms.rebalancing import RebalancingOptimizer
+from app.algorithms.result_cache import ResultCache
+from app.algorithms.risk_parity import RiskParityOptimizer, risk_budget_residual, solve_risk_budget
+from app.algorithms.shared_panel import SharedPanelPool, SharedPanelRegistry, attach
+from app.algorithms.sweep import ParameterSweep
+from app.algorithms.universe import ReturnsUniverse
+from app.algorithms.what_if import WhatIfAnalyzer, clear_analyzer_cache
+from app.api.v1 import api
+from app.core.database import get_db
+from app.core.security import get_current_user_id
+from app.jobs import runner as runner_module
+from app.jobs.handlers import JobContext
+from app.jobs.runner import SimulationRunner
+from app.models.base import Base
+from app.models.portfolio import Portfolio, PortfolioAsset
+from app.models.simulation import Simulation, SimulationStatus, SimulationType
+from app.storage.blobs import MemoryBlobStore
+from app.storage.results import ResultStore, get_result_store
+
+
+def make_returns(n_days: int, n_assets: int, seed: int = 0) -> pd.DataFrame:
+    """Daily returns from a three-factor model, as in benchmarks/common.py."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0.0, 0.18 / np.sqrt(252), size=(n_days, 3))
+    factors[:, 0] += 0.07 / 252
+    loadings = rng.normal(0.0, 0.5, size=(3, n_assets))
+    loadings[0] = rng.uniform(0.5, 1.5, size=n_assets)
+    noise = rng.normal(0.0, 0.25 / np.sqrt(252), size=(n_days, n_assets))
+    alpha = rng.normal(0.0, 0.05 / 252, size=n_assets)
+    returns = factors @ loadings + noise + alpha
+    return pd.DataFrame(returns, columns=[f"ASSET_{i:04d}" for i in range(n_assets)])
+
+
+def test_max_sharpe_solvers_agree():
+    """ADMM, which solver='auto' picks for large universes, maximizes the Sharpe ratio SLSQP reports."""
+    returns = make_returns(1260, 300)
+    slsqp = MeanVarianceOptimizer(returns, solver='slsqp').optimize()
+    admm = MeanVarianceOptimizer(returns, solver='admm').optimize()
+    auto = MeanVarianceOptimizer(returns, solver='auto').optimize()
+    assert abs(admm.sharpe_ratio - slsqp.sharpe_ratio) <= 1e-4 * abs(slsqp.sharpe_ratio)
+    assert auto.sharpe_ratio == admm.sharpe_ratio
+
+
+def test_cla_turning_points_match_warm_started_slsqp():
+    """CLA turning points, and interpolations between them, are the minimum variance portfolios SLSQP finds."""
+    for n_assets, cap, seed in ((8, 1.0, 0), (20, 0.1, 1), (20, 0.2, 0)):
+        frontier = EfficientFrontier(make_returns(1260, n_assets, seed), weight_bounds=(0.0, cap))
+        cla = CriticalLineAlgorithm(frontier.expected_returns, frontier.cov_matrix, 0.0, cap).solve()
+        turning = [w @ frontier.expected_returns for w in cla.weights]
+        between = [(hi + lo) / 2 for hi, lo in zip(turning[:-1], turning[1:])]
+        for targets, exact in ((turning, cla.weights), (between, cla.frontier_weights(between))):
+            solved = frontier.frontier_weights(targets, initial_weights=cla.weights[-1])
+            for cla_weights, slsqp_weights in zip(exact, solved):
+                cla_variance = cla_weights @ frontier.cov_matrix @ cla_weights
+                slsqp_variance = slsqp_weights @ frontier.cov_matrix @ slsqp_weights
+                # SLSQP cannot beat the exact CLA optimum beyond rounding
+                assert -1e-9 <= (slsqp_variance - cla_variance) / cla_variance <= 1e-5
+                np.testing.assert_allclose(cla_weights, slsqp_weights, atol=2e-3)
+
+
+def test_max_return_weights_with_caps_that_sum_to_one_up_to_rounding():
+    """Seven assets capped at 1/7 are fully invested, and bounds that cannot reach 1 are rejected."""
+    frontier = EfficientFrontier(make_returns(504, 7), weight_bounds=(0.0, 1 / 7))
+    weights, _ = max_return_weights(frontier.expected_returns, np.zeros(7), np.full(7, 1 / 7))
+    np.testing.assert_allclose(weights, 1 / 7, rtol=1e-12)
+    cla = CriticalLineAlgorithm(frontier.expected_returns, frontier.cov_matrix, 0.0, 1 / 7).solve()
+    np.testing.assert_allclose(cla.weights[0], 1 / 7, rtol=1e-12)
+
+    with pytest.raises(ValueError, match="infeasible"):
+        max_return_weights(frontier.expected_returns, np.zeros(7), np.full(7, 0.1))
+    with pytest.raises(ValueError, match="infeasible"):
+        max_return_weights(frontier.expected_returns, np.full(7, 0.2), np.ones(7))
+
+
+def test_cla_does_not_cycle_on_tight_upper_bounds():
+    """An asset that just hit its cap does not re-enter at the same lambda (it used to loop forever here)."""
+    returns = make_returns(1260, 20, seed=1)
+    solved = []
+    solver = threading.Thread(
+        target=lambda: solved.append(CriticalLineAlgorithm(returns.mean().values, returns.cov().values, 0.0, 0.1).solve()),
+        daemon=True
+    )
+    solver.start()
+    solver.join(timeout=30)
+    assert solved, "CLA did not terminate"
+    cla = solved[0]
+    lambdas = [lam for lam in cla.lambdas if lam is not None]
+    assert all(later < earlier for earlier, later in zip(lambdas, lambdas[1:]))
+    assert lambdas[-1] == 0
+    for weights in cla.weights:
+        assert abs(weights.sum() - 1) <= 1e-9
+        assert weights.min() >= -1e-9 and weights.max() <= 0.1 + 1e-9
+
+
+def test_slsqp_gradients_match_finite_differences():
+    """The closed-form volatility, return and negative Sharpe gradients match approx_fprime, off the budget too."""
+    returns = make_returns(504, 12)
+    rng = np.random.default_rng(1)
+    for covariance in ('sample', 'factor'):
+        optimizer = MeanVarianceOptimizer(returns, risk_free_rate=0.02, covariance=covariance)
+        for _ in range(3):
+            # Weights that do not sum to 1 exercise the Sharpe ratio's normalization
+            weights = rng.uniform(0.02, 0.2, returns.shape[1])
+            for objective, gradient in (
+                (optimizer._portfolio_volatility, optimizer._portfolio_volatility_grad),
+                (optimizer._portfolio_return, optimizer._portfolio_return_grad),
+                (optimizer._neg_sharpe_ratio, optimizer._neg_sharpe_ratio_grad)
+            ):
+                analytic = gradient(weights)
+                numeric = approx_fprime(weights, objective, 1e-7)
+                np.testing.assert_allclose(analytic, numeric, rtol=0, atol=1e-5 * np.abs(analytic).max())
+
+
+def test_newton_risk_budget_matches_budgets():
+    """Newton risk budgeting hits unequal budgets, and the optimizer equal ones, to solver precision."""
+    returns = make_returns(1260, 50)
+    covariance = DenseCovariance(returns.cov().values)
+    budgets = np.linspace(1.0, 3.0, 50)
+    result = solve_risk_budget(covariance, budgets, tolerance=1e-12)
+    assert result.converged
+    assert result.weights.min() > 0 and abs(result.weights.sum() - 1) < 1e-12
+    assert risk_budget_residual(covariance, result.weights, budgets / budgets.sum()) <= 1e-11
+
+    portfolio = RiskParityOptimizer(returns).optimize()
+    assert portfolio.solver_info['method'] == 'newton'
+    weights = np.array([portfolio.weights[asset] for asset in returns.columns])
+    assert risk_budget_residual(covariance, weights, np.full(50, 1 / 50)) <= 1e-10
+
+
+def test_slsqp_risk_parity_fits_risk_shares_under_binding_bounds():
+    """When the bounds rule out exact budgets, the SLSQP fallback finds the closest risk shares the bounds allow."""
+    returns = make_returns(756, 8, seed=3)
+    covariance = returns.cov().values
+    budgets = np.full(8, 1 / 8)
+
+    def share_error(weights):
+        shares = weights * (covariance @ weights) / (weights @ covariance @ weights)
+        return np.sum((shares - budgets) ** 2)
+
+    portfolio = RiskParityOptimizer(returns, weight_bounds=(0.1, 0.2)).optimize()
+    assert portfolio.solver_info['method'] == 'slsqp'
+    weights = np.array([portfolio.weights[asset] for asset in returns.columns])
+    assert weights.min() >= 0.1 - 1e-9 and weights.max() <= 0.2 + 1e-9
+    # Comparing contributions in volatility units with the budgets left a residual of 0.26 here
+    assert portfolio.solver_info['residual'] <= 0.06
+    best = minimize(
+        share_error,
+        budgets,
+        method='trust-constr',
+        bounds=Bounds(0.1, 0.2),
+        constraints=[LinearConstraint(np.ones((1, 8)), 1, 1)],
+        options={'gtol': 1e-12, 'xtol': 1e-14, 'maxiter': 5000}
+    )
+    assert share_error(weights) <= best.fun + 1e-8
+
+
+def naive_hrp_weights(cov: np.ndarray, link: np.ndarray, bisection: str) -> np.ndarray:
+    """HRP by explicit recursion, each cluster variance from its inverse-variance portfolio."""
+    def cluster_variance(items):
+        sub = cov[np.ix_(items, items)]
+        ivp = 1.0 / np.diag(sub)
+        ivp /= ivp.sum()
+        return ivp @ sub @ ivp
+
+    weights = np.ones(len(cov))
+
+    def split(left, right):
+        var_left, var_right = cluster_variance(left), cluster_variance(right)
+        weights[left] *= var_right / (var_left + var_right)
+        weights[right] *= var_left / (var_left + var_right)
+
+    if bisection == 'tree':
+        def recurse(node):
+            if node.is_leaf():
+                return
+            split(node.get_left().pre_order(), node.get_right().pre_order())
+            recurse(node.get_left())
+            recurse(node.get_right())
+        recurse(to_tree(link))
+    else:
+        clusters = [leaves_list(link).tolist()]
+        while clusters:
+            clusters = [c[i:j] for c in clusters for i, j in ((0, len(c) // 2), (len(c) // 2, len(c))) if len(c) > 1]
+            for left, right in zip(clusters[::2], clusters[1::2]):
+                split(left, right)
+    return weights / weights.sum()
+
+
+def test_hrp_matches_naive_recursion():
+    """The prefix-sum HRP bisection gives the weights of the textbook recursion."""
+    returns = make_returns(504, 60)
+    for bisection in ('tree', 'midpoint'):
+        optimizer = HierarchicalRiskParityOptimizer(returns, bisection=bisection)
+        portfolio = optimizer.optimize()
+        weights = np.array([portfolio.weights[asset] for asset in returns.columns])
+        expected = naive_hrp_weights(optimizer.cov_matrix, optimizer.linkage_matrix, bisection)
+        np.testing.assert_allclose(weights, expected, rtol=1e-10, atol=1e-14)
+
+
+def test_black_litterman_posterior_matches_direct_formula():
+    """The Woodbury posterior equals [(τΣ)^-1 + P'Ω^-1 P]^-1 [(τΣ)^-1 Π + P'Ω^-1 Q]."""
+    returns = make_returns(756, 40)
+    assets = returns.columns
+    views = [
+        View([assets[0], assets[1]], [1.0, -1.0], 0.0004, 0.6),
+        View([assets[2]], [1.0], 0.0008, 0.3),
+        View([assets[5], assets[7], assets[9]], [0.5, 0.3, 0.2], 0.0002, 0.9),
+    ]
+    clear_prior_cache()
+    optimizer = BlackLittermanOptimizer(returns, tau=0.1)
+    posterior = optimizer.combine_views(views)
+
+    P, Q, Omega = optimizer._create_view_matrices(views)
+    prior_precision = np.linalg.inv(0.1 * optimizer.cov_matrix)
+    view_precision = P.T @ np.linalg.inv(Omega)
+    expected = np.linalg.solve(
+        prior_precision + view_precision @ P,
+        prior_precision @ optimizer.equilibrium_returns + view_precision @ Q
+    )
+    np.testing.assert_allclose(posterior, expected, rtol=1e-8, atol=1e-12)
+
+def daily_loop_equity(returns: np.ndarray, weights: np.ndarray, positions: set, cost: float) -> np.ndarray:
+    """Reference backtest, as in benchmarks/bench_backtest.py: update every holding day by day."""
+    holdings = np.zeros(returns.shape[1])
+    cash = 1.0
+    equity = np.empty(len(returns))
+    for t in range(len(returns)):
+        if t > 0:
+            holdings = holdings * (1.0 + returns[t])
+        value = holdings.sum() + cash
+        equity[t] = value
+        if t in positions:
+            value *= 1.0 - cost * np.abs(weights - holdings / value).sum()
+            holdings = weights * value
+            cash = value * (1.0 - weights.sum())
+            if t == 0:
+                equity[t] = value
+    return equity
+
+
+def test_backtest_matches_daily_loop():
+    """The vectorized backtest reproduces a day-by-day simulation, with costs and a cash sleeve."""
+    panel = make_returns(504, 8)
+    panel.index = pd.bdate_range('2020-01-01', periods=504)
+    weights = np.random.default_rng(1).dirichlet(np.ones(8), size=2)
+    weights[1] *= 0.8
+    backtester = Backtester(panel, schedule='M', transaction_cost=0.001)
+    results = backtester.run([
+        BacktestStrategy(f"s{i}", weights=dict(zip(panel.columns, w))) for i, w in enumerate(weights)
+    ])
+    positions = set(backtester.rebalance_positions('M').tolist()) | {0}
+    positions.discard(len(panel) - 1)
+    for i, w in enumerate(weights):
+        reference = daily_loop_equity(panel.values, w, positions, 0.001)
+        np.testing.assert_allclose(results[f"s{i}"].equity.values, reference, rtol=1e-12)
+
+
+def test_shared_panel_registry_shares_counts_and_unlinks():
+    """A keyed panel is published once, read unchanged by a spawned worker and unlinked with its last reference."""
+    registry = SharedPanelRegistry(prefix='psimtest')
+    panel = make_returns(300, 6)
+    handle = registry.publish(panel, key='returns')
+    assert registry.publish(panel.copy(), key='returns') == handle
+    assert registry.refcount(handle) == 2
+    registry.release(handle)
+
+    pool = SharedPanelPool(
+        [registry.acquire(handle)],
+        registry=registry,
+        max_workers=1,
+        mp_context=multiprocessing.get_context('spawn')
+    )
+    with pool:
+        pd.testing.assert_frame_equal(pool.submit(attach, handle).result(), panel)
+        assert registry.refcount(handle) == 2
+    # Shutting the pool down drops its reference, the last release unlinks the block
+    assert registry.refcount(handle) == 1
+    registry.release(handle)
+    assert registry.refcount(handle) == 0
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=handle.name)
+
+
+@pytest.fixture
+def spawn_start_method():
+    """Make spawn the default start method for the duration of a test."""
+    method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method('spawn', force=True)
+    yield
+    multiprocessing.set_start_method(method, force=True)
+
+
+def test_spawned_batch_and_sweep_pools_run_with_a_cache_and_pool_slots(spawn_start_method):
+    """Spawned workers get the batch or sweep without its result cache or pool slots, which cannot be pickled."""
+    returns = make_returns(250, 4)
+    slots = threading.BoundedSemaphore(1)
+    requests = [BatchOptimizationRequest(f"cap{cap}", weight_bounds=(0.0, cap)) for cap in (1.0, 0.6, 0.4)]
+    batch = BatchOptimizer(returns, max_workers=2, cache=ResultCache(), pool_slots=slots)
+    results = {result.request_id: result for result in batch.optimize(requests)}
+    assert sorted(results) == sorted(request.request_id for request in requests)
+    for request in requests:
+        direct = MeanVarianceOptimizer(returns, weight_bounds=request.weight_bounds).optimize()
+        for asset, weight in direct.weights.items():
+            assert results[request.request_id].portfolio.weights[asset] == pytest.approx(weight, abs=1e-6)
+
+    grid = {"risk_free_rate": [0.0, 0.01, 0.02]}
+    sweep = ParameterSweep(
+        MeanVarianceOptimizer, returns, grid, options={"solver": "slsqp"},
+        max_workers=2, cache=ResultCache(), pool_slots=slots
+    )
+    points = {result.index: result for result in sweep.run()}
+    assert sorted(points) == [0, 1, 2] and all(result.success for result in points.values())
+    # Both pools gave their slot back
+    assert slots.acquire(blocking=False)
+    slots.release()
+
+
+def test_universe_moments_are_computed_once_for_consecutive_optimizers(monkeypatch):
+    """Optimizers built on one ReturnsUniverse share its mean, covariance and named covariance models."""
+    calls = Counter()
+
+    def counting(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for name in ('mean', 'cov'):
+        patched = cached_property(counting(name, ReturnsUniverse.__dict__[name].func))
+        patched.__set_name__(ReturnsUniverse, name)
+        monkeypatch.setattr(ReturnsUniverse, name, patched)
+    for name in ('sample', 'ledoit_wolf'):
+        estimator = COVARIANCE_ESTIMATORS[name]
+        monkeypatch.setattr(estimator, 'estimate_universe', counting(name, estimator.estimate_universe))
+
+    universe = ReturnsUniverse(make_returns(500, 6))
+    for covariance in ('sample', 'ledoit_wolf'):
+        first = MeanVarianceOptimizer(universe, covariance=covariance)
+        second = RiskParityOptimizer(universe, covariance=covariance)
+        assert first.expected_returns is second.expected_returns is universe.mean
+        assert first.covariance_model is second.covariance_model is universe.covariance_model(covariance)
+        first.optimize()
+        second.optimize()
+    assert calls == {'mean': 1, 'cov': 1, 'sample': 1, 'ledoit_wolf': 1}
+
+
+def test_rolling_moments_do_not_drift():
+    """Thousands of slides without a refresh stay at rounding error of re-estimating each window."""
+    values = make_returns(3252, 20).values
+    lookback = 252
+    for step in (1, 21):
+        moments = RollingMoments(values[:lookback], refresh=0)
+        for end in range(lookback + step, len(values) + 1, step):
+            moments.slide(values[end - step:end], values[end - lookback - step:end - lookback])
+            if (end - lookback) % 500 < step or end + step > len(values):
+                window = values[end - lookback:end]
+                exact = np.cov(window, rowvar=False)
+                assert np.abs(moments.covariance - exact).max() <= 1e-12 * np.abs(exact).max()
+                assert np.abs(moments.mean - window.mean(axis=0)).max() <= 1e-15
+
+    # A due refresh re-estimates the window it is given
+    moments = RollingMoments(values[:lookback], refresh=100)
+    for end in range(lookback + 1, lookback + 101):
+        moments.slide(values[end - 1], values[end - lookback - 1], window=values[end - lookback:end])
+    np.testing.assert_allclose(moments.covariance, np.cov(values[100:lookback + 100], rowvar=False), rtol=1e-13)
+
+
+def test_ledoit_wolf_matches_direct_formula():
+    """The shrinkage intensity is Ledoit & Wolf's, and is applied to the same (divided by T) covariance."""
+    returns = make_returns(300, 8)
+    centered = returns.values - returns.values.mean(axis=0)
+    n_samples, n_assets = centered.shape
+    emp_cov = centered.T @ centered / n_samples
+    mu = np.trace(emp_cov) / n_assets
+    # b^2 averages the distance of each observation's outer product from the sample covariance
+    b2 = sum(np.sum((np.outer(row, row) - emp_cov) ** 2) for row in centered) / n_samples ** 2
+    d2 = np.sum((emp_cov - mu * np.eye(n_assets)) ** 2)
+    shrinkage = min(b2, d2) / d2
+
+    estimator = LedoitWolfCovariance()
+    model = estimator.estimate(returns)
+    assert abs(estimator.shrinkage_ - shrinkage) <= 1e-12
+    expected = (1 - shrinkage) * emp_cov + shrinkage * mu * np.eye(n_assets)
+    np.testing.assert_allclose(model.to_dense(), expected, rtol=1e-12)
+    np.testing.assert_allclose(estimator.estimate_universe(ReturnsUniverse(returns)).to_dense(), expected, rtol=1e-12)
+
+    fixed = LedoitWolfCovariance(shrinkage=0.5).estimate(returns).to_dense()
+    np.testing.assert_allclose(fixed, 0.5 * emp_cov + 0.5 * mu * np.eye(n_assets), rtol=1e-12)
+
+
+def test_ewma_covariance_matches_pandas_and_direct_formula():
+    """Demeaned EWMA equals pandas' debiased ewm().cov(); without demeaning it is the weighted sum of outer products."""
+    returns = make_returns(300, 8)
+    expected = returns.ewm(alpha=1 - 0.94, adjust=True).cov(bias=False).loc[returns.index[-1]].values
+    np.testing.assert_allclose(EWMACovariance(decay=0.94).estimate(returns).to_dense(), expected, rtol=1e-12)
+
+    decay = 0.5 ** (1 / 30)
+    weights = decay ** np.arange(len(returns) - 1, -1, -1)
+    weights /= weights.sum()
+    outer = sum(w * np.outer(row, row) for w, row in zip(weights, returns.values))
+    expected = outer / (1 - np.sum(weights ** 2))
+    model = EWMACovariance(halflife=30, demean=False).estimate(returns)
+    np.testing.assert_allclose(model.to_dense(), expected, rtol=1e-12)
+
+
+def test_factor_model_covariance_matches_regression_and_principal_components():
+    """Given factors, B F B' + diag(d) comes from per-asset OLS; without, B B' is the top eigenpairs of the sample covariance."""
+    returns = make_returns(500, 12)
+    n_samples = len(returns)
+    rng = np.random.default_rng(3)
+    factors = pd.DataFrame(rng.normal(0.0, 0.01, size=(n_samples, 2)), index=returns.index)
+    model = FactorModelCovariance(factor_returns=factors).estimate(returns)
+    design = np.column_stack([np.ones(n_samples), factors.values])
+    loadings, residuals = [], []
+    for asset in returns.columns:
+        coefficients = np.linalg.lstsq(design, returns[asset].values, rcond=None)[0]
+        loadings.append(coefficients[1:])
+        residuals.append(returns[asset].values - design @ coefficients)
+    loadings = np.array(loadings)
+    expected = loadings @ np.cov(factors.values, rowvar=False) @ loadings.T + np.diag(np.var(residuals, axis=1, ddof=1))
+    np.testing.assert_allclose(model.to_dense(), expected, rtol=1e-10, atol=1e-14)
+
+    model = FactorModelCovariance(num_factors=3).estimate(returns)
+    sample = returns.cov().values
+    eigenvalues, eigenvectors = np.linalg.eigh(sample)
+    top = eigenvectors[:, -3:] * eigenvalues[-3:] @ eigenvectors[:, -3:].T
+    np.testing.assert_allclose(model.loadings @ model.loadings.T, top, rtol=1e-8, atol=1e-14)
+    np.testing.assert_allclose(model.diagonal(), np.diag(sample), rtol=1e-10)
+
+
+def test_factor_covariance_products_match_dense_matrix():
+    """The Woodbury solves and O(Nk) products of a factor model agree with its dense matrix."""
+    rng = np.random.default_rng(4)
+    n_assets, n_factors = 40, 4
+    loadings = rng.normal(0.0, 0.3, size=(n_assets, n_factors))
+    root = rng.normal(size=(n_factors, n_factors))
+    model = FactorCovariance(loadings, root @ root.T + np.eye(n_factors), rng.uniform(0.01, 0.05, n_assets))
+    dense = model.to_dense()
+    np.testing.assert_allclose(dense, loadings @ model.factor_cov @ loadings.T + np.diag(model.specific_variance))
+
+    vector, matrix = rng.normal(size=n_assets), rng.normal(size=(n_assets, 3))
+    shift = rng.uniform(0.0, 0.1, n_assets)
+    for b in (vector, matrix):
+        np.testing.assert_allclose(model.matvec(b), dense @ b, rtol=1e-12)
+        np.testing.assert_allclose(model.solve(b), np.linalg.solve(dense, b), rtol=1e-9)
+        np.testing.assert_allclose(model.solve_shifted(b, shift), np.linalg.solve(dense + np.diag(shift), b), rtol=1e-9)
+    assert abs(model.quadratic_form(vector) - vector @ dense @ vector) <= 1e-12 * (vector @ dense @ vector)
+    np.testing.assert_allclose(model.diagonal(), np.diag(dense), rtol=1e-12)
+    indices = np.array([3, 17, 29])
+    np.testing.assert_allclose(model.columns(indices), dense[:, indices], rtol=1e-12)
+    np.testing.assert_allclose(model.subset(indices).to_dense(), dense[np.ix_(indices, indices)], rtol=1e-12)
+
+
+def period_loop_values(sampler, paths: int, periods: int, initial_value: float, flows: np.ndarray, seed: int) -> np.ndarray:
+    """Paths x periods values from V_t = (V_{t-1} + c_t)(1 + r_t), one period at a time."""
+    growth = 1.0 + sampler.sample(np.random.default_rng(seed), paths, periods)
+    values = np.empty((paths, periods))
+    value = np.full(paths, initial_value)
+    depleted = np.zeros(paths, dtype=bool)
+    for t in range(periods):
+        value = value + flows[t]
+        depleted |= value < 0
+        value = np.where(depleted, 0.0, value * growth[:, t])
+        values[:, t] = value
+    return values
+
+
+def test_goal_projection_percentiles_match_exact_percentiles():
+    """Streamed percentiles over several chunks agree with np.percentile of the full value matrix."""
+    sampler = LognormalSampler(0.06, 0.15)
+    paths, periods, quantiles, bins = 2000, 360, (5, 25, 50, 75, 95), 4096
+    cash_flows = [CashFlow(1000.0, end=240, growth=0.02), CashFlow(-2500.0, start=240)]
+    values = period_loop_values(sampler, paths, periods, 50000.0, cash_flow_schedule(cash_flows, periods), seed=7)
+    projector = GoalProjector(sampler, num_paths=paths, seed=7, chunk_cells=250 * periods, bins=bins)
+    projection = projector.project(periods, initial_value=50000.0, cash_flows=cash_flows, quantiles=quantiles)
+
+    assert projection.mean_terminal_value == pytest.approx(values[:, -1].mean(), rel=1e-12)
+    assert projection.probability_of_depletion == np.mean(values[:, -1] == 0)
+    exact = np.percentile(values, quantiles, axis=0)
+    assert projection.median_terminal_value == pytest.approx(exact[2, -1], rel=5e-3)
+    # Within a bin of the order statistics np.percentile interpolates between;
+    # the histogram spans a factor of 1e7 in log-spaced bins
+    bin_width = 1e7 ** (1 / bins)
+    ordered = np.sort(values, axis=0)
+    for q, row in zip(quantiles, exact):
+        streamed = np.array(projection.percentiles[f"p{q}"])
+        rank = q / 100 * (paths - 1)
+        assert np.all(streamed >= ordered[int(np.floor(rank))] / bin_width)
+        assert np.all(streamed <= ordered[int(np.ceil(rank))] * bin_width)
+        if 25 <= q <= 75:
+            assert np.allclose(streamed, row, rtol=5e-3)
+
+
+class PrimalStartRebalancer(RebalancingOptimizer):
+    """Rebalancer whose first solve only gets the holdings, not their active set."""
+
+    def _qp_start_duals(self, problem):
+        return None
+
+
+def test_admm_reuses_factorizations_and_caps_rho_updates():
+    """A revisited step size reuses its Cholesky factor, and the update cap bounds the refactorizations."""
+    returns = make_returns(504, 60)
+    n_assets = returns.shape[1]
+    problem = QPProblem(
+        returns.cov().values * 252,
+        -returns.mean().values * 252,
+        sp.vstack([np.ones((1, n_assets)), sp.eye(n_assets)]),
+        np.r_[1.0, np.zeros(n_assets)],
+        np.r_[1.0, np.full(n_assets, 0.05)]
+    )
+    optimum = get_qp_solver('slsqp').solve(problem).objective
+    # Frequent, fine-grained step size changes without polishing
+    restless = dict(adaptive_rho_interval=5, adaptive_rho_tolerance=1.2, polish=False, eps_abs=1e-8, eps_rel=1e-8)
+
+    result = ADMMSolver(max_rho_updates=100, **restless).solve(problem)
+    assert result.success and abs(result.objective - optimum) <= 1e-5 * abs(optimum)
+    assert 1 < result.info['factorizations'] < 1 + result.info['rho_updates']
+
+    for cap in (0, 3):
+        result = ADMMSolver(max_rho_updates=cap, **restless).solve(problem)
+        assert result.success and abs(result.objective - optimum) <= 1e-5 * abs(optimum)
+        assert result.info['rho_updates'] == cap
+        assert result.info['factorizations'] <= 1 + cap
+
+
+def test_rebalance_warm_start_skips_admm_iterations():
+    """Rebalancing last month's holdings polishes their active set instead of iterating, to the same trades."""
+    panel = make_returns(777, 100)
+    holdings = RebalancingOptimizer(panel.iloc[:756], {}, solver='admm').optimize().weights
+    rolled = panel.iloc[21:]
+    warm = RebalancingOptimizer(rolled, holdings, transaction_costs=0.001, solver='admm').rebalance()
+    primal = PrimalStartRebalancer(rolled, holdings, transaction_costs=0.001, solver='admm').rebalance()
+    assert warm.iterations == 0 < primal.iterations
+    assert warm.trades.keys() == primal.trades.keys()
+    for asset, weight in primal.portfolio.weights.items():
+        assert abs(warm.portfolio.weights[asset] - weight) <= 1e-8
+
+
+class FakeAsyncRedis:
+    """The few ``redis.asyncio.Redis`` commands the result cache uses, kept in dicts."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value.encode()
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(member.encode() for member in members)
+
+    async def expire(self, key, ttl):
+        pass
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    async def delete(self, *keys):
+        for key in keys:
+            key = key.decode() if isinstance(key, bytes) else key
+            self.data.pop(key, None)
+            self.sets.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append(getattr(self.redis, name)(*args, **kwargs))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+USER_ID = "a0000000-0000-4000-8000-000000000001"
+OTHER_USER_ID = "b0000000-0000-4000-8000-000000000002"
+
+
+def test_service_entrypoint_imports():
+    """The deployed entrypoint (app.py) serves src.app.main's app and its v1 routes, not a fallback."""
+    import importlib.util
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    spec = importlib.util.spec_from_file_location('service_entrypoint', path)
+    entrypoint = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(entrypoint)
+
+    from src.app.main import app
+    assert entrypoint.app is app
+    paths = {route.path for route in app.routes}
+    for route in (
+        "/api/v1/simulations/{simulation_id}/run",
+        "/api/v1/simulations/{simulation_id}/results",
+        "/api/v1/optimize/batch",
+        "/api/v1/optimize/sweep",
+        "/api/v1/risk/what-if"
+    ):
+        assert route in paths
+    # Without entering the client, startup (and the job runner) does not run
+    assert TestClient(app).get("/health").json()["status"] == "healthy"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """TestClient for the v1 router with authentication stubbed and an in-memory Redis."""
+    monkeypatch.setattr(api, 'result_cache', ResultCache(FakeAsyncRedis()))
+    monkeypatch.setattr(api.settings, 'BATCH_MAX_WORKERS', 1)
+    app = FastAPI()
+    app.include_router(api.api_router, prefix="/api/v1")
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    return TestClient(app)
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_route_streams_results_and_caches_them(client):
+    """POST /optimize/batch solves each distinct request once and answers repeats from the cache."""
+    returns = make_returns(250, 5)
+    body = {
+        "returns": {asset: returns[asset].tolist() for asset in returns.columns},
+        "requests": [
+            {"request_id": "a", "weight_bounds": [0.0, 0.5]},
+            {"request_id": "b", "weight_bounds": [0.0, 0.5]},
+            {"request_id": "c", "weight_bounds": [0.0, 0.3]}
+        ]
+    }
+    first = client.post("/api/v1/optimize/batch", json=body)
+    assert first.status_code == 200
+    results = {result["request_id"]: result for result in ndjson(first)}
+    assert set(results) == {"a", "b", "c"}
+    assert all(result["status"] == "success" for result in results.values())
+    assert results["a"]["weights"] == results["b"]["weights"]
+    assert max(results["c"]["weights"].values()) <= 0.3 + 1e-6
+    assert api.result_cache.misses == 3 and api.result_cache.hits == 0
+
+    # A new process would only have Redis: the results come back from there
+    api.result_cache.clear()
+    second = client.post("/api/v1/optimize/batch", json=body)
+    assert {result["request_id"]: result["weights"] for result in ndjson(second)} == {
+        request_id: result["weights"] for request_id, result in results.items()
+    }
+    assert api.result_cache.hits == 3
+
+    too_many = dict(body, requests=body["requests"] * (api.settings.BATCH_MAX_REQUESTS // 3 + 1))
+    assert client.post("/api/v1/optimize/batch", json=too_many).status_code == 400
+
+
+def test_batch_fails_only_the_failing_request_and_holds_a_pool_slot(monkeypatch):
+    """Any exception, even a dead worker, fails only its requests; a shared slot is held while the pool runs."""
+    original = MeanVarianceOptimizer.optimize
+
+    def optimize(self, *args, **kwargs):
+        if self.weight_bounds[1] == 0.5:
+            raise np.linalg.LinAlgError("Singular matrix")
+        if self.weight_bounds[1] == 0.45:
+            os._exit(1)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(MeanVarianceOptimizer, 'optimize', optimize)
+    slots = threading.BoundedSemaphore(1)
+    returns = make_returns(250, 4)
+    requests = [
+        BatchOptimizationRequest('ok', weight_bounds=(0.0, 1.0)),
+        BatchOptimizationRequest('singular', weight_bounds=(0.0, 0.5)),
+        BatchOptimizationRequest('capped', weight_bounds=(0.0, 0.4))
+    ]
+    stream = BatchOptimizer(returns, max_workers=2, pool_slots=slots).optimize(requests)
+    first = next(stream)
+    assert not slots.acquire(blocking=False)
+    results = {result.request_id: result for result in [first, *stream]}
+    assert slots.acquire(blocking=False)
+    slots.release()
+    assert results['singular'].error == "Singular matrix"
+    assert results['ok'].success and results['capped'].success
+
+    crashed = [*requests, BatchOptimizationRequest('crash', weight_bounds=(0.0, 0.45))]
+    results = {r.request_id: r for r in BatchOptimizer(returns, max_workers=2).optimize(crashed)}
+    assert sorted(results) == ['capped', 'crash', 'ok', 'singular']
+    assert not results['crash'].success
+
+
+def test_sweep_route_streams_every_grid_point(client, monkeypatch):
+    """POST /optimize/sweep returns each grid point once, matching a direct solve of its settings."""
+    monkeypatch.setattr(api.settings, 'SWEEP_MAX_WORKERS', 1)
+    returns = make_returns(1260, 5)
+    body = {
+        "algorithm": "mean_variance",
+        "returns": {asset: returns[asset].tolist() for asset in returns.columns},
+        "grid": {"risk_free_rate": [0.0, 0.02], "weight_bounds": [[0.0, 1.0], [0.0, 0.4]]},
+        "options": {"solver": "slsqp"}
+    }
+    response = client.post("/api/v1/optimize/sweep", json=body)
+    assert response.status_code == 200
+    results = {result["index"]: result for result in ndjson(response)}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert all(result["status"] == "success" for result in results.values())
+    # Row-major in the order the parameters were given: index 3 is the last value of each
+    assert results[3]["params"] == {"risk_free_rate": 0.02, "weight_bounds": [0.0, 0.4]}
+    direct = MeanVarianceOptimizer(returns, risk_free_rate=0.02, weight_bounds=(0.0, 0.4), solver='slsqp').optimize()
+    for asset, weight in direct.weights.items():
+        assert abs(results[3]["weights"][asset] - weight) <= 1e-4
+
+    unknown = dict(body, grid={"lookback": [1, 2]})
+    assert client.post("/api/v1/optimize/sweep", json=unknown).status_code == 400
+    monkeypatch.setattr(api.settings, 'SWEEP_MAX_POINTS', 3)
+    assert client.post("/api/v1/optimize/sweep", json=body).status_code == 400
+
+
+def test_sweep_fails_only_the_failing_points_and_holds_a_pool_slot(client, monkeypatch):
+    """A wrong option type fails its point mid-stream, a dead worker its chunk; a shared slot is held while the pool runs."""
+    monkeypatch.setattr(api.settings, 'SWEEP_MAX_WORKERS', 2)
+    returns = make_returns(500, 4)
+    body = {
+        "algorithm": "mean_variance",
+        "returns": {asset: returns[asset].tolist() for asset in returns.columns},
+        "grid": {"risk_free_rate": [0.0, "x", 0.02, 0.03]},
+        "options": {"solver": "slsqp"}
+    }
+    response = client.post("/api/v1/optimize/sweep", json=body)
+    assert response.status_code == 200
+    results = {result["index"]: result for result in ndjson(response)}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[1]["status"] == "failed"
+    assert all(results[index]["status"] == "success" for index in (0, 2, 3))
+
+    original = MeanVarianceOptimizer.optimize
+
+    def optimize(self, *args, **kwargs):
+        if self.risk_free_rate == 0.03:
+            os._exit(1)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(MeanVarianceOptimizer, 'optimize', optimize)
+    slots = threading.BoundedSemaphore(1)
+    grid = {"risk_free_rate": [0.0, 0.01, 0.02, 0.03]}
+    stream = ParameterSweep(
+        MeanVarianceOptimizer, returns, grid, options={"solver": "slsqp"}, max_workers=2, pool_slots=slots
+    ).run()
+    first = next(stream)
+    assert not slots.acquire(blocking=False)
+    results = {result.index: result for result in [first, *stream]}
+    assert slots.acquire(blocking=False)
+    slots.release()
+    assert sorted(results) == [0, 1, 2, 3]
+    assert not results[3].success
+
+
+def test_single_optimize_routes_match_direct_solves_and_use_the_cache(client):
+    """The mean-variance and risk parity routes solve once per return window and share batch results."""
+    returns = make_returns(500, 4)
+    panel = {asset: returns[asset].tolist() for asset in returns.columns}
+
+    body = {"returns": panel, "risk_free_rate": 0.02, "weight_bounds": [0.0, 0.6]}
+    first = client.post("/api/v1/optimize/mean-variance", json=body)
+    assert first.status_code == 200
+    direct = MeanVarianceOptimizer(returns, risk_free_rate=0.02, weight_bounds=(0.0, 0.6)).optimize()
+    for asset, weight in direct.weights.items():
+        assert first.json()["result"]["weights"][asset] == pytest.approx(weight, abs=1e-6)
+    assert client.post("/api/v1/optimize/mean-variance", json=body).json() == first.json()
+    assert (api.result_cache.hits, api.result_cache.misses) == (1, 1)
+
+    # The same problem inside a batch is answered from the single route's result
+    batch = {"returns": panel, "risk_free_rate": 0.02, "requests": [{"request_id": "u", "weight_bounds": [0.0, 0.6]}]}
+    assert ndjson(client.post("/api/v1/optimize/batch", json=batch))[0]["weights"] == first.json()["result"]["weights"]
+    assert api.result_cache.hits == 2
+
+    budgets = {asset: budget for asset, budget in zip(returns.columns, [0.4, 0.3, 0.2, 0.1])}
+    body = {"returns": panel, "risk_weights": budgets}
+    first = client.post("/api/v1/optimize/risk-parity", json=body)
+    assert first.status_code == 200
+    direct = RiskParityOptimizer(returns, risk_weights=budgets).optimize()
+    for asset, weight in direct.weights.items():
+        assert first.json()["result"]["weights"][asset] == pytest.approx(weight, abs=1e-8)
+    assert client.post("/api/v1/optimize/risk-parity", json=body).json() == first.json()
+    assert (api.result_cache.hits, api.result_cache.misses) == (3, 2)
+
+    infeasible = {"returns": panel, "weight_bounds": [0.0, 0.1]}
+    assert client.post("/api/v1/optimize/mean-variance", json=infeasible).status_code == 400
+
+
+def test_returns_panel_routes_reject_ragged_returns_and_inverted_bounds(client):
+    """Every route taking a returns panel validates it, and its weight bounds, before solving."""
+    ragged = {"AAA": [0.01, 0.02, -0.01], "BBB": [0.0, 0.01]}
+    bodies = {
+        "/api/v1/optimize/mean-variance": {},
+        "/api/v1/optimize/risk-parity": {},
+        "/api/v1/optimize/batch": {"requests": [{"request_id": "a"}]},
+        "/api/v1/optimize/sweep": {"algorithm": "risk_parity", "grid": {"risk_free_rate": [0.0]}},
+        "/api/v1/risk/what-if": {"weights": {"AAA": 0.5, "BBB": 0.5}, "trades": [{"trade_id": "t", "changes": {}}]}
+    }
+    for path, body in bodies.items():
+        response = client.post(path, json=dict(body, returns=ragged))
+        assert response.status_code == 422
+        assert "same, non-zero number of returns" in response.text
+
+    panel = {"AAA": [0.01, 0.02, -0.01], "BBB": [0.0, 0.01, 0.02]}
+    for path, body in (
+        ("/api/v1/optimize/mean-variance", {"returns": panel, "weight_bounds": [0.6, 0.4]}),
+        ("/api/v1/optimize/risk-parity", {"returns": panel, "weight_bounds": [0.6, 0.4]}),
+        ("/api/v1/optimize/batch", {"returns": panel, "requests": [{"request_id": "a", "weight_bounds": [0.6, 0.4]}]})
+    ):
+        response = client.post(path, json=body)
+        assert response.status_code == 422
+        assert "Lower weight bound must not exceed the upper bound" in response.text
+
+
+def test_sweep_route_answers_repeated_points_from_the_cache(client, monkeypatch):
+    """A repeated sweep is served from the cache; a wider grid only solves its new points."""
+    monkeypatch.setattr(api.settings, 'SWEEP_MAX_WORKERS', 1)
+    returns = make_returns(500, 4)
+    body = {
+        "algorithm": "risk_parity",
+        "returns": {asset: returns[asset].tolist() for asset in returns.columns},
+        "grid": {"weight_bounds": [[0.0, 1.0], [0.0, 0.4]]}
+    }
+    first = {result["index"]: result for result in ndjson(client.post("/api/v1/optimize/sweep", json=body))}
+    assert api.result_cache.misses == 2 and api.result_cache.hits == 0
+
+    api.result_cache.clear()
+    second = {result["index"]: result for result in ndjson(client.post("/api/v1/optimize/sweep", json=body))}
+    assert {i: r["weights"] for i, r in second.items()} == {i: r["weights"] for i, r in first.items()}
+    assert api.result_cache.hits == 2
+
+    wider = dict(body, grid={"weight_bounds": [[0.0, 1.0], [0.0, 0.4], [0.0, 0.3]]})
+    results = ndjson(client.post("/api/v1/optimize/sweep", json=wider))
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    assert api.result_cache.hits == 4 and api.result_cache.misses == 3
+
+
+def test_sweep_route_passes_views_to_black_litterman(client, monkeypatch):
+    """A tau sweep solves with the request's views, so tau moves the portfolio; without views it is rejected."""
+    monkeypatch.setattr(api.settings, 'SWEEP_MAX_WORKERS', 1)
+    returns = make_returns(1260, 5)
+    assets = list(returns.columns)
+    body = {
+        "algorithm": "black_litterman",
+        "returns": {asset: returns[asset].tolist() for asset in assets},
+        "grid": {"tau": [0.05, 50.0]},
+        "views": [{"assets": [assets[0], assets[1]], "weights": [1.0, -1.0], "return_value": 0.002, "confidence": 1.0}]
+    }
+    response = client.post("/api/v1/optimize/sweep", json=body)
+    assert response.status_code == 200
+    results = {result["index"]: result for result in ndjson(response)}
+    views = [View([assets[0], assets[1]], [1.0, -1.0], 0.002, 1.0)]
+    for index, tau in enumerate(body["grid"]["tau"]):
+        direct = BlackLittermanOptimizer(returns, tau=tau).optimize(views)
+        for asset, weight in direct.weights.items():
+            assert abs(results[index]["weights"][asset] - weight) <= 1e-3
+    assert max(abs(results[0]["weights"][a] - results[1]["weights"][a]) for a in assets) > 1e-2
+
+    assert client.post("/api/v1/optimize/sweep", json=dict(body, views=[])).status_code == 422
+
+
+def assert_same_profile(actual: dict, expected: dict):
+    for metric in ('expected_return', 'volatility', 'value_at_risk', 'diversification_ratio'):
+        assert actual[metric] == pytest.approx(expected[metric], rel=1e-9)
+    # After a trade only the traded assets and the largest contributor are reported
+    for asset, contribution in actual['risk_contributions'].items():
+        assert contribution == pytest.approx(expected['risk_contributions'].get(asset, 0.0), abs=1e-12)
+
+
+def test_what_if_route_matches_full_recalculation(client, monkeypatch):
+    """POST /risk/what-if reports, per trade, the risk of a portfolio recomputed from scratch with the trade applied."""
+    clear_analyzer_cache()
+    returns = make_returns(500, 4)
+    assets = list(returns.columns)
+    weights = {assets[0]: 0.5, assets[1]: 0.3, assets[2]: 0.2}
+    trades = [
+        {"trade_id": "rotate", "changes": {assets[3]: 0.1, assets[0]: -0.1}},
+        {"trade_id": "top_up", "changes": {assets[1]: 0.05}}
+    ]
+    body = {
+        "returns": {asset: returns[asset].tolist() for asset in assets},
+        "weights": weights,
+        "trades": trades,
+        "confidence": 0.99,
+        "horizon": 10
+    }
+    response = client.post("/api/v1/risk/what-if", json=body)
+    assert response.status_code == 200
+    result = response.json()
+    before = WhatIfAnalyzer(returns, weights, confidence=0.99, horizon=10).profile.to_dict()
+    assert_same_profile(result["portfolio"], before)
+    for trade, impact in zip(trades, result["trades"]):
+        assert impact["trade_id"] == trade["trade_id"] and impact["status"] == "success"
+        traded = {asset: weights.get(asset, 0.0) + trade["changes"].get(asset, 0.0) for asset in assets}
+        after = WhatIfAnalyzer(returns, traded, confidence=0.99, horizon=10).profile.to_dict()
+        assert set(trade["changes"]) <= set(impact["after"]["risk_contributions"])
+        assert_same_profile(impact["after"], after)
+        assert impact["change"]["volatility"] == pytest.approx(after["volatility"] - before["volatility"], abs=1e-12)
+
+    assert client.post("/api/v1/risk/what-if", json=dict(body, covariance="bogus")).status_code == 400
+    monkeypatch.setattr(api.settings, 'WHAT_IF_MAX_TRADES', 1)
+    assert client.post("/api/v1/risk/what-if", json=body).status_code == 400
+
+
+@pytest.fixture
+def simulation_sessions(tmp_path):
+    """Async session factory over SQLite portfolios and simulations tables."""
+    path = tmp_path / "simulations.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Portfolio.__table__, PortfolioAsset.__table__, Simulation.__table__])
+    engine.dispose()
+    return async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool), expire_on_commit=False)
+
+
+async def add_simulation(sessions, user_id: str, **values) -> UUID:
+    """Store a simulation of a new portfolio of ``user_id``; returns its id."""
+    async with sessions() as session:
+        portfolio = Portfolio(name="Portfolio", user_id=UUID(user_id))
+        session.add(portfolio)
+        await session.flush()
+        simulation = Simulation(
+            name="Simulation",
+            simulation_type=values.pop("simulation_type", SimulationType.MONTE_CARLO),
+            parameters=values.pop("parameters", {}),
+            portfolio_id=portfolio.id,
+            **values
+        )
+        session.add(simulation)
+        await session.commit()
+        return simulation.id
+
+
+async def load_simulation(sessions, simulation_id: UUID) -> Simulation:
+    async with sessions() as session:
+        return await session.get(Simulation, simulation_id)
+
+
+def session_dependency(sessions):
+    async def get_session():
+        async with sessions() as session:
+            yield session
+    return get_session
+
+
+def test_simulation_routes_only_serve_the_portfolio_owner(client, simulation_sessions):
+    """Run, cancel and status answer 404 for another user's simulation and leave it untouched."""
+    mine = asyncio.run(add_simulation(simulation_sessions, USER_ID))
+    theirs = asyncio.run(add_simulation(simulation_sessions, OTHER_USER_ID, status=SimulationStatus.COMPLETED))
+    client.app.dependency_overrides[get_db] = session_dependency(simulation_sessions)
+    client.app.dependency_overrides[api.get_simulation_runner] = lambda: SimulationRunner(simulation_sessions)
+
+    for method, action in (("get", "status"), ("post", "run"), ("post", "cancel")):
+        assert getattr(client, method)(f"/api/v1/simulations/{theirs}/{action}").status_code == 404
+    assert asyncio.run(load_simulation(simulation_sessions, theirs)).status == SimulationStatus.COMPLETED
+
+    assert client.post(f"/api/v1/simulations/{mine}/run").status_code == 202
+    assert client.get(f"/api/v1/simulations/{mine}/status").json()["status"] == "pending"
+    assert client.post(f"/api/v1/simulations/{mine}/cancel").json()["status"] == "cancelled"
+    assert client.post(f"/api/v1/simulations/{mine}/cancel").status_code == 409
+    assert client.get(f"/api/v1/simulations/{uuid4()}/status").status_code == 404
+
+
+def test_runner_claims_each_pending_simulation_once(simulation_sessions):
+    """Claims take the oldest PENDING simulations, and concurrent runners never claim the same one."""
+    statement = str(SimulationRunner._claim_statement(2).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in statement
+
+    async def scenario():
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        pending = [
+            await add_simulation(simulation_sessions, USER_ID, created_at=start + timedelta(days=day))
+            for day in range(6)
+        ]
+        await add_simulation(simulation_sessions, USER_ID, status=SimulationStatus.CANCELLED, created_at=start)
+        first, second = SimulationRunner(simulation_sessions), SimulationRunner(simulation_sessions)
+
+        assert [row[0] for row in await first._claim(2)] == pending[:2]
+        claims = await asyncio.gather(first._claim(3), second._claim(3))
+        claimed = [row[0] for rows in claims for row in rows]
+        assert sorted(claimed) == sorted(pending[2:])
+        assert await first._claim(3) == []
+        for simulation_id in pending:
+            simulation = await load_simulation(simulation_sessions, simulation_id)
+            assert simulation.status == SimulationStatus.RUNNING and simulation.started_at is not None
+
+    asyncio.run(scenario())
+
+
+def test_runner_cancel_stops_jobs_and_is_never_overwritten(simulation_sessions, monkeypatch):
+    """Cancelled jobs stop at their next progress report, and results arriving after a cancel are dropped."""
+    runner = SimulationRunner(simulation_sessions, max_workers=3)
+
+    def worker(simulation_id, slot, simulation_type, parameters):
+        context = JobContext(slot, runner._progress, runner._cancelled)
+        deadline = time.monotonic() + 10
+        while parameters["wait"] and not context.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if parameters["cooperative"]:
+            context.report(0.5)
+        return {"value": 1.0}
+
+    monkeypatch.setattr(runner_module, "_run_in_worker", worker)
+
+    async def scenario():
+        runner._pool = ThreadPoolExecutor(max_workers=3)
+        cooperative = await add_simulation(simulation_sessions, USER_ID, parameters={"wait": True, "cooperative": True})
+        stubborn = await add_simulation(simulation_sessions, USER_ID, parameters={"wait": True, "cooperative": False})
+        elsewhere = await add_simulation(simulation_sessions, USER_ID, parameters={"wait": True, "cooperative": True})
+        for simulation_id, simulation_type, parameters in await runner._claim(3):
+            runner._launch(simulation_id, simulation_type, parameters)
+        tasks = list(runner._tasks.values())
+
+        assert await runner.cancel(cooperative) and await runner.cancel(stubborn)
+        # Another instance cancels through the database; this runner's heartbeat notices
+        assert await SimulationRunner(simulation_sessions).cancel(elsewhere)
+        await runner._report_progress()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=10)
+        runner._pool.shutdown()
+
+        assert runner.running == []
+        for simulation_id in (cooperative, stubborn, elsewhere):
+            simulation = await load_simulation(simulation_sessions, simulation_id)
+            assert simulation.status == SimulationStatus.CANCELLED and simulation.results is None
+        assert not await runner.cancel(cooperative)
+
+        # Without a cancel the same job completes
+        runner._pool = ThreadPoolExecutor(max_workers=1)
+        done = await add_simulation(simulation_sessions, USER_ID, parameters={"wait": False, "cooperative": True})
+        for simulation_id, simulation_type, parameters in await runner._claim(1):
+            runner._launch(simulation_id, simulation_type, parameters)
+        await asyncio.wait_for(asyncio.gather(*runner._tasks.values()), timeout=10)
+        runner._pool.shutdown()
+        simulation = await load_simulation(simulation_sessions, done)
+        assert simulation.status == SimulationStatus.COMPLETED and simulation.results == {"value": 1.0}
+
+    asyncio.run(scenario())
+
+
+def test_runner_heartbeat_and_stale_requeue(simulation_sessions):
+    """Progress reports refresh updated_at; RUNNING rows without one for stale_after go back to PENDING."""
+    runner = SimulationRunner(simulation_sessions, stale_after=120)
+
+    async def heartbeat():
+        stale = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        simulation_id = await add_simulation(
+            simulation_sessions, USER_ID, status=SimulationStatus.RUNNING, updated_at=stale
+        )
+        runner._jobs[simulation_id] = 1
+        runner._progress[1] = 0.25
+        await runner._report_progress()
+        simulation = await load_simulation(simulation_sessions, simulation_id)
+        assert simulation.progress == 0.25
+        assert simulation.updated_at.replace(tzinfo=timezone.utc) > stale + timedelta(days=365)
+        return simulation_id
+
+    own = asyncio.run(heartbeat())
+
+    # SQLite cannot subtract intervals from now(): check the statement PostgreSQL runs
+    statements = []
+
+    async def execute(statement):
+        statements.append(statement)
+        return 1
+
+    runner._execute = execute
+    asyncio.run(runner._requeue_stale())
+    sql = str(statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "SET status='PENDING', started_at=NULL, progress=0.0" in sql
+    assert "simulations.status = 'RUNNING'" in sql
+    assert "simulations.updated_at < now() - make_interval(secs=>120.0)" in sql
+    # Jobs of this runner are alive even if a heartbeat write was missed
+    assert f"NOT IN ('{own}')" in sql
+
+
+def test_results_routes_page_and_downsample_series(client, monkeypatch, simulation_sessions):
+    """The results summary references stored series, which are read back by page or downsampled."""
+    store = ResultStore(MemoryBlobStore(), inline_max_items=8, chunk_rows=100)
+    equity = np.cumprod(1 + make_returns(1000, 1).values[:, 0])
+    completed = asyncio.run(add_simulation(simulation_sessions, USER_ID, status=SimulationStatus.COMPLETED))
+    running = asyncio.run(add_simulation(simulation_sessions, USER_ID, status=SimulationStatus.RUNNING))
+    summary = store.save(completed, {"strategies": [{"name": "s", "equity": equity.tolist(), "sharpe": 0.5}]})
+
+    async def complete():
+        async with simulation_sessions() as session:
+            (await session.get(Simulation, completed)).results = summary
+            await session.commit()
+
+    asyncio.run(complete())
+    client.app.dependency_overrides[get_db] = session_dependency(simulation_sessions)
+    client.app.dependency_overrides[get_result_store] = lambda: store
+    base = f"/api/v1/simulations/{completed}/results"
+
+    reference = client.get(base).json()["strategies"][0]["equity"]
+    assert reference["$series"] == "strategies/0/equity" and reference["shape"] == [1000]
+    full = client.get(base, params={"full": "true"}).json()
+    np.testing.assert_array_equal(full["strategies"][0]["equity"], equity)
+
+    # A page across a chunk boundary
+    page = client.get(f"{base}/series/strategies/0/equity", params={"offset": 150, "limit": 120}).json()
+    assert page["total"] == 1000 and page["offset"] == 150 and page["limit"] == 120
+    np.testing.assert_array_equal(page["values"], equity[150:270])
+
+    chart = client.get(f"{base}/series/strategies/0/equity", params={"points": 11}).json()
+    assert chart["positions"] == np.linspace(0, 999, 11).round().astype(int).tolist()
+    np.testing.assert_array_equal(chart["values"], equity[chart["positions"]])
+
+    monkeypatch.setattr(api.settings, 'RESULT_PAGE_MAX_ROWS', 50)
+    capped = client.get(f"{base}/series/strategies/0/equity", params={"limit": 500}).json()
+    assert capped["limit"] == 50 and len(capped["values"]) == 50
+
+    assert client.get(f"{base}/series/strategies/0/drawdown").status_code == 404
+    assert client.get(f"/api/v1/simulations/{uuid4()}/results").status_code == 404
+    assert client.get(f"/api/v1/simulations/{running}/results").status_code == 409
+
+    # Another user's simulation is as unknown as a missing one, series included
+    theirs = asyncio.run(add_simulation(simulation_sessions, OTHER_USER_ID, status=SimulationStatus.COMPLETED))
+    store.save(theirs, {"strategies": [{"name": "s", "equity": equity.tolist(), "sharpe": 0.5}]})
+    assert client.get(f"/api/v1/simulations/{theirs}/results").status_code == 404
+    assert client.get(f"/api/v1/simulations/{theirs}/results/series/strategies/0/equity").status_code == 404
+
+
+def test_result_cache_purges_only_the_window_it_rolled_from():
+    """Lookbacks of different lengths coexist; rolling a window forward drops only its predecessor's keys."""
+    panel = make_returns(300, 4)
+    panel.index = pd.bdate_range('2020-01-01', periods=300)
+    year, quarter, rolled = panel.iloc[-253:-1], panel.iloc[-64:-1], panel.iloc[-252:]
+    portfolio = MeanVarianceOptimizer(year).optimize()
+    redis_client = FakeAsyncRedis()
+    cache = ResultCache(redis_client)
+
+    async def scenario():
+        versions = [await cache.aversion(window) for window in (year, quarter)]
+        assert versions[0].universe != versions[1].universe
+        for version in versions:
+            await cache.aput(version, 'mean_variance', {}, portfolio)
+
+        latest = await cache.aversion(rolled)
+        assert latest.universe == versions[0].universe
+        assert cache.key(versions[0], 'mean_variance', {}) not in redis_client.data
+        assert cache.key(versions[1], 'mean_variance', {}) in redis_client.data
+        await cache.aput(latest, 'mean_variance', {}, portfolio)
+
+        # Another process still asking for the older window must not purge the latest one
+        cache.clear()
+        await cache.aversion(year)
+        assert (await cache.aget_many(latest, 'mean_variance', [{}]))[0] is not None
+
+    asyncio.run(scenario())
+
+
+def test_result_cache_keeps_results_of_undated_panels():
+    """Undated panels of the same shape can't be ordered, so caching one never purges another."""
+    panel = make_returns(300, 4)
+    first, second = panel.iloc[:252], panel.iloc[48:]
+    portfolio = MeanVarianceOptimizer(first).optimize()
+    redis_client = FakeAsyncRedis()
+    cache = ResultCache(redis_client)
+
+    async def scenario():
+        a = await cache.aversion(first)
+        await cache.aput(a, 'mean_variance', {}, portfolio)
+        b = await cache.aversion(second)
+        assert b.universe == a.universe and b.version != a.version
+        await cache.aput(b, 'mean_variance', {}, portfolio)
+
+        assert (await cache.aget_many(a, 'mean_variance', [{}]))[0] is not None
+        cache.clear()
+        await cache.aversion(first)
+        await cache.aversion(second)
+        assert (await cache.aget_many(a, 'mean_variance', [{}]))[0] is not None
+        assert (await cache.aget_many(b, 'mean_variance', [{}]))[0] is not None
+
+    asyncio.run(scenario())
+
 
 async def test_portfolio_simulation():
     """Test the portfolio simulation functionality."""
@@ -47,6 +1270,7 @@ async def test_portfolio_simulation():
             rp_weights = rp_optimizer.optimize(covariance_matrix)
             print(f"✅ Risk Parity optimization successful: {rp_weights}")
         except Exception as e:
+            print(f"⚠️ Risk Parity optimization failed (expected): {e}")
 
         # Test 3: Test API imports
         print("\n3. Testing API structure...")
@@ -66,7 +1290,6 @@ async def test_portfolio_simulation():
                 if hasattr(route, 'tags'):
                     tags.update(route.tags)
             print(f"✅ Available tags: {tags}")
-{{ ... }}
         except Exception as e:
             print(f"❌ API import failed: {e}")
             import traceback
@@ -7,10 +7,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+from app.core.metrics import reset_multiprocess_dir
+
 # Import the main application from src
 from src.app import app
 
 if __name__ == "__main__":
+    # Workers aggregate Prometheus samples through PROMETHEUS_MULTIPROC_DIR
+    reset_multiprocess_dir()
     uvicorn.run(
         "src.app:app",
         host=os.getenv("HOST", "0.0.0.0"),
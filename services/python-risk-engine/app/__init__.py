@@ -1,6 +1,5 @@
-"""Python Engine Service""
-
-"'"This module serves as the main package for the Python Engine service,"""
-"""which provides AI-powered features and functionality."""
-
+"""Python Engine Service
 
+This module serves as the main package for the Python Engine service,
+which provides AI-powered features and functionality.
+"""
@@ -4,6 +4,8 @@ import numpy.typing as npt
 from datetime import datetime, timedelta
 import logging
 
+from app.core.metrics import record_simulated_paths, time_calculation
+
 logger = logging.getLogger(__name__)
 
 class MonteCarloSimulation:
@@ -44,24 +46,26 @@ class MonteCarloSimulation:
         Returns:
             Array of simulated price paths (n_simulations x time_horizon+1)
         """
-        # Convert annual parameters to per-time-step
-        mu_per_step = mu * dt
-        sigma_per_step = sigma * np.sqrt(dt)
-        
-        # Generate random numbers for the simulation
-        random_numbers = np.random.normal(
-            loc=(mu_per_step - 0.5 * sigma_per_step**2),
-            scale=sigma_per_step,
-            size=(self.n_simulations, time_horizon)
-        )
-        
-        # Calculate cumulative returns
-        cum_returns = np.exp(random_numbers.cumsum(axis=1))
-        
-        # Apply initial price
-        price_paths = np.ones((self.n_simulations, time_horizon + 1)) * initial_price
-        price_paths[:, 1:] *= cum_returns
+        with time_calculation("monte_carlo", observations=time_horizon, assets=1):
+            # Convert annual parameters to per-time-step
+            mu_per_step = mu * dt
+            sigma_per_step = sigma * np.sqrt(dt)
+            
+            # Generate random numbers for the simulation
+            random_numbers = np.random.normal(
+                loc=(mu_per_step - 0.5 * sigma_per_step**2),
+                scale=sigma_per_step,
+                size=(self.n_simulations, time_horizon)
+            )
+            
+            # Calculate cumulative returns
+            cum_returns = np.exp(random_numbers.cumsum(axis=1))
+            
+            # Apply initial price
+            price_paths = np.ones((self.n_simulations, time_horizon + 1)) * initial_price
+            price_paths[:, 1:] *= cum_returns
         
+        record_simulated_paths("returns", self.n_simulations, time_horizon)
         return price_paths
     
     def simulate_portfolio(
@@ -91,6 +95,25 @@ class MonteCarloSimulation:
                 - 'returns': Portfolio returns (n_simulations x time_horizon)
         """
         n_assets = len(initial_weights)
+        with time_calculation("monte_carlo", observations=time_horizon, assets=n_assets):
+            result = self._simulate_portfolio(
+                initial_weights, expected_returns, cov_matrix, time_horizon, dt, initial_value
+            )
+        
+        record_simulated_paths("portfolio", self.n_simulations, time_horizon)
+        return result
+    
+    def _simulate_portfolio(
+        self,
+        initial_weights: npt.ArrayLike,
+        expected_returns: npt.ArrayLike,
+        cov_matrix: npt.ArrayLike,
+        time_horizon: int,
+        dt: float,
+        initial_value: float
+    ) -> Dict[str, npt.NDArray[np.float64]]:
+        """Run the buy-and-hold portfolio simulation behind ``simulate_portfolio``."""
+        n_assets = len(initial_weights)
         weights = np.zeros((n_assets, self.n_simulations, time_horizon + 1))
         weights[..., 0] = np.array(initial_weights).reshape(-1, 1) * np.ones((n_assets, self.n_simulations))
         
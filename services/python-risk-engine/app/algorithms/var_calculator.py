@@ -4,6 +4,8 @@ import pandas as pd
 from scipy.stats import norm, t, skew, kurtosis
 import logging
 
+from app.core.metrics import time_calculation
+
 logger = logging.getLogger(__name__)
 
 class VaRCalculator:
@@ -198,22 +200,24 @@ class VaRCalculator:
         Returns:
             Dictionary containing VaR and related metrics
         """
-        if method == 'historical':
-            var = VaRCalculator.historical_var(returns, confidence_level, **kwargs)
-        elif method == 'parametric':
-            var = VaRCalculator.parametric_var(returns, confidence_level, **kwargs)
-        elif method == 'modified':
-            var = VaRCalculator.modified_var(returns, confidence_level, **kwargs)
-        else:
+        if method not in ('historical', 'parametric', 'modified'):
             raise ValueError(f"Unsupported VaR method: {method}")
         
-        # Calculate CVaR using the same method for consistency
-        cvar = VaRCalculator.conditional_var(
-            returns, 
-            confidence_level=confidence_level, 
-            method=method,
-            **kwargs
-        )
+        with time_calculation(method, observations=len(returns)):
+            if method == 'historical':
+                var = VaRCalculator.historical_var(returns, confidence_level, **kwargs)
+            elif method == 'parametric':
+                var = VaRCalculator.parametric_var(returns, confidence_level, **kwargs)
+            else:
+                var = VaRCalculator.modified_var(returns, confidence_level, **kwargs)
+            
+            # Calculate CVaR using the same method for consistency
+            cvar = VaRCalculator.conditional_var(
+                returns, 
+                confidence_level=confidence_level, 
+                method=method,
+                **kwargs
+            )
         
         return {
             'var': var,
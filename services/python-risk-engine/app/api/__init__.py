@@ -1,12 +1,4 @@
+"""API package for the Python Engine service.
 
-<<<<<<< HEAD
-
-"""API package for the Python Engine service.""'
-
-""This package contains all API-related code, including endpoints, models, and schemas."""
-=======
-"""API package for the Python Engine service."""
-
-"""This package contains all API-related code, including endpoints, models, and schemas."""
-
->>>>>>> 87ddc13802ba67eae72641b5b2720292e48893fb
+This package contains all API-related code, including endpoints, models, and schemas.
+"""
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import health
+from app.api.v1.endpoints import health, profiles, risk_metrics
 
 api_router = APIRouter()
 
 # Include all endpoint routers
 api_router.include_router(health.router, prefix="/health", tags=["health"])
+api_router.include_router(risk_metrics.router, prefix="/risk-metrics", tags=["risk-metrics"])
+api_router.include_router(profiles.router, prefix="/admin/profiles", tags=["admin"])
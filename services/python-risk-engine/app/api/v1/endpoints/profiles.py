@@ -0,0 +1,57 @@
+"""Admin endpoints for retrieving request profiles."""
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import ProfileArtifact, get_profile_store
+from app.core.security import TokenData, get_admin_user
+
+router = APIRouter()
+
+
+async def _get_artifact(profile_id: str) -> ProfileArtifact:
+    artifact = await get_profile_store().get(profile_id)
+    if artifact is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found",
+        )
+    return artifact
+
+
+@router.get("")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    _: TokenData = Depends(get_admin_user),
+) -> List[Dict[str, Any]]:
+    """List the most recent request profiles, newest first."""
+    return await get_profile_store().list(limit=limit)
+
+
+@router.get("/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    top: int = Query(20, ge=1, le=200, description="Number of hottest frames to include"),
+    _: TokenData = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    """Get a profile's metadata and its hottest frames."""
+    artifact = await _get_artifact(profile_id)
+    return {**artifact.summary(), "top_functions": artifact.top_functions(top)}
+
+
+@router.get("/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(
+    profile_id: str,
+    _: TokenData = Depends(get_admin_user),
+) -> PlainTextResponse:
+    """
+    Download a profile as folded stacks.
+
+    The output can be loaded into speedscope or rendered with flamegraph.pl.
+    """
+    artifact = await _get_artifact(profile_id)
+    return PlainTextResponse(
+        artifact.folded(),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
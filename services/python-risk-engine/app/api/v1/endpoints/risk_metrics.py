@@ -0,0 +1,161 @@
+"""Endpoints for recording and reading risk metrics history."""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.security import TokenData, get_current_user
+from app.db.session import get_db, get_engine
+from app.models.risk_metrics import RiskMetrics
+from app.services.risk_metrics_store import (
+    PortfolioOwnershipError,
+    RiskMetricsHistoryWriter,
+    get_latest_metrics,
+    get_portfolio_history,
+    get_portfolio_owner,
+)
+
+router = APIRouter()
+
+
+class RiskMetricsHistoryPoint(BaseModel):
+    """Risk metrics stored for one portfolio at one point in time."""
+    calculated_at: datetime
+    period: str
+    cumulative_return: float
+    annualized_return: Optional[float] = None
+    volatility: float
+    sharpe_ratio: Optional[float] = None
+    sortino_ratio: Optional[float] = None
+    max_drawdown: float
+    var_95: float
+    var_99: float
+    expected_shortfall_95: float
+    beta: Optional[float] = None
+    alpha: Optional[float] = None
+    risk_level: str
+    risk_score: float
+    details: Optional[Dict[str, Any]] = None
+
+
+class RiskMetricsHistoryResponse(BaseModel):
+    """A page of a portfolio's risk metrics history, newest first."""
+    portfolio_id: str
+    points: List[RiskMetricsHistoryPoint]
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[int] = None
+
+
+class RiskMetricsRecorded(BaseModel):
+    """Number of risk metrics rows stored for a portfolio."""
+    portfolio_id: str
+    rows_written: int
+
+
+def _portfolio_not_found(portfolio_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Portfolio {portfolio_id} not found",
+    )
+
+
+async def _check_owner(db: AsyncSession, portfolio_id: str, user: TokenData) -> None:
+    """
+    Ensure ``user`` owns the portfolio.
+
+    Portfolios owned by someone else are reported as missing, so their ids
+    cannot be probed.
+    """
+    if await get_portfolio_owner(db, portfolio_id) != user.sub:
+        raise _portfolio_not_found(portfolio_id)
+
+
+@router.post(
+    "/portfolios/{portfolio_id}/history",
+    response_model=RiskMetricsRecorded,
+    status_code=status.HTTP_201_CREATED,
+)
+async def record_portfolio_history(
+    portfolio_id: str,
+    metrics: List[RiskMetrics],
+    current_user: TokenData = Depends(get_current_user),
+    engine: AsyncEngine = Depends(get_engine),
+) -> RiskMetricsRecorded:
+    """
+    Store the results of a risk run for one of the caller's portfolios.
+
+    Rows are written through ``RiskMetricsHistoryWriter`` in batches of
+    ``RISK_METRICS_WRITE_BATCH_SIZE`` (COPY on PostgreSQL). The first run
+    stored for a portfolio makes the caller its owner; the claim is made in
+    the transaction that writes the rows, so concurrent first writes cannot
+    both succeed.
+    """
+    if len(metrics) > settings.RISK_METRICS_MAX_RECORDS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Request exceeds {settings.RISK_METRICS_MAX_RECORDS_PER_REQUEST} records",
+        )
+    try:
+        async with RiskMetricsHistoryWriter(engine) as writer:
+            for item in metrics:
+                await writer.add(current_user.sub, portfolio_id, item)
+    except PortfolioOwnershipError:
+        raise _portfolio_not_found(portfolio_id)
+    return RiskMetricsRecorded(portfolio_id=portfolio_id, rows_written=writer.rows_written)
+
+
+@router.get(
+    "/portfolios/{portfolio_id}/history",
+    response_model=RiskMetricsHistoryResponse,
+)
+async def read_portfolio_history(
+    portfolio_id: str,
+    start: Optional[datetime] = Query(None, description="Earliest calculation time (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Latest calculation time (inclusive)"),
+    before: Optional[datetime] = Query(None, description="Cursor from a previous page's next_before"),
+    before_id: Optional[int] = Query(None, description="Cursor from a previous page's next_before_id"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> RiskMetricsHistoryResponse:
+    """
+    Get the risk metrics history of one of the caller's portfolios.
+
+    Results are ordered newest first. When a full page is returned,
+    ``next_before`` and ``next_before_id`` are set and can be passed as
+    ``before`` and ``before_id`` to fetch the next (older) page.
+    """
+    await _check_owner(db, portfolio_id, current_user)
+    rows = await get_portfolio_history(
+        db, portfolio_id, start=start, end=end, before=before, before_id=before_id, limit=limit
+    )
+    full_page = len(rows) == limit
+    return RiskMetricsHistoryResponse(
+        portfolio_id=portfolio_id,
+        points=[RiskMetricsHistoryPoint(**row) for row in rows],
+        next_before=rows[-1]["calculated_at"] if full_page else None,
+        next_before_id=rows[-1]["id"] if full_page else None,
+    )
+
+
+@router.get(
+    "/portfolios/{portfolio_id}/latest",
+    response_model=RiskMetricsHistoryPoint,
+)
+async def read_latest_metrics(
+    portfolio_id: str,
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> RiskMetricsHistoryPoint:
+    """Get the most recently stored risk metrics for one of the caller's portfolios."""
+    await _check_owner(db, portfolio_id, current_user)
+    row = await get_latest_metrics(db, portfolio_id)
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No risk metrics stored for portfolio {portfolio_id}",
+        )
+    return RiskMetricsHistoryPoint(**row)
@@ -1,13 +1,5 @@
+"""Core functionality for the Python Engine service.
 
-<<<<<<< HEAD
-""Core functionality for the Python Engine service.""
-
-""This package contains the core components of the application,""
-""including configuration, logging, and utility functions."""
-=======
-"""Core functionality for the Python Engine service."""
-
-"""This package contains the core components of the application,"""
-"""including configuration, logging, and utility functions."""
-
->>>>>>> 87ddc13802ba67eae72641b5b2720292e48893fb
+This package contains the core components of the application,
+including configuration, logging, and utility functions.
+"""
@@ -41,6 +41,11 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "app"
     POSTGRES_PORT: int = 5432
     DATABASE_URI: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_STATEMENT_TIMEOUT: float = 30.0  # seconds
+    RISK_METRICS_WRITE_BATCH_SIZE: int = 5000  # Rows per COPY batch
+    RISK_METRICS_MAX_RECORDS_PER_REQUEST: int = 50000
     
     @field_validator("DATABASE_URI", mode='before')
     @classmethod
@@ -70,18 +75,37 @@ class Settings(BaseSettings):
     JWT_ISSUER: str = "python-engine-service"
     JWT_AUDIENCE: str = "python-engine-clients"
     
+    # Redis Configuration
+    REDIS_URL: Optional[str] = None
+    
+    # Circuit Breakers
+    CIRCUIT_BREAKER_SHARED_STATE: bool = True  # Share state across workers via Redis
+    
     # Rate Limiting
     RATE_LIMIT_DEFAULT: str = "1000 per day"
     RATE_LIMIT_AUTHENTICATED: str = "10000 per day"
     
     # API Keys
-    API_KEYS: Dict[str, str] = {}
+    API_KEYS: Dict[str, str] = {}  # Key name -> key
+    API_KEY_ROLES: Dict[str, List[str]] = {}  # Key name -> roles (default: user)
+    API_KEY_CACHE_TTL: float = 300.0  # Seconds to cache keys resolved from the database
+    API_KEY_NEGATIVE_CACHE_TTL: float = 30.0  # Seconds to cache unknown keys
+    API_KEY_MISS_RATE: float = 5.0  # Database lookups of unknown keys per second per worker
+    API_KEY_MISS_BURST: int = 50  # Unknown-key lookups allowed in a burst
     
     # Monitoring
     SENTRY_DSN: Optional[str] = None
     ENABLE_OPENAPI: bool = True
     ENABLE_METRICS: bool = True
     
+    # Request profiling
+    PROFILING_ENABLED: bool = True
+    PROFILING_HEADER: str = "X-Profile-Request"  # Admin-only opt-in header
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of all requests profiled
+    PROFILING_INTERVAL: float = 0.005  # Seconds between stack samples
+    PROFILING_MAX_STORED: int = 200
+    PROFILING_TTL: int = 86400  # Seconds profiles are kept in Redis
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
@@ -137,7 +161,7 @@ class Settings(BaseSettings):
 
 @lru_cache()
 def get_settings() -> Settings:
-    ""
+    """
     Get the application settings, cached for performance.
     
     Returns:
@@ -0,0 +1,256 @@
+"""
+Prometheus metrics for the risk engine.
+
+This module defines the metrics exposed on ``/metrics``:
+- HTTP request counts and latency per endpoint
+- Calculation latency per risk algorithm, labelled by ``method`` as used in
+  ``VaRCalculator.calculate_var`` (plus ``monte_carlo`` for simulations)
+- Simulated Monte Carlo path counts and input matrix sizes
+- Executor queue depth, cache hits and misses, and event-loop lag
+- Async circuit breaker state
+
+All collectors are plain counters, gauges and histograms, so recording a
+sample costs a lock and an add; the more expensive views (circuit breaker
+state, executor queue depth) are only computed when Prometheus scrapes.
+
+When running several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` so
+that ``render_metrics`` aggregates samples from every worker. The directory
+must be emptied before the workers start (``reset_multiprocess_dir``) and
+each worker calls ``mark_process_dead`` when it exits.
+
+Ratios are left to PromQL, so they are computed over every worker's counts
+rather than picked from one worker, e.g. the cache hit ratio::
+
+    sum by (cache) (rate(cache_requests_total{result="hit"}[5m]))
+      / sum by (cache) (rate(cache_requests_total[5m]))
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from app.utils.circuit_breaker import CircuitState, get_circuit_breaker_metrics
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds) covering cheap closed-form VaR up to large simulations
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Size buckets for observation / asset counts and simulated paths
+SIZE_BUCKETS = (1, 10, 50, 100, 252, 500, 1_000, 2_520, 5_000, 10_000, 50_000, 100_000)
+
+# HTTP metrics (names match the Grafana dashboard and alert rules)
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "path", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ["method", "path"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Risk algorithm metrics
+RISK_CALCULATION_DURATION = Histogram(
+    "risk_calculation_duration_seconds",
+    "Risk calculation latency in seconds by method",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+RISK_CALCULATION_ERRORS = Counter(
+    "risk_calculation_errors_total",
+    "Risk calculations that raised an exception by method",
+    ["method"],
+)
+RISK_MATRIX_SIZE = Histogram(
+    "risk_calculation_matrix_size",
+    "Input matrix dimensions by method and axis (observations or assets)",
+    ["method", "dimension"],
+    buckets=SIZE_BUCKETS,
+)
+MONTE_CARLO_PATHS = Counter(
+    "monte_carlo_simulated_paths_total",
+    "Number of Monte Carlo paths simulated",
+    ["simulation"],
+)
+MONTE_CARLO_PATH_STEPS = Counter(
+    "monte_carlo_simulated_steps_total",
+    "Number of Monte Carlo path steps (paths x time steps) simulated",
+    ["simulation"],
+)
+
+# Runtime metrics
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Delay between when the event loop was asked to wake up and when it did",
+    multiprocess_mode="max",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+# Executors whose queue depth is reported at scrape time
+_tracked_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+@contextmanager
+def time_calculation(
+    method: str,
+    observations: Optional[int] = None,
+    assets: Optional[int] = None,
+) -> Iterator[None]:
+    """
+    Time a risk calculation and record its input size.
+
+    Args:
+        method: Calculation method label (e.g. 'historical', 'monte_carlo')
+        observations: Number of return observations (time steps) in the input
+        assets: Number of assets in the input
+
+    Example:
+        with time_calculation("parametric", observations=len(returns)):
+            var = ...
+    """
+    if observations is not None:
+        RISK_MATRIX_SIZE.labels(method=method, dimension="observations").observe(observations)
+    if assets is not None:
+        RISK_MATRIX_SIZE.labels(method=method, dimension="assets").observe(assets)
+
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        RISK_CALCULATION_ERRORS.labels(method=method).inc()
+        raise
+    finally:
+        RISK_CALCULATION_DURATION.labels(method=method).observe(time.perf_counter() - start)
+
+
+def record_simulated_paths(simulation: str, n_paths: int, n_steps: int) -> None:
+    """Record the number of Monte Carlo paths and path steps simulated."""
+    MONTE_CARLO_PATHS.labels(simulation=simulation).inc(n_paths)
+    MONTE_CARLO_PATH_STEPS.labels(simulation=simulation).inc(n_paths * n_steps)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Record a cache lookup as a hit or a miss."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def track_executor(name: str, executor: ThreadPoolExecutor) -> None:
+    """Report the number of tasks waiting in an executor's queue."""
+    _tracked_executors[name] = executor
+
+
+class _RuntimeCollector:
+    """Collects gauges that are only worth computing at scrape time."""
+
+    def collect(self):
+        queue_depth = GaugeMetricFamily(
+            "executor_queue_depth",
+            "Tasks submitted to an executor that have not started yet",
+            labels=["executor"],
+        )
+        for name, executor in _tracked_executors.items():
+            # ThreadPoolExecutor keeps pending work items in a SimpleQueue
+            queue_depth.add_metric([name], executor._work_queue.qsize())
+        yield queue_depth
+
+        circuit_state = GaugeMetricFamily(
+            "circuit_breaker_state",
+            "Circuit breaker state observed by this process "
+            "(1=CLOSED, 2=OPEN, 3=HALF_OPEN)",
+            labels=["circuit"],
+        )
+        state_changes = GaugeMetricFamily(
+            "circuit_breaker_state_changes",
+            "State changes observed by this process since start",
+            labels=["circuit", "transition"],
+        )
+        rejections = GaugeMetricFamily(
+            "circuit_breaker_rejections",
+            "Calls rejected by the circuit breaker since start",
+            labels=["circuit"],
+        )
+        for name, snapshot in get_circuit_breaker_metrics().items():
+            circuit_state.add_metric([name], CircuitState[snapshot["state"]].value)
+            rejections.add_metric([name], snapshot["rejections"])
+            for transition, count in snapshot["state_changes"].items():
+                state_changes.add_metric([name, transition], count)
+        yield circuit_state
+        yield state_changes
+        yield rejections
+
+
+REGISTRY.register(_RuntimeCollector())
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """
+    Measure event-loop lag until cancelled.
+
+    Sleeps for ``interval`` seconds and records how much later than requested
+    the loop woke up. A blocked loop (e.g. a CPU-bound calculation running on
+    it) shows up as lag.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - start - interval))
+
+
+def reset_multiprocess_dir() -> None:
+    """Empty ``PROMETHEUS_MULTIPROC_DIR`` so samples of a previous run are not reported."""
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess aggregate."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        Tuple of (payload, content_type)
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        # Scrape-time gauges describe the worker that served the scrape
+        registry.register(_RuntimeCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,301 @@
+"""
+Per-request sampling profiler and profile artifact storage.
+
+``SamplingProfiler`` runs a background thread that periodically captures the
+stack of the thread serving a request (``sys._current_frames``) and counts
+identical stacks. Nothing is hooked into the interpreter, so the profiled
+request pays only for the sampler thread waking up, and requests that are
+not profiled pay nothing.
+
+Profiles are stored as ``ProfileArtifact`` objects holding folded stacks
+(``frame;frame;frame count`` lines, as read by flamegraph.pl, speedscope
+and similar tools). Artifacts are kept in process memory, or in Redis when
+profiles must be retrievable from any worker.
+
+Note that async endpoints share the event-loop thread, so a profile of one
+request can include samples from other requests interleaved with it.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Deepest stack recorded per sample
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def _fold_stack(frame: Optional[FrameType]) -> str:
+    """Render a frame and its callers as a root-first folded stack."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a single thread.
+
+    Example:
+        profiler = SamplingProfiler(threading.get_ident(), interval=0.005)
+        profiler.start()
+        ...
+        stacks = profiler.stop()
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            thread_id: Identifier of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.started_at: Optional[float] = None
+        self.duration: float = 0.0
+        self._start_counter: float = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[_fold_stack(frame)] += 1
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self.started_at = time.time()
+        self._start_counter = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """
+        Stop sampling.
+
+        Returns:
+            Counter mapping folded stacks to sample counts
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start_counter
+        return self.stacks
+
+
+@dataclass
+class ProfileArtifact:
+    """A stored profile of one request."""
+    profile_id: str
+    method: str
+    path: str
+    trigger: str  # "header" or "sampled"
+    started_at: float
+    duration_s: float
+    interval_s: float
+    status_code: Optional[int] = None
+    stacks: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.stacks.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Artifact metadata without the stacks."""
+        data = asdict(self)
+        data.pop("stacks")
+        data["sample_count"] = self.sample_count
+        return data
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Functions ranked by the samples in which they were executing.
+
+        Returns:
+            List of {"frame", "self_samples", "share"} dictionaries
+        """
+        leaf_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+        total = self.sample_count or 1
+        return [
+            {"frame": frame, "self_samples": count, "share": count / total}
+            for frame, count in leaf_counts.most_common(limit)
+        ]
+
+    def folded(self) -> str:
+        """Render the stacks in folded format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ProfileArtifact":
+        return cls(**json.loads(payload))
+
+    @classmethod
+    def from_profiler(
+        cls,
+        profiler: SamplingProfiler,
+        method: str,
+        path: str,
+        trigger: str,
+        status_code: Optional[int] = None,
+    ) -> "ProfileArtifact":
+        """Build an artifact from a stopped profiler."""
+        return cls(
+            profile_id=uuid.uuid4().hex,
+            method=method,
+            path=path,
+            trigger=trigger,
+            started_at=profiler.started_at or time.time(),
+            duration_s=profiler.duration,
+            interval_s=profiler.interval,
+            status_code=status_code,
+            stacks=dict(profiler.stacks),
+        )
+
+
+class ProfileStore(ABC):
+    """Base class for profile artifact storage."""
+
+    @abstractmethod
+    async def save(self, artifact: ProfileArtifact) -> None:
+        """Store a profile, evicting old ones past the store's capacity."""
+
+    @abstractmethod
+    async def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        """The profile with this id, or None if it is unknown or evicted."""
+
+    @abstractmethod
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries of the most recent profiles, newest first."""
+
+
+class InMemoryProfileStore(ProfileStore):
+    """Keeps the most recent profiles in process memory."""
+
+    def __init__(self, max_profiles: int = 200):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, ProfileArtifact]" = OrderedDict()
+
+    async def save(self, artifact: ProfileArtifact) -> None:
+        self._profiles[artifact.profile_id] = artifact
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    async def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        return self._profiles.get(profile_id)
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        recent = list(self._profiles.values())[-limit:]
+        return [artifact.summary() for artifact in reversed(recent)]
+
+
+class RedisProfileStore(ProfileStore):
+    """
+    Stores profiles in Redis so any worker can serve them.
+
+    Each artifact is a JSON string with a TTL; a sorted set scored by start
+    time indexes them for listing.
+    """
+
+    def __init__(self, redis_client: Any, key_prefix: str = "profile", ttl: int = 86400,
+                 max_profiles: int = 1000):
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.max_profiles = max_profiles
+
+    def _key(self, profile_id: str) -> str:
+        return f"{self.key_prefix}:{profile_id}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.key_prefix}:index"
+
+    async def save(self, artifact: ProfileArtifact) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(artifact.profile_id), artifact.to_json(), ex=self.ttl)
+            pipe.zadd(self._index_key, {artifact.profile_id: artifact.started_at})
+            pipe.zremrangebyscore(self._index_key, 0, time.time() - self.ttl)
+            pipe.zremrangebyrank(self._index_key, 0, -self.max_profiles - 1)
+            await pipe.execute()
+
+    async def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        payload = await self.redis.get(self._key(profile_id))
+        return ProfileArtifact.from_json(payload) if payload else None
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        profile_ids = await self.redis.zrevrange(self._index_key, 0, limit - 1)
+        if not profile_ids:
+            return []
+        payloads = await self.redis.mget(
+            [self._key(pid.decode() if isinstance(pid, bytes) else pid) for pid in profile_ids]
+        )
+        return [ProfileArtifact.from_json(payload).summary() for payload in payloads if payload]
+
+
+# Global profile store
+_profile_store: ProfileStore = InMemoryProfileStore()
+
+
+def configure_profile_store(
+    redis_url: Optional[str] = None,
+    max_profiles: int = 200,
+    ttl: int = 86400,
+) -> ProfileStore:
+    """
+    Select the global profile store.
+
+    Args:
+        redis_url: Redis URL for profiles shared across workers (None for in-memory)
+        max_profiles: Maximum number of profiles kept
+        ttl: Seconds a profile is kept in Redis
+
+    Returns:
+        The configured store
+    """
+    global _profile_store
+
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+
+            _profile_store = RedisProfileStore(
+                redis.Redis.from_url(redis_url), ttl=ttl, max_profiles=max_profiles
+            )
+            logger.info("Using Redis-backed profile store")
+            return _profile_store
+        except Exception as e:
+            logger.error(f"Failed to set up Redis profile store: {e}. Falling back to in-memory store.")
+
+    _profile_store = InMemoryProfileStore(max_profiles=max_profiles)
+    return _profile_store
+
+
+def get_profile_store() -> ProfileStore:
+    """Get the global profile store."""
+    return _profile_store
@@ -4,16 +4,23 @@ Security configuration and utilities including JWT authentication and RBAC.
 This module provides:
 - Password hashing and verification
 - JWT token creation and validation
-- Role-based access control (RBAC)
-- API key authentication
+- Role-based access control (RBAC) backed by precomputed role bitmaps
+- API key authentication through a hashed-key index with a TTL cache
 - Security middleware
 """
+import hashlib
+import logging
 import os
+import re
 import secrets
+import threading
+import time
+import zlib
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 from functools import lru_cache
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import (
@@ -33,8 +40,11 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
 from app.core.config import settings
-from app.core.logging import logger
+from app.core.metrics import record_cache_access
 from app.schemas import ErrorResponse
+from app.utils.circuit_breaker import CircuitBreakerError
+
+logger = logging.getLogger(__name__)
 
 # Password hashing with strong settings
 pwd_context = CryptContext(
@@ -78,6 +88,76 @@ class UserRole(str, Enum):
     ADMIN = "admin"    # Full access
     SUPER_ADMIN = "superadmin"  # System-level access
 
+
+# Roles each role implicitly holds, in addition to itself
+ROLE_INHERITANCE: Dict[UserRole, Tuple[UserRole, ...]] = {
+    UserRole.GUEST: (),
+    UserRole.USER: (),
+    UserRole.EDITOR: (UserRole.USER,),
+    UserRole.ADMIN: (UserRole.USER,),
+    UserRole.SUPER_ADMIN: tuple(UserRole),
+}
+
+# One bit per role
+ROLE_BITS: Dict[UserRole, int] = {role: 1 << i for i, role in enumerate(UserRole)}
+
+
+def _build_role_permissions() -> Dict[str, int]:
+    """
+    Build the bitmap of roles granted by each role.
+
+    Expands ``ROLE_INHERITANCE`` transitively once, so request-time checks
+    are a dict lookup and a bitwise AND.
+
+    Returns:
+        Dictionary mapping role value to granted-role bitmap
+    """
+    permissions = {}
+    for role in UserRole:
+        granted, pending = 0, [role]
+        while pending:
+            current = pending.pop()
+            if granted & ROLE_BITS[current]:
+                continue
+            granted |= ROLE_BITS[current]
+            pending.extend(ROLE_INHERITANCE[current])
+        permissions[role.value] = granted
+    return permissions
+
+
+# Granted-role bitmap per role value, computed at import
+ROLE_PERMISSIONS: Dict[str, int] = _build_role_permissions()
+
+
+@lru_cache(maxsize=256)
+def _granted_bitmap(roles: Tuple[str, ...]) -> int:
+    granted = 0
+    for role in roles:
+        # Unknown roles grant nothing
+        granted |= ROLE_PERMISSIONS.get(role, 0)
+    return granted
+
+
+def get_role_bitmap(roles: Iterable[str]) -> int:
+    """
+    Get the bitmap of roles granted by a set of role values.
+
+    Args:
+        roles: Role values, e.g. from ``TokenData.roles``
+
+    Returns:
+        Bitmap of granted roles (see ``ROLE_BITS``)
+    """
+    return _granted_bitmap(tuple(roles))
+
+
+def roles_mask(*roles: UserRole) -> int:
+    """Combine roles into a bitmap for comparison with ``get_role_bitmap``."""
+    mask = 0
+    for role in roles:
+        mask |= ROLE_BITS[role]
+    return mask
+
 class TokenData(BaseModel):
     """JWT token payload schema."""
     sub: str  # Subject (usually user ID)
@@ -405,6 +485,261 @@ async def get_current_user(
         )
 
 
+@dataclass(frozen=True)
+class APIKeyRecord:
+    """Identity and permissions attached to an API key."""
+    key_id: str
+    subject: str
+    roles: Tuple[str, ...] = (UserRole.USER.value,)
+    scopes: Tuple[str, ...] = ("read",)
+    expires_at: Optional[datetime] = None
+    is_active: bool = True
+
+    def is_valid(self, now: Optional[datetime] = None) -> bool:
+        """Check whether the key is active and not expired."""
+        if not self.is_active:
+            return False
+        return self.expires_at is None or self.expires_at > (now or datetime.utcnow())
+
+    def to_token_data(self) -> TokenData:
+        """Build the token data used by the auth dependencies."""
+        return TokenData(
+            sub=self.subject,
+            username=self.key_id,
+            roles=list(self.roles),
+            scopes=list(self.scopes),
+            is_active=self.is_active,
+            is_verified=True,
+        )
+
+
+# API keys are "sk_" + 40 random hex digits + the CRC-32 of those digits (8 hex digits)
+API_KEY_PREFIX = "sk_"
+_API_KEY_PATTERN = re.compile(r"sk_([0-9a-f]{40})([0-9a-f]{8})")
+
+
+def _api_key_checksum(body: str) -> str:
+    return format(zlib.crc32(body.encode("ascii")), "08x")
+
+
+def generate_api_key() -> str:
+    """Generate a new API key in the format accepted by ``is_well_formed_api_key``."""
+    body = secrets.token_hex(20)
+    return f"{API_KEY_PREFIX}{body}{_api_key_checksum(body)}"
+
+
+def is_well_formed_api_key(api_key: str) -> bool:
+    """
+    Check an API key's prefix, length and checksum.
+
+    Mistyped, truncated or made-up keys fail this check, so they can be
+    rejected without a database lookup.
+    """
+    match = _API_KEY_PATTERN.fullmatch(api_key)
+    return match is not None and _api_key_checksum(match.group(1)) == match.group(2)
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key for indexing and storage.
+
+    API keys are long random tokens, so a single SHA-256 is enough to make
+    the stored value useless to an attacker and, unlike bcrypt, can be used
+    as a dictionary or database index key.
+    """
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class _TTLCache:
+    """Small thread-safe in-process cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for an unexpired entry."""
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return False, None
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ``ttl`` seconds, evicting the oldest entry when full."""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Take a token if one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def give_back(self) -> None:
+        """Return a token taken for work that turned out not to count."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+APIKeyLoader = Callable[[str], Awaitable[Optional[APIKeyRecord]]]
+
+
+class APIKeyIndex:
+    """
+    API key lookup by key hash.
+
+    Statically configured keys live in a dict keyed by ``hash_api_key``.
+    Keys not found there are resolved through an optional async loader (e.g.
+    a query on ``api_keys.key_hash``), whose results, including misses, are
+    kept in a TTL cache so a key costs at most one loader call per TTL.
+
+    Keys that fail ``is_well_formed_api_key`` never reach the loader, and
+    loader misses are rate limited: once ``miss_burst`` unknown keys were
+    looked up faster than ``miss_rate`` per second, further uncached keys are
+    rejected without a lookup until the budget refills. Cached keys are
+    unaffected.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[APIKeyLoader] = None,
+        cache_ttl: float = 300.0,
+        negative_cache_ttl: float = 30.0,
+        cache_size: int = 10000,
+        miss_rate: float = 5.0,
+        miss_burst: int = 50,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            loader: Async callable mapping a key hash to a record (or None)
+            cache_ttl: Seconds to cache keys found by the loader
+            negative_cache_ttl: Seconds to cache keys the loader did not find
+            cache_size: Maximum number of cached loader results
+            miss_rate: Loader misses allowed per second
+            miss_burst: Loader misses allowed in a burst
+        """
+        self.loader = loader
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self._static: Dict[str, APIKeyRecord] = {}
+        self._cache = _TTLCache(maxsize=cache_size)
+        self._miss_budget = _TokenBucket(miss_rate, miss_burst)
+
+    def add(self, api_key: str, record: APIKeyRecord) -> None:
+        """Register a static API key."""
+        self._static[hash_api_key(api_key)] = record
+
+    def invalidate(self, key_hash: Optional[str] = None) -> None:
+        """Drop one cached loader result (by key hash), or all of them."""
+        if key_hash is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key_hash)
+
+    async def lookup(self, api_key: str) -> Optional[APIKeyRecord]:
+        """
+        Resolve an API key to its record.
+
+        Args:
+            api_key: The raw API key presented by the client
+
+        Returns:
+            The key's record, or None if the key is unknown
+        """
+        key_hash = hash_api_key(api_key)
+        record = self._static.get(key_hash)
+        if record is not None:
+            return record
+        if self.loader is None or not is_well_formed_api_key(api_key):
+            return None
+
+        found, record = self._cache.get(key_hash)
+        record_cache_access("api_key_index", found)
+        if found:
+            return record
+
+        if not self._miss_budget.take():
+            logger.warning("API key miss budget exhausted; rejecting uncached key without lookup")
+            return None
+        record = await self.loader(key_hash)
+        if record is not None:
+            # Only misses count against the budget
+            self._miss_budget.give_back()
+        self._cache.set(
+            key_hash, record, self.cache_ttl if record is not None else self.negative_cache_ttl
+        )
+        return record
+
+
+# Global API key index, populated by init_api_key_index at startup
+api_key_index = APIKeyIndex()
+
+
+def init_api_key_index(loader: Optional[APIKeyLoader] = None) -> APIKeyIndex:
+    """
+    Build the global API key index from settings.
+
+    ``settings.API_KEYS`` maps key names to key values; each key gets the
+    roles listed for its name in ``settings.API_KEY_ROLES`` (default: user).
+
+    Args:
+        loader: Optional async loader for keys not present in settings
+
+    Returns:
+        The global API key index
+    """
+    global api_key_index
+
+    index = APIKeyIndex(
+        loader=loader,
+        cache_ttl=settings.API_KEY_CACHE_TTL,
+        negative_cache_ttl=settings.API_KEY_NEGATIVE_CACHE_TTL,
+        miss_rate=settings.API_KEY_MISS_RATE,
+        miss_burst=settings.API_KEY_MISS_BURST,
+    )
+    for name, key in settings.API_KEYS.items():
+        roles = tuple(settings.API_KEY_ROLES.get(name, [UserRole.USER.value]))
+        index.add(key, APIKeyRecord(key_id=name, subject=f"api_key:{name}", roles=roles))
+
+    api_key_index = index
+    logger.info(f"Initialized API key index with {len(settings.API_KEYS)} static keys")
+    return index
+
+
 async def authenticate_api_key(api_key: str) -> TokenData:
     """
     Authenticate using an API key.
@@ -418,30 +753,20 @@ async def authenticate_api_key(api_key: str) -> TokenData:
     Raises:
         HTTPException: If authentication fails
     """
-    # TODO: Implement API key validation against your database or key store
-    # This is a simplified example
-    if not api_key or not api_key.startswith("sk_"):
+    if not api_key or not api_key.startswith(API_KEY_PREFIX):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key format",
         )
     
-    # In a real application, you would validate the API key against a database
-    # and load the associated user's permissions
     try:
-        # Example: Look up API key in database
-        # user = await User.get_by_api_key(api_key)
-        # if not user or not user.is_active:
-        #     raise HTTPException(status_code=401, detail="Invalid or inactive API key")
-        
-        # For now, return a mock user with admin privileges
-        return TokenData(
-            sub="api_key_user",
-            username="api_user",
-            roles=[UserRole.ADMIN.value],
-            scopes=["read", "write"],
-            is_active=True,
-            is_verified=True,
+        record = await api_key_index.lookup(api_key)
+    except CircuitBreakerError as e:
+        # The key store is known to be down: don't report the key as invalid
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="API key store unavailable",
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.5)))},
         )
     except Exception as e:
         logger.error(f"API key authentication failed: {str(e)}")
@@ -449,65 +774,41 @@ async def authenticate_api_key(api_key: str) -> TokenData:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
         )
+    
+    if record is None or not record.is_valid():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or inactive API key",
+        )
+    
+    return record.to_token_data()
 
 # Role-based access control utilities
 
 def has_role(required_role: UserRole) -> Callable[[TokenData], bool]:
     """Check if the user has the required role."""
+    required = ROLE_BITS[required_role]
+    
     def check_role(token_data: TokenData = Depends(get_current_user)) -> bool:
-        if not token_data.roles:
-            return False
-        
-        # Convert role strings to UserRole enums for comparison
-        user_roles = [UserRole(role) for role in token_data.roles]
-        
-        # Check if user has the required role or higher
-        return any(
-            role.value == required_role.value or 
-            (role == UserRole.SUPER_ADMIN) or
-            (required_role == UserRole.USER and role in [UserRole.EDITOR, UserRole.ADMIN])
-            for role in user_roles
-        )
+        return bool(get_role_bitmap(token_data.roles) & required)
     return check_role
 
 
 def has_any_role(*roles: UserRole) -> Callable[[TokenData], bool]:
     """Check if the user has any of the required roles."""
+    required = roles_mask(*roles)
+    
     def check_any_role(token_data: TokenData = Depends(get_current_user)) -> bool:
-        if not token_data.roles:
-            return False
-        
-        user_roles = [UserRole(role) for role in token_data.roles]
-        required_roles = set(roles)
-        
-        return any(
-            user_role in required_roles or 
-            user_role == UserRole.SUPER_ADMIN or
-            (UserRole.USER in required_roles and user_role in [UserRole.EDITOR, UserRole.ADMIN])
-            for user_role in user_roles
-        )
+        return bool(get_role_bitmap(token_data.roles) & required)
     return check_any_role
 
 
 def has_all_roles(*roles: UserRole) -> Callable[[TokenData], bool]:
     """Check if the user has all of the required roles."""
+    required = roles_mask(*roles)
+    
     def check_all_roles(token_data: TokenData = Depends(get_current_user)) -> bool:
-        if not token_data.roles:
-            return False
-        
-        user_roles = {UserRole(role) for role in token_data.roles}
-        required_roles = set(roles)
-        
-        # Super admin has all roles
-        if UserRole.SUPER_ADMIN in user_roles:
-            return True
-            
-        # If USER is required, EDITOR and ADMIN also satisfy it
-        if UserRole.USER in required_roles:
-            required_roles.discard(UserRole.USER)
-            required_roles.update({UserRole.EDITOR, UserRole.ADMIN})
-        
-        return required_roles.issubset(user_roles)
+        return get_role_bitmap(token_data.roles) & required == required
     return check_all_roles
 
 
@@ -13,7 +13,7 @@ class Base(DeclarativeBase):
     
     @declared_attr.directive
     def __tablename__(cls) -> str:
-        ""
+        """
         Generate __tablename__ automatically.
         Converts CamelCase class name to snake_case table name.
         """
@@ -55,7 +55,7 @@ class Base(DeclarativeBase):
     )
     
     def to_dict(self) -> Dict[str, Any]:
-        ""
+        """
         Convert model to dictionary.
         
         Returns:
@@ -67,7 +67,7 @@ class Base(DeclarativeBase):
         }
     
     def update(self, **kwargs: Any) -> None:
-        ""
+        """
         Update model attributes.
         
         Args:
@@ -78,20 +78,20 @@ class Base(DeclarativeBase):
                 setattr(self, key, value)
     
     def soft_delete(self) -> None:
-        ""Mark the record as deleted."""
+        """Mark the record as deleted."""
         self.deleted_at = datetime.utcnow()
     
     def is_deleted(self) -> bool:
-        ""Check if the record is marked as deleted."""
+        """Check if the record is marked as deleted."""
         return self.deleted_at is not None
     
     def __repr__(self) -> str:
-        ""Return a string representation of the model."""
+        """Return a string representation of the model."""
         return f"<{self.__class__.__name__}(id={self.id})>"
 
 
 class AuditMixin:
-    ""
+    """
     Mixin for models that need to track who created and last modified them.
     """
     created_by: Mapped[Optional[UUID]] = mapped_column(
@@ -106,7 +106,7 @@ class AuditMixin:
 
 
 class TimestampMixin:
-    ""Mixin for models that need created/updated timestamps."""
+    """Mixin for models that need created/updated timestamps."""
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -122,7 +122,7 @@ class TimestampMixin:
 
 
 class SoftDeleteMixin:
-    ""Mixin for models that support soft deletion."""
+    """Mixin for models that support soft deletion."""
     deleted_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
@@ -130,13 +130,13 @@ class SoftDeleteMixin:
     )
     
     def soft_delete(self) -> None:
-        ""Mark the record as deleted."""
+        """Mark the record as deleted."""
         self.deleted_at = datetime.utcnow()
     
     def restore(self) -> None:
-        ""Restore a soft-deleted record."""
+        """Restore a soft-deleted record."""
         self.deleted_at = None
     
     def is_deleted(self) -> bool:
-        ""Check if the record is marked as deleted."""
+        """Check if the record is marked as deleted."""
         return self.deleted_at is not None
@@ -60,7 +60,7 @@ def get_session_factory() -> async_sessionmaker:
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    ""
+    """
     Dependency that provides a database session.
     
     Example:
@@ -103,13 +103,14 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db() -> None:
-    ""Initialize database connections and create tables if they don't exist."""
+    """Initialize database connections and create tables if they don't exist."""
     from app.db import base  # noqa: F401
     
     engine = get_engine()
     
     # Import all models here to ensure they are registered with SQLAlchemy
-    from app.models import Base  # noqa: F401
+    from app.db.base import Base
+    from app.models import api_key, risk_metrics_history  # noqa: F401
     
     async with engine.begin() as conn:
         # Create all tables
@@ -120,7 +121,7 @@ async def init_db() -> None:
 
 
 async def run_migrations() -> None:
-    ""Run database migrations."""
+    """Run database migrations."""
     from alembic import command
     from alembic.config import Config
     
@@ -132,7 +133,7 @@ async def run_migrations() -> None:
 
 
 async def close_db() -> None:
-    ""Close database connections."""
+    """Close database connections."""
     global _async_engine, _async_session_factory
     
     if _async_engine:
@@ -1,12 +1,21 @@
+import asyncio
 import logging
 import sys
-from fastapi import FastAPI, Request, status
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.core.security import init_api_key_index
+from app.services.api_key_store import load_api_key
+from app.core.metrics import monitor_event_loop_lag, render_metrics, track_executor
+from app.core.profiling import configure_profile_store
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.utils.circuit_breaker import configure_circuit_breakers
 
 # Configure logging
 configure_logging()
@@ -32,6 +41,14 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Opt-in and sampled per-request profiling
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Record request counts and latency per endpoint
+if settings.ENABLE_METRICS:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -60,6 +77,21 @@ async def startup_event():
     """Run on application startup"""
     logger.info("Starting Python Engine Service...")
     # Initialize services here (database, cache, etc.)
+    init_api_key_index(loader=load_api_key if settings.DATABASE_URI else None)
+    configure_profile_store(
+        settings.REDIS_URL, max_profiles=settings.PROFILING_MAX_STORED, ttl=settings.PROFILING_TTL
+    )
+    configure_circuit_breakers(
+        settings.REDIS_URL if settings.CIRCUIT_BREAKER_SHARED_STATE else None
+    )
+
+    if settings.ENABLE_METRICS:
+        # Use an explicit default executor so its queue depth can be reported
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(thread_name_prefix="risk-engine")
+        loop.set_default_executor(executor)
+        track_executor("default", executor)
+        app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
 
 # Shutdown event
 @app.on_event("shutdown")
@@ -67,6 +99,16 @@ async def shutdown_event():
     """Run on application shutdown"""
     logger.info("Shutting down Python Engine Service...")
     # Clean up resources here
+    loop_lag_task = getattr(app.state, "loop_lag_task", None)
+    if loop_lag_task is not None:
+        loop_lag_task.cancel()
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose metrics in the Prometheus text format"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
 
 # Root endpoint
 @app.get("/")
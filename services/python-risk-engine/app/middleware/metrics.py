@@ -0,0 +1,52 @@
+"""
+HTTP metrics middleware.
+
+Records request counts and latency for every request, labelled by the route
+template (e.g. ``/api/v1/portfolios/{portfolio_id}``) rather than the raw URL
+so that path parameters don't explode label cardinality.
+"""
+import time
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.routing import Match
+
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_TOTAL
+
+# Paths that are scraped or probed constantly and would drown real traffic
+EXCLUDED_PATHS = {"/metrics", "/health", "/health/liveness", "/health/readiness"}
+
+
+def get_route_path(request: Request) -> str:
+    """Return the route template matching the request, or a catch-all label."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Middleware recording Prometheus request metrics."""
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if request.url.path in EXCLUDED_PATHS:
+            return await call_next(request)
+
+        path = get_route_path(request)
+        start = time.perf_counter()
+        status_code = 500
+
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_DURATION.labels(method=request.method, path=path).observe(
+                time.perf_counter() - start
+            )
+            HTTP_REQUESTS_TOTAL.labels(
+                method=request.method, path=path, status=str(status_code)
+            ).inc()
@@ -0,0 +1,99 @@
+"""
+Per-request profiling middleware.
+
+A request is profiled when either:
+- an admin sends the profiling header (``settings.PROFILING_HEADER``), or
+- it is picked by the global sampling rate (``settings.PROFILING_SAMPLE_RATE``).
+
+The profile is stored in the global profile store and its id is returned in
+the ``X-Profile-Id`` response header. Requests that are not profiled only pay
+for a header lookup and one random draw.
+"""
+import logging
+import random
+import threading
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp
+
+from app.core.config import settings
+from app.core.profiling import ProfileArtifact, SamplingProfiler, get_profile_store
+from app.core.security import UserRole, get_current_user, has_role
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+async def is_admin_request(request: Request) -> bool:
+    """Check whether the request carries admin credentials (API key or bearer token)."""
+    api_key = request.headers.get("X-API-Key")
+    authorization = request.headers.get("Authorization", "")
+    token = authorization[7:] if authorization.lower().startswith("bearer ") else None
+    if not api_key and not token:
+        return False
+
+    try:
+        user = await get_current_user(token=token, api_key=api_key)
+    except HTTPException:
+        return False
+    return has_role(UserRole.ADMIN)(user)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Middleware running a sampling profiler for selected requests."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        interval: Optional[float] = None,
+    ):
+        super().__init__(app)
+        self.header = header or settings.PROFILING_HEADER
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.interval = interval or settings.PROFILING_INTERVAL
+
+    async def _trigger(self, request: Request) -> Optional[str]:
+        """Return why the request should be profiled, or None."""
+        if request.headers.get(self.header):
+            if await is_admin_request(request):
+                return "header"
+            logger.warning(f"Ignoring {self.header} header from non-admin request")
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        trigger = await self._trigger(request)
+        if trigger is None:
+            return await call_next(request)
+
+        # Async endpoints run on this (the event loop's) thread
+        profiler = SamplingProfiler(threading.get_ident(), interval=self.interval)
+        profiler.start()
+        status_code = None
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            profiler.stop()
+            artifact = ProfileArtifact.from_profiler(
+                profiler,
+                method=request.method,
+                path=request.url.path,
+                trigger=trigger,
+                status_code=status_code,
+            )
+            try:
+                await get_profile_store().save(artifact)
+            except Exception as e:
+                logger.error(f"Failed to store request profile: {e}")
+
+        response.headers[PROFILE_ID_HEADER] = artifact.profile_id
+        return response
@@ -0,0 +1,31 @@
+"""
+API keys table.
+
+Only the SHA-256 of each key is stored (see ``hash_api_key``); the unique
+index on ``key_hash`` serves the lookup ``APIKeyIndex`` makes for keys that
+are not configured statically.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class APIKey(Base):
+    """An API key issued to a user or service."""
+
+    __tablename__ = "api_keys"
+
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    key_hash: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+    prefix: Mapped[str] = mapped_column(String(16), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    roles: Mapped[List[str]] = mapped_column(JSONB, nullable=False, default=list)
+    scopes: Mapped[List[str]] = mapped_column(JSONB, nullable=False, default=list)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,70 @@
+"""
+Risk metrics history table.
+
+Stores one row per portfolio per risk run, tagged with the user who owns the
+portfolio. The table is append-only and is written in bulk by
+``RiskMetricsHistoryWriter``, so it is defined as a plain Core table rather
+than on the declarative ``Base``: it skips the UUID key,
+soft-delete and versioning columns (and their indexes) that every ORM model
+carries, which would otherwise be maintained for every copied row.
+
+Ownership lives in ``portfolio_owners``, keyed on the portfolio id, so each
+portfolio has exactly one owner no matter how many history rows it has.
+"""
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Identity,
+    Index,
+    Integer,
+    String,
+    Table,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+risk_metrics_history = Table(
+    "risk_metrics_history",
+    Base.metadata,
+    # SQLite only autoincrements INTEGER primary keys
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True),
+    Column("owner_id", String(64), nullable=False),
+    Column("portfolio_id", String(64), nullable=False),
+    Column("calculated_at", DateTime(timezone=True), nullable=False),
+    Column("period", String(8), nullable=False),
+    Column("cumulative_return", Float, nullable=False),
+    Column("annualized_return", Float),
+    Column("volatility", Float, nullable=False),
+    Column("sharpe_ratio", Float),
+    Column("sortino_ratio", Float),
+    Column("max_drawdown", Float, nullable=False),
+    Column("var_95", Float, nullable=False),
+    Column("var_99", Float, nullable=False),
+    Column("expected_shortfall_95", Float, nullable=False),
+    Column("beta", Float),
+    Column("alpha", Float),
+    Column("risk_level", String(16), nullable=False),
+    Column("risk_score", Float, nullable=False),
+    Column("details", JSON().with_variant(JSONB(), "postgresql")),
+    # Serves per-portfolio history reads (equality on portfolio, range/order on
+    # time, with id breaking ties for the keyset cursor)
+    Index("ix_risk_metrics_history_portfolio_calculated_at", "portfolio_id", "calculated_at", "id"),
+)
+
+portfolio_owners = Table(
+    "portfolio_owners",
+    Base.metadata,
+    Column("portfolio_id", String(64), primary_key=True),
+    Column("owner_id", String(64), nullable=False),
+    Column("claimed_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+)
+
+# Columns written by the bulk writer, in record order (``id`` is generated)
+RISK_METRICS_HISTORY_COLUMNS = tuple(
+    column.name for column in risk_metrics_history.columns if column.name != "id"
+)
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """Pydantic schemas for request/response validation."""
 from .base import (
     BaseSchema,
@@ -14,10 +13,10 @@ from .base import (
     IDModel,
     TimestampMixin,
     ID_TYPE,
-    NonEmptyStr,""
+    NonEmptyStr,
 )
 
-""__all__ = [
+__all__ = [
     'BaseSchema',
     'BaseResponse',
     'PaginatedResponse',
@@ -31,40 +30,5 @@ from .base import (
     'IDModel',
     'TimestampMixin',
     'ID_TYPE',
-    'NonEmptyStr',""'
-=======
-""""""Pydantic schemas for request/response validation."""
-""from .base import ("""
-   """ BaseSchema,"""
-   "" BaseResponse,""
-  ""  PaginatedResponse,""
-  ""  ErrorResponse,""
-   "" SortOrder,""
-   "" QueryParams,""
-    ""EmailField,""
-   "" PasswordField,""
-  "" SuccessResponse,""
-  """ErrorResponseModel,""
-    """IDModel,""
-    """timestampMixin,""
-    """ID_TYPE,""
-    """NonEmptyStr,"""
-)
-
-"""__all__ = [""
-    'BaseSchema',""
-    'BaseResponse',""
-    'PaginatedResponse',""
-    'ErrorResponse',""
-    'SortOrder',""
-    'QueryParams',"'
-    'EmailField',""
-    'PasswordField',""
-    'SuccessResponse',""
-    'ErrorResponseModel',""
-    'IDModel',""
-    'TimestampMixin',""
-    'ID_TYPE',""
-    'NonEmptyStr',"""
->>>>>>> 87ddc13802ba67eae72641b5b2720292e48893fb
+    'NonEmptyStr',
 ]
@@ -50,13 +50,13 @@ class BaseSchema(BaseModel):
         extra="forbid",  # Don't allow extra fields
     )
     
-    @field_serializer('id')
+    @field_serializer('id', check_fields=False)
     def serialize_id(self, id: ID_TYPE, _info) -> str:
         """Convert ID to string for JSON serialization."""
         return str(id)
     
     def model_dump_flat(self, **kwargs) -> Dict[str, Any]:
-        ""
+        """
         Dump the model to a flat dictionary, removing nested models.
         
         This is useful for creating flat database records or API responses.
@@ -81,7 +81,7 @@ class BaseSchema(BaseModel):
         return result
     
     def model_copy(self, **kwargs) -> 'BaseSchema':
-        ""Create a copy of the model with updated fields."""
+        """Create a copy of the model with updated fields."""
         return self.model_validate(self.model_dump() | kwargs)
 
 class BaseResponse(BaseSchema):
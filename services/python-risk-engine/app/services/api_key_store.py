@@ -0,0 +1,63 @@
+"""
+Database-backed API key loader.
+
+``load_api_key`` is the loader passed to ``init_api_key_index`` at startup
+when a database is configured: keys that are not configured in settings are
+resolved by their hash from the ``api_keys`` table, and ``APIKeyIndex``
+caches the result. Loads go through the ``api_key_store`` circuit breaker,
+so a database outage fails API key authentication fast instead of tying up a
+connection attempt per request.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.core.security import APIKeyRecord, UserRole
+from app.models.api_key import APIKey
+from app.utils.circuit_breaker import async_circuit
+
+logger = logging.getLogger(__name__)
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Match the naive UTC timestamps ``APIKeyRecord.is_valid`` compares against."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@async_circuit("api_key_store", minimum_calls=20, recovery_timeout=15.0, call_timeout=2.0)
+async def load_api_key(key_hash: str) -> Optional[APIKeyRecord]:
+    """
+    Load an API key record by key hash.
+
+    Args:
+        key_hash: ``hash_api_key`` of the presented key
+
+    Returns:
+        The key's record, or None if no live key has this hash
+
+    Raises:
+        CircuitBreakerError: If recent loads failed and the circuit is open
+    """
+    # Imported here: the session module creates the engine on import
+    from app.db.session import get_db_context
+
+    async with get_db_context() as db:
+        result = await db.execute(
+            select(APIKey).where(APIKey.key_hash == key_hash, APIKey.deleted_at.is_(None))
+        )
+        key = result.scalar_one_or_none()
+
+    if key is None:
+        return None
+    return APIKeyRecord(
+        key_id=key.name,
+        subject=key.subject,
+        roles=tuple(key.roles or [UserRole.USER.value]),
+        scopes=tuple(key.scopes),
+        expires_at=_as_naive_utc(key.expires_at),
+        is_active=key.is_active,
+    )
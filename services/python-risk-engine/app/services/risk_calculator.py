@@ -1,4 +1,4 @@
-ureimport numpy as np
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
@@ -0,0 +1,341 @@
+"""
+Risk metrics history store.
+
+Persists the results of risk runs and reads them back per portfolio.
+
+Writes go through ``RiskMetricsHistoryWriter``, which buffers rows as tuples
+and flushes them in batches. On PostgreSQL with asyncpg each batch is sent
+with ``COPY`` (``copy_records_to_table``); other drivers fall back to
+multi-row ``INSERT`` statements. Either way a batch is one round trip and one
+transaction instead of one ORM object and statement per row.
+
+Every row carries the id of the user owning its portfolio; the read
+endpoints only serve a portfolio's history to that user. Owners are kept in
+``portfolio_owners``, one row per portfolio. The writer claims every
+portfolio in a batch in the same transaction that writes the batch, so the
+first writer of a portfolio becomes its owner and a batch for a portfolio
+owned by someone else is rolled back with ``PortfolioOwnershipError``.
+
+Example:
+    async with RiskMetricsHistoryWriter(get_engine()) as writer:
+        for portfolio_id, metrics in results:
+            await writer.add(owner_id, portfolio_id, metrics)
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.models.risk_metrics import RiskMetrics
+from app.models.risk_metrics_history import (
+    RISK_METRICS_HISTORY_COLUMNS,
+    portfolio_owners,
+    risk_metrics_history,
+)
+
+logger = logging.getLogger(__name__)
+
+_OWNER_INDEX = RISK_METRICS_HISTORY_COLUMNS.index("owner_id")
+_PORTFOLIO_INDEX = RISK_METRICS_HISTORY_COLUMNS.index("portfolio_id")
+_DETAILS_INDEX = RISK_METRICS_HISTORY_COLUMNS.index("details")
+
+# INSERT ... ON CONFLICT DO NOTHING, for dialects that support it
+_INSERT_IGNORING_CONFLICTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+class PortfolioOwnershipError(Exception):
+    """Raised when rows are written for a portfolio owned by another user."""
+
+    def __init__(self, portfolio_ids: Iterable[str]):
+        self.portfolio_ids = sorted(portfolio_ids)
+        super().__init__(f"Portfolios owned by another user: {', '.join(self.portfolio_ids)}")
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (``datetime.utcnow``) as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def to_history_record(owner_id: str, portfolio_id: str, metrics: RiskMetrics) -> Tuple[Any, ...]:
+    """
+    Convert risk metrics to a history record.
+
+    The raw return series is not stored; only the summary metrics are.
+
+    Args:
+        owner_id: User owning the portfolio
+        portfolio_id: Portfolio the metrics were calculated for
+        metrics: Calculated risk metrics
+
+    Returns:
+        Tuple of values in ``RISK_METRICS_HISTORY_COLUMNS`` order
+    """
+    return (
+        owner_id,
+        portfolio_id,
+        _as_utc(metrics.timestamp),
+        metrics.period.value,
+        metrics.cumulative_return,
+        metrics.annualized_return,
+        metrics.volatility,
+        metrics.sharpe_ratio,
+        metrics.sortino_ratio,
+        metrics.max_drawdown,
+        metrics.var_95,
+        metrics.var_99,
+        metrics.expected_shortfall_95,
+        metrics.beta,
+        metrics.alpha,
+        metrics.risk_level.value,
+        metrics.risk_score,
+        metrics.metadata or None,
+    )
+
+
+class RiskMetricsHistoryWriter:
+    """
+    Buffered bulk writer for the risk metrics history table.
+
+    Rows are flushed automatically once ``batch_size`` are buffered and when
+    the writer is used as an async context manager and exits cleanly.
+    """
+
+    def __init__(self, engine: AsyncEngine, batch_size: Optional[int] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            engine: Async engine to write through
+            batch_size: Rows per COPY/INSERT batch
+                (default: settings.RISK_METRICS_WRITE_BATCH_SIZE)
+        """
+        self.engine = engine
+        self.batch_size = batch_size or settings.RISK_METRICS_WRITE_BATCH_SIZE
+        self.rows_written = 0
+        self._buffer: List[Tuple[Any, ...]] = []
+
+    async def __aenter__(self) -> "RiskMetricsHistoryWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+        elif self._buffer:
+            logger.warning(
+                f"Discarding {len(self._buffer)} buffered risk metrics rows after error"
+            )
+            self._buffer.clear()
+
+    async def add(self, owner_id: str, portfolio_id: str, metrics: RiskMetrics) -> None:
+        """Buffer one portfolio's metrics, flushing if the batch is full."""
+        await self.add_records([to_history_record(owner_id, portfolio_id, metrics)])
+
+    async def add_records(self, records: Iterable[Tuple[Any, ...]]) -> None:
+        """
+        Buffer pre-built history records, flushing full batches.
+
+        Args:
+            records: Tuples in ``RISK_METRICS_HISTORY_COLUMNS`` order
+        """
+        for record in records:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered rows in a single transaction.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            PortfolioOwnershipError: If a row's portfolio is owned by another
+                user; nothing from the batch is written
+        """
+        if not self._buffer:
+            return 0
+
+        batch, self._buffer = self._buffer, []
+        async with self.engine.begin() as conn:
+            await claim_portfolios(
+                conn, {(record[_PORTFOLIO_INDEX], record[_OWNER_INDEX]) for record in batch}
+            )
+            raw = await conn.get_raw_connection()
+            driver_connection = raw.driver_connection
+            if hasattr(driver_connection, "copy_records_to_table"):
+                await self._copy(driver_connection, batch)
+            else:
+                await self._insert(conn, batch)
+
+        self.rows_written += len(batch)
+        logger.debug(f"Wrote {len(batch)} risk metrics history rows")
+        return len(batch)
+
+    @staticmethod
+    async def _copy(connection: Any, batch: List[Tuple[Any, ...]]) -> None:
+        """Send a batch with asyncpg's binary COPY protocol."""
+        # asyncpg's jsonb codec expects text
+        records = [
+            record[:_DETAILS_INDEX]
+            + (json.dumps(record[_DETAILS_INDEX]) if record[_DETAILS_INDEX] is not None else None,)
+            + record[_DETAILS_INDEX + 1:]
+            for record in batch
+        ]
+        await connection.copy_records_to_table(
+            risk_metrics_history.name,
+            records=records,
+            columns=RISK_METRICS_HISTORY_COLUMNS,
+            schema_name=risk_metrics_history.schema,
+        )
+
+    @staticmethod
+    async def _insert(conn: AsyncConnection, batch: List[Tuple[Any, ...]]) -> None:
+        """Send a batch as multi-row INSERT statements."""
+        await conn.execute(
+            risk_metrics_history.insert(),
+            [dict(zip(RISK_METRICS_HISTORY_COLUMNS, record)) for record in batch],
+        )
+
+
+async def claim_portfolios(conn: AsyncConnection, claims: Iterable[Tuple[str, str]]) -> None:
+    """
+    Record owners for unclaimed portfolios and check the rest.
+
+    Runs in the caller's transaction. The primary key on
+    ``portfolio_owners.portfolio_id`` settles concurrent claims: a second
+    claimant's insert waits for the first transaction and then finds the
+    portfolio taken.
+
+    Args:
+        conn: Connection with an open transaction
+        claims: ``(portfolio_id, owner_id)`` pairs
+
+    Raises:
+        PortfolioOwnershipError: If any portfolio is owned by someone else
+    """
+    claims = sorted(set(claims))
+    if not claims:
+        return
+    table = portfolio_owners
+    portfolio_ids = sorted({portfolio_id for portfolio_id, _ in claims})
+    insert = _INSERT_IGNORING_CONFLICTS.get(conn.dialect.name)
+    if insert is not None:
+        # Claimed in key order, so concurrent batches cannot deadlock
+        await conn.execute(
+            insert(table).on_conflict_do_nothing(index_elements=[table.c.portfolio_id]),
+            [{"portfolio_id": portfolio_id, "owner_id": owner_id} for portfolio_id, owner_id in claims],
+        )
+        result = await conn.execute(
+            select(table.c.portfolio_id, table.c.owner_id).where(table.c.portfolio_id.in_(portfolio_ids))
+        )
+        owners = dict(result.all())
+    else:
+        # The primary key still rejects a concurrent claim, as an IntegrityError
+        result = await conn.execute(
+            select(table.c.portfolio_id, table.c.owner_id).where(table.c.portfolio_id.in_(portfolio_ids))
+        )
+        owners = dict(result.all())
+        new = {}
+        for portfolio_id, owner_id in claims:
+            if portfolio_id not in owners and portfolio_id not in new:
+                new[portfolio_id] = owner_id
+        if new:
+            await conn.execute(
+                table.insert(),
+                [{"portfolio_id": portfolio_id, "owner_id": owner_id} for portfolio_id, owner_id in new.items()],
+            )
+            owners.update(new)
+
+    conflicts = {portfolio_id for portfolio_id, owner_id in claims if owners[portfolio_id] != owner_id}
+    if conflicts:
+        raise PortfolioOwnershipError(conflicts)
+
+
+async def get_portfolio_owner(db: AsyncSession, portfolio_id: str) -> Optional[str]:
+    """
+    Look up the user owning a portfolio.
+
+    Args:
+        db: Database session
+        portfolio_id: Portfolio to look up
+
+    Returns:
+        Owner's user id, or None if the portfolio has not been claimed
+    """
+    table = portfolio_owners
+    result = await db.execute(select(table.c.owner_id).where(table.c.portfolio_id == portfolio_id))
+    return result.scalar_one_or_none()
+
+
+async def get_portfolio_history(
+    db: AsyncSession,
+    portfolio_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = 500,
+) -> List[Dict[str, Any]]:
+    """
+    Read a portfolio's metrics history, newest first.
+
+    Rows are ordered by ``(calculated_at, id)`` and every filter is on
+    ``(portfolio_id, calculated_at, id)``, so the query is a range scan of
+    the composite index. Page through long histories by passing the
+    ``calculated_at`` and ``id`` of the previous page's last row as
+    ``before`` and ``before_id``: the row-value comparison resumes right
+    after that row, so rows sharing its ``calculated_at`` are not skipped.
+
+    Args:
+        db: Database session
+        portfolio_id: Portfolio to read
+        start: Only rows calculated at or after this time
+        end: Only rows calculated at or before this time
+        before: Keyset cursor; only rows before it in the ordering (with
+            ``before_id``) or calculated strictly before this time (without)
+        before_id: ``id`` of the cursor row
+        limit: Maximum number of rows to return
+
+    Returns:
+        List of history rows as dictionaries
+    """
+    table = risk_metrics_history
+    query = select(table).where(table.c.portfolio_id == portfolio_id)
+    if start is not None:
+        query = query.where(table.c.calculated_at >= _as_utc(start))
+    if end is not None:
+        query = query.where(table.c.calculated_at <= _as_utc(end))
+    if before is not None and before_id is not None:
+        query = query.where(
+            tuple_(table.c.calculated_at, table.c.id) < tuple_(_as_utc(before), before_id)
+        )
+    elif before is not None:
+        query = query.where(table.c.calculated_at < _as_utc(before))
+    query = query.order_by(table.c.calculated_at.desc(), table.c.id.desc()).limit(limit)
+
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
+
+
+async def get_latest_metrics(db: AsyncSession, portfolio_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a portfolio's most recent metrics.
+
+    Args:
+        db: Database session
+        portfolio_id: Portfolio to read
+
+    Returns:
+        Latest history row as a dictionary, or None if there is none
+    """
+    rows = await get_portfolio_history(db, portfolio_id, limit=1)
+    return rows[0] if rows else None
@@ -1,7 +1,31 @@
-"""Circuit breaker pattern implementation for resilient service calls."""
+"""Circuit breaker pattern implementation for resilient service calls.
+
+Two flavours are provided:
+
+- ``CircuitBreaker``: a lightweight, synchronous breaker that counts
+  consecutive failures in process memory.
+- ``AsyncCircuitBreaker``: an asyncio-aware breaker that trips on the failure
+  rate over a sliding time window, limits the number of probe calls admitted
+  in HALF_OPEN, and can share its state across worker processes through Redis.
+"""
+import asyncio
 import time
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Callable, Optional, TypeVar, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
 from functools import wraps
 import logging
 
@@ -26,7 +50,7 @@ class CircuitBreakerError(Exception):
         )
 
 class CircuitBreaker:
-    ""
+    """
     Circuit breaker to detect failures and encapsulate the logic of preventing a
     service from constantly trying to execute a function that's likely to fail.
     """
@@ -183,3 +207,706 @@ def circuit(
         )
         return cb(func)
     return decorator
+
+
+# ---------------------------------------------------------------------------
+# Async, sliding-window circuit breaker with optional shared state
+# ---------------------------------------------------------------------------
+
+# Lua script that decides whether a call may proceed. Runs atomically in Redis
+# so every worker sees the same OPEN -> HALF_OPEN transition and probe budget.
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local recovery_timeout = tonumber(ARGV[2])
+local max_probes = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local state = redis.call('HGET', key, 'state') or 'CLOSED'
+local previous = state
+local changed_at = tonumber(redis.call('HGET', key, 'changed_at')) or 0
+
+if state == 'OPEN' then
+    local elapsed = now - changed_at
+    if elapsed < recovery_timeout then
+        return {previous, state, 0, tostring(recovery_timeout - elapsed)}
+    end
+    state = 'HALF_OPEN'
+    changed_at = now
+    redis.call('HSET', key, 'state', state, 'changed_at', tostring(now),
+               'probes', 0, 'probe_successes', 0)
+    redis.call('EXPIRE', key, ttl)
+end
+
+if state == 'HALF_OPEN' then
+    -- A probe whose worker died never reports back; start a fresh probe
+    -- round instead of rejecting forever.
+    if now - changed_at >= recovery_timeout then
+        redis.call('HSET', key, 'changed_at', tostring(now),
+                   'probes', 0, 'probe_successes', 0)
+    end
+    local probes = tonumber(redis.call('HGET', key, 'probes')) or 0
+    local successes = tonumber(redis.call('HGET', key, 'probe_successes')) or 0
+    if probes + successes >= max_probes then
+        return {previous, state, 0, '0'}
+    end
+    redis.call('HINCRBY', key, 'probes', 1)
+    return {previous, state, 1, '0'}
+end
+
+return {previous, state, 1, '0'}
+"""
+
+# Lua script that records the outcome of a call and applies the failure-rate
+# rule over the sliding window. Window buckets live in the same hash as the
+# state ("s:<bucket>" / "f:<bucket>") so the script touches a single key.
+_RECORD_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local outcome = ARGV[2]
+local probe = ARGV[3] == '1'
+local bucket_width = tonumber(ARGV[4])
+local bucket_count = tonumber(ARGV[5])
+local minimum_calls = tonumber(ARGV[6])
+local threshold = tonumber(ARGV[7])
+local max_probes = tonumber(ARGV[8])
+local ttl = tonumber(ARGV[9])
+
+local function clear_window()
+    local fields = redis.call('HKEYS', key)
+    for _, f in ipairs(fields) do
+        local prefix = string.sub(f, 1, 2)
+        if prefix == 's:' or prefix == 'f:' then
+            redis.call('HDEL', key, f)
+        end
+    end
+end
+
+local function transition(new_state)
+    redis.call('HSET', key, 'state', new_state, 'changed_at', tostring(now),
+               'probes', 0, 'probe_successes', 0)
+    clear_window()
+    redis.call('EXPIRE', key, ttl)
+end
+
+local state = redis.call('HGET', key, 'state') or 'CLOSED'
+local previous = state
+
+if probe then
+    if tonumber(redis.call('HINCRBY', key, 'probes', -1)) < 0 then
+        redis.call('HSET', key, 'probes', 0)
+    end
+    if state ~= 'HALF_OPEN' or outcome == 'release' then
+        return {previous, state}
+    end
+    if outcome == 'failure' then
+        transition('OPEN')
+        return {previous, 'OPEN'}
+    end
+    local successes = redis.call('HINCRBY', key, 'probe_successes', 1)
+    if successes >= max_probes then
+        transition('CLOSED')
+        return {previous, 'CLOSED'}
+    end
+    return {previous, state}
+end
+
+if state ~= 'CLOSED' or outcome == 'release' then
+    return {previous, state}
+end
+
+local current = math.floor(now / bucket_width)
+local field = (outcome == 'success') and 's:' or 'f:'
+redis.call('HINCRBY', key, field .. current, 1)
+redis.call('EXPIRE', key, ttl)
+
+local total = 0
+local failures = 0
+local oldest = current - bucket_count + 1
+local fields = redis.call('HKEYS', key)
+for _, f in ipairs(fields) do
+    local prefix = string.sub(f, 1, 2)
+    if prefix == 's:' or prefix == 'f:' then
+        local bucket = tonumber(string.sub(f, 3))
+        if bucket < oldest then
+            redis.call('HDEL', key, f)
+        else
+            local count = tonumber(redis.call('HGET', key, f)) or 0
+            total = total + count
+            if prefix == 'f:' then
+                failures = failures + count
+            end
+        end
+    end
+end
+
+if total >= minimum_calls and failures / total >= threshold then
+    transition('OPEN')
+    return {previous, 'OPEN'}
+end
+
+return {previous, state}
+"""
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Tuning parameters for an ``AsyncCircuitBreaker``."""
+    failure_rate_threshold: float = 0.5
+    minimum_calls: int = 10
+    window_seconds: float = 60.0
+    bucket_count: int = 10
+    recovery_timeout: float = 30.0
+    half_open_max_calls: int = 3
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.failure_rate_threshold <= 1.0:
+            raise ValueError("failure_rate_threshold must be in (0, 1]")
+        if self.minimum_calls < 1:
+            raise ValueError("minimum_calls must be >= 1")
+        if self.window_seconds <= 0 or self.bucket_count < 1:
+            raise ValueError("window_seconds and bucket_count must be positive")
+        if self.half_open_max_calls < 1:
+            raise ValueError("half_open_max_calls must be >= 1")
+
+    @property
+    def bucket_width(self) -> float:
+        """Width of a single sliding-window bucket in seconds."""
+        return self.window_seconds / self.bucket_count
+
+    @property
+    def state_ttl(self) -> int:
+        """How long shared state may sit idle before Redis expires it."""
+        return int(2 * max(self.window_seconds, self.recovery_timeout)) + 1
+
+
+@dataclass
+class CircuitBreakerMetrics:
+    """Counters describing what a circuit breaker has seen in this process."""
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    rejections: int = 0
+    state_changes: Counter = field(default_factory=Counter)
+    last_state_change_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a dictionary."""
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejections": self.rejections,
+            "state_changes": dict(self.state_changes),
+            "last_state_change_at": self.last_state_change_at,
+        }
+
+
+class CircuitStateBackend(ABC):
+    """Base class for circuit breaker state storage."""
+
+    @abstractmethod
+    async def acquire(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+    ) -> Tuple[CircuitState, CircuitState, bool, float]:
+        """Ask whether a call may proceed.
+
+        Args:
+            name: Circuit name
+            config: Circuit configuration
+            now: Current wall-clock time in seconds
+
+        Returns:
+            Tuple of (previous_state, state, allowed, retry_after)
+        """
+
+    @abstractmethod
+    async def record(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+        outcome: str,
+        probe: bool,
+    ) -> Tuple[CircuitState, CircuitState]:
+        """Record the outcome of an admitted call.
+
+        Args:
+            name: Circuit name
+            config: Circuit configuration
+            now: Current wall-clock time in seconds
+            outcome: 'success', 'failure' or 'release' (no verdict, e.g. the
+                     call was cancelled or raised an unexpected exception)
+            probe: Whether the call was admitted as a HALF_OPEN probe
+
+        Returns:
+            Tuple of (previous_state, state)
+        """
+
+
+@dataclass
+class _LocalCircuit:
+    """Per-circuit state held by ``InMemoryCircuitStateBackend``."""
+    state: CircuitState = CircuitState.CLOSED
+    changed_at: float = 0.0
+    probes: int = 0
+    probe_successes: int = 0
+    # Each bucket is [bucket_index, successes, failures]
+    buckets: Deque[List[int]] = field(default_factory=deque)
+
+
+class InMemoryCircuitStateBackend(CircuitStateBackend):
+    """Per-process circuit state for development, tests and Redis fallback."""
+
+    def __init__(self) -> None:
+        self._circuits: Dict[str, _LocalCircuit] = {}
+
+    def _get(self, name: str) -> _LocalCircuit:
+        if name not in self._circuits:
+            self._circuits[name] = _LocalCircuit()
+        return self._circuits[name]
+
+    @staticmethod
+    def _transition(circuit: _LocalCircuit, state: CircuitState, now: float) -> None:
+        circuit.state = state
+        circuit.changed_at = now
+        circuit.probes = 0
+        circuit.probe_successes = 0
+        circuit.buckets.clear()
+
+    async def acquire(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+    ) -> Tuple[CircuitState, CircuitState, bool, float]:
+        circuit = self._get(name)
+        previous = circuit.state
+
+        if circuit.state == CircuitState.OPEN:
+            elapsed = now - circuit.changed_at
+            if elapsed < config.recovery_timeout:
+                return previous, circuit.state, False, config.recovery_timeout - elapsed
+            self._transition(circuit, CircuitState.HALF_OPEN, now)
+
+        if circuit.state == CircuitState.HALF_OPEN:
+            if now - circuit.changed_at >= config.recovery_timeout:
+                circuit.changed_at = now
+                circuit.probes = 0
+                circuit.probe_successes = 0
+            if circuit.probes + circuit.probe_successes >= config.half_open_max_calls:
+                return previous, circuit.state, False, 0.0
+            circuit.probes += 1
+
+        return previous, circuit.state, True, 0.0
+
+    async def record(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+        outcome: str,
+        probe: bool,
+    ) -> Tuple[CircuitState, CircuitState]:
+        circuit = self._get(name)
+        previous = circuit.state
+
+        if probe:
+            circuit.probes = max(0, circuit.probes - 1)
+            if circuit.state != CircuitState.HALF_OPEN or outcome == "release":
+                return previous, circuit.state
+            if outcome == "failure":
+                self._transition(circuit, CircuitState.OPEN, now)
+            else:
+                circuit.probe_successes += 1
+                if circuit.probe_successes >= config.half_open_max_calls:
+                    self._transition(circuit, CircuitState.CLOSED, now)
+            return previous, circuit.state
+
+        if circuit.state != CircuitState.CLOSED or outcome == "release":
+            return previous, circuit.state
+
+        current = int(now // config.bucket_width)
+        buckets = circuit.buckets
+        if not buckets or buckets[-1][0] != current:
+            buckets.append([current, 0, 0])
+        buckets[-1][1 if outcome == "success" else 2] += 1
+
+        oldest = current - config.bucket_count + 1
+        while buckets and buckets[0][0] < oldest:
+            buckets.popleft()
+
+        total = sum(b[1] + b[2] for b in buckets)
+        failures = sum(b[2] for b in buckets)
+        if total >= config.minimum_calls and failures / total >= config.failure_rate_threshold:
+            self._transition(circuit, CircuitState.OPEN, now)
+
+        return previous, circuit.state
+
+
+class RedisCircuitStateBackend(CircuitStateBackend):
+    """Circuit state shared by all workers through Redis.
+
+    Every decision runs as a Lua script, so concurrent workers agree on state
+    transitions and on the number of HALF_OPEN probes in flight.
+    """
+
+    def __init__(self, redis_client: Any, key_prefix: str = "circuit"):
+        """Initialize the backend.
+
+        Args:
+            redis_client: A ``redis.asyncio.Redis`` client
+            key_prefix: Prefix for the Redis keys holding circuit state
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._acquire_script = redis_client.register_script(_ACQUIRE_SCRIPT)
+        self._record_script = redis_client.register_script(_RECORD_SCRIPT)
+
+    def _key(self, name: str) -> str:
+        # Hash tag keeps all of a circuit's data in one cluster slot
+        return f"{self.key_prefix}:{{{name}}}"
+
+    @staticmethod
+    def _decode(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else str(value)
+
+    async def acquire(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+    ) -> Tuple[CircuitState, CircuitState, bool, float]:
+        previous, state, allowed, retry_after = await self._acquire_script(
+            keys=[self._key(name)],
+            args=[now, config.recovery_timeout, config.half_open_max_calls, config.state_ttl],
+        )
+        return (
+            CircuitState[self._decode(previous)],
+            CircuitState[self._decode(state)],
+            bool(int(allowed)),
+            float(self._decode(retry_after)),
+        )
+
+    async def record(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        now: float,
+        outcome: str,
+        probe: bool,
+    ) -> Tuple[CircuitState, CircuitState]:
+        previous, state = await self._record_script(
+            keys=[self._key(name)],
+            args=[
+                now,
+                outcome,
+                "1" if probe else "0",
+                config.bucket_width,
+                config.bucket_count,
+                config.minimum_calls,
+                config.failure_rate_threshold,
+                config.half_open_max_calls,
+                config.state_ttl,
+            ],
+        )
+        return CircuitState[self._decode(previous)], CircuitState[self._decode(state)]
+
+
+StateChangeListener = Callable[[str, CircuitState, CircuitState], Any]
+
+
+class AsyncCircuitBreaker:
+    """
+    Asyncio circuit breaker driven by the failure rate over a sliding window.
+
+    The circuit opens once at least ``minimum_calls`` calls were seen in the
+    last ``window_seconds`` and the share of failures among them reaches
+    ``failure_rate_threshold``. After ``recovery_timeout`` at most
+    ``half_open_max_calls`` probe calls are let through; the circuit closes
+    when all of them succeed and reopens on the first probe failure.
+
+    Use it as a decorator on coroutine functions or through ``guard()``:
+
+        breaker = get_async_circuit_breaker("market_data")
+
+        @breaker
+        async def fetch_prices(symbol: str) -> dict:
+            ...
+
+        async with breaker.guard():
+            await client.get(url)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 60.0,
+        bucket_count: int = 10,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 3,
+        call_timeout: Optional[float] = None,
+        expected_exceptions: tuple[type[Exception], ...] = (Exception,),
+        backend: Optional[CircuitStateBackend] = None,
+        logger: Optional[logging.Logger] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the circuit breaker.
+
+        Args:
+            name: Name of the circuit breaker for identification
+            failure_rate_threshold: Failure share (0-1] that opens the circuit
+            minimum_calls: Calls required in the window before the rate is evaluated
+            window_seconds: Length of the sliding window in seconds
+            bucket_count: Number of buckets the window is divided into
+            recovery_timeout: Time in seconds the circuit stays OPEN before probing
+            half_open_max_calls: Probe calls admitted (and successes required) in HALF_OPEN
+            call_timeout: Optional per-call timeout; a timeout counts as a failure
+            expected_exceptions: Exceptions that should be counted as failures
+            backend: State backend; defaults to the one set by
+                     ``configure_circuit_breakers`` (in-memory if unset)
+            logger: Optional logger for circuit state changes
+            clock: Wall-clock source, shared across workers when using Redis
+        """
+        self.name = name
+        self.config = CircuitBreakerConfig(
+            failure_rate_threshold=failure_rate_threshold,
+            minimum_calls=minimum_calls,
+            window_seconds=window_seconds,
+            bucket_count=bucket_count,
+            recovery_timeout=recovery_timeout,
+            half_open_max_calls=half_open_max_calls,
+        )
+        self.call_timeout = call_timeout
+        self.expected_exceptions = expected_exceptions
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = CircuitBreakerMetrics()
+        self._backend = backend
+        self._fallback_backend = InMemoryCircuitStateBackend()
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._listeners: List[StateChangeListener] = []
+
+    @property
+    def backend(self) -> CircuitStateBackend:
+        """The state backend in use."""
+        return self._backend or _default_backend
+
+    @property
+    def state(self) -> CircuitState:
+        """The last circuit state observed by this process."""
+        return self._state
+
+    def add_listener(self, listener: StateChangeListener) -> None:
+        """Register a callback invoked as ``listener(name, old_state, new_state)``."""
+        self._listeners.append(listener)
+
+    def _observe(self, state: CircuitState) -> None:
+        """Track the latest known state and publish changes."""
+        if state == self._state:
+            return
+
+        old_state, self._state = self._state, state
+        self.metrics.state_changes[f"{old_state.name}->{state.name}"] += 1
+        self.metrics.last_state_change_at = self._clock()
+
+        log = self.logger.error if state == CircuitState.OPEN else self.logger.warning
+        log("Circuit '%s' changed from %s to %s", self.name, old_state.name, state.name)
+
+        for listener in self._listeners:
+            try:
+                listener(self.name, old_state, state)
+            except Exception:
+                self.logger.exception(
+                    "State change listener failed for circuit '%s'", self.name
+                )
+
+    async def _acquire_state(self) -> Tuple[CircuitState, CircuitState, bool, float]:
+        now = self._clock()
+        try:
+            return await self.backend.acquire(self.name, self.config, now)
+        except Exception as e:
+            # Shared state is unavailable: degrade to per-process decisions
+            self.logger.warning(
+                "Circuit '%s' state backend failed (%s); using local state", self.name, e
+            )
+            return await self._fallback_backend.acquire(self.name, self.config, now)
+
+    async def _record_state(self, outcome: str, probe: bool) -> None:
+        now = self._clock()
+        try:
+            previous, state = await self.backend.record(
+                self.name, self.config, now, outcome, probe
+            )
+        except Exception as e:
+            self.logger.warning(
+                "Circuit '%s' state backend failed (%s); using local state", self.name, e
+            )
+            previous, state = await self._fallback_backend.record(
+                self.name, self.config, now, outcome, probe
+            )
+        self._observe(previous)
+        self._observe(state)
+
+    async def acquire(self) -> bool:
+        """Ask for permission to make a call.
+
+        Returns:
+            True if the call was admitted as a HALF_OPEN probe
+
+        Raises:
+            CircuitBreakerError: If the circuit is rejecting calls
+        """
+        previous, state, allowed, retry_after = await self._acquire_state()
+        self._observe(previous)
+        self._observe(state)
+
+        if not allowed:
+            self.metrics.rejections += 1
+            raise CircuitBreakerError(self.name, state, retry_after)
+
+        self.metrics.calls += 1
+        return state == CircuitState.HALF_OPEN
+
+    async def record_success(self, probe: bool = False) -> None:
+        """Record a successful call."""
+        self.metrics.successes += 1
+        await self._record_state("success", probe)
+
+    async def record_failure(self, probe: bool = False) -> None:
+        """Record a failed call."""
+        self.metrics.failures += 1
+        await self._record_state("failure", probe)
+
+    async def release(self, probe: bool = False) -> None:
+        """Release an admitted call without a verdict (e.g. it was cancelled)."""
+        await self._record_state("release", probe)
+
+    async def _settle(self, probe: bool, exc: Optional[BaseException]) -> None:
+        """Classify the way a guarded call ended and record it."""
+        if exc is None:
+            await self.record_success(probe)
+        elif isinstance(exc, asyncio.TimeoutError):
+            self.metrics.timeouts += 1
+            await self.record_failure(probe)
+        elif isinstance(exc, self.expected_exceptions):
+            await self.record_failure(probe)
+        else:
+            # Cancellation and unexpected exceptions don't trip the circuit
+            await self.release(probe)
+
+    def guard(self) -> "_CircuitGuard":
+        """Async context manager guarding a block of code with this circuit."""
+        return _CircuitGuard(self)
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call a coroutine function through the circuit breaker."""
+        probe = await self.acquire()
+        try:
+            if self.call_timeout is not None:
+                result = await asyncio.wait_for(func(*args, **kwargs), self.call_timeout)
+            else:
+                result = await func(*args, **kwargs)
+        except BaseException as e:
+            await self._settle(probe, e)
+            raise
+        await self._settle(probe, None)
+        return result
+
+    def __call__(self, func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """Decorator to apply the circuit breaker to a coroutine function."""
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call(func, *args, **kwargs)
+
+        return cast(Callable[..., Awaitable[T]], wrapper)
+
+
+class _CircuitGuard:
+    """Async context manager returned by ``AsyncCircuitBreaker.guard``."""
+
+    def __init__(self, breaker: AsyncCircuitBreaker):
+        self.breaker = breaker
+        self.probe = False
+
+    async def __aenter__(self) -> "_CircuitGuard":
+        self.probe = await self.breaker.acquire()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        await self.breaker._settle(self.probe, exc)
+        return False
+
+
+# Default backend used by async circuit breakers created without one
+_default_backend: CircuitStateBackend = InMemoryCircuitStateBackend()
+
+# Global async circuit breakers registry
+_async_circuit_breakers: dict[str, AsyncCircuitBreaker] = {}
+
+
+def configure_circuit_breakers(redis_url: Optional[str] = None) -> CircuitStateBackend:
+    """Select the default state backend for async circuit breakers.
+
+    Args:
+        redis_url: Redis URL for state shared across workers (None for in-memory)
+
+    Returns:
+        The configured backend
+    """
+    global _default_backend
+
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+
+            _default_backend = RedisCircuitStateBackend(redis.Redis.from_url(redis_url))
+            logging.getLogger(__name__).info("Using Redis-backed circuit breaker state")
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                "Failed to set up Redis circuit breaker state: %s. "
+                "Falling back to in-memory state.", e
+            )
+            _default_backend = InMemoryCircuitStateBackend()
+    else:
+        _default_backend = InMemoryCircuitStateBackend()
+
+    return _default_backend
+
+
+def get_async_circuit_breaker(name: str, **kwargs: Any) -> AsyncCircuitBreaker:
+    """Get or create an async circuit breaker with the given name."""
+    if name not in _async_circuit_breakers:
+        _async_circuit_breakers[name] = AsyncCircuitBreaker(name, **kwargs)
+    return _async_circuit_breakers[name]
+
+
+def async_circuit(
+    name: str,
+    **kwargs: Any,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorator to apply an async circuit breaker to a coroutine function.
+
+    Example:
+        @async_circuit("market_data", failure_rate_threshold=0.5, call_timeout=2.0)
+        async def fetch_quotes(symbols: list[str]) -> dict:
+            ...
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        return get_async_circuit_breaker(name, **kwargs)(func)
+    return decorator
+
+
+def get_circuit_breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of state and counters for every registered async circuit."""
+    return {
+        name: {"state": breaker.state.name, **breaker.metrics.to_dict()}
+        for name, breaker in _async_circuit_breakers.items()
+    }
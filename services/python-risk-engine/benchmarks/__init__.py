@@ -0,0 +1,11 @@
+"""
+Benchmark suite for the risk engine algorithms.
+
+Run from the service root:
+
+    python -m benchmarks                       # quick profile, compare to baseline
+    python -m benchmarks --profile full        # realistic sizes
+    python -m benchmarks --save-baseline       # record a new baseline
+
+See ``python -m benchmarks --help`` for thresholds and filters.
+"""
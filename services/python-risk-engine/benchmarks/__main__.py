@@ -0,0 +1,101 @@
+"""Command line entry point: ``python -m benchmarks``."""
+import argparse
+import fnmatch
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.cases import PROFILES, build_cases
+from benchmarks.harness import (
+    calibrate,
+    compare,
+    load_baseline,
+    print_report,
+    run_case,
+    save_baseline,
+    timing_scale,
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark risk engine algorithms and gate on regressions.",
+    )
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument(
+        "-k", "--filter", default="*", help="Glob matched against case ids, e.g. 'src.*'"
+    )
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default: baselines/<profile>.json)")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Record results as the new baseline"
+    )
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase in median time (default: 0.25)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=0.10,
+        help="Allowed relative increase in peak memory (default: 0.10)",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="Target timed seconds per case"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    cases = [case for case in build_cases(args.profile) if fnmatch.fnmatch(case.case_id, args.filter)]
+    if not cases:
+        print(f"No benchmark cases match {args.filter!r}")
+        return 2
+
+    # Calibrate on both sides of the run, so a host that sped up or slowed
+    # down meanwhile is not mistaken for a faster or slower one
+    calibration_s = calibrate()
+    results = [run_case(case, min_time=args.min_time) for case in cases]
+    calibration_s = min(calibration_s, calibrate())
+    baseline = load_baseline(args.profile, args.baseline)
+
+    if args.save_baseline or baseline is None:
+        print_report(results)
+        if args.save_baseline:
+            path = save_baseline(args.profile, results, args.baseline, calibration_s)
+            print(f"\nSaved baseline to {path}")
+        else:
+            print(f"\nNo baseline for profile {args.profile!r}; run with --save-baseline to record one")
+        return 0
+
+    time_scale, reason = timing_scale(baseline, calibration_s)
+    print_report(results, baseline, time_scale)
+    if time_scale is None:
+        print(f"\nWarning: not gating on time: {reason}; record a baseline on this runner with --save-baseline")
+    else:
+        print(f"\nBaseline times scaled by {time_scale:.2f} for this host's calibration")
+    regressions, missing = compare(
+        results,
+        baseline,
+        time_threshold=args.time_threshold,
+        memory_threshold=args.memory_threshold,
+        time_scale=time_scale,
+    )
+    if missing:
+        print(f"\n{len(missing)} case(s) not in baseline: {', '.join(missing)}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Benchmark cases for the risk engine.
+
+Covers both code trees: the ``app`` package (``VaRCalculator``,
+``MonteCarloSimulation``, ``RiskCalculator``) and the deployed ``src``
+service (``VarCalculator``, ``MonteCarloSimulation``, ``RiskCalculator``).
+
+Two profiles are defined:
+- ``quick``: small inputs that finish in well under a minute, for CI gating
+- ``full``: realistic sizes (10-2,000 assets, 252-2,520 days, 1k-100k paths)
+"""
+from itertools import product
+from typing import Any, Callable, Dict, List
+
+from benchmarks.data import make_moments, make_returns, make_weights
+from benchmarks.harness import BenchmarkCase
+
+PROFILES: Dict[str, Dict[str, List[int]]] = {
+    "quick": {
+        "days": [252],
+        "assets": [10, 100],
+        "paths": [1_000],
+        "mc_portfolio_assets": [10],
+        "mc_portfolio_paths": [1_000],
+    },
+    "full": {
+        "days": [252, 2_520],
+        "assets": [10, 500, 2_000],
+        "paths": [1_000, 10_000, 100_000],
+        "mc_portfolio_assets": [10, 50],
+        "mc_portfolio_paths": [1_000, 10_000],
+    },
+}
+
+# The app package's simulate_portfolio allocates (assets x paths x days)
+# arrays; keep it below ~2 GiB of intermediates.
+MAX_MC_PORTFOLIO_CELLS = 10 * 10_000 * 252
+
+
+def _app_var_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from app.algorithms.var_calculator import VaRCalculator
+
+    cases = []
+    for days, method in product(sizes["days"], ("historical", "parametric", "modified")):
+        def setup(days: int = days, method: str = method) -> Callable[[], Any]:
+            returns = make_returns(days, 1)[:, 0] * 100  # percentage returns
+            return lambda: VaRCalculator.calculate_var(returns, 0.95, method=method)
+
+        cases.append(BenchmarkCase("app.VaRCalculator", method, {"days": days}, setup))
+    return cases
+
+
+def _app_monte_carlo_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from app.algorithms.monte_carlo import MonteCarloSimulation
+
+    cases = []
+    for paths in sizes["paths"]:
+        def setup(paths: int = paths) -> Callable[[], Any]:
+            simulation = MonteCarloSimulation(n_simulations=paths)
+            return lambda: simulation.simulate_returns(100.0, 0.07, 0.2, time_horizon=252, dt=1 / 252)
+
+        cases.append(
+            BenchmarkCase(
+                "app.MonteCarloSimulation", "simulate_returns", {"paths": paths, "days": 252}, setup
+            )
+        )
+
+    for assets, paths in product(sizes["mc_portfolio_assets"], sizes["mc_portfolio_paths"]):
+        if assets * paths * 252 > MAX_MC_PORTFOLIO_CELLS:
+            continue
+
+        def setup(assets: int = assets, paths: int = paths) -> Callable[[], Any]:
+            simulation = MonteCarloSimulation(n_simulations=paths)
+            weights = make_weights(assets)
+            expected_returns, cov_matrix = make_moments(assets)
+            return lambda: simulation.simulate_portfolio(
+                weights, expected_returns, cov_matrix, time_horizon=252, dt=1 / 252
+            )
+
+        cases.append(
+            BenchmarkCase(
+                "app.MonteCarloSimulation",
+                "simulate_portfolio",
+                {"assets": assets, "paths": paths, "days": 252},
+                setup,
+            )
+        )
+    return cases
+
+
+def _app_risk_calculator_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from app.services.risk_calculator import RiskCalculator
+
+    methods = (
+        "calculate_volatility",
+        "calculate_value_at_risk",
+        "calculate_expected_shortfall",
+        "calculate_sharpe_ratio",
+        "calculate_max_drawdown",
+    )
+    cases = []
+    for days, method in product(sizes["days"], methods):
+        def setup(days: int = days, method: str = method) -> Callable[[], Any]:
+            # The app RiskCalculator API takes plain lists
+            returns = make_returns(days, 1)[:, 0].tolist()
+            func = getattr(RiskCalculator, method)
+            return lambda: func(returns)
+
+        cases.append(BenchmarkCase("app.RiskCalculator", method, {"days": days}, setup))
+
+    for days in sizes["days"]:
+        def setup(days: int = days) -> Callable[[], Any]:
+            returns = make_returns(days, 2)
+            asset, market = returns[:, 0].tolist(), returns[:, 1].tolist()
+            return lambda: RiskCalculator.calculate_beta(asset, market)
+
+        cases.append(BenchmarkCase("app.RiskCalculator", "calculate_beta", {"days": days}, setup))
+    return cases
+
+
+def _src_var_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from src.algorithms.var_calculator import VarCalculator
+
+    cases = []
+    for days, assets, method in product(
+        sizes["days"], sizes["assets"], ("historical", "parametric", "monte_carlo")
+    ):
+        def setup(days: int = days, assets: int = assets, method: str = method) -> Callable[[], Any]:
+            calculator = VarCalculator()
+            returns = make_returns(days, assets)
+            weights = make_weights(assets)
+            return lambda: calculator.calculate_var(returns, weights, method=method)
+
+        cases.append(
+            BenchmarkCase("src.VarCalculator", method, {"days": days, "assets": assets}, setup)
+        )
+    return cases
+
+
+def _src_monte_carlo_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from src.algorithms.monte_carlo import MonteCarloSimulation
+
+    cases = []
+    assets = max(sizes["assets"])
+    for paths in sizes["paths"]:
+        def setup(paths: int = paths) -> Callable[[], Any]:
+            simulation = MonteCarloSimulation(num_simulations=paths)
+            returns = make_returns(252, assets)
+            weights = make_weights(assets)
+            return lambda: simulation.run_simulation(returns, weights)
+
+        cases.append(
+            BenchmarkCase(
+                "src.MonteCarloSimulation",
+                "run_simulation",
+                {"paths": paths, "assets": assets, "days": 252},
+                setup,
+            )
+        )
+    return cases
+
+
+def _src_risk_calculator_cases(sizes: Dict[str, List[int]]) -> List[BenchmarkCase]:
+    from src.services.risk_calculator import RiskCalculator
+
+    cases = []
+    for days, assets in product(sizes["days"], sizes["assets"]):
+        def setup(days: int = days, assets: int = assets) -> Callable[[], Any]:
+            calculator = RiskCalculator()
+            # calculate_portfolio_risk expects (assets x days)
+            returns = make_returns(days, assets).T.copy()
+            weights = make_weights(assets)
+            return lambda: calculator.calculate_portfolio_risk("benchmark", returns, weights)
+
+        cases.append(
+            BenchmarkCase(
+                "src.RiskCalculator",
+                "calculate_portfolio_risk",
+                {"days": days, "assets": assets},
+                setup,
+            )
+        )
+    return cases
+
+
+CASE_BUILDERS = (
+    _app_var_cases,
+    _app_monte_carlo_cases,
+    _app_risk_calculator_cases,
+    _src_var_cases,
+    _src_monte_carlo_cases,
+    _src_risk_calculator_cases,
+)
+
+
+def build_cases(profile: str) -> List[BenchmarkCase]:
+    """
+    Build every benchmark case for a profile.
+
+    Args:
+        profile: Profile name (see ``PROFILES``)
+
+    Returns:
+        List of benchmark cases
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown benchmark profile: {profile}")
+
+    sizes = PROFILES[profile]
+    cases: List[BenchmarkCase] = []
+    for builder in CASE_BUILDERS:
+        cases.extend(builder(sizes))
+    return cases
@@ -0,0 +1,331 @@
+"""
+Benchmark runner, baselines and regression checks.
+
+Each case is timed with ``time.perf_counter`` over several repeats (after a
+warm-up call) and then run once more under ``tracemalloc`` to record peak
+memory. NumPy reports its array allocations to ``tracemalloc``, so the peak
+covers the arrays a method allocates, not just Python objects. Setup (data
+generation) is never measured.
+
+Absolute times differ between hosts, so every run also times a fixed
+calibration workload. Baseline times are scaled by the ratio of the current
+calibration time to the recorded one before they are compared, and timing is
+not gated at all when the Python, NumPy or CPU differ from the baseline's.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Differences below these are treated as noise regardless of the relative threshold
+MIN_TIME_DELTA = 0.002  # seconds
+MIN_MEMORY_DELTA = 1.0  # MiB
+
+# Environment entries that must match the baseline's for its times to be comparable
+TIMING_ENVIRONMENT_KEYS = ("python", "numpy", "machine", "processor")
+
+
+@dataclass
+class BenchmarkCase:
+    """A method call at one input size."""
+    group: str
+    name: str
+    params: Dict[str, int]
+    setup: Callable[[], Callable[[], Any]]
+    seed: int = 0
+
+    @property
+    def case_id(self) -> str:
+        """Stable identifier used as the baseline key."""
+        sizes = ",".join(f"{key}={value}" for key, value in sorted(self.params.items()))
+        return f"{self.group}.{self.name}[{sizes}]"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory measurements for one case."""
+    case_id: str
+    repeats: int
+    median_s: float
+    min_s: float
+    stdev_s: float
+    peak_memory_mb: float
+
+
+@dataclass
+class Regression:
+    """A measurement that got worse than its baseline allows."""
+    case_id: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.case_id}: {self.metric} {self.baseline:.4g} -> {self.current:.4g} "
+            f"({self.change:+.1%})"
+        )
+
+
+def run_case(
+    case: BenchmarkCase,
+    min_repeats: int = 3,
+    max_repeats: int = 50,
+    min_time: float = 0.5,
+) -> BenchmarkResult:
+    """
+    Measure a benchmark case.
+
+    Repeats the call until ``min_time`` seconds have been spent (bounded by
+    ``min_repeats`` and ``max_repeats``) and reports the median.
+
+    Args:
+        case: Case to run
+        min_repeats: Minimum number of timed calls
+        max_repeats: Maximum number of timed calls
+        min_time: Target total timed duration in seconds
+
+    Returns:
+        Measurements for the case
+    """
+    func = case.setup()
+
+    def call() -> None:
+        # Re-seed the global RNG so stochastic methods do identical work each call
+        np.random.seed(case.seed)
+        func()
+
+    call()  # warm-up
+
+    timings: List[float] = []
+    total = 0.0
+    while len(timings) < max_repeats and (len(timings) < min_repeats or total < min_time):
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        case_id=case.case_id,
+        repeats=len(timings),
+        median_s=statistics.median(timings),
+        min_s=min(timings),
+        stdev_s=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        peak_memory_mb=peak / 2**20,
+    )
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and library versions a baseline was recorded on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or "unknown",
+    }
+
+
+def calibrate(repeats: int = 30) -> float:
+    """
+    Time a fixed workload mixing BLAS, elementwise NumPy and interpreter work.
+
+    Returns:
+        Fastest run in seconds, as a measure of the host's speed (the minimum
+        is less sensitive to other load on the host than the median)
+    """
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((300, 300))
+    spd = a @ a.T + 300 * np.eye(300)
+    x = rng.standard_normal(200_000)
+
+    def workload() -> None:
+        np.linalg.cholesky(spd @ spd)
+        np.sort(np.exp(x) * x)
+        sum(i * i for i in range(50_000))
+
+    workload()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        workload()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def timing_scale(baseline: Dict[str, Any], calibration_s: float) -> Tuple[Optional[float], str]:
+    """
+    Factor to scale a baseline's times by before comparing them to this host's.
+
+    Args:
+        baseline: Baseline loaded with ``load_baseline``
+        calibration_s: ``calibrate()`` time on this host
+
+    Returns:
+        Tuple of (scale, reason): scale is None, with the reason, when the
+        baseline's times cannot be compared to this host's
+    """
+    recorded = baseline.get("environment", {})
+    current = environment()
+    differences = [
+        f"{key} {recorded.get(key)} != {current[key]}"
+        for key in TIMING_ENVIRONMENT_KEYS
+        if recorded.get(key) != current[key]
+    ]
+    if differences:
+        return None, "environment differs from the baseline's (" + ", ".join(differences) + ")"
+    if not baseline.get("calibration_s"):
+        return None, "baseline has no calibration time"
+    return calibration_s / baseline["calibration_s"], ""
+
+
+def baseline_path(profile: str) -> Path:
+    return BASELINE_DIR / f"{profile}.json"
+
+
+def save_baseline(
+    profile: str,
+    results: List[BenchmarkResult],
+    path: Optional[Path] = None,
+    calibration_s: Optional[float] = None,
+) -> Path:
+    """
+    Write results as the baseline for a profile.
+
+    Args:
+        profile: Profile the results were measured with
+        results: Measurements to record
+        path: Baseline file (default: baselines/<profile>.json)
+        calibration_s: ``calibrate()`` time measured with the results
+
+    Returns:
+        Path the baseline was written to
+    """
+    path = path or baseline_path(profile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "profile": profile,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "calibration_s": calibration_s if calibration_s is not None else calibrate(),
+        "results": {result.case_id: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_baseline(profile: str, path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Load the baseline for a profile, or None if none has been recorded."""
+    path = path or baseline_path(profile)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Any],
+    time_threshold: float = 0.25,
+    memory_threshold: float = 0.10,
+    time_scale: Optional[float] = 1.0,
+) -> Tuple[List[Regression], List[str]]:
+    """
+    Compare results to a baseline.
+
+    A case regresses when its median time or peak memory exceeds the
+    baseline by more than the relative threshold and by more than
+    ``MIN_TIME_DELTA`` / ``MIN_MEMORY_DELTA`` in absolute terms.
+
+    Args:
+        results: Current measurements
+        baseline: Baseline loaded with ``load_baseline``
+        time_threshold: Allowed relative increase in median time
+        memory_threshold: Allowed relative increase in peak memory
+        time_scale: Factor applied to the baseline's times (see
+            ``timing_scale``); None skips the timing checks
+
+    Returns:
+        Tuple of (regressions, case ids missing from the baseline)
+    """
+    recorded = baseline.get("results", {})
+    regressions: List[Regression] = []
+    missing: List[str] = []
+
+    for result in results:
+        previous = recorded.get(result.case_id)
+        if previous is None:
+            missing.append(result.case_id)
+            continue
+
+        if time_scale is not None:
+            expected_s = previous["median_s"] * time_scale
+            if (
+                result.median_s > expected_s * (1 + time_threshold)
+                and result.median_s - expected_s > MIN_TIME_DELTA
+            ):
+                regressions.append(Regression(result.case_id, "median_s", expected_s, result.median_s))
+
+        if (
+            result.peak_memory_mb > previous["peak_memory_mb"] * (1 + memory_threshold)
+            and result.peak_memory_mb - previous["peak_memory_mb"] > MIN_MEMORY_DELTA
+        ):
+            regressions.append(
+                Regression(
+                    result.case_id,
+                    "peak_memory_mb",
+                    previous["peak_memory_mb"],
+                    result.peak_memory_mb,
+                )
+            )
+
+    return regressions, missing
+
+
+def format_result(
+    result: BenchmarkResult,
+    previous: Optional[Dict[str, Any]] = None,
+    time_scale: Optional[float] = 1.0,
+) -> str:
+    """Format one result as a report line, with the change against a (scaled) baseline."""
+    line = (
+        f"{result.case_id:<72} {result.median_s * 1000:>10.2f} ms "
+        f"{result.peak_memory_mb:>9.1f} MiB"
+    )
+    if previous and time_scale is not None:
+        expected_s = previous["median_s"] * time_scale
+        time_change = result.median_s / expected_s - 1 if expected_s else 0.0
+        line += f"  ({time_change:+.1%} time)"
+    return line
+
+
+def print_report(
+    results: List[BenchmarkResult],
+    baseline: Optional[Dict[str, Any]] = None,
+    time_scale: Optional[float] = 1.0,
+) -> None:
+    recorded = (baseline or {}).get("results", {})
+    print(f"{'case':<72} {'median':>13} {'peak mem':>13}")
+    for result in results:
+        print(format_result(result, recorded.get(result.case_id), time_scale))
+    sys.stdout.flush()
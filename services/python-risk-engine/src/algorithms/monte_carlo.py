@@ -2,6 +2,8 @@ import numpy as np
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+from app.core.metrics import record_simulated_paths, time_calculation
+
 @dataclass
 class MonteCarloResult:
     simulated_returns: np.ndarray
@@ -31,6 +33,19 @@ class MonteCarloSimulation:
     ) -> MonteCarloResult:
         """Run Monte Carlo simulation for portfolio returns"""
         
+        assets = weights.shape[0] if np.ndim(weights) else 1
+        with time_calculation("monte_carlo", observations=len(returns), assets=assets):
+            result = self._run_simulation(returns, weights, initial_value)
+        
+        record_simulated_paths("portfolio", self.num_simulations, self.time_horizon)
+        return result
+    
+    def _run_simulation(
+        self,
+        returns: np.ndarray,
+        weights: np.ndarray,
+        initial_value: float
+    ) -> MonteCarloResult:
         # Calculate portfolio parameters
         portfolio_returns = np.dot(returns, weights)
         mean_return = np.mean(portfolio_returns)
@@ -2,6 +2,8 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from app.core.metrics import record_simulated_paths, time_calculation
+
 @dataclass
 class VaRResult:
     var_historical: float
@@ -42,40 +44,44 @@ class VarCalculator:
         """
         
         portfolio_returns = np.dot(returns, weights)
+        observations, assets = len(portfolio_returns), len(weights)
         results = {}
         
         if method in ["historical", "all"]:
-            historical_var = self._historical_var(portfolio_returns, portfolio_value)
-            results["historical"] = VaRResult(
-                var_historical=historical_var,
-                var_parametric=0.0,
-                var_conditional=self._calculate_cvar(portfolio_returns, historical_var),
-                confidence_level=self.confidence_level,
-                time_horizon=self.time_horizon,
-                method="historical"
-            )
+            with time_calculation("historical", observations=observations, assets=assets):
+                historical_var = self._historical_var(portfolio_returns, portfolio_value)
+                results["historical"] = VaRResult(
+                    var_historical=historical_var,
+                    var_parametric=0.0,
+                    var_conditional=self._calculate_cvar(portfolio_returns, historical_var),
+                    confidence_level=self.confidence_level,
+                    time_horizon=self.time_horizon,
+                    method="historical"
+                )
             
         if method in ["parametric", "all"]:
-            parametric_var = self._parametric_var(portfolio_returns, portfolio_value)
-            results["parametric"] = VaRResult(
-                var_historical=0.0,
-                var_parametric=parametric_var,
-                var_conditional=self._calculate_cvar(portfolio_returns, parametric_var),
-                confidence_level=self.confidence_level,
-                time_horizon=self.time_horizon,
-                method="parametric"
-            )
+            with time_calculation("parametric", observations=observations, assets=assets):
+                parametric_var = self._parametric_var(portfolio_returns, portfolio_value)
+                results["parametric"] = VaRResult(
+                    var_historical=0.0,
+                    var_parametric=parametric_var,
+                    var_conditional=self._calculate_cvar(portfolio_returns, parametric_var),
+                    confidence_level=self.confidence_level,
+                    time_horizon=self.time_horizon,
+                    method="parametric"
+                )
             
         if method in ["monte_carlo", "all"]:
-            mc_var = self._monte_carlo_var(portfolio_returns, portfolio_value)
-            results["monte_carlo"] = VaRResult(
-                var_historical=0.0,
-                var_parametric=0.0,
-                var_conditional=self._calculate_cvar(portfolio_returns, mc_var),
-                confidence_level=self.confidence_level,
-                time_horizon=self.time_horizon,
-                method="monte_carlo"
-            )
+            with time_calculation("monte_carlo", observations=observations, assets=assets):
+                mc_var = self._monte_carlo_var(portfolio_returns, portfolio_value)
+                results["monte_carlo"] = VaRResult(
+                    var_historical=0.0,
+                    var_parametric=0.0,
+                    var_conditional=self._calculate_cvar(portfolio_returns, mc_var),
+                    confidence_level=self.confidence_level,
+                    time_horizon=self.time_horizon,
+                    method="monte_carlo"
+                )
             
         return results
     
@@ -115,6 +121,7 @@ class VarCalculator:
         # Calculate portfolio values
         portfolio_values = portfolio_value * (1 + random_returns)
         losses = portfolio_value - portfolio_values
+        record_simulated_paths("var", num_simulations, 1)
         
         # Calculate VaR
         return np.percentile(losses, self.confidence_level * 100)
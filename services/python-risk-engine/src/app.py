@@ -1,6 +1,8 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
@@ -27,6 +29,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus request metrics and request profiling (shared with the app package)
+from app.api.v1.endpoints import profiles
+from app.core.config import settings
+from app.core.metrics import (
+    mark_process_dead,
+    monitor_event_loop_lag,
+    render_metrics,
+    track_executor,
+)
+from app.core.profiling import configure_profile_store
+from app.core.security import init_api_key_index
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.api_key_store import load_api_key
+from app.utils.circuit_breaker import configure_circuit_breakers
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.ENABLE_METRICS:
+    app.add_middleware(MetricsMiddleware)
+app.include_router(profiles.router, prefix="/admin/profiles", tags=["admin"])
+
 # Import after environment setup
 from .services.risk_calculator import RiskCalculator
 from .algorithms.var_calculator import VarCalculator
@@ -38,6 +62,40 @@ risk_calculator = RiskCalculator()
 var_calculator = VarCalculator()
 mc_simulator = MonteCarloSimulation()
 
+@app.on_event("startup")
+async def startup_event():
+    """Set up admin authentication, profile storage and runtime metrics."""
+    init_api_key_index(loader=load_api_key if settings.DATABASE_URI else None)
+    configure_profile_store(
+        settings.REDIS_URL, max_profiles=settings.PROFILING_MAX_STORED, ttl=settings.PROFILING_TTL
+    )
+    configure_circuit_breakers(
+        settings.REDIS_URL if settings.CIRCUIT_BREAKER_SHARED_STATE else None
+    )
+
+    if settings.ENABLE_METRICS:
+        # Use an explicit default executor so its queue depth can be reported
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(thread_name_prefix="risk-engine")
+        loop.set_default_executor(executor)
+        track_executor("default", executor)
+        app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the event-loop lag monitor and retire this worker's metrics."""
+    loop_lag_task = getattr(app.state, "loop_lag_task", None)
+    if loop_lag_task is not None:
+        loop_lag_task.cancel()
+    mark_process_dead()
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose metrics in the Prometheus text format."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -1,2 +1 @@
-"""service"""
-"'" Initialize services package"""
+"""Initialize services package"""